@@ -2,69 +2,38 @@
 Rate Limiter for Personal Recipe Intelligence API
 
 シンプルで軽量なレートリミッター実装。
-SlowAPI の代わりに、メモリベースの自作実装を使用。
+SlowAPI の代わりに、共通のレート制限エンジン（backend/core/rate_limit.py、
+GCRA）を使用する。クライアントごとの状態は数値1つで、
+古いリクエストの記録や定期的なクリーンアップは不要。
 """
 
-import time
-from typing import Dict, Optional, Tuple
-from collections import defaultdict
+from typing import Optional, Tuple
 from fastapi import Request, HTTPException, status
-import asyncio
+
+from backend.core.rate_limit import (
+    Rate,
+    RateLimitEngine,
+    get_rate_limit_engine,
+    retry_after_seconds,
+)
 
 
 class RateLimiter:
     """
-    メモリベースのシンプルなレートリミッター。
+    IPアドレス・エンドポイントごとのレートリミッター。
 
     IPアドレスごとにリクエスト数をトラッキングし、
     制限を超えた場合は429エラーを返す。
     """
 
-    def __init__(self):
-        """レートリミッターの初期化"""
-        # {ip_address: {endpoint: [(timestamp, count)]}}
-        self._requests: Dict[str, Dict[str, list]] = defaultdict(
-            lambda: defaultdict(list)
-        )
-        # クリーンアップ用のロック
-        self._lock = asyncio.Lock()
-        # 最後のクリーンアップ時刻
-        self._last_cleanup = time.time()
-        # クリーンアップ間隔（秒）
-        self._cleanup_interval = 300  # 5分
-
-    async def _cleanup_old_entries(self):
+    def __init__(self, engine: Optional[RateLimitEngine] = None):
         """
-        古いエントリをクリーンアップしてメモリ使用量を削減。
-        """
-        current_time = time.time()
-
-        # クリーンアップ間隔チェック
-        if current_time - self._last_cleanup < self._cleanup_interval:
-            return
+        レートリミッターの初期化
 
-        async with self._lock:
-            # 1時間以上前のエントリを削除
-            cutoff_time = current_time - 3600
-
-            for ip in list(self._requests.keys()):
-                for endpoint in list(self._requests[ip].keys()):
-                    # 古いタイムスタンプを削除
-                    self._requests[ip][endpoint] = [
-                        (ts, count)
-                        for ts, count in self._requests[ip][endpoint]
-                        if ts > cutoff_time
-                    ]
-
-                    # 空のエンドポイントを削除
-                    if not self._requests[ip][endpoint]:
-                        del self._requests[ip][endpoint]
-
-                # 空のIPエントリを削除
-                if not self._requests[ip]:
-                    del self._requests[ip]
-
-            self._last_cleanup = current_time
+        Args:
+          engine: レート制限エンジン（省略時はこのインスタンス専用のメモリ上のエンジン）
+        """
+        self._engine = engine or RateLimitEngine()
 
     async def check_rate_limit(
         self, ip_address: str, endpoint: str, limit: int, window: int = 60
@@ -81,35 +50,11 @@ class RateLimiter:
         Returns:
           (許可されるか, リトライまでの秒数)
         """
-        current_time = time.time()
-        cutoff_time = current_time - window
-
-        # 定期的なクリーンアップ
-        await self._cleanup_old_entries()
-
-        # 現在の窓内のリクエストを取得
-        requests = self._requests[ip_address][endpoint]
-
-        # 古いリクエストを削除
-        valid_requests = [(ts, count) for ts, count in requests if ts > cutoff_time]
-
-        # リクエスト数をカウント
-        total_requests = sum(count for _, count in valid_requests)
-
-        if total_requests >= limit:
-            # 最も古いリクエストからのリトライ時間を計算
-            if valid_requests:
-                oldest_timestamp = min(ts for ts, _ in valid_requests)
-                retry_after = int(window - (current_time - oldest_timestamp)) + 1
-            else:
-                retry_after = window
-
-            return False, retry_after
-
-        # 新しいリクエストを記録
-        valid_requests.append((current_time, 1))
-        self._requests[ip_address][endpoint] = valid_requests
-
+        result = await self._engine.hit_async(
+            f"api|{endpoint}|{ip_address}", Rate(limit, window)
+        )
+        if not result.allowed:
+            return False, retry_after_seconds(result)
         return True, None
 
     def get_client_ip(self, request: Request) -> str:
@@ -139,8 +84,8 @@ class RateLimiter:
         return "unknown"
 
 
-# グローバルなレートリミッターインスタンス
-rate_limiter = RateLimiter()
+# グローバルなレートリミッターインスタンス（ワーカー間で共有可能なエンジンを使用）
+rate_limiter = RateLimiter(get_rate_limit_engine())
 
 
 class RateLimitConfig:
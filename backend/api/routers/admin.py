@@ -4,12 +4,14 @@
 管理者ダッシュボード用のエンドポイントを提供。
 """
 
+from datetime import datetime
 from typing import Any, Dict, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
 
 from backend.services.admin_service import AdminService
+from backend.services.audit_service import get_audit_service
 from backend.api.auth import get_current_admin_user
 
 
@@ -197,6 +199,36 @@ async def get_system_logs(
         )
 
 
+@router.get("/audit")
+async def get_audit_logs(
+    start: Optional[datetime] = Query(None, description="期間の開始 (ISO8601)"),
+    end: Optional[datetime] = Query(None, description="期間の終了 (ISO8601)"),
+    action: Optional[str] = Query(None, description="アクションフィルタ"),
+    user_id: Optional[str] = Query(None, description="ユーザーIDフィルタ"),
+    limit: int = Query(100, ge=1, le=1000, description="取得件数"),
+    _: Dict[str, Any] = Depends(get_current_admin_user),
+) -> Dict[str, Any]:
+    """
+    監査ログを検索（新しい順）
+
+    管理者のみアクセス可能。
+    """
+    try:
+        entries = get_audit_service().query(
+            start=start, end=end, action=action, user_id=user_id, limit=limit
+        )
+        return {
+            "status": "ok",
+            "data": {"entries": entries, "count": len(entries)},
+            "error": None,
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get audit logs: {str(e)}",
+        )
+
+
 @router.get("/health")
 async def health_check(
     admin_service: AdminService = Depends(get_admin_service),
@@ -2,7 +2,7 @@
 カレンダーAPIルーター - 献立計画のCRUD操作とエクスポート機能
 """
 
-from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi import APIRouter, Header, HTTPException, Query, Response
 from typing import List, Optional
 from datetime import date
 from pydantic import BaseModel, Field
@@ -203,25 +203,35 @@ async def delete_meal_plan(plan_id: int):
 async def export_ical(
     start_date: Optional[str] = Query(None, description="開始日 (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="終了日 (YYYY-MM-DD)"),
+    if_none_match: Optional[str] = Header(None),
 ):
     """
     iCal 形式で献立カレンダーをエクスポート
 
     - start_date, end_date で期間を指定可能
     - レスポンスは .ics ファイルとしてダウンロード可能
+    - ETag を返し、If-None-Match が一致すれば 304 を返す
     """
     try:
         # 日付パース
         start = date.fromisoformat(start_date) if start_date else None
         end = date.fromisoformat(end_date) if end_date else None
 
-        ical_content = calendar_service.export_to_ical(start_date=start, end_date=end)
+        ical_content, etag = calendar_service.get_ical_export(
+            start_date=start, end_date=end
+        )
+
+        if if_none_match == etag:
+            return Response(status_code=304, headers={"ETag": etag})
 
         # iCalendar ファイルとして返す
         return Response(
             content=ical_content,
             media_type="text/calendar",
-            headers={"Content-Disposition": "attachment; filename=meal_calendar.ics"},
+            headers={
+                "Content-Disposition": "attachment; filename=meal_calendar.ics",
+                "ETag": etag,
+            },
         )
 
     except ValueError as e:
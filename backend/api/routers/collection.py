@@ -177,6 +177,34 @@ async def get_public_collections(
         )
 
 
+@router.get("/by-recipe/{recipe_id}", response_model=CollectionListResponse)
+async def get_collections_with_recipe(
+    recipe_id: str, authorization: Optional[str] = Header(None)
+):
+    """
+    Get current user's collections that contain a recipe.
+
+    Args:
+      recipe_id: Recipe ID
+      authorization: Authorization header
+
+    Returns:
+      List of collections
+    """
+    try:
+        user_id = get_user_id(authorization)
+        collections = collection_service.get_collections_with_recipe(recipe_id, user_id)
+
+        return CollectionListResponse(data=[c.to_dict() for c in collections])
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to get collections: {str(e)}"
+        )
+
+
 @router.get("/{collection_id}", response_model=CollectionResponse)
 async def get_collection(
     collection_id: str, authorization: Optional[str] = Header(None)
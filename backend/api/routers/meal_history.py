@@ -294,3 +294,22 @@ async def get_nutrition_summary(
         raise
     except Exception as e:
         return ApiResponse(status="error", error=str(e))
+
+
+@router.get("/totals", response_model=ApiResponse)
+async def get_period_totals(
+    user_id: str = Query(..., description="ユーザーID"),
+    period: str = Query("week", description="集計単位", pattern="^(week|month)$"),
+):
+    """
+    週別・月別の栄養摂取量合計を取得
+
+    記録のある週（月曜日始まり）または月ごとの合計と食事回数を返します。
+    """
+    try:
+        totals = service.get_period_totals(user_id, period)
+
+        return ApiResponse(status="ok", data={"period": period, "totals": totals})
+
+    except Exception as e:
+        return ApiResponse(status="error", error=str(e))
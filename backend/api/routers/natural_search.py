@@ -206,8 +206,7 @@ async def clear_history():
     すべての検索履歴を削除します。
     """
     try:
-        natural_search_service.history = []
-        natural_search_service._save_history()
+        natural_search_service.clear_history()
 
         return {"status": "ok", "message": "検索履歴をクリアしました"}
 
@@ -2,14 +2,20 @@
 OCR API Router - Image-to-recipe extraction endpoints
 """
 
+import asyncio
 import base64
 from typing import Optional
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
 from pydantic import BaseModel, Field
 
 from backend.api.schemas import ApiResponse
 from backend.core.database import get_session
+from backend.core.uploads import (
+    remove_spooled,
+    spool_multipart_images,
+    spool_upload_file,
+)
 
 router = APIRouter(prefix="/api/v1/ocr", tags=["ocr"])
 
@@ -34,6 +40,10 @@ class Base64ImageRequest(BaseModel):
 # Maximum upload size (10MB)
 MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10MB
 
+# 一括アップロードの上限と同時OCR数
+MAX_BULK_FILES = 20
+OCR_WORKERS = 2
+
 
 @router.post("/extract", response_model=ApiResponse)
 async def extract_from_image(
@@ -49,23 +59,16 @@ async def extract_from_image(
                 status_code=400, detail="画像ファイルをアップロードしてください"
             )
 
-        # ファイルサイズチェック
-        file.file.seek(0, 2)  # Move to end of file
-        file_size = file.file.tell()
-        file.file.seek(0)  # Reset to beginning
-
-        if file_size > MAX_UPLOAD_SIZE:
-            raise HTTPException(
-                status_code=413,
-                detail=f"ファイルサイズが大きすぎます。最大{MAX_UPLOAD_SIZE // (1024 * 1024)}MBまでアップロード可能です"
-            )
-
-        # 画像データ読み込み
-        image_data = await file.read()
+        # ディスクへ逐次書き出し（サイズ・形式はストリーミング中に検証）
+        upload = await spool_upload_file(file, max_size=MAX_UPLOAD_SIZE)
 
-        # OCR実行
-        ocr_service = OCRService()
-        result = ocr_service.extract_recipe(image_data)
+        # OCR実行（ワーカーにはファイルパスを渡す）
+        try:
+            ocr_service = OCRService()
+            response = await asyncio.to_thread(ocr_service.process_image, upload.path)
+        finally:
+            remove_spooled([upload])
+        result = response.get("data")
 
         if not result:
             raise HTTPException(status_code=400, detail="レシピの抽出に失敗しました")
@@ -95,10 +98,60 @@ async def extract_from_image(
 
     except ImportError:
         raise HTTPException(status_code=501, detail="OCRモジュールが利用できません")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/extract-bulk", response_model=ApiResponse)
+async def extract_from_images_bulk(request: Request):
+    """
+    複数画像からレシピを一括抽出
+
+    multipart/form-data のボディを逐次パースして画像をディスクへ書き出し、
+    OCRワーカーにはファイルパスのみを渡す。メモリ使用量はアップロードサイズや
+    同時実行数に依存しない。
+    """
+    try:
+        from backend.ocr.service import OCRService
+    except ImportError:
+        raise HTTPException(status_code=501, detail="OCRモジュールが利用できません")
+
+    uploads, _ = await spool_multipart_images(
+        request, max_file_size=MAX_UPLOAD_SIZE, max_files=MAX_BULK_FILES
+    )
+
+    try:
+        ocr_service = OCRService()
+        semaphore = asyncio.Semaphore(OCR_WORKERS)
+
+        async def process(upload):
+            async with semaphore:
+                result = await asyncio.to_thread(
+                    ocr_service.process_image, upload.path, True, True
+                )
+            result["source"] = upload.original_filename
+            return result
+
+        results = await asyncio.gather(*(process(upload) for upload in uploads))
+    finally:
+        remove_spooled(uploads)
+
+    success = sum(1 for r in results if r["status"] == "ok")
+    return ApiResponse(
+        status="ok",
+        data={
+            "results": results,
+            "summary": {
+                "total": len(results),
+                "success": success,
+                "error": len(results) - success,
+            },
+        },
+    )
+
+
 @router.post("/extract-base64", response_model=ApiResponse)
 async def extract_from_base64(
     request: Base64ImageRequest, session=Depends(get_session)
@@ -146,6 +146,18 @@ MOCK_RECIPES = [
 ]
 
 
+# 材料索引はリクエスト間で共有する
+_recommendation_service = None
+
+
+def get_recommendation_service() -> RecommendationService:
+    """推薦サービス取得（材料索引を構築済みの共有インスタンス）"""
+    global _recommendation_service
+    if _recommendation_service is None:
+        _recommendation_service = RecommendationService(recipes=MOCK_RECIPES)
+    return _recommendation_service
+
+
 def _convert_to_response_item(result: RecommendationResult) -> dict:
     """RecommendationResultをレスポンス形式に変換"""
     return {
@@ -174,8 +186,8 @@ async def recommend_by_ingredients(request: IngredientRequest) -> dict:
       推薦結果
     """
     try:
-        # サービス初期化
-        service = RecommendationService(recipes=MOCK_RECIPES)
+        # サービス取得
+        service = get_recommendation_service()
 
         # 推薦実行
         results = service.recommend_by_ingredients(
@@ -224,8 +236,8 @@ async def recommend_similar(
       推薦結果
     """
     try:
-        # サービス初期化
-        service = RecommendationService(recipes=MOCK_RECIPES)
+        # サービス取得
+        service = get_recommendation_service()
 
         # 推薦実行
         results = service.recommend_similar(
@@ -280,8 +292,8 @@ async def what_can_i_make(request: WhatCanIMakeRequest) -> dict:
       推薦結果
     """
     try:
-        # サービス初期化
-        service = RecommendationService(recipes=MOCK_RECIPES)
+        # サービス取得
+        service = get_recommendation_service()
 
         # 推薦実行
         results = service.what_can_i_make(
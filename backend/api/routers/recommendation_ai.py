@@ -2,18 +2,40 @@
 レシピ推薦AI APIルーター
 """
 
+import asyncio
 from typing import List, Optional
 
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
 
 from backend.services.recommendation_ai_service import RecommendationAIService
+from backend.services.recommendation_snapshot import (
+    DEFAULT_TRENDING_WINDOW,
+    TRENDING_WINDOWS,
+    RecommendationMaterializer,
+)
 
 router = APIRouter(prefix="/api/v1/ai", tags=["AI Recommendation"])
 
 # サービスインスタンス
 recommendation_service = RecommendationAIService(data_dir="data")
 
+_materializer = None
+
+
+def get_materializer() -> RecommendationMaterializer:
+    """事前計算サービス取得（初回呼び出し時にバックグラウンド更新を開始）
+
+    ウォームアップは更新スレッドで行うため、この呼び出しはすぐに戻る。
+    """
+    global _materializer
+    if _materializer is None:
+        _materializer = RecommendationMaterializer(
+            recommendation_service, recipe_source=_get_dummy_recipes
+        )
+        _materializer.start()
+    return _materializer
+
 
 # === Pydantic Models ===
 
@@ -108,12 +130,12 @@ async def get_personalized_recommendations(
 ):
     """パーソナライズ推薦を取得"""
     try:
-        # ダミーレシピデータ（実際はDBから取得）
-        recipes = _get_dummy_recipes()
-
-        recommendations = recommendation_service.get_personalized_recommendations(
-            user_id=user_id, recipes=recipes, limit=limit
+        # バックグラウンドで事前計算したスナップショットから返す
+        # （起動直後は計算が走るためイベントループの外で呼ぶ）
+        snapshot = await asyncio.to_thread(
+            get_materializer().get_personalized, user_id, limit
         )
+        recommendations = snapshot.items
 
         return StandardResponse(
             status="ok",
@@ -121,6 +143,8 @@ async def get_personalized_recommendations(
                 "user_id": user_id,
                 "recommendations": recommendations,
                 "total": len(recommendations),
+                "version": snapshot.version,
+                "generated_at": snapshot.generated_at,
             },
         )
 
@@ -140,15 +164,15 @@ async def get_similar_recipes(
 ):
     """類似レシピを取得"""
     try:
-        recipes = _get_dummy_recipes()
+        snapshot = await asyncio.to_thread(
+            get_materializer().get_similar, recipe_id, limit
+        )
 
         # レシピが存在するかチェック
-        if not any(r.get("id") == recipe_id for r in recipes):
+        if snapshot is None:
             raise HTTPException(status_code=404, detail="レシピが見つかりません")
 
-        similar_recipes = recommendation_service.get_similar_recipes(
-            recipe_id=recipe_id, recipes=recipes, limit=limit
-        )
+        similar_recipes = snapshot.items
 
         return StandardResponse(
             status="ok",
@@ -156,6 +180,8 @@ async def get_similar_recipes(
                 "recipe_id": recipe_id,
                 "similar_recipes": similar_recipes,
                 "total": len(similar_recipes),
+                "version": snapshot.version,
+                "generated_at": snapshot.generated_at,
             },
         )
 
@@ -173,23 +199,33 @@ async def get_similar_recipes(
 )
 async def get_trending_recipes(
     limit: int = Query(10, ge=1, le=50, description="取得件数"),
+    window: str = Query(
+        DEFAULT_TRENDING_WINDOW, description="集計期間: " + ", ".join(TRENDING_WINDOWS)
+    ),
 ):
     """トレンドレシピを取得"""
     try:
-        recipes = _get_dummy_recipes()
+        if window not in TRENDING_WINDOWS:
+            raise HTTPException(status_code=400, detail=f"無効な集計期間: {window}")
 
-        trending_recipes = recommendation_service.get_trending_recommendations(
-            recipes=recipes, limit=limit
+        snapshot = await asyncio.to_thread(
+            get_materializer().get_trending, window, limit
         )
+        trending_recipes = snapshot.items
 
         return StandardResponse(
             status="ok",
             data={
                 "trending_recipes": trending_recipes,
                 "total": len(trending_recipes),
+                "window": window,
+                "version": snapshot.version,
+                "generated_at": snapshot.generated_at,
             },
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"トレンドレシピ取得エラー: {str(e)}"
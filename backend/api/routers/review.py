@@ -4,7 +4,7 @@ Review API router for Personal Recipe Intelligence.
 """
 
 from typing import Optional
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, HTTPException, Header, Query
 from pydantic import BaseModel, Field
 
 from backend.services.review_service import ReviewService
@@ -413,6 +413,45 @@ async def get_rating_summary(recipe_id: str) -> ApiResponse:
         )
 
 
+@router.get("/summaries")
+async def get_rating_summaries(
+    recipe_ids: str = Query(..., description="カンマ区切りのレシピID"),
+) -> ApiResponse:
+    """
+    複数レシピの評価サマリーをまとめて取得（一覧ページの評価バッジ用）
+
+    Args:
+        recipe_ids: カンマ区切りのレシピID（最大200件）
+
+    Returns:
+        レシピIDごとの評価サマリー
+    """
+    ids = [
+        recipe_id.strip() for recipe_id in recipe_ids.split(",") if recipe_id.strip()
+    ]
+    if not ids:
+        raise HTTPException(status_code=400, detail="recipe_ids is required")
+    if len(ids) > 200:
+        raise HTTPException(status_code=400, detail="Too many recipe_ids (max 200)")
+
+    try:
+        summaries = review_service.get_rating_summaries(ids)
+
+        return ApiResponse(
+            status="ok",
+            data={
+                "summaries": {
+                    recipe_id: summary.to_dict()
+                    for recipe_id, summary in summaries.items()
+                }
+            },
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to get rating summaries: {str(e)}"
+        )
+
+
 @router.get("/recipe/{recipe_id}/popular")
 async def get_popular_reviews(recipe_id: str, limit: int = 3) -> ApiResponse:
     """
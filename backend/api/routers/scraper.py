@@ -2,9 +2,11 @@
 Scraper API Router - Web recipe scraping endpoints
 """
 
+import json
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, HttpUrl
 
 from backend.api.schemas import ApiResponse
@@ -18,6 +20,25 @@ class ScrapeRequest(BaseModel):
 
     url: HttpUrl = Field(..., description="レシピページのURL")
     save: bool = Field(default=False, description="スクレイピング後に保存するか")
+    use_cache: bool = Field(default=True, description="HTMLキャッシュを利用するか")
+
+
+class BulkScrapeRequest(BaseModel):
+    """一括スクレイピングリクエスト"""
+
+    urls: list[HttpUrl] = Field(
+        ..., min_length=1, max_length=500, description="レシピページのURL一覧"
+    )
+    per_host_concurrency: int = Field(
+        default=2, ge=1, le=8, description="ホストごとの同時リクエスト数"
+    )
+    use_cache: bool = Field(default=True, description="HTMLキャッシュを利用するか")
+
+
+class ReparseRequest(BaseModel):
+    """キャッシュ済みHTMLの再解析リクエスト"""
+
+    limit: Optional[int] = Field(default=None, ge=1, description="再解析する最大件数")
 
 
 class ScrapeResult(BaseModel):
@@ -38,20 +59,14 @@ class ScrapeResult(BaseModel):
 async def scrape_recipe(request: ScrapeRequest, session=Depends(get_session)):
     """URLからレシピをスクレイピング"""
     try:
-        from backend.scraper import CookpadScraper, DelishKitchenScraper, GenericScraper
+        from backend.scraper import get_html_cache, get_scraper_for_url
 
         url_str = str(request.url)
 
-        # サイトに応じたスクレイパーを選択
-        if "cookpad.com" in url_str:
-            scraper = CookpadScraper()
-        elif "delishkitchen.tv" in url_str:
-            scraper = DelishKitchenScraper()
-        else:
-            scraper = GenericScraper()
-
-        # スクレイピング実行
-        result = await scraper.scrape(url_str)
+        # サイトに応じたスクレイパーを選択（取得済みHTMLはキャッシュから再利用）
+        html_cache = get_html_cache() if request.use_cache else None
+        async with get_scraper_for_url(url_str, html_cache=html_cache) as scraper:
+            result = await scraper.scrape(url_str)
 
         if not result:
             raise HTTPException(status_code=400, detail="レシピの抽出に失敗しました")
@@ -91,6 +106,55 @@ async def scrape_recipe(request: ScrapeRequest, session=Depends(get_session)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/bulk")
+async def bulk_scrape(request: BulkScrapeRequest):
+    """
+    複数URLを一括スクレイピング
+
+    ホストごとに並列実行し、完了した順に1行1件のNDJSONで結果を返す。
+    共有クローラーを使うため、ホストごとの間隔や条件付きリクエスト用の
+    ETag / Last-Modified はリクエストをまたいで引き継がれる。
+    """
+    from backend.scraper import get_batch_crawler
+
+    urls = [str(url) for url in request.urls]
+    crawler = get_batch_crawler()
+
+    async def stream():
+        async for result in crawler.crawl(
+            urls,
+            per_host_concurrency=request.per_host_concurrency,
+            use_cache=request.use_cache,
+        ):
+            yield json.dumps(result.to_dict(), ensure_ascii=False) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@router.post("/reparse")
+async def reparse_cached_pages(request: ReparseRequest):
+    """
+    キャッシュ済みHTMLを現在のパーサーで一括再解析
+
+    ネットワークアクセスは行わず、結果をNDJSONでストリーミングする。
+    """
+    from backend.scraper import get_html_cache, reparse_cached
+
+    async def stream():
+        async for result in reparse_cached(get_html_cache(), limit=request.limit):
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@router.get("/cache/stats", response_model=ApiResponse)
+async def get_html_cache_stats():
+    """HTMLキャッシュの統計"""
+    from backend.scraper import get_html_cache
+
+    return ApiResponse(status="ok", data=get_html_cache().get_stats())
+
+
 @router.get("/supported-sites", response_model=ApiResponse)
 async def get_supported_sites():
     """サポートされているサイト一覧"""
@@ -8,11 +8,11 @@ Follows CLAUDE.md specifications for PRI project.
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from slowapi.errors import RateLimitExceeded
 import logging
 from pathlib import Path
 
 from backend.middleware.rate_limiter import (
+  RateLimitExceeded,
   limiter,
   rate_limit_exceeded_handler,
   get_rate_limit_status,
@@ -26,6 +26,7 @@ from backend.api.v1 import (
 # Use the full implementation router instead of stub
 from backend.api.routers.recipes import router as recipes_router
 from backend.api.routers.collector import router as collector_router
+from backend.scraper.crawler import close_batch_crawler
 
 # Database initialization
 from backend.core.database import create_db_and_tables
@@ -96,7 +97,7 @@ async def startup_event():
   create_db_and_tables()
   logger.info("Database tables initialized")
 
-  logger.info(f"Rate limiting enabled with slowapi")
+  logger.info("Rate limiting enabled (GCRA)")
   logger.info(f"Docs available at /api/docs")
 
 
@@ -106,6 +107,7 @@ async def shutdown_event():
   Application shutdown event handler
   """
   logger.info("Shutting down Personal Recipe Intelligence API")
+  await close_batch_crawler()
 
 
 @app.get("/")
@@ -0,0 +1,352 @@
+"""
+Shared rate limiting engine for Personal Recipe Intelligence.
+
+Rate limits are enforced with GCRA (the generic cell rate algorithm, an
+exact form of a token bucket). Each client key stores a single number, its
+theoretical arrival time (TAT), so memory is O(1) per client regardless of
+the limit or traffic, and a check is one read-modify-write of that number.
+
+A limit of ``limit`` requests per ``period`` seconds admits a burst of
+``limit`` requests and then one request every ``period / limit`` seconds.
+
+TATs are integer microseconds. Summing float intervals onto a wall-clock
+timestamp (~1.7e9) drifts by a few ulps per request, which was enough to
+reject the last request of a burst; integer arithmetic keeps the burst
+exact. Microsecond timestamps stay below 2**53, so a SQLite REAL column
+still stores them exactly.
+
+Storage is pluggable:
+
+- ``MemoryStorage``: in-process dict (per worker), expired keys dropped in
+  TAT order
+- ``SQLiteStorage``: a SQLite file shared by every process that opens it, so
+  uvicorn workers enforce one common limit
+
+The API-level dependency limiter (``backend/api/rate_limiter.py``), the
+endpoint decorators (``backend/middleware/rate_limiter.py``) and the scraper
+request throttle (``backend/scraper/base.py``) all run on this engine.
+Set ``PRI_RATE_LIMIT_DB`` to a file path to share the default engine between
+workers. Coroutines use ``hit_async``/``reserve_async``, which move blocking
+storage calls (SQLite may wait for another worker's write lock) off the event
+loop.
+"""
+
+import asyncio
+import heapq
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# A storage update receives the stored TAT in microseconds (None if
+# unknown/expired) and returns (new TAT or None to keep the stored value, result)
+Updater = Callable[[Optional[int]], Tuple[Optional[int], T]]
+
+_MICROSECONDS = 1_000_000
+
+_PERIODS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+}
+
+
+@dataclass(frozen=True)
+class Rate:
+    """A rate limit of ``limit`` requests per ``period`` seconds."""
+
+    limit: int
+    period: float
+
+    @property
+    def interval(self) -> float:
+        """Seconds between requests at the sustained rate."""
+        return self.period / self.limit
+
+    @property
+    def period_us(self) -> int:
+        """The period in whole microseconds."""
+        return round(self.period * _MICROSECONDS)
+
+    @property
+    def interval_us(self) -> int:
+        """Microseconds between requests (rounded down, at least 1)."""
+        return max(1, self.period_us // self.limit)
+
+    @classmethod
+    def parse(cls, value: str) -> "Rate":
+        """
+        Parse a limit string such as ``"5/minute"`` or ``"100 per 1 hour"``.
+
+        Raises:
+          ValueError: If the string is not a valid limit
+        """
+        match = re.fullmatch(
+            r"\s*(\d+)\s*(?:/|per)\s*(\d+)?\s*(second|minute|hour|day)s?\s*",
+            value,
+        )
+        if not match:
+            raise ValueError(f"Invalid rate limit: {value!r}")
+        limit, multiplier, unit = match.groups()
+        return cls(int(limit), int(multiplier or 1) * _PERIODS[unit])
+
+    def __str__(self) -> str:
+        for unit, seconds in reversed(_PERIODS.items()):
+            if self.period % seconds == 0:
+                return f"{self.limit} per {int(self.period // seconds)} {unit}"
+        return f"{self.limit} per {self.period} second"
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """Outcome of a rate limit check."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    # Seconds until the next request would be allowed (0 when allowed)
+    retry_after: float
+    # Seconds until the client is back to a full burst
+    reset_after: float
+
+
+class MemoryStorage:
+    """In-process TAT storage (one integer per active client)."""
+
+    # Updates never wait on I/O or other processes
+    blocking = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> TAT (microseconds)
+        self._tats: Dict[str, int] = {}
+        # (TAT, key) min-heap; an entry whose TAT no longer matches _tats is stale
+        self._expiry: List[Tuple[int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._tats)
+
+    def update(self, key: str, now: int, updater: Updater) -> T:
+        """Atomically read and replace the TAT for ``key`` (``now`` in microseconds)."""
+        with self._lock:
+            # A TAT in the past carries no state. Sweeping in TAT order means a
+            # client on a slow rate cannot hold back expired keys behind it.
+            while self._expiry and self._expiry[0][0] <= now:
+                tat, expired_key = heapq.heappop(self._expiry)
+                if self._tats.get(expired_key) == tat:
+                    del self._tats[expired_key]
+
+            new_tat, result = updater(self._tats.get(key))
+            if new_tat is not None:
+                self._tats[key] = new_tat
+                heapq.heappush(self._expiry, (new_tat, key))
+                if len(self._expiry) > 2 * len(self._tats):
+                    # Drop stale entries so the heap stays O(active clients)
+                    self._expiry = [(t, k) for k, t in self._tats.items()]
+                    heapq.heapify(self._expiry)
+            return result
+
+    def reset(self, key: Optional[str] = None) -> None:
+        """Forget one key, or every key (stale heap entries are skipped later)."""
+        with self._lock:
+            if key is None:
+                self._tats.clear()
+                self._expiry.clear()
+            else:
+                self._tats.pop(key, None)
+
+
+class SQLiteStorage:
+    """TAT storage in a SQLite file shared across processes."""
+
+    # Updates may wait up to ``timeout`` for another worker's write lock
+    blocking = True
+
+    def __init__(self, db_path: Path, timeout: float = 5.0):
+        """
+        Initialize SQLite storage.
+
+        Args:
+          db_path: Database file path (every worker opens the same file)
+          timeout: Seconds to wait for another process holding the write lock
+        """
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits "
+            "(key TEXT PRIMARY KEY, tat REAL NOT NULL) WITHOUT ROWID"
+        )
+        self._updates = 0
+
+    def update(self, key: str, now: int, updater: Updater) -> T:
+        """Atomically read and replace the TAT for ``key`` across processes."""
+        with self._lock:
+            # IMMEDIATE takes the write lock up front so two workers cannot
+            # read the same TAT and both admit a request
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT tat FROM rate_limits WHERE key = ?", (key,)
+                ).fetchone()
+                # Rows written in seconds by older versions read as expired
+                tat = int(row[0]) if row and row[0] > now else None
+                new_tat, result = updater(tat)
+                if new_tat is not None:
+                    self._conn.execute(
+                        "INSERT INTO rate_limits (key, tat) VALUES (?, ?) "
+                        "ON CONFLICT(key) DO UPDATE SET tat = excluded.tat",
+                        (key, new_tat),
+                    )
+                self._updates += 1
+                if self._updates % 10000 == 0:
+                    self._conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return result
+
+    def reset(self, key: Optional[str] = None) -> None:
+        """Forget one key, or every key."""
+        with self._lock:
+            if key is None:
+                self._conn.execute("DELETE FROM rate_limits")
+            else:
+                self._conn.execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class RateLimitEngine:
+    """GCRA rate limiter over a pluggable TAT storage."""
+
+    def __init__(self, storage=None, clock: Callable[[], float] = time.time):
+        """
+        Initialize the engine.
+
+        Args:
+          storage: ``MemoryStorage`` (default) or ``SQLiteStorage``
+          clock: Time source in seconds (wall clock, so processes agree)
+        """
+        self.storage = storage if storage is not None else MemoryStorage()
+        self.clock = clock
+
+    def hit(self, key: str, rate: Rate) -> RateLimitResult:
+        """
+        Count one request for ``key`` if the rate allows it.
+
+        Args:
+          key: Client key (e.g. scope and client IP)
+          rate: Limit to enforce
+
+        Returns:
+          Result; a denied request is not counted
+        """
+        now = round(self.clock() * _MICROSECONDS)
+        interval = rate.interval_us
+
+        def updater(tat: Optional[int]) -> Tuple[Optional[int], RateLimitResult]:
+            new_tat = max(tat or now, now) + interval
+            allow_at = new_tat - rate.period_us
+            if allow_at > now:
+                current = max(tat or now, now)
+                return None, RateLimitResult(
+                    allowed=False,
+                    limit=rate.limit,
+                    remaining=0,
+                    retry_after=(allow_at - now) / _MICROSECONDS,
+                    reset_after=(current - now) / _MICROSECONDS,
+                )
+            return new_tat, RateLimitResult(
+                allowed=True,
+                limit=rate.limit,
+                remaining=(now - allow_at) // interval,
+                retry_after=0.0,
+                reset_after=(new_tat - now) / _MICROSECONDS,
+            )
+
+        return self.storage.update(key, now, updater)
+
+    def reserve(self, key: str, rate: Rate) -> float:
+        """
+        Count one request for ``key`` and return how long to wait before sending it.
+
+        Unlike ``hit`` the request is always counted, so concurrent callers
+        queue up behind each other instead of all waking at the same time.
+
+        Returns:
+          Delay in seconds (0 when the request may go now)
+        """
+        now = round(self.clock() * _MICROSECONDS)
+
+        def updater(tat: Optional[int]) -> Tuple[int, float]:
+            new_tat = max(tat or now, now) + rate.interval_us
+            return new_tat, max(0, new_tat - rate.period_us - now) / _MICROSECONDS
+
+        return self.storage.update(key, now, updater)
+
+    async def hit_async(self, key: str, rate: Rate) -> RateLimitResult:
+        """
+        ``hit`` for coroutines.
+
+        With blocking storage the check runs in a worker thread, so waiting on
+        another worker's SQLite write lock does not stall the event loop.
+        """
+        return await self._call(self.hit, key, rate)
+
+    async def reserve_async(self, key: str, rate: Rate) -> float:
+        """``reserve`` for coroutines (see ``hit_async``)."""
+        return await self._call(self.reserve, key, rate)
+
+    async def _call(self, method: Callable[[str, Rate], T], key: str, rate: Rate) -> T:
+        if getattr(self.storage, "blocking", False):
+            return await asyncio.to_thread(method, key, rate)
+        return method(key, rate)
+
+    def reset(self, key: Optional[str] = None) -> None:
+        """Forget the state of one key, or of every key."""
+        self.storage.reset(key)
+
+
+def retry_after_seconds(result: RateLimitResult) -> int:
+    """Whole seconds for a Retry-After header (at least 1)."""
+    return max(1, math.ceil(result.retry_after))
+
+
+_default_engine: Optional[RateLimitEngine] = None
+_default_lock = threading.Lock()
+
+
+def get_rate_limit_engine() -> RateLimitEngine:
+    """
+    Get the process-wide engine shared by the API rate limiters.
+
+    Uses ``SQLiteStorage`` at ``PRI_RATE_LIMIT_DB`` when that variable is set
+    (shared between workers), otherwise ``MemoryStorage``.
+    """
+    global _default_engine
+    with _default_lock:
+        if _default_engine is None:
+            db_path = os.environ.get("PRI_RATE_LIMIT_DB")
+            storage = SQLiteStorage(Path(db_path)) if db_path else MemoryStorage()
+            _default_engine = RateLimitEngine(storage)
+        return _default_engine
@@ -16,6 +16,7 @@ logger = logging.getLogger(__name__)
 
 # ファイルアップロード設定
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+UPLOAD_CHUNK_SIZE = 64 * 1024  # 64KB
 ALLOWED_IMAGE_MIME_TYPES = {
     "image/jpeg",
     "image/png",
@@ -105,16 +106,19 @@ async def validate_image_upload(
     Raises:
         HTTPException: 検証エラー時
     """
-    # ファイル内容を読み取り
-    content = await file.read()
-
-    # サイズチェック
-    if len(content) > max_size:
-        logger.warning(f"File upload rejected: size {len(content)} exceeds {max_size}")
-        raise HTTPException(
-            status_code=400,
-            detail=f"ファイルサイズが大きすぎます（最大: {max_size // (1024 * 1024)}MB）"
-        )
+    # ファイル内容をチャンク単位で読み取り（上限を超えた時点で中断）
+    chunks = []
+    total = 0
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        total += len(chunk)
+        if total > max_size:
+            logger.warning(f"File upload rejected: size exceeds {max_size}")
+            raise HTTPException(
+                status_code=400,
+                detail=f"ファイルサイズが大きすぎます（最大: {max_size // (1024 * 1024)}MB）"
+            )
+        chunks.append(chunk)
+    content = b"".join(chunks)
 
     if len(content) == 0:
         raise HTTPException(status_code=400, detail="空のファイルです")
@@ -0,0 +1,304 @@
+"""
+Personal Recipe Intelligence - Streaming Upload Ingestion
+
+multipart/form-data を逐次パースし、画像をチャンク単位でディスクへ書き出す。
+先頭バイトで MIME タイプを判定し、サイズ上限はストリーミング中に検査するため、
+アップロードサイズや同時実行数に関わらずメモリ使用量は一定に保たれる。
+"""
+
+import logging
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, Request, UploadFile
+
+from backend.core.security import (
+    ALLOWED_IMAGE_EXTENSIONS,
+    ALLOWED_IMAGE_MIME_TYPES,
+    MAX_FILE_SIZE,
+    UPLOAD_CHUNK_SIZE,
+    detect_mime_type,
+    sanitize_filename,
+)
+
+try:
+    import python_multipart as multipart
+    from python_multipart.multipart import parse_options_header
+except ImportError:  # pragma: no cover
+    import multipart
+    from multipart.multipart import parse_options_header
+
+logger = logging.getLogger(__name__)
+
+# MIME 判定に必要な先頭バイト数（WebP は 12 バイト目まで参照）
+SNIFF_BYTES = 16
+MAX_FILES = 20
+MAX_FIELD_SIZE = 64 * 1024
+UPLOAD_SPOOL_DIR = Path("data/uploads/spool")
+
+
+@dataclass
+class SpooledUpload:
+    """ディスクに書き出されたアップロードファイル"""
+
+    path: Path
+    filename: str
+    original_filename: str
+    mime_type: str
+    size: int
+
+
+class _ImageSpooler:
+    """1ファイル分の書き出し状態（先頭バイト判定・サイズ上限つき）"""
+
+    def __init__(self, original_filename: str, dest_dir: Path, max_size: int):
+        ext = Path(original_filename or "").suffix.lower()
+        if ext and ext not in ALLOWED_IMAGE_EXTENSIONS:
+            logger.warning(f"File upload rejected: invalid extension {ext}")
+            raise HTTPException(
+                status_code=400, detail=f"許可されていない拡張子です: {ext}"
+            )
+
+        self.original_filename = original_filename
+        self.filename = sanitize_filename(original_filename or "upload")
+        self.max_size = max_size
+        self.size = 0
+        self.mime_type: Optional[str] = None
+        self._head = b""
+        self._file = tempfile.NamedTemporaryFile(
+            dir=dest_dir, prefix="upload_", suffix=ext, delete=False
+        )
+        self.path = Path(self._file.name)
+
+    def write(self, data: bytes) -> None:
+        """チャンクを書き込む（上限超過・形式不正は即時に拒否）"""
+        self.size += len(data)
+        if self.size > self.max_size:
+            logger.warning(
+                f"File upload rejected: size exceeds {self.max_size} while streaming"
+            )
+            raise HTTPException(
+                status_code=413,
+                detail=f"ファイルサイズが大きすぎます（最大: {self.max_size // (1024 * 1024)}MB）",
+            )
+
+        if self.mime_type is None:
+            self._head += data[: SNIFF_BYTES - len(self._head)]
+            if len(self._head) >= SNIFF_BYTES:
+                self._sniff()
+
+        self._file.write(data)
+
+    def _sniff(self) -> None:
+        """先頭バイトから MIME タイプを判定"""
+        detected = detect_mime_type(self._head)
+        if detected not in ALLOWED_IMAGE_MIME_TYPES:
+            logger.warning(f"File upload rejected: invalid MIME type {detected}")
+            raise HTTPException(
+                status_code=400,
+                detail="許可されていないファイル形式です。JPEG, PNG, GIF, WebPのみ対応しています。",
+            )
+        self.mime_type = detected
+
+    def finish(self) -> SpooledUpload:
+        """書き込みを完了して結果を返す"""
+        self._file.close()
+        if self.size == 0:
+            raise HTTPException(status_code=400, detail="空のファイルです")
+        if self.mime_type is None:
+            self._sniff()
+        return SpooledUpload(
+            path=self.path,
+            filename=self.filename,
+            original_filename=self.original_filename,
+            mime_type=self.mime_type,
+            size=self.size,
+        )
+
+    def abort(self) -> None:
+        """書き込み途中のファイルを破棄"""
+        self._file.close()
+        self.path.unlink(missing_ok=True)
+
+
+def remove_spooled(uploads: List[SpooledUpload]) -> None:
+    """
+    書き出したファイルを削除
+
+    Args:
+        uploads: 削除対象
+    """
+    for upload in uploads:
+        upload.path.unlink(missing_ok=True)
+
+
+async def spool_upload_file(
+    file: UploadFile,
+    dest_dir: Path = UPLOAD_SPOOL_DIR,
+    max_size: int = MAX_FILE_SIZE,
+) -> SpooledUpload:
+    """
+    UploadFile をチャンク単位でディスクへ書き出す
+
+    Args:
+        file: アップロードされたファイル
+        dest_dir: 書き出し先ディレクトリ
+        max_size: 最大ファイルサイズ（バイト）
+
+    Returns:
+        書き出したファイルの情報
+
+    Raises:
+        HTTPException: 検証エラー時
+    """
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    spooler = _ImageSpooler(file.filename or "", dest_dir, max_size)
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            spooler.write(chunk)
+        upload = spooler.finish()
+    except BaseException:
+        spooler.abort()
+        raise
+
+    logger.info(
+        f"File upload spooled: {upload.filename}, size={upload.size}, mime={upload.mime_type}"
+    )
+    return upload
+
+
+async def spool_multipart_images(
+    request: Request,
+    dest_dir: Path = UPLOAD_SPOOL_DIR,
+    max_file_size: int = MAX_FILE_SIZE,
+    max_files: int = MAX_FILES,
+) -> tuple[List[SpooledUpload], Dict[str, str]]:
+    """
+    multipart リクエストボディを逐次パースし、画像をディスクへ書き出す
+
+    リクエスト全体をメモリに読み込まず、受信したチャンクをそのまま
+    パーサーに渡す。いずれかのファイルが検証に失敗した場合は、
+    書き出し済みのファイルをすべて削除して例外を送出する。
+
+    Args:
+        request: FastAPI リクエスト
+        dest_dir: 書き出し先ディレクトリ
+        max_file_size: 1ファイルあたりの最大サイズ（バイト）
+        max_files: 最大ファイル数
+
+    Returns:
+        (書き出したファイル一覧, テキストフィールド) のタプル
+
+    Raises:
+        HTTPException: 検証エラー時
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(
+            status_code=400, detail="multipart/form-data で送信してください"
+        )
+
+    dest_dir.mkdir(parents=True, exist_ok=True)
+
+    uploads: List[SpooledUpload] = []
+    fields: Dict[str, str] = {}
+    state: Dict[str, object] = {
+        "header_field": b"",
+        "header_value": b"",
+        "headers": {},
+        "spooler": None,
+        "field_name": None,
+        "field_value": b"",
+    }
+
+    def on_part_begin() -> None:
+        state["headers"] = {}
+        state["spooler"] = None
+        state["field_name"] = None
+        state["field_value"] = b""
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        state["header_field"] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        state["header_value"] += data[start:end]
+
+    def on_header_end() -> None:
+        state["headers"][state["header_field"].lower()] = state["header_value"]
+        state["header_field"] = b""
+        state["header_value"] = b""
+
+    def on_headers_finished() -> None:
+        _, options = parse_options_header(
+            state["headers"].get(b"content-disposition", b"")
+        )
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        if b"filename" in options:
+            if len(uploads) >= max_files:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"ファイル数が多すぎます（最大: {max_files}件）",
+                )
+            filename = options[b"filename"].decode("utf-8", "replace")
+            state["spooler"] = _ImageSpooler(filename, dest_dir, max_file_size)
+        else:
+            state["field_name"] = name
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        spooler = state["spooler"]
+        if spooler is not None:
+            spooler.write(data[start:end])
+        elif state["field_name"] is not None:
+            state["field_value"] += data[start:end]
+            if len(state["field_value"]) > MAX_FIELD_SIZE:
+                raise HTTPException(status_code=400, detail="フィールドが大きすぎます")
+
+    def on_part_end() -> None:
+        spooler = state["spooler"]
+        if spooler is not None:
+            state["spooler"] = None
+            try:
+                uploads.append(spooler.finish())
+            except BaseException:
+                spooler.abort()
+                raise
+        elif state["field_name"] is not None:
+            fields[state["field_name"]] = state["field_value"].decode(
+                "utf-8", "replace"
+            )
+
+    parser = multipart.MultipartParser(
+        params[b"boundary"],
+        {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+        },
+    )
+
+    try:
+        async for chunk in request.stream():
+            if chunk:
+                parser.write(chunk)
+        parser.finalize()
+    except BaseException as e:
+        if state["spooler"] is not None:
+            state["spooler"].abort()
+        remove_spooled(uploads)
+        if isinstance(e, HTTPException):
+            raise
+        if isinstance(e, multipart.exceptions.MultipartParseError):
+            raise HTTPException(status_code=400, detail="不正なmultipartデータです")
+        raise
+
+    if not uploads:
+        raise HTTPException(status_code=400, detail="画像ファイルがありません")
+
+    logger.info(f"Spooled {len(uploads)} uploads to {dest_dir}")
+    return uploads, fields
@@ -11,6 +11,15 @@ import time
 
 from backend.services.api_key_service import APIKeyService
 
+# 認証不要のパス（前方一致）
+PUBLIC_PATHS = (
+    "/api/v1/public/keys",
+    "/api/v1/public/docs",
+    "/docs",
+    "/openapi.json",
+    "/health",
+)
+
 
 class APIKeyMiddleware:
     """
@@ -42,17 +51,8 @@ class APIKeyMiddleware:
         Returns:
           レスポンス
         """
-        # 公開エンドポイントのパス
-        public_paths = [
-            "/api/v1/public/keys",
-            "/api/v1/public/docs",
-            "/docs",
-            "/openapi.json",
-            "/health",
-        ]
-
         # 公開パスはスキップ
-        if any(request.url.path.startswith(path) for path in public_paths):
+        if request.url.path.startswith(PUBLIC_PATHS):
             return await call_next(request)
 
         # APIキーを取得（ヘッダーから）
@@ -6,19 +6,42 @@ IP-based rate limiting with different limits for different endpoints:
 - Video endpoints: 5 requests/minute
 - Scraper endpoints: 10 requests/minute
 - Default: 100 requests/minute
+
+Limits are enforced by the shared GCRA engine in backend/core/rate_limit.py
+(set PRI_RATE_LIMIT_DB to share the counters between uvicorn workers).
 """
 
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
 from fastapi import Request, Response
 from fastapi.responses import JSONResponse
-from typing import Callable
+from typing import Any, Callable, Optional
+import functools
 import logging
 
+from backend.core.rate_limit import (
+  Rate,
+  RateLimitEngine,
+  get_rate_limit_engine,
+  retry_after_seconds,
+)
+
 logger = logging.getLogger(__name__)
 
 
+class RateLimitExceeded(Exception):
+  """Raised by a rate limited endpoint when the client is over its limit."""
+
+  def __init__(self, rate: Rate, retry_after: int):
+    """
+    Args:
+      rate: The limit that was exceeded
+      retry_after: Seconds until the next request would be allowed
+    """
+    super().__init__(str(rate))
+    self.rate = rate
+    self.detail = str(rate)
+    self.retry_after = retry_after
+
+
 def get_client_identifier(request: Request) -> str:
   """
   Get client identifier for rate limiting.
@@ -39,7 +62,7 @@ def get_client_identifier(request: Request) -> str:
     return client_ip
 
   # Fallback to direct remote address
-  client_ip = get_remote_address(request)
+  client_ip = request.client.host if request.client else "127.0.0.1"
   logger.debug(f"Rate limit identifier from remote address: {client_ip}")
   return client_ip
 
@@ -78,20 +101,65 @@ def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded) -> Res
       }
     },
     headers={
-      "Retry-After": "60",  # Suggest retry after 60 seconds
+      "Retry-After": str(getattr(exc, "retry_after", 60)),
       "X-RateLimit-Limit": str(exc.detail).split()[0] if hasattr(exc, 'detail') else "Unknown"
     }
   )
 
 
+class Limiter:
+  """Endpoint decorator factory backed by the shared rate limiting engine."""
+
+  def __init__(
+    self,
+    key_func: Callable[[Request], str],
+    engine: Optional[RateLimitEngine] = None,
+  ):
+    """
+    Args:
+      key_func: Returns the client identifier for a request
+      engine: Rate limiting engine (defaults to the process-wide engine)
+    """
+    self.key_func = key_func
+    self._engine = engine
+
+  @property
+  def engine(self) -> RateLimitEngine:
+    if self._engine is None:
+      self._engine = get_rate_limit_engine()
+    return self._engine
+
+  def limit(self, limit_value: str) -> Callable:
+    """
+    Decorator limiting an endpoint per client, e.g. ``limit("5/minute")``.
+
+    The endpoint must accept a ``request: Request`` argument.
+    """
+    rate = Rate.parse(limit_value)
+
+    def decorator(func: Callable) -> Callable:
+      scope = f"endpoint|{func.__module__}.{func.__qualname__}"
+
+      @functools.wraps(func)
+      async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        request = kwargs.get("request")
+        if not isinstance(request, Request):
+          request = next((arg for arg in args if isinstance(arg, Request)), None)
+        if request is None:
+          raise TypeError(f"{func.__qualname__} needs a 'request: Request' argument")
+
+        result = await self.engine.hit_async(f"{scope}|{self.key_func(request)}", rate)
+        if not result.allowed:
+          raise RateLimitExceeded(rate, retry_after_seconds(result))
+        return await func(*args, **kwargs)
+
+      return wrapper
+
+    return decorator
+
+
 # Initialize limiter with custom key function
-limiter = Limiter(
-  key_func=get_client_identifier,
-  default_limits=["100/minute"],
-  storage_uri="memory://",  # In-memory storage for simplicity
-  strategy="fixed-window",  # Fixed window strategy
-  headers_enabled=False,  # Disabled for compatibility with FastAPI
-)
+limiter = Limiter(key_func=get_client_identifier)
 
 
 # Rate limit decorators for different endpoint types
@@ -147,7 +215,7 @@ def get_rate_limit_status(request: Request) -> dict:
       "scraper": "10/minute",
       "default": "100/minute"
     },
-    "strategy": "fixed-window"
+    "strategy": "gcra"
   }
 
 
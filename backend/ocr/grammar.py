@@ -0,0 +1,507 @@
+"""
+Compiled Line Grammar for OCR Recipe Text
+
+This module classifies OCR text lines in a single pass using patterns that
+are compiled once at import time. Each line is labelled as title, section
+header, ingredient, step or plain text, and ingredient lines carry their
+structured quantities, so parsing a large batch of pages is linear in the
+amount of text.
+"""
+
+import re
+from dataclasses import dataclass, field
+from enum import Enum
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+
+# Keywords for section detection (Japanese + English)
+INGREDIENT_KEYWORDS = [
+    "材料",
+    "ingredients",
+    "材料名",
+    "ingredient",
+    "用意するもの",
+    "必要なもの",
+]
+
+STEPS_KEYWORDS = [
+    "作り方",
+    "手順",
+    "instructions",
+    "directions",
+    "steps",
+    "調理手順",
+    "調理方法",
+    "レシピ",
+]
+
+# Common Japanese and English measurement units
+UNITS = [
+    "g",
+    "kg",
+    "ml",
+    "l",
+    "cc",
+    "カップ",
+    "個",
+    "本",
+    "枚",
+    "切れ",
+    "片",
+    "大さじ",
+    "小さじ",
+    "適量",
+    "少々",
+    "cup",
+    "tbsp",
+    "tsp",
+    "oz",
+    "lb",
+]
+
+
+def _alternation(words: List[str]) -> str:
+    """Build a regex alternation, longest words first."""
+    return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+
+@lru_cache(maxsize=None)
+def _compile_keywords(keywords: Tuple[str, ...]) -> Pattern[str]:
+    return re.compile(_alternation(list(keywords)))
+
+
+def keyword_pattern(keywords: Iterable[str]) -> Pattern[str]:
+    """
+    Compile a pattern matching any of the keywords.
+
+    Patterns are cached per keyword list, so callers can pass their keywords
+    on every call without recompiling.
+
+    Args:
+      keywords: Lowercase section keywords
+
+    Returns:
+      Compiled alternation, longest keywords first
+    """
+    return _compile_keywords(tuple(keywords))
+
+
+# Section keywords anywhere in a (lowercased) line
+INGREDIENT_HEADER_PATTERN = keyword_pattern(INGREDIENT_KEYWORDS)
+STEPS_HEADER_PATTERN = keyword_pattern(STEPS_KEYWORDS)
+
+# Section keyword at the start of a (lowercased) line
+SECTION_START_PATTERN = keyword_pattern(INGREDIENT_KEYWORDS + STEPS_KEYWORDS)
+
+# Ingredient line indicators
+UNIT_PATTERN = re.compile(_alternation(UNITS))
+COUNTER_PATTERN = re.compile(r"\d+\s*[個本枚切片]")
+LEADING_NUMBER_PATTERN = re.compile(r"^[\d\.]+\s")
+TRAILING_NUMBER_PATTERN = re.compile(r"\s[\d\.]+$")
+
+NUMERIC_ONLY_PATTERN = re.compile(r"^[\d\s\-\.\,]+$")
+STEP_NUMBER_PATTERN = re.compile(r"^(\d+)[\.\)]\s*(.+)")
+
+# Number followed by an optional known unit (used for structured quantities)
+QUANTITY_PATTERN = re.compile(
+    r"(\d+(?:\.\d+)?)\s*((g|kg|ml|l|cc|カップ|個|本|枚|切れ|片|大さじ|小さじ|適量|少々|cup|tbsp|tsp|oz|lb))?",
+    re.IGNORECASE,
+)
+
+# Number followed by an optional word (used to split name from amount)
+AMOUNT_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*([a-zA-Zぁ-んァ-ン一-龥]+)?")
+
+
+class LineLabel(str, Enum):
+    """Label assigned to an OCR text line."""
+
+    TITLE = "title"
+    INGREDIENT_HEADER = "ingredient_header"
+    STEPS_HEADER = "steps_header"
+    INGREDIENT = "ingredient"
+    STEP = "step"
+    TEXT = "text"
+
+
+@dataclass
+class LineFeatures:
+    """Pattern hits for a single line, computed once."""
+
+    text: str
+    has_ingredient_keyword: bool
+    has_steps_keyword: bool
+    starts_section: bool
+    is_ingredient: bool
+    is_numeric: bool
+
+
+@dataclass
+class ClassifiedLine:
+    """A labelled OCR line."""
+
+    index: int
+    text: str
+    label: LineLabel
+    quantities: List[Dict[str, any]] = field(default_factory=list)
+
+
+def extract_quantities(text: str) -> List[Dict[str, any]]:
+    """
+    Extract quantities with units from text.
+
+    Args:
+      text: Text to parse
+
+    Returns:
+      List of dictionaries with value and unit
+    """
+    return [
+        {"value": float(match[0]), "unit": match[1] if match[1] else None}
+        for match in QUANTITY_PATTERN.findall(text)
+    ]
+
+
+def parse_amount(ingredient: str) -> Dict[str, any]:
+    """
+    Split an ingredient string into name, quantity and unit.
+
+    Args:
+      ingredient: Raw ingredient string (e.g. "牛肉 500g")
+
+    Returns:
+      Dictionary with name, quantity, unit and original text
+    """
+    result = {
+        "name": ingredient,
+        "quantity": None,
+        "unit": None,
+        "original": ingredient,
+    }
+
+    match = AMOUNT_PATTERN.search(ingredient)
+    if match:
+        result["quantity"] = float(match.group(1))
+        result["unit"] = match.group(2) or None
+
+        name = (ingredient[: match.start()] + ingredient[match.end() :]).strip()
+        if name:
+            result["name"] = name
+
+    return result
+
+
+def is_ingredient_line(line: str) -> bool:
+    """
+    Check if line looks like an ingredient entry.
+
+    Args:
+      line: Text line
+
+    Returns:
+      True if the line contains a unit or a quantity pattern
+    """
+    return bool(
+        UNIT_PATTERN.search(line.lower())
+        or COUNTER_PATTERN.search(line)
+        or LEADING_NUMBER_PATTERN.match(line)
+        or TRAILING_NUMBER_PATTERN.search(line)
+    )
+
+
+def line_features(line: str) -> LineFeatures:
+    """
+    Evaluate every pattern against a line once, using the default keywords.
+
+    Args:
+      line: Stripped text line
+
+    Returns:
+      LineFeatures for the line
+    """
+    return _default_classifier.line_features(line)
+
+
+class LineClassifier:
+    """
+    Single-pass classifier for OCR recipe text.
+
+    Section boundaries, the title, ingredient lines and step lines are all
+    derived from one LineFeatures record per line.
+    """
+
+    def __init__(
+        self,
+        ingredient_keywords: List[str] = INGREDIENT_KEYWORDS,
+        steps_keywords: List[str] = STEPS_KEYWORDS,
+    ):
+        """
+        Compile the section patterns.
+
+        Args:
+          ingredient_keywords: Keywords introducing the ingredients section
+          steps_keywords: Keywords introducing the steps section
+        """
+        self.ingredient_header_pattern = keyword_pattern(ingredient_keywords)
+        self.steps_header_pattern = keyword_pattern(steps_keywords)
+        self.section_start_pattern = keyword_pattern(
+            list(ingredient_keywords) + list(steps_keywords)
+        )
+
+    def line_features(self, line: str) -> LineFeatures:
+        """
+        Evaluate every pattern against a line once.
+
+        Args:
+          line: Stripped text line
+
+        Returns:
+          LineFeatures for the line
+        """
+        lower = line.lower()
+        return LineFeatures(
+            text=line,
+            has_ingredient_keyword=bool(self.ingredient_header_pattern.search(lower)),
+            has_steps_keyword=bool(self.steps_header_pattern.search(lower)),
+            starts_section=bool(self.section_start_pattern.match(lower)),
+            is_ingredient=is_ingredient_line(line),
+            is_numeric=bool(NUMERIC_ONLY_PATTERN.match(line)),
+        )
+
+    def split_lines(self, text: str) -> List[str]:
+        """Split text into stripped, non-empty lines."""
+        return [line.strip() for line in text.split("\n") if line.strip()]
+
+    def find_title(self, features: List[LineFeatures]) -> Optional[int]:
+        """
+        Find the title line index.
+
+        Args:
+          features: Features of each line
+
+        Returns:
+          Index of the title line, or None if there are no lines
+        """
+        for i, f in enumerate(features[:10]):
+            if len(f.text) < 3:
+                continue
+            if f.has_ingredient_keyword or f.has_steps_keyword or f.is_numeric:
+                continue
+            return i
+        return 0 if features else None
+
+    def find_section(
+        self, features: List[LineFeatures], steps: bool
+    ) -> tuple[Optional[int], Optional[int]]:
+        """
+        Find section start and end indices.
+
+        The section starts after the first line mentioning one of its keywords
+        and ends at the next line that begins with any section keyword.
+
+        Args:
+          features: Features of each line
+          steps: True for the steps section, False for ingredients
+
+        Returns:
+          Tuple of (start_index, end_index) or (None, None)
+        """
+        start_idx = None
+        for i, f in enumerate(features):
+            if f.has_steps_keyword if steps else f.has_ingredient_keyword:
+                start_idx = i + 1
+                break
+        return self._section_bounds(features, start_idx)
+
+    def find_keyword_section(
+        self, features: List[LineFeatures], keywords: List[str]
+    ) -> tuple[Optional[int], Optional[int]]:
+        """
+        Find the section introduced by any of the given keywords.
+
+        Like find_section, but the header is matched against the given
+        keywords instead of the classifier's section keywords.
+
+        Args:
+          features: Features of each line
+          keywords: Section keywords to search for
+
+        Returns:
+          Tuple of (start_index, end_index) or (None, None)
+        """
+        header = keyword_pattern(keywords)
+        start_idx = None
+        for i, f in enumerate(features):
+            if header.search(f.text.lower()):
+                start_idx = i + 1
+                break
+        return self._section_bounds(features, start_idx)
+
+    def _section_bounds(
+        self, features: List[LineFeatures], start_idx: Optional[int]
+    ) -> tuple[Optional[int], Optional[int]]:
+        """End the section at the next line that begins with a section keyword."""
+        if start_idx is None:
+            return None, None
+
+        end_idx = len(features)
+        for i in range(start_idx, len(features)):
+            if features[i].starts_section:
+                end_idx = i
+                break
+
+        return start_idx, end_idx
+
+    def ingredient_indices(
+        self,
+        features: List[LineFeatures],
+        start: Optional[int],
+        end: Optional[int],
+        steps_start: Optional[int],
+    ) -> List[int]:
+        """
+        Select ingredient line indices.
+
+        Without an explicit section, ingredient-looking lines before the steps
+        section (or in the first half of the text) are used.
+
+        Args:
+          features: Features of each line
+          start: Start index of ingredients section
+          end: End index of ingredients section
+          steps_start: Start index of steps section (to avoid overlap)
+
+        Returns:
+          Indices of ingredient lines
+        """
+        if start is None:
+            potential_end = steps_start if steps_start else len(features) // 2
+            return [i for i in range(potential_end) if features[i].is_ingredient]
+
+        actual_end = end
+        if steps_start and (end is None or steps_start < end):
+            actual_end = steps_start
+
+        indices = []
+        for i in range(start, actual_end if actual_end else len(features)):
+            f = features[i]
+            if len(f.text) < 2:
+                continue
+            if f.has_steps_keyword:
+                break
+            indices.append(i)
+        return indices
+
+    def group_steps(
+        self, lines: List[str], start: Optional[int], end: Optional[int]
+    ) -> List[tuple[List[int], str]]:
+        """
+        Group lines into numbered steps, joining continuation lines.
+
+        Args:
+          lines: Text lines
+          start: Start index of steps section (None uses the second half)
+          end: End index of steps section
+
+        Returns:
+          List of (line_indices, step_text) tuples
+        """
+        if start is None:
+            start = len(lines) // 2
+        actual_end = end if end else len(lines)
+
+        steps: List[tuple[List[int], str]] = []
+        current: List[str] = []
+        current_indices: List[int] = []
+
+        for i in range(start, actual_end):
+            line = lines[i]
+            step_match = STEP_NUMBER_PATTERN.match(line)
+            if step_match:
+                if current:
+                    steps.append((current_indices, " ".join(current).strip()))
+                current = [step_match.group(2)]
+                current_indices = [i]
+            else:
+                current.append(line)
+                current_indices.append(i)
+
+        if current:
+            steps.append((current_indices, " ".join(current).strip()))
+
+        return steps
+
+    def classify(self, text: str) -> List[ClassifiedLine]:
+        """
+        Label every line of OCR text.
+
+        Args:
+          text: Raw OCR text
+
+        Returns:
+          ClassifiedLine for each non-empty line
+        """
+        return self.parse(text)["lines"]
+
+    def parse(self, text: str) -> Dict[str, any]:
+        """
+        Classify lines and assemble the recipe structure.
+
+        Args:
+          text: Raw OCR text
+
+        Returns:
+          Dictionary with title, ingredients, parsed_ingredients, steps and
+          the labelled lines
+        """
+        lines = self.split_lines(text)
+        features = [self.line_features(line) for line in lines]
+        labels = [LineLabel.TEXT] * len(lines)
+
+        title_idx = self.find_title(features)
+        ing_start, ing_end = self.find_section(features, steps=False)
+        steps_start, steps_end = self.find_section(features, steps=True)
+
+        if ing_start is not None:
+            labels[ing_start - 1] = LineLabel.INGREDIENT_HEADER
+        if steps_start is not None:
+            labels[steps_start - 1] = LineLabel.STEPS_HEADER
+
+        step_groups = self.group_steps(lines, steps_start, steps_end)
+        for indices, _ in step_groups:
+            for i in indices:
+                labels[i] = LineLabel.STEP
+
+        ingredient_idx = self.ingredient_indices(
+            features, ing_start, ing_end, steps_start
+        )
+        for i in ingredient_idx:
+            labels[i] = LineLabel.INGREDIENT
+
+        if title_idx is not None:
+            labels[title_idx] = LineLabel.TITLE
+
+        classified = [
+            ClassifiedLine(
+                index=i,
+                text=line,
+                label=labels[i],
+                quantities=(
+                    extract_quantities(line)
+                    if labels[i] == LineLabel.INGREDIENT
+                    else []
+                ),
+            )
+            for i, line in enumerate(lines)
+        ]
+
+        ingredients = [lines[i] for i in ingredient_idx]
+        return {
+            "title": lines[title_idx] if title_idx is not None else "",
+            "ingredients": ingredients,
+            "parsed_ingredients": [parse_amount(line) for line in ingredients],
+            "steps": [step for _, step in step_groups],
+            "lines": classified,
+        }
+
+
+_default_classifier = LineClassifier()
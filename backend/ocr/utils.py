@@ -11,6 +11,8 @@ from typing import Dict, List, Optional, Tuple
 
 from PIL import Image
 
+from .grammar import extract_quantities as _extract_quantities
+
 logger = logging.getLogger(__name__)
 
 
@@ -249,29 +251,15 @@ def extract_quantities(text: str) -> List[Dict[str, any]]:
     """
     Extract quantities with units from text.
 
+    Uses the precompiled quantity pattern from the OCR line grammar.
+
     Args:
       text: Text to parse
 
     Returns:
       List of dictionaries with quantity info
     """
-    # Common units
-    units = r"(g|kg|ml|l|cc|カップ|個|本|枚|切れ|片|大さじ|小さじ|適量|少々|cup|tbsp|tsp|oz|lb)"
-
-    # Pattern: number + optional unit
-    pattern = rf"(\d+(?:\.\d+)?)\s*({units})?"
-
-    matches = re.findall(pattern, text, re.IGNORECASE)
-
-    quantities = []
-    for match in matches:
-        quantity = {
-            "value": float(match[0]),
-            "unit": match[1] if match[1] else None,
-        }
-        quantities.append(quantity)
-
-    return quantities
+    return _extract_quantities(text)
 
 
 def normalize_whitespace(text: str) -> str:
@@ -5,8 +5,17 @@ Provides scrapers for various recipe websites:
 - CookpadScraper: For cookpad.com
 - DelishKitchenScraper: For delishkitchen.tv
 - GenericScraper: Fallback for any site using schema.org or common patterns
+- BatchCrawler: Concurrent, host-aware crawler for bulk URL scraping
+- HTMLCache: Compressed on-disk raw HTML cache with offline re-parsing
 """
 
+from backend.scraper.crawler import (
+    BatchCrawler,
+    CrawlResult,
+    close_batch_crawler,
+    get_batch_crawler,
+)
+from backend.scraper.html_cache import HTMLCache, get_html_cache, reparse_cached
 from backend.scraper.sites import (
     CookpadScraper,
     DelishKitchenScraper,
@@ -15,6 +24,13 @@ from backend.scraper.sites import (
 )
 
 __all__ = [
+    "BatchCrawler",
+    "CrawlResult",
+    "close_batch_crawler",
+    "get_batch_crawler",
+    "HTMLCache",
+    "get_html_cache",
+    "reparse_cached",
     "CookpadScraper",
     "DelishKitchenScraper",
     "GenericScraper",
@@ -11,12 +11,17 @@ This module provides the foundation for all recipe scrapers with:
 import asyncio
 import logging
 from abc import ABC, abstractmethod
-from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlparse
 
 import httpx
 from bs4 import BeautifulSoup
 
+from backend.core.rate_limit import Rate, RateLimitEngine, get_rate_limit_engine
+
+if TYPE_CHECKING:
+    from backend.scraper.html_cache import HTMLCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,40 +44,54 @@ class ParseError(ScraperError):
 
 
 class RateLimiter:
-    """Simple rate limiter for HTTP requests."""
+    """
+    Rate limiter for HTTP requests (waits instead of failing).
+
+    Budgets live in the process-wide engine under a stable key per host, so
+    every scraper instance (one is built per URL) shares them, and so do
+    other workers when ``PRI_RATE_LIMIT_DB`` is set.
+    """
 
-    def __init__(self, max_requests: int = 10, time_window: int = 60):
+    def __init__(
+        self,
+        max_requests: int = 10,
+        time_window: int = 60,
+        engine: Optional[RateLimitEngine] = None,
+        key: Optional[str] = None,
+    ):
         """
         Initialize rate limiter.
 
         Args:
           max_requests: Maximum number of requests allowed in time window
           time_window: Time window in seconds
+          engine: Rate limiting engine (defaults to the process-wide engine)
+          key: Budget name within the engine; the request host is appended
         """
         self.max_requests = max_requests
         self.time_window = time_window
-        self.requests: list[datetime] = []
+        self.rate = Rate(max_requests, time_window)
+        self.engine = engine or get_rate_limit_engine()
+        self.key = key or "scraper"
 
-    async def acquire(self) -> None:
+    async def acquire(self, url: Optional[str] = None) -> None:
         """
-        Acquire permission to make a request.
+        Acquire permission to make a request, sleeping until it is allowed.
 
-        Raises:
-          RateLimitError: If rate limit is exceeded
-        """
-        now = datetime.now()
-        cutoff = now - timedelta(seconds=self.time_window)
-
-        # Remove old requests
-        self.requests = [req_time for req_time in self.requests if req_time > cutoff]
+        The slot is reserved before sleeping, so concurrent callers are spaced
+        out rather than all waking at the same time.
 
-        if len(self.requests) >= self.max_requests:
-            wait_time = (self.requests[0] - cutoff).total_seconds()
+        Args:
+          url: Request URL; its host selects the budget (one shared budget
+            when omitted)
+        """
+        key = self.key
+        if url is not None:
+            key = f"{key}|{urlparse(url).netloc.lower()}"
+        wait_time = await self.engine.reserve_async(key, self.rate)
+        if wait_time > 0:
             logger.warning(f"Rate limit reached. Waiting {wait_time:.2f} seconds")
             await asyncio.sleep(wait_time)
-            self.requests = self.requests[1:]
-
-        self.requests.append(now)
 
 
 class BaseScraper(ABC):
@@ -83,6 +102,9 @@ class BaseScraper(ABC):
         timeout: int = 30,
         max_retries: int = 3,
         rate_limiter: Optional[RateLimiter] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        fetcher: Optional[Callable[[str], Awaitable[str]]] = None,
+        html_cache: Optional["HTMLCache"] = None,
     ):
         """
         Initialize base scraper.
@@ -91,11 +113,18 @@ class BaseScraper(ABC):
           timeout: Request timeout in seconds
           max_retries: Maximum number of retry attempts
           rate_limiter: Optional rate limiter instance
+          client: Optional shared HTTP client (not closed by this scraper)
+          fetcher: Optional coroutine used instead of the built-in fetch,
+            e.g. a batch crawler
+          html_cache: Optional raw HTML cache consulted before fetching
         """
         self.timeout = timeout
         self.max_retries = max_retries
         self.rate_limiter = rate_limiter or RateLimiter()
-        self.client: Optional[httpx.AsyncClient] = None
+        self.client: Optional[httpx.AsyncClient] = client
+        self.fetcher = fetcher
+        self.html_cache = html_cache
+        self._owns_client = client is None
 
     async def _get_client(self) -> httpx.AsyncClient:
         """
@@ -120,6 +149,34 @@ class BaseScraper(ABC):
         """
         Fetch HTML content from URL with retry logic.
 
+        Args:
+          url: URL to fetch
+
+        Returns:
+          HTML content as string
+
+        Raises:
+          ScraperError: If fetching fails after all retries
+        """
+        if self.html_cache is not None:
+            cached = self.html_cache.get(url)
+            if cached is not None:
+                logger.info(f"HTML cache hit: {url}")
+                return cached
+
+        if self.fetcher is not None:
+            html = await self.fetcher(url)
+        else:
+            html = await self._fetch_remote(url)
+
+        if self.html_cache is not None:
+            self.html_cache.put(url, html)
+        return html
+
+    async def _fetch_remote(self, url: str) -> str:
+        """
+        Fetch HTML over the network with retry logic.
+
         Args:
           url: URL to fetch
 
@@ -134,7 +191,7 @@ class BaseScraper(ABC):
 
         for attempt in range(self.max_retries):
             try:
-                await self.rate_limiter.acquire()
+                await self.rate_limiter.acquire(url)
 
                 logger.info(
                     f"Fetching URL: {url} (attempt {attempt + 1}/{self.max_retries})"
@@ -196,8 +253,9 @@ class BaseScraper(ABC):
 
     async def close(self) -> None:
         """Close HTTP client."""
-        if self.client:
+        if self.client and self._owns_client:
             await self.client.aclose()
+        if self._owns_client:
             self.client = None
 
     async def __aenter__(self):
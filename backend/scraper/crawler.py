@@ -0,0 +1,455 @@
+"""
+Batch crawler for scraping many recipe URLs concurrently.
+
+This module provides a crawl engine shared by all site scrapers with:
+- A single pooled httpx client for every host
+- Per-host politeness (minimum interval) and concurrency caps, applied to
+  robots.txt fetches as well
+- robots.txt caching per host
+- Conditional revalidation via ETag / Last-Modified (validators are kept in
+  memory and, when an HTML cache is attached, persisted with the page)
+- Results streamed back as soon as each URL finishes
+
+The API uses one long-lived crawler (``get_batch_crawler``) so politeness
+state, robots.txt and validators carry over between requests.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Optional,
+    Tuple,
+)
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import httpx
+
+from backend.scraper.base import ScraperError
+from backend.scraper.sites import get_scraper_for_url
+
+if TYPE_CHECKING:
+    from backend.scraper.html_cache import HTMLCache
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Personal-Recipe-Intelligence/1.0 (Recipe Collector Bot)"
+
+# Per-host cap of the shared crawler; requests may ask for less
+SHARED_PER_HOST_CONCURRENCY = 8
+
+
+@dataclass
+class CrawlResult:
+    """Outcome of scraping a single URL."""
+
+    url: str
+    status: str  # "ok" | "error" | "blocked"
+    recipe: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    revalidated: bool = False
+    elapsed_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return asdict(self)
+
+
+@dataclass
+class _CachedPage:
+    """Validators and body of a previously fetched page."""
+
+    body: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+@dataclass
+class _HostState:
+    """Per-host scheduling state."""
+
+    semaphore: asyncio.Semaphore
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    robots_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    next_allowed: float = 0.0
+    robots: Optional[RobotFileParser] = None
+    robots_fetched_at: float = 0.0
+
+
+class BatchCrawler:
+    """Concurrent, host-aware crawler for batch recipe scraping."""
+
+    def __init__(
+        self,
+        max_connections: int = 50,
+        per_host_concurrency: int = 2,
+        per_host_interval: float = 1.0,
+        timeout: int = 30,
+        max_retries: int = 3,
+        respect_robots: bool = True,
+        robots_ttl: int = 3600,
+        validator_cache_size: int = 1024,
+        html_cache: Optional["HTMLCache"] = None,
+    ):
+        """
+        Initialize batch crawler.
+
+        Args:
+          max_connections: Size of the shared connection pool
+          per_host_concurrency: Maximum in-flight requests per host
+          per_host_interval: Minimum seconds between request starts per host
+          timeout: Request timeout in seconds
+          max_retries: Maximum number of retry attempts per URL
+          respect_robots: Whether to honour robots.txt
+          robots_ttl: Seconds a fetched robots.txt stays valid
+          validator_cache_size: Number of pages kept for conditional requests
+          html_cache: Optional raw HTML cache consulted before fetching
+        """
+        self.max_connections = max_connections
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_interval = per_host_interval
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.respect_robots = respect_robots
+        self.robots_ttl = robots_ttl
+        self.validator_cache_size = validator_cache_size
+        self.html_cache = html_cache
+
+        self.client: Optional[httpx.AsyncClient] = None
+        self._hosts: Dict[str, _HostState] = {}
+        self._pages: "OrderedDict[str, _CachedPage]" = OrderedDict()
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        """
+        Get or create the shared HTTP client.
+
+        Returns:
+          httpx.AsyncClient instance
+        """
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=self.timeout,
+                headers={
+                    "User-Agent": USER_AGENT,
+                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                    "Accept-Language": "ja,en-US;q=0.7,en;q=0.3",
+                },
+                follow_redirects=True,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self.client
+
+    def _host_state(self, host: str) -> _HostState:
+        """Get or create scheduling state for a host."""
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState(semaphore=asyncio.Semaphore(self.per_host_concurrency))
+            self._hosts[host] = state
+        return state
+
+    async def _wait_for_slot(self, state: _HostState) -> None:
+        """Wait until the host's politeness interval allows another request."""
+        async with state.lock:
+            now = time.monotonic()
+            start = max(now, state.next_allowed)
+            state.next_allowed = start + self.per_host_interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def is_allowed(self, url: str) -> bool:
+        """
+        Check robots.txt for the URL, fetching and caching it per host.
+
+        Args:
+          url: URL to check
+
+        Returns:
+          True if crawling the URL is allowed
+        """
+        if not self.respect_robots:
+            return True
+
+        parsed = urlparse(url)
+        state = self._host_state(parsed.netloc)
+
+        async with state.robots_lock:
+            expired = time.monotonic() - state.robots_fetched_at > self.robots_ttl
+            if state.robots is None or expired:
+                state.robots = await self._fetch_robots(
+                    parsed.scheme, parsed.netloc, state
+                )
+                state.robots_fetched_at = time.monotonic()
+            robots = state.robots
+
+        return robots.can_fetch(USER_AGENT, url)
+
+    async def _fetch_robots(
+        self, scheme: str, netloc: str, state: _HostState
+    ) -> RobotFileParser:
+        """Fetch and parse robots.txt; unreachable files allow everything."""
+        robots = RobotFileParser()
+        client = await self._get_client()
+        try:
+            # robots.txt counts against the host's politeness interval too
+            await self._wait_for_slot(state)
+            response = await client.get(f"{scheme}://{netloc}/robots.txt")
+            if response.status_code in (401, 403):
+                robots.disallow_all = True
+            elif response.status_code >= 400:
+                robots.allow_all = True
+            else:
+                robots.parse(response.text.splitlines())
+        except httpx.RequestError as e:
+            logger.warning(f"robots.txt fetch failed for {netloc}: {e}")
+            robots.allow_all = True
+        return robots
+
+    def _remember(self, url: str, page: _CachedPage) -> None:
+        """Store page validators, evicting the least recently used entry."""
+        self._pages[url] = page
+        self._pages.move_to_end(url)
+        while len(self._pages) > self.validator_cache_size:
+            self._pages.popitem(last=False)
+
+    async def fetch(self, url: str, use_cache: bool = True) -> str:
+        """
+        Fetch HTML with per-host limits, retries and conditional revalidation.
+
+        Args:
+          url: URL to fetch
+          use_cache: Consult and update the attached HTML cache
+
+        Returns:
+          HTML content as string
+
+        Raises:
+          ScraperError: If fetching fails after all retries
+        """
+        body, _ = await self._fetch(url, use_cache)
+        return body
+
+    async def _fetch(self, url: str, use_cache: bool = True) -> Tuple[str, bool]:
+        """
+        Fetch HTML, reporting whether it was revalidated with a 304.
+
+        Returns:
+          (html, revalidated)
+        """
+        html_cache = self.html_cache if use_cache else None
+        if html_cache is not None:
+            fresh = html_cache.get(url)
+            if fresh is not None:
+                logger.info(f"HTML cache hit: {url}")
+                return fresh, False
+
+        cached = self._pages.get(url)
+        if cached is None and html_cache is not None:
+            stored = html_cache.get_validators(url)
+            if stored is not None:
+                cached = _CachedPage(*stored)
+
+        client = await self._get_client()
+        state = self._host_state(urlparse(url).netloc)
+
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        last_error: Optional[Exception] = None
+        async with state.semaphore:
+            for attempt in range(self.max_retries):
+                await self._wait_for_slot(state)
+                try:
+                    response = await client.get(url, headers=headers)
+
+                    if response.status_code == 304 and cached is not None:
+                        self._remember(url, cached)
+                        if html_cache is not None:
+                            html_cache.touch(url)
+                        logger.debug(f"Not modified: {url}")
+                        return cached.body, True
+
+                    response.raise_for_status()
+                    page = _CachedPage(
+                        body=response.text,
+                        etag=response.headers.get("ETag"),
+                        last_modified=response.headers.get("Last-Modified"),
+                    )
+                    self._remember(url, page)
+                    if html_cache is not None:
+                        html_cache.put(url, page.body, page.etag, page.last_modified)
+                    return page.body, False
+
+                except httpx.HTTPStatusError as e:
+                    last_error = e
+                    if e.response.status_code in [429, 503]:
+                        wait_time = 2**attempt
+                        logger.warning(
+                            f"HTTP {e.response.status_code} error. Retrying in {wait_time}s"
+                        )
+                        await asyncio.sleep(wait_time)
+                    else:
+                        raise ScraperError(
+                            f"HTTP error {e.response.status_code}"
+                        ) from e
+
+                except httpx.RequestError as e:
+                    last_error = e
+                    wait_time = 2**attempt
+                    logger.warning(f"Request error: {e}. Retrying in {wait_time}s")
+                    await asyncio.sleep(wait_time)
+
+        raise ScraperError(
+            f"Failed to fetch URL after {self.max_retries} attempts"
+        ) from last_error
+
+    async def scrape(self, url: str, use_cache: bool = True) -> CrawlResult:
+        """
+        Scrape a single URL through the shared pool.
+
+        Args:
+          url: Recipe URL
+          use_cache: Consult and update the attached HTML cache
+
+        Returns:
+          CrawlResult describing the outcome (never raises)
+        """
+        started = time.perf_counter()
+        fetched: Dict[str, bool] = {}
+
+        async def fetcher(target: str) -> str:
+            body, fetched["revalidated"] = await self._fetch(target, use_cache)
+            return body
+
+        try:
+            if not await self.is_allowed(url):
+                return CrawlResult(
+                    url=url, status="blocked", error="Disallowed by robots.txt"
+                )
+
+            # The fetcher reads and writes the HTML cache itself, with validators
+            scraper = get_scraper_for_url(
+                url, client=await self._get_client(), fetcher=fetcher
+            )
+            recipe = await scraper.scrape(url)
+            return CrawlResult(
+                url=url,
+                status="ok",
+                recipe=recipe,
+                revalidated=fetched.get("revalidated", False),
+                elapsed_ms=(time.perf_counter() - started) * 1000,
+            )
+        except Exception as e:
+            logger.error(f"Failed to scrape {url}: {e}")
+            return CrawlResult(
+                url=url,
+                status="error",
+                error=str(e),
+                elapsed_ms=(time.perf_counter() - started) * 1000,
+            )
+
+    async def crawl(
+        self,
+        urls: Iterable[str],
+        per_host_concurrency: Optional[int] = None,
+        use_cache: bool = True,
+    ) -> AsyncIterator[CrawlResult]:
+        """
+        Scrape many URLs concurrently, yielding results as they complete.
+
+        Hosts run in parallel; requests to the same host respect the
+        per-host concurrency cap and interval. Duplicate URLs are scraped once.
+
+        Args:
+          urls: Recipe URLs
+          per_host_concurrency: Lower per-host cap for this crawl only (the
+            crawler-wide cap still applies across concurrent crawls)
+          use_cache: Consult and update the attached HTML cache
+
+        Yields:
+          CrawlResult for each unique URL, in completion order
+        """
+        unique = list(dict.fromkeys(urls))
+        limits: Dict[str, asyncio.Semaphore] = {}
+
+        async def scrape_limited(url: str) -> CrawlResult:
+            if per_host_concurrency is None:
+                return await self.scrape(url, use_cache)
+            host = urlparse(url).netloc
+            limit = limits.setdefault(host, asyncio.Semaphore(per_host_concurrency))
+            async with limit:
+                return await self.scrape(url, use_cache)
+
+        tasks = [asyncio.create_task(scrape_limited(url)) for url in unique]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def close(self) -> None:
+        """Close the shared HTTP client."""
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.close()
+
+
+_shared_crawler: Optional[BatchCrawler] = None
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_batch_crawler() -> BatchCrawler:
+    """
+    Get the long-lived crawler shared by API requests.
+
+    Politeness intervals, robots.txt and page validators persist across
+    requests. Asyncio primitives and the HTTP client belong to one event
+    loop, so a new crawler is created if called from a different loop.
+
+    Returns:
+      BatchCrawler attached to the global HTML cache
+    """
+    global _shared_crawler, _shared_loop
+    from backend.scraper.html_cache import get_html_cache
+
+    loop = asyncio.get_running_loop()
+    if _shared_crawler is None or _shared_loop is not loop:
+        _shared_crawler = BatchCrawler(
+            per_host_concurrency=SHARED_PER_HOST_CONCURRENCY,
+            html_cache=get_html_cache(),
+        )
+        _shared_loop = loop
+    return _shared_crawler
+
+
+async def close_batch_crawler() -> None:
+    """Close the shared crawler (application shutdown)."""
+    global _shared_crawler, _shared_loop
+    if _shared_crawler is not None and _shared_loop is asyncio.get_running_loop():
+        await _shared_crawler.close()
+    _shared_crawler = None
+    _shared_loop = None
@@ -0,0 +1,393 @@
+"""
+On-disk cache of raw HTML pages fetched by the scrapers.
+
+Pages are stored zlib-compressed in a single SQLite file, keyed by a
+normalized URL, with a TTL and a total size limit (least recently used
+pages are evicted first). ETag / Last-Modified validators are stored with
+each page, so an expired page can be revalidated with a conditional request
+instead of downloaded again. The cache also supports re-parsing: running the
+current site parsers over every stored page without network access, so
+parser fixes can be rolled out over previously scraped pages.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that never change page content
+TRACKING_PARAMS = {"fbclid", "gclid", "yclid", "mc_cid", "mc_eid", "ref"}
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize URL so equivalent addresses share a cache entry.
+
+    Lowercases scheme and host, drops default ports, fragments and tracking
+    parameters, sorts the query string and removes trailing slashes.
+
+    Args:
+      url: URL to normalize
+
+    Returns:
+      Normalized URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+        )
+    )
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+class HTMLCache:
+    """Compressed, size-bounded HTML page cache backed by SQLite."""
+
+    def __init__(
+        self,
+        cache_dir: str = "data/html_cache",
+        ttl: int = 7 * 24 * 3600,
+        max_bytes: int = 512 * 1024 * 1024,
+        compression_level: int = 6,
+    ):
+        """
+        Initialize HTML cache.
+
+        Args:
+          cache_dir: Directory holding the cache database
+          ttl: Seconds a page is served from cache
+          max_bytes: Maximum total compressed size before eviction
+          compression_level: zlib compression level (1-9)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.cache_dir / "pages.db"
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.compression_level = compression_level
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT
+            )
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(pages)")}
+        for column in ("etag", "last_modified"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE pages ADD COLUMN {column} TEXT")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_pages_accessed ON pages(accessed_at)"
+        )
+        self._conn.commit()
+        # Running total of compressed page sizes, kept in step with writes so
+        # eviction does not aggregate the whole table on every put
+        self._total_bytes = self._sum_sizes_locked()
+
+    def _sum_sizes_locked(self) -> int:
+        """Total compressed size of all stored pages."""
+        return self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM pages"
+        ).fetchone()[0]
+
+    def _size_locked(self, key: str) -> int:
+        """Compressed size of one stored page (0 if missing)."""
+        row = self._conn.execute(
+            "SELECT size FROM pages WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    @staticmethod
+    def _key(url: str) -> str:
+        """Cache key for a URL."""
+        return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+    def get(self, url: str, max_age: Optional[int] = None) -> Optional[str]:
+        """
+        Get cached HTML for a URL.
+
+        Args:
+          url: Page URL
+          max_age: Override TTL in seconds (None uses the cache TTL)
+
+        Returns:
+          HTML string, or None if missing or expired
+        """
+        max_age = self.ttl if max_age is None else max_age
+        now = time.time()
+        key = self._key(url)
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, fetched_at FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > max_age:
+                return None
+            self._conn.execute(
+                "UPDATE pages SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def get_validators(
+        self, url: str
+    ) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+        """
+        Get a stored page with its validators, regardless of TTL.
+
+        Args:
+          url: Page URL
+
+        Returns:
+          (html, etag, last_modified), or None if the page is missing or
+          was stored without validators
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified FROM pages WHERE key = ?",
+                (self._key(url),),
+            ).fetchone()
+        if row is None or (row[1] is None and row[2] is None):
+            return None
+        return zlib.decompress(row[0]).decode("utf-8"), row[1], row[2]
+
+    def touch(self, url: str) -> None:
+        """
+        Mark a stored page as freshly fetched (e.g. after a 304 response).
+
+        Args:
+          url: Page URL
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, self._key(url)),
+            )
+            self._conn.commit()
+
+    def put(
+        self,
+        url: str,
+        html: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """
+        Store HTML for a URL, evicting old pages if over the size limit.
+
+        Args:
+          url: Page URL
+          html: Raw HTML
+          etag: ETag response header, for later revalidation
+          last_modified: Last-Modified response header
+        """
+        body = zlib.compress(html.encode("utf-8"), self.compression_level)
+        now = time.time()
+        key = self._key(url)
+
+        with self._lock:
+            replaced = self._size_locked(key)
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO pages
+                    (key, url, body, size, fetched_at, accessed_at,
+                     etag, last_modified)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    key,
+                    normalize_url(url),
+                    body,
+                    len(body),
+                    now,
+                    now,
+                    etag,
+                    last_modified,
+                ),
+            )
+            self._total_bytes += len(body) - replaced
+            self._evict_locked()
+            self._conn.commit()
+
+    def delete(self, url: str) -> bool:
+        """
+        Remove a cached page.
+
+        Args:
+          url: Page URL
+
+        Returns:
+          True if a page was removed
+        """
+        key = self._key(url)
+        with self._lock:
+            size = self._size_locked(key)
+            cursor = self._conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+            self._conn.commit()
+            self._total_bytes -= size
+            return cursor.rowcount > 0
+
+    def _evict_locked(self) -> None:
+        """Drop least recently used pages until under ``max_bytes``."""
+        if self._total_bytes <= self.max_bytes:
+            return
+        # Only the over-limit path recounts, so rows changed by another
+        # process sharing the file are picked up before choosing victims
+        total = self._sum_sizes_locked()
+        if total <= self.max_bytes:
+            self._total_bytes = total
+            return
+
+        cursor = self._conn.execute("SELECT key, size FROM pages ORDER BY accessed_at")
+        victims = []
+        for key, size in cursor:
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM pages WHERE key = ?", victims)
+        self._total_bytes = total
+        logger.info(f"HTML cache evicted {len(victims)} pages")
+
+    def purge_expired(self) -> int:
+        """
+        Delete pages older than the TTL.
+
+        Returns:
+          Number of pages deleted
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM pages WHERE fetched_at < ?", (time.time() - self.ttl,)
+            )
+            self._conn.commit()
+            if cursor.rowcount:
+                self._total_bytes = self._sum_sizes_locked()
+            return cursor.rowcount
+
+    def iter_pages(self, batch_size: int = 100) -> Iterator[Tuple[str, str]]:
+        """
+        Iterate over all cached pages regardless of TTL.
+
+        Pages are read in batches so memory stays bounded.
+
+        Args:
+          batch_size: Rows fetched per query
+
+        Yields:
+          (normalized_url, html) tuples
+        """
+        last_key = ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT key, url, body FROM pages WHERE key > ? ORDER BY key LIMIT ?",
+                    (last_key, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            for key, url, body in rows:
+                yield url, zlib.decompress(body).decode("utf-8")
+            last_key = rows[-1][0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+          Dictionary with page count and compressed size
+        """
+        with self._lock:
+            count, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages"
+            ).fetchone()
+        return {
+            "pages": count,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+        }
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+async def reparse_cached(
+    cache: HTMLCache, limit: Optional[int] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run the current site parsers over cached pages without network access.
+
+    Args:
+      cache: HTML cache to read from
+      limit: Maximum number of pages to re-parse
+
+    Yields:
+      Result dictionaries in the same shape as ``CrawlResult.to_dict()``
+    """
+    from backend.scraper.crawler import CrawlResult
+    from backend.scraper.sites import get_scraper_for_url
+
+    for count, (url, html) in enumerate(cache.iter_pages()):
+        if limit is not None and count >= limit:
+            return
+
+        async def fetcher(_: str, page: str = html) -> str:
+            return page
+
+        started = time.perf_counter()
+        try:
+            recipe = await get_scraper_for_url(url, fetcher=fetcher).scrape(url)
+            result = CrawlResult(url=url, status="ok", recipe=recipe)
+        except Exception as e:
+            logger.warning(f"Re-parse failed for {url}: {e}")
+            result = CrawlResult(url=url, status="error", error=str(e))
+        result.elapsed_ms = (time.perf_counter() - started) * 1000
+        yield result.to_dict()
+
+
+_html_cache: Optional[HTMLCache] = None
+
+
+def get_html_cache() -> HTMLCache:
+    """Get the global HTML cache."""
+    global _html_cache
+    if _html_cache is None:
+        _html_cache = HTMLCache()
+    return _html_cache
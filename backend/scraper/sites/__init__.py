@@ -7,7 +7,7 @@ This package contains scrapers for specific recipe websites:
 - Generic (fallback using schema.org or common patterns)
 """
 
-from typing import Dict, Type
+from typing import Any, Dict, Type
 from urllib.parse import urlparse
 
 from backend.scraper.base import BaseScraper
@@ -22,12 +22,14 @@ SCRAPER_MAP: Dict[str, Type[BaseScraper]] = {
 }
 
 
-def get_scraper_for_url(url: str) -> BaseScraper:
+def get_scraper_for_url(url: str, **scraper_kwargs: Any) -> BaseScraper:
     """
     Get appropriate scraper for given URL.
 
     Args:
       url: Recipe URL
+      **scraper_kwargs: Passed to the scraper constructor
+        (e.g. shared ``client`` or ``fetcher``)
 
     Returns:
       Scraper instance for the URL
@@ -42,10 +44,10 @@ def get_scraper_for_url(url: str) -> BaseScraper:
     # Find matching scraper
     for pattern, scraper_class in SCRAPER_MAP.items():
         if pattern in domain:
-            return scraper_class()
+            return scraper_class(**scraper_kwargs)
 
     # Fallback to generic scraper
-    return GenericScraper()
+    return GenericScraper(**scraper_kwargs)
 
 
 __all__ = [
@@ -0,0 +1,264 @@
+"""
+ユーザー行動ログ（追記専用ストア）
+
+行動イベントを WAL モードの SQLite テーブルへ追記する。
+記録はメモリ上のバッファに積むだけで即座に返り、バックグラウンドスレッドが
+一定間隔またはバッファが溜まった時点でまとめて1トランザクションで書き込む。
+(user_id, seq) の索引により、ユーザー単位の読み出しや
+前回以降の差分読み込みが可能。
+"""
+
+import atexit
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from backend.services.write_behind import WriteBehindBuffer
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityLog:
+    """追記専用の行動ログ（SQLite WAL + バッチ書き込み）"""
+
+    def __init__(
+        self,
+        db_path: Path,
+        flush_interval: float = 1.0,
+        batch_size: int = 256,
+    ):
+        """
+        初期化
+
+        Args:
+          db_path: データベースファイルパス
+          flush_interval: バックグラウンド書き込みの間隔（秒）
+          batch_size: この件数に達したら間隔を待たずに書き込む
+        """
+        self.db_path = Path(db_path)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._lock = threading.Lock()
+        self._buffer = WriteBehindBuffer(
+            self._write_rows,
+            name="activity-log-flush",
+            flush_interval=flush_interval,
+            batch_size=batch_size,
+        )
+
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS activities (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id TEXT NOT NULL,
+                recipe_id TEXT NOT NULL,
+                activity_type TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_activities_user ON activities(user_id, seq)"
+        )
+        self._conn.commit()
+
+    def append(self, user_id: str, activity: Dict) -> None:
+        """
+        行動イベントを追記（書き込みはバックグラウンドで行う）
+
+        metadata は呼び出し元のスレッドで JSON 化するため、
+        シリアライズできない値はここで例外になりバッファには積まれない。
+
+        Args:
+          user_id: ユーザーID
+          activity: recipe_id, activity_type, timestamp, metadata を持つ辞書
+
+        Raises:
+          TypeError: metadata が JSON に変換できない場合
+        """
+        row = (
+            user_id,
+            activity["recipe_id"],
+            activity["activity_type"],
+            activity["timestamp"],
+            json.dumps(
+                activity.get("metadata") or {},
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ),
+        )
+        self._buffer.append(row)
+
+    @property
+    def closed(self) -> bool:
+        return self._buffer.closed
+
+    def _write_rows(self, rows: List[Tuple[str, str, str, str, str]]) -> None:
+        """行をまとめて1トランザクションで書き込む"""
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO activities "
+                    "(user_id, recipe_id, activity_type, timestamp, metadata) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+
+    def flush(self) -> int:
+        """
+        バッファ内のイベントをまとめて書き込む
+
+        書き込みに失敗した場合はバッファを残し、次回の flush で再試行する。
+
+        Returns:
+          書き込んだ件数
+        """
+        return self._buffer.flush()
+
+    def iter_since(
+        self, after_seq: int = 0, chunk_size: int = 1000
+    ) -> Iterator[Tuple[int, str, Dict]]:
+        """
+        指定シーケンス以降のイベントを古い順に返す
+
+        未書き込みのバッファは先に書き込むため、直前の追記も含まれる。
+
+        Args:
+          after_seq: このシーケンス番号より後のイベントを返す
+          chunk_size: 1回のクエリで読む件数
+
+        Yields:
+          (seq, user_id, activity) のタプル
+        """
+        self.flush()
+        last = after_seq
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT seq, user_id, recipe_id, activity_type, timestamp, metadata "
+                    "FROM activities WHERE seq > ? ORDER BY seq LIMIT ?",
+                    (last, chunk_size),
+                ).fetchall()
+            if not rows:
+                return
+            for seq, user_id, recipe_id, activity_type, timestamp, metadata in rows:
+                yield seq, user_id, {
+                    "recipe_id": recipe_id,
+                    "activity_type": activity_type,
+                    "timestamp": timestamp,
+                    "metadata": json.loads(metadata),
+                }
+            last = rows[-1][0]
+
+    def load_user(self, user_id: str) -> List[Dict]:
+        """
+        1ユーザーの行動履歴を取得（索引を使用）
+
+        Args:
+          user_id: ユーザーID
+
+        Returns:
+          古い順の行動リスト
+        """
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT recipe_id, activity_type, timestamp, metadata "
+                "FROM activities WHERE user_id = ? ORDER BY seq",
+                (user_id,),
+            ).fetchall()
+        return [
+            {
+                "recipe_id": recipe_id,
+                "activity_type": activity_type,
+                "timestamp": timestamp,
+                "metadata": json.loads(metadata),
+            }
+            for recipe_id, activity_type, timestamp, metadata in rows
+        ]
+
+    def count(self) -> int:
+        """書き込み済みイベント数を取得"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM activities").fetchone()[0]
+
+    def import_json(self, json_path: Path) -> int:
+        """
+        旧形式（ユーザーID→行動リストのJSON）を取り込む
+
+        取り込み後、元のファイルは ``.migrated`` を付けた名前に変更する。
+
+        Args:
+          json_path: 旧形式の JSON ファイル
+
+        Returns:
+          取り込んだ件数
+        """
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to read legacy activity file {json_path}: {e}")
+            return 0
+
+        imported = 0
+        for user_id, activities in data.items():
+            for activity in activities:
+                self.append(user_id, activity)
+                imported += 1
+        self.flush()
+        json_path.rename(json_path.with_name(json_path.name + ".migrated"))
+        logger.info(f"Imported {imported} activities from {json_path}")
+        return imported
+
+    def close(self) -> None:
+        """残りを書き込んで接続を閉じる"""
+        if self._buffer.closed:
+            return
+        self._buffer.close()
+        with self._lock:
+            self._conn.close()
+
+
+_logs: Dict[Path, ActivityLog] = {}
+_logs_lock = threading.Lock()
+
+
+def get_activity_log(db_path: Path) -> ActivityLog:
+    """
+    パスごとに共有される ActivityLog を取得
+
+    同じファイルを開く複数のサービスインスタンスが未書き込みのバッファを
+    共有するため、別インスタンスからも直前の記録が見える。
+
+    Args:
+      db_path: データベースファイルパス
+
+    Returns:
+      ActivityLog インスタンス
+    """
+    key = Path(db_path).resolve()
+    with _logs_lock:
+        log = _logs.get(key)
+        if log is None or log.closed:
+            log = ActivityLog(key)
+            _logs[key] = log
+        return log
+
+
+@atexit.register
+def close_activity_logs() -> None:
+    """全ての ActivityLog を書き込んで閉じる"""
+    with _logs_lock:
+        logs = list(_logs.values())
+        _logs.clear()
+    for log in logs:
+        log.close()
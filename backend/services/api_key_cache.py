@@ -0,0 +1,91 @@
+"""
+検証済みAPIキーのキャッシュ
+
+Argon2id の検証は意図的に遅いため、最近検証に成功したキーを短時間だけ覚えておき、
+同じキーでの連続したリクエストではハッシュ検証を省く。
+生のキーは保持せず、プロセスごとの秘密鍵による HMAC-SHA256 のダイジェストだけを
+鍵にする（メモリ上のダイジェストからキーを復元・照合することはできない）。
+"""
+
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# キャッシュに保持する件数
+DEFAULT_CACHE_SIZE = 1024
+
+# 検証結果を信用する秒数
+DEFAULT_CACHE_TTL = 300.0
+
+
+class VerifiedKeyCache:
+    """HMAC ダイジェストを鍵にした検証済みキーの LRU キャッシュ"""
+
+    def __init__(
+        self, max_size: int = DEFAULT_CACHE_SIZE, ttl: float = DEFAULT_CACHE_TTL
+    ):
+        """
+        初期化
+
+        Args:
+          max_size: 保持する件数
+          ttl: 検証結果を信用する秒数
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._secret = secrets.token_bytes(32)
+        self._lock = threading.Lock()
+        # ダイジェスト → (キーID, 有効期限)
+        self._entries: "OrderedDict[bytes, Tuple[str, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _digest(self, raw_key: str) -> bytes:
+        return hmac.new(self._secret, raw_key.encode(), hashlib.sha256).digest()
+
+    def get(self, raw_key: str) -> Optional[str]:
+        """
+        検証済みのキーならキーIDを返す
+
+        Args:
+          raw_key: 生のAPIキー
+
+        Returns:
+          キーID（未検証・期限切れの場合は None）
+        """
+        digest = self._digest(raw_key)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            key_id, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[digest]
+                return None
+            self._entries.move_to_end(digest)
+            return key_id
+
+    def put(self, raw_key: str, key_id: str) -> None:
+        """検証に成功したキーを記録"""
+        digest = self._digest(raw_key)
+        with self._lock:
+            self._entries[digest] = (key_id, time.monotonic() + self.ttl)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key_id: str) -> None:
+        """キーIDに対応する記録を取り除く（無効化・削除時）"""
+        with self._lock:
+            for digest in [d for d, (kid, _) in self._entries.items() if kid == key_id]:
+                del self._entries[digest]
+
+    def clear(self) -> None:
+        """全記録を破棄"""
+        with self._lock:
+            self._entries.clear()
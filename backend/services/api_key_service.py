@@ -3,6 +3,14 @@ API Key Management Service
 
 APIキーの発行・管理・検証を行うサービス
 Argon2idを使用したセキュアなハッシュ化
+
+発行するキーは「キーID.秘密部分」の形式で、検証時はキーIDで対象を引いて
+1件分のハッシュだけを照合する。最近検証したキーはキャッシュで照合を省く。
+
+レート制限はキーごとの固定長のバケット（api_key_usage.UsageCounters）で判定し、
+使用量の記録は追記ファイル（usage.log）へ非同期にまとめて書き込む。
+keys.json と usage.json は追記ファイルを取り込んだスナップショットとして、
+キーの発行・無効化・削除時と追記ファイルが一定件数に達した時に書き直す。
 """
 
 import hashlib
@@ -10,11 +18,15 @@ import secrets
 import json
 import time
 import logging
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Deque, Dict, List, Optional, Tuple
 from pathlib import Path
 from dataclasses import dataclass, asdict
 
+from backend.services.api_key_cache import VerifiedKeyCache
+from backend.services.api_key_usage import UsageCounters, get_usage_log
+
 # Argon2をインポート（フォールバック付き）
 try:
     from argon2 import PasswordHasher
@@ -28,6 +40,15 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# 発行するキーのキーIDと秘密部分の区切り（token_urlsafe の文字には含まれない）
+KEY_ID_SEPARATOR = "."
+
+# 使用量記録を保持する秒数（日単位のレート制限の期間）
+USAGE_RETENTION_SECONDS = 86400
+
+# 追記ファイルがこの件数に達したらスナップショットに書き出す
+USAGE_COMPACT_THRESHOLD = 10000
+
 
 @dataclass
 class APIKeyScope:
@@ -62,6 +83,8 @@ class APIKey:
     last_used_at: Optional[str] = None
     usage_count: int = 0
     is_active: bool = True
+    # キー文字列にキーIDを含むか（False は旧形式のキー）
+    prefixed: bool = False
 
 
 @dataclass
@@ -97,9 +120,12 @@ class APIKeyService:
 
         self.keys_file = self.data_dir / "keys.json"
         self.usage_file = self.data_dir / "usage.json"
+        self.usage_log = get_usage_log(self.data_dir / "usage.log")
 
         self.keys: Dict[str, APIKey] = {}
-        self.usage: Dict[str, List[UsageRecord]] = {}
+        self.usage: Dict[str, Deque[UsageRecord]] = {}
+        self._counters: Dict[str, UsageCounters] = {}
+        self._verified_cache = VerifiedKeyCache()
 
         # Argon2ハッシャーを初期化（利用可能な場合）
         if ARGON2_AVAILABLE:
@@ -138,12 +164,39 @@ class APIKeyService:
                 with open(self.usage_file, "r", encoding="utf-8") as f:
                     data = json.load(f)
                     for key_id, records in data.items():
-                        self.usage[key_id] = [
+                        self.usage[key_id] = deque(
                             UsageRecord(**record) for record in records
-                        ]
+                        )
             except Exception as e:
                 print(f"Failed to load usage records: {e}")
 
+        # スナップショット以降の使用量記録を反映
+        for entry in self.usage_log.read():
+            try:
+                key_id = entry["key_id"]
+                record = UsageRecord(
+                    timestamp=entry["timestamp"],
+                    endpoint=entry["endpoint"],
+                    status_code=entry["status_code"],
+                )
+            except (KeyError, TypeError):
+                continue
+            self.usage.setdefault(key_id, deque()).append(record)
+            api_key = self.keys.get(key_id)
+            if api_key is not None:
+                api_key.last_used_at = datetime.fromtimestamp(
+                    record.timestamp
+                ).isoformat()
+                api_key.usage_count += 1
+
+        # 直近1日分の記録からレート制限のカウンタを作る
+        cutoff = time.time() - USAGE_RETENTION_SECONDS
+        for key_id, records in self.usage.items():
+            counters = self._counters[key_id] = UsageCounters()
+            for record in records:
+                if record.timestamp > cutoff:
+                    counters.add(record.timestamp)
+
     def _save_keys(self) -> None:
         """APIキーの保存"""
         data = {}
@@ -158,13 +211,37 @@ class APIKeyService:
             json.dump(data, f, ensure_ascii=False, indent=2)
 
     def _save_usage(self) -> None:
-        """使用量記録の保存"""
+        """
+        使用量記録の保存
+
+        追記ファイルの内容はメモリ上の記録に含まれているため、
+        スナップショットを書き出した後に追記ファイルを空にする。
+        """
+        cutoff = time.time() - USAGE_RETENTION_SECONDS
         data = {}
         for key_id, records in self.usage.items():
+            self._prune_usage(key_id, cutoff)
             data[key_id] = [asdict(record) for record in records]
 
         with open(self.usage_file, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
+        self.usage_log.truncate()
+
+    def _save(self) -> None:
+        """
+        APIキーと使用量記録を保存
+
+        keys.json の使用回数は追記ファイルの分を含むため、
+        二重に数えないよう使用量のスナップショットと組で書き出す。
+        """
+        self._save_keys()
+        self._save_usage()
+
+    def _prune_usage(self, key_id: str, cutoff: float) -> None:
+        """cutoff 以前の使用量記録を先頭から取り除く"""
+        records = self.usage.get(key_id)
+        while records and records[0].timestamp <= cutoff:
+            records.popleft()
 
     def _hash_key(self, raw_key: str) -> str:
         """
@@ -250,11 +327,11 @@ class APIKeyService:
         Returns:
           (生成されたAPIキー文字列, APIKey情報)
         """
-        # 32バイトのランダムキー生成
-        raw_key = secrets.token_urlsafe(32)
-
-        # キーIDとハッシュ生成（Argon2idを使用）
+        # キーIDと32バイトのランダムキーを生成（キーIDは公開部分としてキーに含める）
         key_id = secrets.token_urlsafe(16)
+        raw_key = f"{key_id}{KEY_ID_SEPARATOR}{secrets.token_urlsafe(32)}"
+
+        # ハッシュ生成（Argon2idを使用）
         key_hash = self._hash_key(raw_key)
 
         # デフォルト値設定
@@ -271,13 +348,14 @@ class APIKeyService:
             scope=scope,
             rate_limit=rate_limit,
             created_at=datetime.now().isoformat(),
+            prefixed=True,
         )
 
         # 保存
         self.keys[key_id] = api_key
-        self.usage[key_id] = []
-        self._save_keys()
-        self._save_usage()
+        self.usage[key_id] = deque()
+        self._counters[key_id] = UsageCounters()
+        self._save()
 
         return raw_key, api_key
 
@@ -288,13 +366,30 @@ class APIKeyService:
         Argon2id形式とSHA-256形式の両方に対応（後方互換性）
         SHA-256形式のキーは自動的にArgon2idに移行
 
+        キーIDを含むキーはそのキーのハッシュだけを照合する。
+        キーIDを含まない旧形式のキーは旧形式のキーの中から探す。
+
         Args:
           raw_key: 検証するAPIキー文字列
 
         Returns:
           APIKey情報（無効な場合はNone）
         """
-        for api_key in self.keys.values():
+        # 最近検証したキーはハッシュ照合を省く
+        cached_id = self._verified_cache.get(raw_key)
+        if cached_id is not None:
+            api_key = self.keys.get(cached_id)
+            if api_key and api_key.is_active:
+                return api_key
+
+        key_id, separator, _ = raw_key.partition(KEY_ID_SEPARATOR)
+        if separator:
+            api_key = self.keys.get(key_id)
+            candidates = [api_key] if api_key and api_key.prefixed else []
+        else:
+            candidates = [k for k in self.keys.values() if not k.prefixed]
+
+        for api_key in candidates:
             if not api_key.is_active:
                 continue
 
@@ -304,8 +399,9 @@ class APIKeyService:
                 if self._needs_rehash(api_key.key_hash):
                     logger.info(f"Rehashing API key {api_key.key_id} from SHA-256 to Argon2id")
                     api_key.key_hash = self._hash_key(raw_key)
-                    self._save_keys()
+                    self._save()
 
+                self._verified_cache.put(raw_key, api_key.key_id)
                 return api_key
 
         return None
@@ -322,7 +418,8 @@ class APIKeyService:
         """
         if key_id in self.keys:
             self.keys[key_id].is_active = False
-            self._save_keys()
+            self._verified_cache.invalidate(key_id)
+            self._save()
             return True
         return False
 
@@ -338,10 +435,10 @@ class APIKeyService:
         """
         if key_id in self.keys:
             del self.keys[key_id]
-            if key_id in self.usage:
-                del self.usage[key_id]
-            self._save_keys()
-            self._save_usage()
+            self._verified_cache.invalidate(key_id)
+            self.usage.pop(key_id, None)
+            self._counters.pop(key_id, None)
+            self._save()
             return True
         return False
 
@@ -379,18 +476,14 @@ class APIKeyService:
         if not api_key.is_active:
             return False, "API key is inactive"
 
-        # 使用量記録を取得
-        records = self.usage.get(key_id, [])
         now = time.time()
 
         # 古い記録を削除（24時間以上前）
-        cutoff = now - 86400  # 24 hours
-        records = [r for r in records if r.timestamp > cutoff]
-        self.usage[key_id] = records
+        self._prune_usage(key_id, now - USAGE_RETENTION_SECONDS)
+
+        minute_count, hour_count, day_count = self._usage_counts(key_id, now)
 
         # 分単位チェック
-        minute_ago = now - 60
-        minute_count = sum(1 for r in records if r.timestamp > minute_ago)
         if minute_count >= api_key.rate_limit.requests_per_minute:
             return (
                 False,
@@ -398,8 +491,6 @@ class APIKeyService:
             )
 
         # 時間単位チェック
-        hour_ago = now - 3600
-        hour_count = sum(1 for r in records if r.timestamp > hour_ago)
         if hour_count >= api_key.rate_limit.requests_per_hour:
             return (
                 False,
@@ -407,8 +498,6 @@ class APIKeyService:
             )
 
         # 日単位チェック
-        day_ago = now - 86400
-        day_count = sum(1 for r in records if r.timestamp > day_ago)
         if day_count >= api_key.rate_limit.requests_per_day:
             return (
                 False,
@@ -417,6 +506,13 @@ class APIKeyService:
 
         return True, None
 
+    def _usage_counts(self, key_id: str, now: float) -> Tuple[int, int, int]:
+        """(直近1分, 直近1時間, 直近1日) のリクエスト数"""
+        counters = self._counters.get(key_id)
+        if counters is None:
+            return 0, 0, 0
+        return counters.counts(now)
+
     def record_usage(self, key_id: str, endpoint: str, status_code: int) -> None:
         """
         使用量を記録
@@ -434,18 +530,20 @@ class APIKeyService:
             timestamp=time.time(), endpoint=endpoint, status_code=status_code
         )
 
-        if key_id not in self.usage:
-            self.usage[key_id] = []
-
-        self.usage[key_id].append(record)
+        self.usage.setdefault(key_id, deque()).append(record)
+        counters = self._counters.get(key_id)
+        if counters is None:
+            counters = self._counters[key_id] = UsageCounters()
+        counters.add(record.timestamp)
 
         # キーの最終使用日時と使用回数を更新
         self.keys[key_id].last_used_at = datetime.now().isoformat()
         self.keys[key_id].usage_count += 1
 
-        # 保存（パフォーマンスのため非同期化を検討）
-        self._save_keys()
-        self._save_usage()
+        # 保存は追記ファイルへ非同期に行う
+        self.usage_log.append({"key_id": key_id, **asdict(record)})
+        if self.usage_log.entry_count >= USAGE_COMPACT_THRESHOLD:
+            self._save()
 
     def get_usage_stats(self, key_id: str) -> Optional[Dict]:
         """
@@ -460,17 +558,8 @@ class APIKeyService:
         if key_id not in self.keys:
             return None
 
-        records = self.usage.get(key_id, [])
-        now = time.time()
-
         # 時間範囲別の集計
-        minute_ago = now - 60
-        hour_ago = now - 3600
-        day_ago = now - 86400
-
-        minute_count = sum(1 for r in records if r.timestamp > minute_ago)
-        hour_count = sum(1 for r in records if r.timestamp > hour_ago)
-        day_count = sum(1 for r in records if r.timestamp > day_ago)
+        minute_count, hour_count, day_count = self._usage_counts(key_id, time.time())
 
         # レート制限情報
         api_key = self.keys[key_id]
@@ -0,0 +1,224 @@
+"""
+APIキー使用量の集計と記録
+
+レート制限の判定には、キーごとの固定長のリングバッファ（秒・分・時の
+バケット）を使う。直近1分は秒単位60個、直近1時間は分単位60個、
+直近1日は時単位24個のバケットの合計で数えるため、リクエスト1件あたりの
+加算・判定のコストは記録の件数に依存しない。
+
+使用量の記録は JSON Lines 形式の追記ファイルに書く。記録はメモリ上のバッファに
+積むだけで即座に返り、バックグラウンドスレッドが一定間隔またはバッファが
+溜まった時点でまとめて追記する（ファイル全体の書き直しは行わない）。
+"""
+
+import atexit
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from backend.services.write_behind import WriteBehindBuffer
+
+
+class SlidingWindowCounter:
+    """固定幅バケットのリングバッファによる期間内の件数"""
+
+    __slots__ = ("width", "_counts", "_stamps")
+
+    def __init__(self, slots: int, width: float):
+        """
+        初期化
+
+        Args:
+          slots: バケット数（期間 = slots × width）
+          width: 1バケットの幅（秒）
+        """
+        self.width = width
+        self._counts = [0] * slots
+        # バケットに入っている期間の番号（timestamp // width）
+        self._stamps = [-1] * slots
+
+    def add(self, timestamp: float, count: int = 1) -> None:
+        """指定時刻に件数を加算"""
+        index = int(timestamp // self.width)
+        slot = index % len(self._counts)
+        if self._stamps[slot] != index:
+            if self._stamps[slot] > index:
+                # バケットが既に新しい期間に使われている（古すぎる記録）
+                return
+            self._stamps[slot] = index
+            self._counts[slot] = 0
+        self._counts[slot] += count
+
+    def total(self, now: float) -> int:
+        """now を含む直近の期間の件数"""
+        newest = int(now // self.width)
+        oldest = newest - len(self._counts) + 1
+        return sum(
+            count
+            for count, stamp in zip(self._counts, self._stamps)
+            if oldest <= stamp <= newest
+        )
+
+
+class UsageCounters:
+    """1キー分の直近1分・1時間・1日の件数"""
+
+    __slots__ = ("minute", "hour", "day")
+
+    def __init__(self):
+        self.minute = SlidingWindowCounter(60, 1.0)
+        self.hour = SlidingWindowCounter(60, 60.0)
+        self.day = SlidingWindowCounter(24, 3600.0)
+
+    def add(self, timestamp: float) -> None:
+        """リクエスト1件を加算"""
+        self.minute.add(timestamp)
+        self.hour.add(timestamp)
+        self.day.add(timestamp)
+
+    def counts(self, now: float) -> Tuple[int, int, int]:
+        """(直近1分, 直近1時間, 直近1日) の件数"""
+        return self.minute.total(now), self.hour.total(now), self.day.total(now)
+
+
+class UsageLog:
+    """使用量記録の追記ファイル（非同期バッチ書き込み）"""
+
+    def __init__(
+        self,
+        log_path: Path,
+        flush_interval: float = 1.0,
+        batch_size: int = 256,
+    ):
+        """
+        初期化
+
+        Args:
+          log_path: 追記ファイルパス
+          flush_interval: バックグラウンド書き込みの間隔（秒）
+          batch_size: この件数に達したら間隔を待たずに書き込む
+        """
+        self.log_path = Path(log_path)
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._lock = threading.Lock()
+        self._buffer = WriteBehindBuffer(
+            self._write_lines,
+            name="api-key-usage-flush",
+            flush_interval=flush_interval,
+            batch_size=batch_size,
+        )
+        # 前回の truncate 以降に追記した件数（未書き込みを含む）
+        self.entry_count = self._count_lines()
+
+    def _count_lines(self) -> int:
+        try:
+            with open(self.log_path, "rb") as f:
+                return sum(1 for _ in f)
+        except FileNotFoundError:
+            return 0
+
+    def append(self, entry: Dict) -> None:
+        """
+        記録を追記（書き込みはバックグラウンドで行う）
+
+        JSON への変換は呼び出し元のスレッドで行う。
+
+        Args:
+          entry: JSON に変換できる辞書
+
+        Raises:
+          TypeError: entry が JSON に変換できない場合
+        """
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            self.entry_count += 1
+        self._buffer.append(line)
+
+    @property
+    def closed(self) -> bool:
+        return self._buffer.closed
+
+    def _write_lines(self, lines: List[str]) -> None:
+        """行をまとめて追記"""
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+
+    def flush(self) -> int:
+        """
+        バッファ内の記録をまとめて追記
+
+        書き込みに失敗した場合はバッファを残し、次回の flush で再試行する。
+
+        Returns:
+          書き込んだ件数
+        """
+        return self._buffer.flush()
+
+    def read(self) -> Iterator[Dict]:
+        """追記済みの記録を古い順に返す（未書き込みのバッファは先に書き込む）"""
+        self.flush()
+        try:
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        # 書き込み途中で終了した行は読み飛ばす
+                        continue
+        except FileNotFoundError:
+            return
+
+    def truncate(self) -> None:
+        """
+        追記ファイルを空にする
+
+        呼び出し側がこれまでの記録（未書き込みの分を含む）を
+        スナップショットに書き出した後に呼ぶ。
+        """
+        with self._buffer.io_lock, self._lock:
+            self._buffer.discard()
+            self.log_path.write_text("", encoding="utf-8")
+            self.entry_count = 0
+
+    def close(self) -> None:
+        """残りを書き込んでバックグラウンドスレッドを止める"""
+        self._buffer.close()
+
+
+_logs: Dict[Path, UsageLog] = {}
+_logs_lock = threading.Lock()
+
+
+def get_usage_log(log_path: Path) -> UsageLog:
+    """
+    パスごとに共有される UsageLog を取得
+
+    同じファイルを開く複数のサービスインスタンスが未書き込みのバッファを
+    共有するため、別インスタンスからも直前の記録が見える。
+
+    Args:
+      log_path: 追記ファイルパス
+
+    Returns:
+      UsageLog インスタンス
+    """
+    key = Path(log_path).resolve()
+    with _logs_lock:
+        log = _logs.get(key)
+        if log is None or log.closed:
+            log = UsageLog(key)
+            _logs[key] = log
+        return log
+
+
+@atexit.register
+def close_usage_logs() -> None:
+    """全ての UsageLog を書き込んで閉じる"""
+    with _logs_lock:
+        logs = list(_logs.values())
+        _logs.clear()
+    for log in logs:
+        log.close()
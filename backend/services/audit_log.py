@@ -0,0 +1,660 @@
+"""
+Audit Log Writer for Personal Recipe Intelligence
+
+監査ログの書き込み・ローテーション・検索
+
+- 記録は呼び出し元のスレッドで JSON 化して上限付きキューに積むだけで即座に返り、
+  バックグラウンドスレッドが溜まった記録をまとめて書き込み、1バッチにつき1回
+  fsync する（グループコミット）。JSON 化できない記録は単独で緊急ログに残す
+- 書き込み中のセグメント（audit.json）がサイズ上限または経過時間の上限に
+  達したら gzip 圧縮したセグメント（audit-<開始時刻>-<連番>.json.gz）に切り替える
+- セグメントごとに期間・アクション・ユーザーの要約をインデックス
+  （audit_index.json）に保存し、検索時は条件に合わないセグメントを開かない
+- 複数プロセス（uvicorn の worker）が同じディレクトリに書く場合に備え、
+  追記はロックファイル（audit.lock）の共有ロック、ローテーションと
+  インデックスの更新は排他ロックの下で行う。追記の前に audit.json が
+  別プロセスのローテーションで置き換わっていないかを確認し、置き換わっていれば
+  開き直す。fcntl のない環境（Windows）ではプロセス間の排他を行わないため、
+  1つのディレクトリに書き込むプロセスは1つにすること
+"""
+
+import atexit
+import gzip
+import json
+import logging
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+  import fcntl
+except ImportError:  # pragma: no cover
+  fcntl = None
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_FILE = "audit.json"
+INDEX_FILE = "audit_index.json"
+EMERGENCY_FILE = "audit_emergency.json"
+LOCK_FILE = "audit.lock"
+
+# ユーザー数がこれを超えたセグメントはユーザーで絞り込まない
+MAX_INDEXED_USERS = 256
+
+_SEGMENT_PATTERN = re.compile(r"^audit-\d{8}T\d{6}-(\d{6})\.json(\.gz)?$")
+
+# close 時に書き込みスレッドを止めるための目印
+_STOP = object()
+
+
+def _entry_time(entry: Dict[str, Any]) -> float:
+  """記録のタイムスタンプ（UNIX秒）"""
+  try:
+    return datetime.fromisoformat(entry["timestamp"]).timestamp()
+  except (KeyError, TypeError, ValueError):
+    return time.time()
+
+
+class SegmentSummary:
+  """1セグメント分の期間・件数・アクション・ユーザー"""
+
+  __slots__ = ("start", "end", "count", "actions", "users")
+
+  def __init__(self):
+    self.start: Optional[float] = None
+    self.end: Optional[float] = None
+    self.count = 0
+    self.actions: set = set()
+    # None は「ユーザーが多すぎて記録していない」（どのユーザーでも候補になる）
+    self.users: Optional[set] = set()
+
+  def add(self, entry: Dict[str, Any]) -> None:
+    """記録を1件加える"""
+    ts = _entry_time(entry)
+    self.start = ts if self.start is None else min(self.start, ts)
+    self.end = ts if self.end is None else max(self.end, ts)
+    self.count += 1
+    self.actions.add(entry.get("action"))
+    if self.users is not None:
+      self.users.add(entry.get("user_id"))
+      if len(self.users) > MAX_INDEXED_USERS:
+        self.users = None
+
+  def matches(
+    self,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    action: Optional[str] = None,
+    user_id: Optional[str] = None,
+  ) -> bool:
+    """条件に合う記録を含みうるか"""
+    if self.count == 0:
+      return False
+    if start is not None and self.end < start:
+      return False
+    if end is not None and self.start > end:
+      return False
+    if action is not None and action not in self.actions:
+      return False
+    if user_id is not None and self.users is not None and user_id not in self.users:
+      return False
+    return True
+
+  def to_dict(self) -> Dict[str, Any]:
+    return {
+      "start": self.start,
+      "end": self.end,
+      "count": self.count,
+      "actions": sorted(a for a in self.actions if a is not None),
+      "users": (
+        None
+        if self.users is None
+        else sorted(u for u in self.users if u is not None)
+      ),
+    }
+
+  @classmethod
+  def from_dict(cls, data: Dict[str, Any]) -> "SegmentSummary":
+    summary = cls()
+    summary.start = data.get("start")
+    summary.end = data.get("end")
+    summary.count = data.get("count", 0)
+    summary.actions = set(data.get("actions") or [])
+    users = data.get("users")
+    summary.users = None if users is None else set(users)
+    return summary
+
+  @classmethod
+  def from_entries(cls, entries: Iterable[Dict[str, Any]]) -> "SegmentSummary":
+    summary = cls()
+    for entry in entries:
+      summary.add(entry)
+    return summary
+
+
+def _read_lines(path: Path) -> List[Dict[str, Any]]:
+  """セグメントの記録を古い順に読む（書き込み途中の行は読み飛ばす）"""
+  opener = gzip.open if path.suffix == ".gz" else open
+  entries = []
+  try:
+    with opener(path, "rt", encoding="utf-8") as f:
+      for line in f:
+        try:
+          entries.append(json.loads(line))
+        except json.JSONDecodeError:
+          continue
+  except FileNotFoundError:
+    pass
+  return entries
+
+
+class AuditLog:
+  """監査ログの非同期書き込みとセグメント管理"""
+
+  def __init__(
+    self,
+    log_dir: Path,
+    max_bytes: int = 10 * 1024 * 1024,
+    max_age: float = 86400.0,
+    queue_size: int = 10000,
+    batch_size: int = 512,
+    flush_interval: float = 0.5,
+    put_timeout: float = 1.0,
+    fsync: bool = True,
+  ):
+    """
+    初期化
+
+    Args:
+        log_dir: ログディレクトリパス
+        max_bytes: 書き込み中セグメントのサイズ上限（バイト）
+        max_age: 書き込み中セグメントの最初の記録からの経過時間の上限（秒）
+        queue_size: 書き込み待ちキューの上限件数
+        batch_size: 1回の書き込み・fsync でまとめる最大件数
+        flush_interval: 記録がない時にローテーションを確認する間隔（秒）
+        put_timeout: キューが満杯の時に空きを待つ時間（秒）
+        fsync: バッチごとに fsync するか
+    """
+    self.log_dir = Path(log_dir)
+    self.log_dir.mkdir(parents=True, exist_ok=True)
+    self.active_path = self.log_dir / ACTIVE_FILE
+    self.index_path = self.log_dir / INDEX_FILE
+    self.emergency_path = self.log_dir / EMERGENCY_FILE
+    self.lock_path = self.log_dir / LOCK_FILE
+
+    self.max_bytes = max_bytes
+    self.max_age = max_age
+    self.batch_size = batch_size
+    self.flush_interval = flush_interval
+    self.put_timeout = put_timeout
+    self.fsync = fsync
+
+    self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    # セグメントの切り替え・検索の排他
+    self._lock = threading.RLock()
+    self._thread_lock = threading.Lock()
+    self._thread: Optional[threading.Thread] = None
+    self._closed = False
+    self._file = None
+    self._lock_fd: Optional[int] = None
+
+    # ファイル名 -> 要約（古い順）
+    self._segments: Dict[str, SegmentSummary] = {}
+    self._active = SegmentSummary()
+    with self._process_lock():
+      self._load()
+
+  # === プロセス間の排他 ===
+
+  @contextmanager
+  def _process_lock(self, shared: bool = False) -> Iterator[None]:
+    """
+    ロックファイルによるプロセス間の排他（_lock を保持して呼ぶ）
+
+    Args:
+        shared: 共有ロック（追記）か排他ロック（ローテーション・インデックス更新）か
+    """
+    if fcntl is None:
+      yield
+      return
+    if self._lock_fd is None:
+      self._lock_fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    fcntl.flock(self._lock_fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+    try:
+      yield
+    finally:
+      fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+  def _active_replaced(self) -> bool:
+    """開いている audit.json が別プロセスのローテーションで置き換わったか"""
+    if self._file is None:
+      return False
+    try:
+      current = os.stat(self.active_path)
+    except FileNotFoundError:
+      return True
+    opened = os.fstat(self._file.fileno())
+    return (opened.st_dev, opened.st_ino) != (current.st_dev, current.st_ino)
+
+  def _reopen_if_replaced(self) -> None:
+    """置き換わっていれば閉じて、インデックスと書き込み中の要約を読み直す"""
+    if not self._active_replaced():
+      return
+    self._file.close()
+    self._file = None
+    self._merge_index()
+    self._active = SegmentSummary.from_entries(_read_lines(self.active_path))
+
+  def _merge_index(self) -> None:
+    """別プロセスがインデックスに登録したセグメントを取り込む"""
+    self._segments.update(self._read_index())
+    self._segments = dict(sorted(self._segments.items(), key=lambda item: item[0]))
+
+  # === 起動時の読み込み ===
+
+  def _read_index(self) -> Dict[str, SegmentSummary]:
+    """インデックスを読み込む（ない・壊れている場合は空）"""
+    segments: Dict[str, SegmentSummary] = {}
+    try:
+      with open(self.index_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+      for name, summary in data.get("segments", {}).items():
+        segments[name] = SegmentSummary.from_dict(summary)
+    except FileNotFoundError:
+      pass
+    except (json.JSONDecodeError, AttributeError) as e:
+      logger.error(f"Audit index is broken, rebuilding: {e}")
+    return segments
+
+  def _load(self) -> None:
+    """インデックスを読み込み、中断したローテーションを完了させる"""
+    self._segments = self._read_index()
+
+    changed = False
+    for path in sorted(self.log_dir.iterdir(), key=lambda p: p.name):
+      match = _SEGMENT_PATTERN.match(path.name)
+      if not match:
+        continue
+      if match.group(2):
+        if path.name not in self._segments:
+          # インデックスにないセグメントは中身から要約を作り直す
+          self._segments[path.name] = SegmentSummary.from_entries(_read_lines(path))
+          changed = True
+      else:
+        # 圧縮前に中断したセグメント
+        self._compress(path)
+        changed = True
+
+    for name in list(self._segments):
+      if not (self.log_dir / name).exists():
+        del self._segments[name]
+        changed = True
+
+    self._segments = dict(sorted(self._segments.items(), key=lambda item: item[0]))
+    if changed:
+      self._save_index()
+
+    self._active = SegmentSummary.from_entries(_read_lines(self.active_path))
+    self._terminate_partial_line()
+
+  def _terminate_partial_line(self) -> None:
+    """書き込み途中で終了した行の後ろに次の記録が繋がらないよう改行を補う"""
+    try:
+      with open(self.active_path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+          return
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+          f.write(b"\n")
+    except FileNotFoundError:
+      pass
+
+  def _save_index(self) -> None:
+    """インデックスを書き込む（一時ファイルから置き換え）"""
+    data = {
+      "segments": {name: s.to_dict() for name, s in self._segments.items()}
+    }
+    tmp_path = self.index_path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+      json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, self.index_path)
+
+  # === 書き込み ===
+
+  def write(self, entry: Dict[str, Any]) -> bool:
+    """
+    記録を JSON 化して書き込みキューに積む
+
+    JSON にできない値は文字列にする。それでも変換できない記録
+    （循環参照など）はキューに積まず、単独で緊急ログに残す。
+
+    Args:
+        entry: 監査エントリ
+
+    Returns:
+        受け付けた場合 True（キューが満杯のまま空かなかった場合 False）
+    """
+    try:
+      line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+    except (TypeError, ValueError) as e:
+      logger.error(f"Audit entry is not serializable: {e}")
+      self.write_emergency([entry], e)
+      return True
+
+    item = (entry, line)
+    if self._closed:
+      # 終了後の記録はその場で書き込む
+      with self._lock:
+        return self._commit([item])
+
+    self._ensure_thread()
+    try:
+      self._queue.put_nowait(item)
+    except queue.Full:
+      try:
+        self._queue.put(item, timeout=self.put_timeout)
+      except queue.Full:
+        return False
+    return True
+
+  def _ensure_thread(self) -> None:
+    if self._thread is not None:
+      return
+    with self._thread_lock:
+      if self._thread is None:
+        self._thread = threading.Thread(
+          target=self._run, name="audit-log-writer", daemon=True
+        )
+        self._thread.start()
+
+  def _run(self) -> None:
+    """バックグラウンド書き込みループ"""
+    while True:
+      try:
+        batch = [self._queue.get(timeout=self.flush_interval)]
+      except queue.Empty:
+        with self._lock:
+          self._rotate_if_needed()
+        continue
+
+      while len(batch) < self.batch_size:
+        try:
+          batch.append(self._queue.get_nowait())
+        except queue.Empty:
+          break
+
+      items = [item for item in batch if item is not _STOP]
+      try:
+        if items:
+          with self._lock:
+            self._commit(items)
+      except Exception as e:
+        logger.error(f"Audit log writer failed: {e}")
+        self.write_emergency([entry for entry, _ in items], e)
+      finally:
+        for _ in batch:
+          self._queue.task_done()
+
+      if len(items) != len(batch):
+        return
+
+  def _commit(self, items: List[Tuple[Dict[str, Any], str]]) -> bool:
+    """
+    JSON 化済みの記録をまとめて追記し fsync する（_lock を保持して呼ぶ）
+
+    Args:
+        items: (監査エントリ, JSON の行) のリスト
+
+    Returns:
+        書き込めた場合 True（失敗した記録は緊急ログに残す）
+    """
+    data = "".join(line for _, line in items).encode("utf-8")
+    try:
+      with self._process_lock(shared=True):
+        self._reopen_if_replaced()
+        if self._file is None:
+          self._file = open(self.active_path, "ab")
+        self._file.write(data)
+        self._file.flush()
+        if self.fsync:
+          os.fsync(self._file.fileno())
+    except OSError as e:
+      logger.error(f"Failed to write audit log: {e}")
+      self.write_emergency([entry for entry, _ in items], e)
+      return False
+
+    for entry, _ in items:
+      self._active.add(entry)
+    self._rotate_if_needed()
+    return True
+
+  def write_emergency(self, entries: List[Dict[str, Any]], error: Exception) -> None:
+    """
+    監査ログに書けなかった記録を緊急ログに残す
+
+    Args:
+        entries: 監査エントリ
+        error: 発生したエラー
+    """
+    try:
+      with open(self.emergency_path, "a", encoding="utf-8") as f:
+        for entry in entries:
+          emergency_entry = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "error": str(error),
+            "original_entry": entry,
+          }
+          try:
+            line = json.dumps(emergency_entry, ensure_ascii=False, default=str)
+          except (TypeError, ValueError):
+            # JSON にできない記録は repr で残す
+            emergency_entry["original_entry"] = repr(entry)
+            line = json.dumps(emergency_entry, ensure_ascii=False)
+          f.write(line + "\n")
+    except Exception as e:
+      # これも失敗したら標準エラー出力
+      print(f"CRITICAL: Failed to write emergency audit log: {e}", flush=True)
+
+  # === ローテーション ===
+
+  def _rotate_if_needed(self, now: Optional[float] = None) -> None:
+    """サイズまたは経過時間が上限に達していればセグメントを切り替える"""
+    if self._active.count == 0:
+      return
+    now = time.time() if now is None else now
+    try:
+      size = self.active_path.stat().st_size
+    except FileNotFoundError:
+      return
+    if size >= self.max_bytes or now - self._active.start >= self.max_age:
+      self.rotate()
+
+  def rotate(self) -> Optional[str]:
+    """
+    書き込み中のセグメントを圧縮セグメントに切り替える
+
+    Returns:
+        作成したセグメントのファイル名（記録がない場合 None）
+    """
+    with self._lock, self._process_lock():
+      # 別プロセスが先にローテーションしていれば、その結果を読み直してから判断する
+      self._reopen_if_replaced()
+      if self._file is None:
+        self._active = SegmentSummary.from_entries(_read_lines(self.active_path))
+      self._merge_index()
+      if self._active.count == 0:
+        return None
+      if self._file is not None:
+        self._file.close()
+        self._file = None
+
+      started = datetime.fromtimestamp(self._active.start, timezone.utc)
+      name = f"audit-{started.strftime('%Y%m%dT%H%M%S')}-{self._next_seq():06d}.json"
+      pending = self.log_dir / name
+      os.replace(self.active_path, pending)
+      self._active = SegmentSummary()
+      return self._compress(pending)
+
+  def _next_seq(self) -> int:
+    seqs = [
+      int(match.group(1))
+      for match in map(_SEGMENT_PATTERN.match, self._segments)
+      if match
+    ]
+    return max(seqs, default=0) + 1
+
+  def _compress(self, pending: Path) -> str:
+    """未圧縮セグメントを gzip 圧縮してインデックスに登録する"""
+    name = pending.name + ".gz"
+    target = self.log_dir / name
+    if name not in self._segments or not target.exists():
+      summary = SegmentSummary.from_entries(_read_lines(pending))
+      tmp_path = target.with_suffix(".tmp")
+      with open(pending, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+      os.replace(tmp_path, target)
+      self._segments[name] = summary
+      self._save_index()
+    pending.unlink()
+    return name
+
+  # === 検索 ===
+
+  def flush(self) -> None:
+    """キューに積まれた記録がすべて書き込まれるまで待つ"""
+    if self._thread is not None and self._thread.is_alive():
+      self._queue.join()
+
+  def candidate_segments(
+    self,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    action: Optional[str] = None,
+    user_id: Optional[str] = None,
+  ) -> List[Path]:
+    """
+    条件に合う記録を含みうるセグメント（古い順、書き込み中を含む）
+
+    Args:
+        start: 期間の開始（UNIX秒）
+        end: 期間の終了（UNIX秒）
+        action: アクション
+        user_id: ユーザーID
+    """
+    with self._lock:
+      paths = [
+        self.log_dir / name
+        for name, summary in self._segments.items()
+        if summary.matches(start, end, action, user_id)
+      ]
+      if self._active.matches(start, end, action, user_id):
+        paths.append(self.active_path)
+      return paths
+
+  def query(
+    self,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    action: Optional[str] = None,
+    user_id: Optional[str] = None,
+    limit: Optional[int] = 100,
+  ) -> List[Dict[str, Any]]:
+    """
+    監査ログを検索（新しい順）
+
+    Args:
+        start: 期間の開始（UNIX秒）
+        end: 期間の終了（UNIX秒）
+        action: アクション
+        user_id: ユーザーID
+        limit: 最大件数（None は無制限）
+
+    Returns:
+        条件に合う監査エントリ
+    """
+    self.flush()
+    results: List[Dict[str, Any]] = []
+    with self._lock:
+      for path in reversed(self.candidate_segments(start, end, action, user_id)):
+        for entry in reversed(_read_lines(path)):
+          if action is not None and entry.get("action") != action:
+            continue
+          if user_id is not None and entry.get("user_id") != user_id:
+            continue
+          if start is not None or end is not None:
+            ts = _entry_time(entry)
+            if (start is not None and ts < start) or (end is not None and ts > end):
+              continue
+          results.append(entry)
+          if limit is not None and len(results) >= limit:
+            return results
+    return results
+
+  def close(self) -> None:
+    """残りを書き込んで書き込みスレッドを止める"""
+    if self._closed:
+      return
+    self._closed = True
+    if self._thread is not None and self._thread.is_alive():
+      self._queue.put(_STOP)
+      self._thread.join(timeout=self.flush_interval + 5)
+
+    # 終了と入れ違いに積まれた記録
+    leftover = []
+    while True:
+      try:
+        item = self._queue.get_nowait()
+      except queue.Empty:
+        break
+      if item is not _STOP:
+        leftover.append(item)
+    with self._lock:
+      if leftover:
+        self._commit(leftover)
+      if self._file is not None:
+        self._file.close()
+        self._file = None
+      if self._lock_fd is not None:
+        os.close(self._lock_fd)
+        self._lock_fd = None
+
+
+_logs: Dict[Path, AuditLog] = {}
+_logs_lock = threading.Lock()
+
+
+def get_audit_log(log_dir: Path) -> AuditLog:
+  """
+  ディレクトリごとに共有される AuditLog を取得
+
+  Args:
+      log_dir: ログディレクトリパス
+
+  Returns:
+      AuditLog インスタンス
+  """
+  key = Path(log_dir).resolve()
+  with _logs_lock:
+    log = _logs.get(key)
+    if log is None or log._closed:
+      log = AuditLog(key)
+      _logs[key] = log
+    return log
+
+
+@atexit.register
+def close_audit_logs() -> None:
+  """全ての AuditLog を書き込んで閉じる"""
+  with _logs_lock:
+    logs = list(_logs.values())
+    _logs.clear()
+  for log in logs:
+    log.close()
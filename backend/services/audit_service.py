@@ -3,16 +3,20 @@ Audit Service for Personal Recipe Intelligence
 
 監査ログサービス - セキュリティ関連イベントの記録
 CLAUDE.md Section 6.4 準拠
+
+書き込みは AuditLog（backend/services/audit_log.py）のキューに積むだけで、
+ファイルへの追記・fsync・ローテーションはバックグラウンドで行う。
 """
 
-import json
 import logging
 from datetime import datetime, timezone
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Union
 from threading import Lock
 
+from backend.services.audit_log import get_audit_log
+
 
 class AuditAction(Enum):
   """監査対象アクション"""
@@ -70,7 +74,7 @@ class AuditService:
   監査ログサービス
 
   すべてのセキュリティ関連イベントを記録する
-  JSON形式でログファイルに追記
+  JSON形式でログファイルに追記（非同期バッチ書き込み）
   """
 
   def __init__(self, log_dir: str = "logs"):
@@ -83,8 +87,10 @@ class AuditService:
     self.log_dir = Path(log_dir)
     self.log_dir.mkdir(parents=True, exist_ok=True)
 
-    self.audit_log_path = self.log_dir / "audit.json"
-    self.lock = Lock()  # スレッドセーフな書き込み
+    # 同じディレクトリを使うインスタンス間で書き込みスレッドを共有
+    self.audit_log = get_audit_log(self.log_dir)
+    self.audit_log_path = self.audit_log.active_path
+    self.lock = Lock()  # 緊急ログのスレッドセーフな書き込み
 
     # ロガー設定
     self.logger = logging.getLogger("audit_service")
@@ -133,13 +139,11 @@ class AuditService:
     }
 
     try:
-      with self.lock:
-        # JSON形式で追記
-        with open(self.audit_log_path, "a", encoding="utf-8") as f:
-          json.dump(audit_entry, f, ensure_ascii=False)
-          f.write("\n")
+      # キューに積むだけ（書き込みはバックグラウンド）
+      if not self.audit_log.write(audit_entry):
+        raise RuntimeError("Audit log queue is full")
 
-      self.logger.info(
+      self.logger.debug(
         f"Audit: {action.value} on {resource_type.value} "
         f"by user={user_id} status={status}"
       )
@@ -149,6 +153,43 @@ class AuditService:
       # 監査ログの失敗は致命的なので別途記録
       self._write_emergency_log(audit_entry, e)
 
+  def flush(self) -> None:
+    """キューに積まれた監査ログがすべて書き込まれるまで待つ"""
+    self.audit_log.flush()
+
+  def query(
+    self,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    action: Optional[Union[AuditAction, str]] = None,
+    user_id: Optional[str] = None,
+    limit: Optional[int] = 100,
+  ) -> List[Dict[str, Any]]:
+    """
+    監査ログを検索（新しい順）
+
+    条件に合わないセグメントはインデックスで読み飛ばす。
+
+    Args:
+        start: 期間の開始
+        end: 期間の終了
+        action: アクション
+        user_id: ユーザーID
+        limit: 最大件数（None は無制限）
+
+    Returns:
+        条件に合う監査エントリのリスト
+    """
+    if isinstance(action, AuditAction):
+      action = action.value
+    return self.audit_log.query(
+      start=start.timestamp() if start else None,
+      end=end.timestamp() if end else None,
+      action=action,
+      user_id=user_id,
+      limit=limit,
+    )
+
   def _sanitize_details(self, details: Dict[str, Any]) -> Dict[str, Any]:
     """
     機密データをマスク
@@ -200,19 +241,8 @@ class AuditService:
         audit_entry: 監査エントリ
         error: 発生したエラー
     """
-    emergency_log_path = self.log_dir / "audit_emergency.json"
-    try:
-      with open(emergency_log_path, "a", encoding="utf-8") as f:
-        emergency_entry = {
-          "timestamp": datetime.now(timezone.utc).isoformat(),
-          "error": str(error),
-          "original_entry": audit_entry,
-        }
-        json.dump(emergency_entry, f, ensure_ascii=False)
-        f.write("\n")
-    except Exception as e:
-      # これも失敗したら標準エラー出力
-      print(f"CRITICAL: Failed to write emergency audit log: {e}", flush=True)
+    with self.lock:
+      self.audit_log.write_emergency([audit_entry], error)
 
   # === Recipe CRUD Audit Methods ===
 
@@ -2,13 +2,20 @@
 カレンダーサービス - 献立計画のカレンダー連携機能を提供
 """
 
+from collections import OrderedDict
 from datetime import datetime, date, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from icalendar import Calendar, Event
 from pydantic import BaseModel, Field
-import json
+import hashlib
+import threading
 from pathlib import Path
 
+from backend.services.calendar_store import MealPlanStore
+
+# iCal エクスポートをキャッシュする期間の組み合わせの最大数
+ICAL_CACHE_SIZE = 32
+
 
 class MealPlanModel(BaseModel):
     """献立計画データモデル"""
@@ -40,6 +47,10 @@ class CalendarService:
         self.data_dir = Path(data_dir)
         self.plans_file = self.data_dir / "meal_plans.json"
         self._ensure_data_dir()
+        self.store = MealPlanStore(self.plans_file, self.data_dir / "meal_plans.seq")
+        # (開始日, 終了日) → (世代, iCal 文字列, ETag)
+        self._ical_cache: OrderedDict = OrderedDict()
+        self._ical_lock = threading.Lock()
 
     def _ensure_data_dir(self) -> None:
         """データディレクトリの存在を保証"""
@@ -47,42 +58,14 @@ class CalendarService:
         if not self.plans_file.exists():
             self.plans_file.write_text("[]", encoding="utf-8")
 
-    def _load_plans(self) -> List[Dict[str, Any]]:
-        """献立計画をファイルから読み込み"""
-        try:
-            data = json.loads(self.plans_file.read_text(encoding="utf-8"))
-            return data if isinstance(data, list) else []
-        except Exception as e:
-            print(f"Error loading plans: {e}")
-            return []
-
-    def _save_plans(self, plans: List[Dict[str, Any]]) -> None:
-        """献立計画をファイルに保存"""
-        self.plans_file.write_text(
-            json.dumps(plans, ensure_ascii=False, indent=2, default=str),
-            encoding="utf-8",
-        )
-
-    def _generate_id(self, plans: List[Dict[str, Any]]) -> int:
-        """新しいIDを生成"""
-        if not plans:
-            return 1
-        return max(plan.get("id", 0) for plan in plans) + 1
-
     def create_plan(self, plan: MealPlanModel) -> MealPlanModel:
-        """献立計画を作成"""
-        plans = self._load_plans()
-
+        """献立計画を作成（ID はストアが単調増加で採番）"""
         plan_dict = plan.dict()
-        plan_dict["id"] = self._generate_id(plans)
         plan_dict["created_at"] = datetime.now().isoformat()
         plan_dict["updated_at"] = datetime.now().isoformat()
         plan_dict["date"] = plan.date.isoformat()
 
-        plans.append(plan_dict)
-        self._save_plans(plans)
-
-        return MealPlanModel(**plan_dict)
+        return MealPlanModel(**self.store.insert(plan_dict))
 
     def get_plans(
         self,
@@ -90,62 +73,76 @@ class CalendarService:
         end_date: Optional[date] = None,
         meal_type: Optional[str] = None,
     ) -> List[MealPlanModel]:
-        """献立計画を取得（フィルタリング可能）"""
-        plans = self._load_plans()
-
-        # フィルタリング
-        filtered_plans = []
-        for plan in plans:
-            plan_date = date.fromisoformat(plan["date"])
-
-            # 日付範囲フィルタ
-            if start_date and plan_date < start_date:
-                continue
-            if end_date and plan_date > end_date:
-                continue
+        """献立計画を日付順に取得（フィルタリング可能）"""
+        # 日付範囲はストアの索引で絞り込む
+        plans = self.store.range(start_date, end_date)
 
-            # 食事タイプフィルタ
-            if meal_type and plan.get("meal_type") != meal_type:
-                continue
+        # 食事タイプフィルタ
+        if meal_type:
+            plans = [plan for plan in plans if plan.get("meal_type") == meal_type]
 
-            filtered_plans.append(plan)
-
-        return [MealPlanModel(**plan) for plan in filtered_plans]
+        return [MealPlanModel(**plan) for plan in plans]
 
     def update_plan(
         self, plan_id: int, updates: Dict[str, Any]
     ) -> Optional[MealPlanModel]:
         """献立計画を更新"""
-        plans = self._load_plans()
-
-        for plan in plans:
-            if plan.get("id") == plan_id:
-                # 日付の変換処理
-                if "date" in updates and isinstance(updates["date"], date):
-                    updates["date"] = updates["date"].isoformat()
+        # 日付の変換処理
+        if "date" in updates and isinstance(updates["date"], date):
+            updates["date"] = updates["date"].isoformat()
 
-                plan.update(updates)
-                plan["updated_at"] = datetime.now().isoformat()
-                self._save_plans(plans)
-                return MealPlanModel(**plan)
-
-        return None
+        plan = self.store.update(
+            plan_id, {**updates, "updated_at": datetime.now().isoformat()}
+        )
+        return MealPlanModel(**plan) if plan is not None else None
 
     def delete_plan(self, plan_id: int) -> bool:
         """献立計画を削除"""
-        plans = self._load_plans()
-        original_length = len(plans)
-        plans = [p for p in plans if p.get("id") != plan_id]
-
-        if len(plans) < original_length:
-            self._save_plans(plans)
-            return True
-        return False
+        return self.store.delete(plan_id)
 
     def export_to_ical(
         self, start_date: Optional[date] = None, end_date: Optional[date] = None
     ) -> str:
         """iCal 形式でエクスポート"""
+        return self.get_ical_export(start_date, end_date)[0]
+
+    def get_ical_export(
+        self, start_date: Optional[date] = None, end_date: Optional[date] = None
+    ) -> Tuple[str, str]:
+        """
+        iCal エクスポートと ETag を取得
+
+        期間ごとに生成結果をキャッシュし、献立計画が変更される（ストアの世代が
+        進む）まで再利用する。
+
+        Returns:
+            (iCal 文字列, ETag)
+        """
+        self.store.refresh()
+        generation = self.store.generation
+        key = (start_date, end_date)
+
+        with self._ical_lock:
+            cached = self._ical_cache.get(key)
+            if cached is not None and cached[0] == generation:
+                self._ical_cache.move_to_end(key)
+                return cached[1], cached[2]
+
+        content = self._build_ical(start_date, end_date)
+        etag = '"' + hashlib.sha1(content.encode("utf-8")).hexdigest() + '"'
+
+        with self._ical_lock:
+            self._ical_cache[key] = (generation, content, etag)
+            self._ical_cache.move_to_end(key)
+            while len(self._ical_cache) > ICAL_CACHE_SIZE:
+                self._ical_cache.popitem(last=False)
+
+        return content, etag
+
+    def _build_ical(
+        self, start_date: Optional[date] = None, end_date: Optional[date] = None
+    ) -> str:
+        """iCal 形式の文字列を生成"""
         cal = Calendar()
         cal.add("prodid", "-//Personal Recipe Intelligence//Meal Planner//JP")
         cal.add("version", "2.0")
@@ -0,0 +1,182 @@
+"""
+献立計画ストア（日付順インデックス付き）
+
+献立計画ファイル（meal_plans.json）を一度だけ読み込み、ID → 計画の辞書と
+(日付, ID) の昇順リストで保持する。期間の取得は二分探索で範囲の両端を
+求めるだけで済み、計画ごとの日付の解析も不要になる。
+ID は採番済みの最大値を別ファイルに記録し、削除後も再利用しない。
+変更のたびに世代番号を進めるので、呼び出し側は世代を鍵にキャッシュできる。
+"""
+
+import bisect
+import json
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class MealPlanStore:
+    """日付順インデックス付きの献立計画ストア"""
+
+    def __init__(self, plans_file: Path, seq_file: Path):
+        """
+        初期化
+
+        Args:
+            plans_file: 献立計画ファイル（計画リストの JSON）
+            seq_file: 採番済みの最大IDを記録するファイル
+        """
+        self.plans_file = Path(plans_file)
+        self.seq_file = Path(seq_file)
+        self._lock = threading.Lock()
+        self._plans: Dict[int, Dict[str, Any]] = {}
+        self._index: List[Tuple[str, int]] = []
+        self._last_id = 0
+        self._file_signature: Optional[Tuple[int, int]] = None
+        self.generation = 0
+        self.refresh()
+
+    # === 読み込み ===
+
+    def _stat_file(self) -> Optional[Tuple[int, int]]:
+        """献立計画ファイルの (更新時刻, サイズ)。ファイルがなければ None"""
+        try:
+            stat = self.plans_file.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def refresh(self) -> None:
+        """献立計画ファイルが外部で変更されていれば読み込み直す"""
+        with self._lock:
+            signature = self._stat_file()
+            if signature == self._file_signature:
+                return
+            self._load()
+            self._file_signature = signature
+            self.generation += 1
+
+    def _load(self) -> None:
+        """献立計画を読み込んで索引を作り直す"""
+        try:
+            data = json.loads(self.plans_file.read_text(encoding="utf-8"))
+            plans = data if isinstance(data, list) else []
+        except Exception as e:
+            print(f"Error loading plans: {e}")
+            plans = []
+
+        self._plans = {plan.get("id", 0): plan for plan in plans}
+        self._index = sorted(
+            (plan["date"], plan_id) for plan_id, plan in self._plans.items()
+        )
+
+        try:
+            recorded = int(self.seq_file.read_text(encoding="utf-8").strip() or 0)
+        except (FileNotFoundError, ValueError):
+            recorded = 0
+        self._last_id = max([recorded, self._last_id, *self._plans])
+
+    def _save(self) -> None:
+        """献立計画と採番済みIDを保存"""
+        self.plans_file.write_text(
+            json.dumps(
+                list(self._plans.values()), ensure_ascii=False, indent=2, default=str
+            ),
+            encoding="utf-8",
+        )
+        self.seq_file.write_text(str(self._last_id), encoding="utf-8")
+        self._file_signature = self._stat_file()
+        self.generation += 1
+
+    # === 取得 ===
+
+    def get(self, plan_id: int) -> Optional[Dict[str, Any]]:
+        """IDで献立計画を取得"""
+        self.refresh()
+        with self._lock:
+            plan = self._plans.get(plan_id)
+            return dict(plan) if plan is not None else None
+
+    def range(
+        self, start_date: Optional[date] = None, end_date: Optional[date] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        期間内の献立計画を日付順（同日はID順）に取得
+
+        Args:
+            start_date: 開始日（この日を含む）
+            end_date: 終了日（この日を含む）
+        """
+        self.refresh()
+        with self._lock:
+            low = (
+                bisect.bisect_left(self._index, (start_date.isoformat(),))
+                if start_date
+                else 0
+            )
+            high = (
+                # 終了日のエントリ (日付, ID) より後ろになる鍵で上限を探す
+                bisect.bisect_left(self._index, (end_date.isoformat() + "\uffff",))
+                if end_date
+                else len(self._index)
+            )
+            return [dict(self._plans[plan_id]) for _, plan_id in self._index[low:high]]
+
+    # === 書き込み ===
+
+    def insert(self, plan: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        献立計画を追加（IDを採番する）
+
+        Args:
+            plan: date を ISO 形式の文字列で持つ献立計画
+
+        Returns:
+            ID を設定した献立計画
+        """
+        self.refresh()
+        with self._lock:
+            self._last_id += 1
+            plan = {**plan, "id": self._last_id}
+            self._plans[plan["id"]] = plan
+            bisect.insort(self._index, (plan["date"], plan["id"]))
+            self._save()
+            return dict(plan)
+
+    def update(self, plan_id: int, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        献立計画を更新
+
+        Returns:
+            更新後の献立計画（存在しない場合は None）
+        """
+        self.refresh()
+        with self._lock:
+            plan = self._plans.get(plan_id)
+            if plan is None:
+                return None
+            old_date = plan["date"]
+            # ID は変更しない
+            plan.update({k: v for k, v in updates.items() if k != "id"})
+            if plan["date"] != old_date:
+                del self._index[bisect.bisect_left(self._index, (old_date, plan_id))]
+                bisect.insort(self._index, (plan["date"], plan_id))
+            self._save()
+            return dict(plan)
+
+    def delete(self, plan_id: int) -> bool:
+        """
+        献立計画を削除
+
+        Returns:
+            削除したかどうか
+        """
+        self.refresh()
+        with self._lock:
+            plan = self._plans.pop(plan_id, None)
+            if plan is None:
+                return False
+            del self._index[bisect.bisect_left(self._index, (plan["date"], plan_id))]
+            self._save()
+            return True
@@ -2,7 +2,6 @@
 Collection service for Personal Recipe Intelligence.
 """
 
-import json
 import uuid
 from datetime import datetime
 from pathlib import Path
@@ -14,6 +13,7 @@ from backend.models.collection import (
     CollectionStats,
     CollectionVisibility,
 )
+from backend.services.collection_store import CollectionStore
 
 
 class CollectionService:
@@ -38,36 +38,13 @@ class CollectionService:
         self.data_dir = Path(data_dir)
         self.collections_dir = self.data_dir / "collections"
         self.collections_dir.mkdir(parents=True, exist_ok=True)
-        self.collections_file = self.collections_dir / "collections.json"
-
-        # Initialize collections file if not exists
-        if not self.collections_file.exists():
-            self._save_collections([])
-
-    def _load_collections(self) -> List[Collection]:
-        """Load all collections from file."""
-        try:
-            with open(self.collections_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return [Collection.from_dict(item) for item in data]
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
-
-    def _save_collections(self, collections: List[Collection]) -> None:
-        """Save collections to file."""
-        with open(self.collections_file, "w", encoding="utf-8") as f:
-            json.dump(
-                [c.to_dict() for c in collections], f, ensure_ascii=False, indent=2
-            )
+        self.collections_file = self.collections_dir / "collections.db"
+        self.store = CollectionStore(self.collections_file)
 
-    def _get_collection_by_id(
-        self, collection_id: str, collections: List[Collection]
-    ) -> Optional[Collection]:
-        """Get collection by ID from list."""
-        for collection in collections:
-            if collection.id == collection_id:
-                return collection
-        return None
+        # Import the legacy JSON file once, if present
+        legacy_file = self.collections_dir / "collections.json"
+        if legacy_file.exists() and self.store.count() == 0:
+            self.store.import_json(legacy_file)
 
     def create_default_collections(self, owner_id: str) -> List[Collection]:
         """
@@ -79,7 +56,6 @@ class CollectionService:
         Returns:
           List of created collections
         """
-        collections = self._load_collections()
         created = []
 
         now = datetime.utcnow().isoformat()
@@ -95,10 +71,9 @@ class CollectionService:
                 updated_at=now,
                 is_default=True,
             )
-            collections.append(collection)
+            self.store.insert(collection)
             created.append(collection)
 
-        self._save_collections(collections)
         return created
 
     def create_collection(
@@ -128,12 +103,9 @@ class CollectionService:
         if not name or not name.strip():
             raise ValueError("Collection name cannot be empty")
 
-        collections = self._load_collections()
-
         # Check for duplicate name for same owner
-        for collection in collections:
-            if collection.owner_id == owner_id and collection.name == name:
-                raise ValueError(f"Collection '{name}' already exists")
+        if self.store.name_exists(owner_id, name):
+            raise ValueError(f"Collection '{name}' already exists")
 
         now = datetime.utcnow().isoformat()
 
@@ -148,8 +120,7 @@ class CollectionService:
             tags=tags or [],
         )
 
-        collections.append(collection)
-        self._save_collections(collections)
+        self.store.insert(collection)
 
         return collection
 
@@ -166,8 +137,7 @@ class CollectionService:
         Returns:
           Collection or None if not found/no permission
         """
-        collections = self._load_collections()
-        collection = self._get_collection_by_id(collection_id, collections)
+        collection = self.store.get(collection_id)
 
         if not collection:
             return None
@@ -190,8 +160,7 @@ class CollectionService:
         Returns:
           List of collections
         """
-        collections = self._load_collections()
-        return [c for c in collections if c.owner_id == user_id]
+        return self.store.list_by_owner(user_id)
 
     def get_public_collections(
         self, limit: int = 50, offset: int = 0
@@ -206,13 +175,8 @@ class CollectionService:
         Returns:
           List of public collections
         """
-        collections = self._load_collections()
-        public = [c for c in collections if c.visibility == CollectionVisibility.PUBLIC]
-
-        # Sort by recipe count (descending) then by updated_at
-        public.sort(key=lambda c: (len(c.recipes), c.updated_at), reverse=True)
-
-        return public[offset : offset + limit]
+        # Sorted by recipe count (descending) then by updated_at
+        return self.store.list_public(limit=limit, offset=offset)
 
     def update_collection(
         self,
@@ -240,17 +204,15 @@ class CollectionService:
         Raises:
           ValueError: If name is empty or already exists
         """
-        collections = self._load_collections()
-        collection = self._get_collection_by_id(collection_id, collections)
+        collection = self.store.get(collection_id)
 
         if not collection or collection.owner_id != user_id:
             return None
 
         # Check for duplicate name
         if name and name != collection.name:
-            for c in collections:
-                if c.owner_id == user_id and c.name == name and c.id != collection_id:
-                    raise ValueError(f"Collection '{name}' already exists")
+            if self.store.name_exists(user_id, name, exclude_id=collection_id):
+                raise ValueError(f"Collection '{name}' already exists")
 
         # Update fields
         if name:
@@ -264,7 +226,7 @@ class CollectionService:
 
         collection.updated_at = datetime.utcnow().isoformat()
 
-        self._save_collections(collections)
+        self.store.update(collection)
         return collection
 
     def delete_collection(self, collection_id: str, user_id: str) -> bool:
@@ -278,15 +240,12 @@ class CollectionService:
         Returns:
           True if deleted, False if not found/no permission
         """
-        collections = self._load_collections()
-        collection = self._get_collection_by_id(collection_id, collections)
+        collection = self.store.get(collection_id)
 
         if not collection or collection.owner_id != user_id:
             return False
 
-        collections = [c for c in collections if c.id != collection_id]
-        self._save_collections(collections)
-        return True
+        return self.store.delete(collection_id)
 
     def add_recipe(
         self,
@@ -310,8 +269,7 @@ class CollectionService:
         Raises:
           ValueError: If recipe already in collection or limit exceeded
         """
-        collections = self._load_collections()
-        collection = self._get_collection_by_id(collection_id, collections)
+        collection = self.store.get(collection_id)
 
         if not collection or collection.owner_id != user_id:
             return None
@@ -334,10 +292,10 @@ class CollectionService:
             note=note,
             position=len(collection.recipes),
         )
-        collection.recipes.append(item)
         collection.updated_at = datetime.utcnow().isoformat()
+        self.store.add_item(collection_id, item, collection.updated_at)
+        collection.recipes.append(item)
 
-        self._save_collections(collections)
         return collection
 
     def remove_recipe(
@@ -354,8 +312,7 @@ class CollectionService:
         Returns:
           Updated collection or None if not found/no permission
         """
-        collections = self._load_collections()
-        collection = self._get_collection_by_id(collection_id, collections)
+        collection = self.store.get(collection_id)
 
         if not collection or collection.owner_id != user_id:
             return None
@@ -368,7 +325,7 @@ class CollectionService:
         for idx, item in enumerate(collection.recipes):
             item.position = idx
 
-        self._save_collections(collections)
+        self.store.remove_item(collection_id, recipe_id, collection.updated_at)
         return collection
 
     def copy_collection(
@@ -385,8 +342,7 @@ class CollectionService:
         Returns:
           Copied collection or None if not found/no permission
         """
-        collections = self._load_collections()
-        source = self._get_collection_by_id(collection_id, collections)
+        source = self.store.get(collection_id)
 
         if not source:
             return None
@@ -421,10 +377,24 @@ class CollectionService:
             tags=source.tags.copy(),
         )
 
-        collections.append(copied)
-        self._save_collections(collections)
+        self.store.insert(copied)
         return copied
 
+    def get_collections_with_recipe(
+        self, recipe_id: str, user_id: str
+    ) -> List[Collection]:
+        """
+        Get the user's collections that contain a recipe.
+
+        Args:
+          recipe_id: Recipe ID
+          user_id: User ID
+
+        Returns:
+          List of collections (in creation order)
+        """
+        return self.store.list_containing(recipe_id, owner_id=user_id)
+
     def get_stats(self) -> CollectionStats:
         """
         Get collection statistics.
@@ -432,27 +402,4 @@ class CollectionService:
         Returns:
           Collection statistics
         """
-        collections = self._load_collections()
-
-        total_collections = len(collections)
-        public_collections = sum(
-            1 for c in collections if c.visibility == CollectionVisibility.PUBLIC
-        )
-        private_collections = total_collections - public_collections
-        total_recipes = sum(len(c.recipes) for c in collections)
-
-        # Find most popular public collection
-        public_colls = [
-            c for c in collections if c.visibility == CollectionVisibility.PUBLIC
-        ]
-        most_popular = None
-        if public_colls:
-            most_popular = max(public_colls, key=lambda c: len(c.recipes)).id
-
-        return CollectionStats(
-            total_collections=total_collections,
-            public_collections=public_collections,
-            private_collections=private_collections,
-            total_recipes=total_recipes,
-            most_popular_collection_id=most_popular,
-        )
+        return self.store.stats()
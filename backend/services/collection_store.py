@@ -0,0 +1,396 @@
+"""
+Collection storage for Personal Recipe Intelligence.
+
+Collections are kept in SQLite and read/written as the dataclasses from
+models/collection.py. Collections are indexed by ID and by owner, and the
+membership table doubles as a recipe_id -> collection_ids reverse index, so
+"which of my collections contain this recipe" and public-collection browsing
+are index lookups instead of full-file scans. Each collection row carries its
+recipe count, updated in the same transaction as the membership change.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from backend.models.collection import (
+    Collection,
+    CollectionItem,
+    CollectionStats,
+    CollectionVisibility,
+)
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of IDs bound into one IN clause (below SQLite's variable limit)
+_MAX_IN_PARAMS = 500
+
+_COLLECTION_COLUMNS = (
+    "id, name, description, owner_id, visibility, created_at, updated_at, "
+    "is_default, tags, thumbnail_url"
+)
+
+
+class CollectionStore:
+    """SQLite-backed collection storage with owner and recipe indexes."""
+
+    def __init__(self, db_path: Path):
+        """
+        Initialize collection store.
+
+        Args:
+          db_path: Database file path
+        """
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS collections (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id TEXT NOT NULL UNIQUE,
+                    name TEXT NOT NULL,
+                    description TEXT,
+                    owner_id TEXT NOT NULL,
+                    visibility TEXT NOT NULL,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    is_default INTEGER NOT NULL DEFAULT 0,
+                    tags TEXT NOT NULL DEFAULT '[]',
+                    thumbnail_url TEXT,
+                    recipe_count INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS idx_collections_owner
+                    ON collections(owner_id, name);
+                CREATE INDEX IF NOT EXISTS idx_collections_visibility
+                    ON collections(visibility, recipe_count, updated_at);
+                CREATE TABLE IF NOT EXISTS collection_recipes (
+                    collection_id TEXT NOT NULL,
+                    recipe_id TEXT NOT NULL,
+                    added_at TEXT NOT NULL,
+                    note TEXT,
+                    position INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (collection_id, recipe_id)
+                );
+                CREATE INDEX IF NOT EXISTS idx_collection_recipes_recipe
+                    ON collection_recipes(recipe_id, collection_id);
+                """
+            )
+
+    # === Conversion ===
+
+    @staticmethod
+    def _to_row(collection: Collection) -> tuple:
+        return (
+            collection.id,
+            collection.name,
+            collection.description,
+            collection.owner_id,
+            collection.visibility.value,
+            collection.created_at,
+            collection.updated_at,
+            int(collection.is_default),
+            json.dumps(collection.tags, ensure_ascii=False),
+            collection.thumbnail_url,
+        )
+
+    @staticmethod
+    def _from_row(row: tuple, items: List[CollectionItem]) -> Collection:
+        (
+            collection_id,
+            name,
+            description,
+            owner_id,
+            visibility,
+            created_at,
+            updated_at,
+            is_default,
+            tags,
+            thumbnail_url,
+        ) = row
+        return Collection(
+            id=collection_id,
+            name=name,
+            description=description,
+            owner_id=owner_id,
+            visibility=CollectionVisibility(visibility),
+            created_at=created_at,
+            updated_at=updated_at,
+            is_default=bool(is_default),
+            recipes=items,
+            tags=json.loads(tags),
+            thumbnail_url=thumbnail_url,
+        )
+
+    def _load_items(self, collection_ids: List[str]) -> Dict[str, List[CollectionItem]]:
+        """Load recipe items for collections, ordered by position."""
+        items: Dict[str, List[CollectionItem]] = {cid: [] for cid in collection_ids}
+        for start in range(0, len(collection_ids), _MAX_IN_PARAMS):
+            chunk = collection_ids[start : start + _MAX_IN_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self._conn.execute(
+                "SELECT collection_id, recipe_id, added_at, note, position "
+                f"FROM collection_recipes WHERE collection_id IN ({placeholders}) "
+                "ORDER BY collection_id, position, rowid",
+                chunk,
+            ).fetchall()
+            for collection_id, recipe_id, added_at, note, position in rows:
+                items[collection_id].append(
+                    CollectionItem(
+                        recipe_id=recipe_id,
+                        added_at=added_at,
+                        note=note,
+                        position=position,
+                    )
+                )
+        return items
+
+    def _select(
+        self, where: str, params: tuple = (), tail: str = ""
+    ) -> List[Collection]:
+        """Select collections with their recipe items (caller holds the lock)."""
+        rows = self._conn.execute(
+            f"SELECT {_COLLECTION_COLUMNS} FROM collections WHERE {where} {tail}",
+            params,
+        ).fetchall()
+        items = self._load_items([row[0] for row in rows])
+        return [self._from_row(row, items[row[0]]) for row in rows]
+
+    def _insert_items(self, collection_id: str, items: List[CollectionItem]) -> None:
+        self._conn.executemany(
+            "INSERT INTO collection_recipes "
+            "(collection_id, recipe_id, added_at, note, position) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [
+                (collection_id, item.recipe_id, item.added_at, item.note, item.position)
+                for item in items
+            ],
+        )
+
+    # === Write ===
+
+    def insert(self, collection: Collection) -> None:
+        """
+        Insert a collection together with its recipe items.
+
+        Raises:
+          ValueError: If the collection ID already exists or an item is duplicated
+        """
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute(
+                        f"INSERT INTO collections ({_COLLECTION_COLUMNS}, recipe_count) "
+                        f"VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        self._to_row(collection) + (len(collection.recipes),),
+                    )
+                    self._insert_items(collection.id, collection.recipes)
+            except sqlite3.IntegrityError:
+                raise ValueError(f"Collection '{collection.id}' already exists")
+
+    def update(self, collection: Collection) -> None:
+        """Overwrite collection fields (recipe items are left untouched)."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE collections SET name = ?, description = ?, visibility = ?, "
+                "updated_at = ?, tags = ?, thumbnail_url = ? WHERE id = ?",
+                (
+                    collection.name,
+                    collection.description,
+                    collection.visibility.value,
+                    collection.updated_at,
+                    json.dumps(collection.tags, ensure_ascii=False),
+                    collection.thumbnail_url,
+                    collection.id,
+                ),
+            )
+
+    def delete(self, collection_id: str) -> bool:
+        """
+        Delete a collection and its recipe items.
+
+        Returns:
+          True if deleted
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM collections WHERE id = ?", (collection_id,)
+            )
+            self._conn.execute(
+                "DELETE FROM collection_recipes WHERE collection_id = ?",
+                (collection_id,),
+            )
+        return cursor.rowcount > 0
+
+    def add_item(
+        self, collection_id: str, item: CollectionItem, updated_at: str
+    ) -> None:
+        """
+        Add a recipe item to a collection.
+
+        Raises:
+          ValueError: If the recipe is already in the collection
+        """
+        with self._lock:
+            try:
+                with self._conn:
+                    self._insert_items(collection_id, [item])
+                    self._conn.execute(
+                        "UPDATE collections SET recipe_count = recipe_count + 1, "
+                        "updated_at = ? WHERE id = ?",
+                        (updated_at, collection_id),
+                    )
+            except sqlite3.IntegrityError:
+                raise ValueError("Recipe already in collection")
+
+    def remove_item(self, collection_id: str, recipe_id: str, updated_at: str) -> None:
+        """Remove a recipe item and close the gap in positions."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT position FROM collection_recipes "
+                "WHERE collection_id = ? AND recipe_id = ?",
+                (collection_id, recipe_id),
+            ).fetchone()
+            if row is not None:
+                self._conn.execute(
+                    "DELETE FROM collection_recipes "
+                    "WHERE collection_id = ? AND recipe_id = ?",
+                    (collection_id, recipe_id),
+                )
+                self._conn.execute(
+                    "UPDATE collection_recipes SET position = position - 1 "
+                    "WHERE collection_id = ? AND position > ?",
+                    (collection_id, row[0]),
+                )
+            self._conn.execute(
+                "UPDATE collections SET recipe_count = recipe_count - ?, "
+                "updated_at = ? WHERE id = ?",
+                (1 if row is not None else 0, updated_at, collection_id),
+            )
+
+    # === Read ===
+
+    def get(self, collection_id: str) -> Optional[Collection]:
+        """Get collection by ID."""
+        with self._lock:
+            found = self._select("id = ?", (collection_id,))
+        return found[0] if found else None
+
+    def list_by_owner(self, owner_id: str) -> List[Collection]:
+        """Get an owner's collections in creation order."""
+        with self._lock:
+            return self._select("owner_id = ?", (owner_id,), "ORDER BY seq")
+
+    def name_exists(
+        self, owner_id: str, name: str, exclude_id: Optional[str] = None
+    ) -> bool:
+        """Whether the owner already has a collection with this name."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM collections WHERE owner_id = ? AND name = ? "
+                "AND id IS NOT ? LIMIT 1",
+                (owner_id, name, exclude_id),
+            ).fetchone()
+        return row is not None
+
+    def list_public(self, limit: int = 50, offset: int = 0) -> List[Collection]:
+        """
+        Get public collections, most recipes first, then most recently updated.
+
+        Args:
+          limit: Maximum number of collections
+          offset: Offset for pagination
+        """
+        with self._lock:
+            return self._select(
+                "visibility = ?",
+                (CollectionVisibility.PUBLIC.value, limit, offset),
+                "ORDER BY recipe_count DESC, updated_at DESC, seq LIMIT ? OFFSET ?",
+            )
+
+    def list_containing(
+        self, recipe_id: str, owner_id: Optional[str] = None
+    ) -> List[Collection]:
+        """
+        Get collections containing a recipe, in creation order.
+
+        Args:
+          recipe_id: Recipe ID
+          owner_id: Restrict to this owner's collections
+        """
+        where = (
+            "id IN (SELECT collection_id FROM collection_recipes WHERE recipe_id = ?)"
+        )
+        params: tuple = (recipe_id,)
+        if owner_id is not None:
+            where += " AND owner_id = ?"
+            params += (owner_id,)
+        with self._lock:
+            return self._select(where, params, "ORDER BY seq")
+
+    def count(self) -> int:
+        """Total number of collections."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM collections").fetchone()[0]
+
+    def stats(self) -> CollectionStats:
+        """Collection statistics computed from the collection rows."""
+        public = CollectionVisibility.PUBLIC.value
+        with self._lock:
+            total, public_count, total_recipes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(visibility = ?), 0), "
+                "COALESCE(SUM(recipe_count), 0) FROM collections",
+                (public,),
+            ).fetchone()
+            popular = self._conn.execute(
+                "SELECT id FROM collections WHERE visibility = ? "
+                "ORDER BY recipe_count DESC, seq LIMIT 1",
+                (public,),
+            ).fetchone()
+        return CollectionStats(
+            total_collections=total,
+            public_collections=public_count,
+            private_collections=total - public_count,
+            total_recipes=total_recipes,
+            most_popular_collection_id=popular[0] if popular else None,
+        )
+
+    # === Migration ===
+
+    def import_json(self, json_path: Path) -> int:
+        """
+        Import the legacy collections JSON file (a list of collection dicts).
+
+        The file is renamed with a ``.migrated`` suffix afterwards.
+
+        Returns:
+          Number of imported collections
+        """
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                collections = [Collection.from_dict(item) for item in json.load(f)]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Failed to read legacy collection file {json_path}: {e}")
+            return 0
+
+        imported = 0
+        for collection in collections:
+            try:
+                self.insert(collection)
+                imported += 1
+            except ValueError:
+                logger.warning(f"Skipped duplicate collection {collection.id}")
+        json_path.rename(json_path.with_name(json_path.name + ".migrated"))
+        logger.info(f"Imported {imported} collections from {json_path}")
+        return imported
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
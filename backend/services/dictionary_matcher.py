@@ -0,0 +1,201 @@
+"""
+辞書照合（Aho–Corasick オートマトン）
+
+辞書の全単語から一度だけオートマトンを構築し、テキストを1回走査するだけで
+全ての辞書語の出現位置とラベル（食材・調理法などの分類）を取得する。
+照合コストはテキスト長と出現数にのみ比例し、辞書の大きさには依存しない。
+重なり合う出現は「左端優先・最長一致」で1つに絞る。
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class DictionaryMatch:
+    """辞書語の出現"""
+
+    word: str
+    start: int
+    end: int
+    labels: Tuple[str, ...]
+
+
+class DictionaryMatcher:
+    """Aho–Corasick 法による複数パターン照合"""
+
+    def __init__(self, entries: Optional[Dict[str, Iterable[str]]] = None):
+        """
+        初期化
+
+        Args:
+          entries: ラベル → 単語リスト（指定した場合はそのまま構築する）
+        """
+        # ノードごとの遷移・失敗リンク・出力
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._word: List[Optional[str]] = [None]
+        self._labels: List[Tuple[str, ...]] = [()]
+        # 失敗リンクをたどった先で最初に単語が終わるノード
+        self._output_link: List[int] = [0]
+        self._built = True
+
+        if entries:
+            for label, words in entries.items():
+                for word in words:
+                    self.add(word, label)
+            self.build()
+
+    def __len__(self) -> int:
+        return sum(1 for word in self._word if word is not None)
+
+    def add(self, word: str, label: str) -> None:
+        """
+        単語を登録（同じ単語を複数ラベルで登録できる）
+
+        Args:
+          word: 単語
+          label: 分類ラベル
+        """
+        if not word:
+            return
+
+        node = 0
+        for char in word:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._word.append(None)
+                self._labels.append(())
+                self._output_link.append(0)
+            node = next_node
+
+        self._word[node] = word
+        if label not in self._labels[node]:
+            self._labels[node] = self._labels[node] + (label,)
+        self._built = False
+
+    def build(self) -> None:
+        """失敗リンクを幅優先で計算"""
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            self._output_link[child] = 0
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+
+                suffix = self._fail[child]
+                self._output_link[child] = (
+                    suffix
+                    if self._word[suffix] is not None
+                    else self._output_link[suffix]
+                )
+                queue.append(child)
+
+        self._built = True
+
+    def find_all(self, text: str) -> List[DictionaryMatch]:
+        """
+        重なりを含む全ての出現を取得
+
+        Args:
+          text: 照合するテキスト
+
+        Returns:
+          出現のリスト（終了位置順）
+        """
+        if not self._built:
+            self.build()
+
+        matches = []
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+
+            hit = node if self._word[node] is not None else self._output_link[node]
+            while hit:
+                word = self._word[hit]
+                end = position + 1
+                matches.append(
+                    DictionaryMatch(word, end - len(word), end, self._labels[hit])
+                )
+                hit = self._output_link[hit]
+
+        return matches
+
+    def find(self, text: str) -> List[DictionaryMatch]:
+        """
+        重ならない出現を左端優先・最長一致で取得
+
+        Args:
+          text: 照合するテキスト
+
+        Returns:
+          出現のリスト（開始位置順）
+        """
+        longest: Dict[int, DictionaryMatch] = {}
+        for match in self.find_all(text):
+            current = longest.get(match.start)
+            if current is None or match.end > current.end:
+                longest[match.start] = match
+
+        selected = []
+        last_end = 0
+        for start in sorted(longest):
+            if start >= last_end:
+                selected.append(longest[start])
+                last_end = longest[start].end
+        return selected
+
+    def labelled(self, text: str) -> Dict[str, List[str]]:
+        """
+        ラベルごとに出現した単語を取得
+
+        Args:
+          text: 照合するテキスト
+
+        Returns:
+          ラベル → 単語リスト（出現順・重複なし）
+        """
+        found: Dict[str, List[str]] = {}
+        for match in self.find(text):
+            for label in match.labels:
+                words = found.setdefault(label, [])
+                if match.word not in words:
+                    words.append(match.word)
+        return found
+
+    def replace(self, text: str, replacements: Dict[str, str]) -> str:
+        """
+        出現した単語を置き換え（1回の走査で、置換結果は再照合しない）
+
+        Args:
+          text: テキスト
+          replacements: 単語 → 置換後の文字列
+
+        Returns:
+          置換後のテキスト
+        """
+        parts = []
+        last_end = 0
+        for match in self.find(text):
+            if match.word not in replacements:
+                continue
+            parts.append(text[last_end : match.start])
+            parts.append(replacements[match.word])
+            last_end = match.end
+        parts.append(text[last_end:])
+        return "".join(parts)
@@ -0,0 +1,151 @@
+"""
+支出台帳（日付順の列指向インデックス）
+
+支出記録を日付（YYYY-MM-DD）順に並べ、金額の累積和を合計・カテゴリごとの
+列（array）として保持する。期間の合計やカテゴリ別内訳は、二分探索で
+期間の両端の位置を求めて累積和の差を取るだけで計算できるため、
+台帳が何年分に増えても集計のコストはほぼ変わらない。
+"""
+
+import bisect
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+# 累積和の差で生じる浮動小数点の誤差を丸める桁数
+_ROUND_DIGITS = 6
+
+
+def day_of(date: str) -> str:
+    """ISO8601 の日時から日付部分（YYYY-MM-DD）を取り出す"""
+    return date.split("T")[0]
+
+
+def _category_key(category: Any) -> str:
+    return getattr(category, "value", category)
+
+
+class ExpenseLedger:
+    """日付順に並べた支出記録と金額の累積和"""
+
+    def __init__(self, records: Optional[List[Any]] = None):
+        """
+        初期化
+
+        Args:
+            records: 支出記録（date, amount, category を持つオブジェクト）
+        """
+        self._days: List[str] = []
+        self._records: List[Any] = []
+        # None → 全カテゴリの累積和、カテゴリ名 → そのカテゴリの累積和
+        # column[i] は先頭 i 件の合計（長さは件数 + 1）
+        self._cumulative: Dict[Optional[str], array] = {None: array("d", [0.0])}
+
+        if records:
+            ordered = sorted(records, key=lambda record: day_of(record.date))
+            self._days = [day_of(record.date) for record in ordered]
+            self._records = ordered
+            for record in ordered:
+                self._column(_category_key(record.category))
+            self._rebuild_from(0)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _column(self, key: str) -> array:
+        """カテゴリの累積和の列を取得（なければ 0 で作る）"""
+        column = self._cumulative.get(key)
+        if column is None:
+            size = len(self._cumulative[None])
+            column = self._cumulative[key] = array("d", [0.0]) * size
+        return column
+
+    def _rebuild_from(self, position: int) -> None:
+        """position 番目以降の累積和を計算し直す"""
+        size = len(self._records) + 1
+        for key, column in self._cumulative.items():
+            if len(column) < size:
+                column.extend([0.0] * (size - len(column)))
+            for index in range(position, size - 1):
+                record = self._records[index]
+                amount = (
+                    record.amount
+                    if key is None or _category_key(record.category) == key
+                    else 0.0
+                )
+                column[index + 1] = column[index] + amount
+
+    def add(self, record: Any) -> None:
+        """
+        支出記録を追加
+
+        同じ日付の記録の後ろに挿入する。日付順に追加される通常の場合は
+        累積和の末尾を伸ばすだけで済む。
+        """
+        day = day_of(record.date)
+        position = bisect.bisect_right(self._days, day)
+        self._column(_category_key(record.category))
+        self._days.insert(position, day)
+        self._records.insert(position, record)
+        self._rebuild_from(position)
+
+    def _bounds(
+        self, start_date: Optional[str], end_date: Optional[str]
+    ) -> Tuple[int, int]:
+        """期間（両端を含む）に入る記録の位置の範囲"""
+        low = bisect.bisect_left(self._days, day_of(start_date)) if start_date else 0
+        high = (
+            bisect.bisect_right(self._days, day_of(end_date))
+            if end_date
+            else len(self._days)
+        )
+        return low, max(low, high)
+
+    def records(
+        self, start_date: Optional[str] = None, end_date: Optional[str] = None
+    ) -> List[Any]:
+        """
+        期間内の支出記録を日付の古い順に取得
+
+        Args:
+            start_date: 開始日（ISO8601形式、この日を含む）
+            end_date: 終了日（ISO8601形式、この日を含む）
+        """
+        low, high = self._bounds(start_date, end_date)
+        return self._records[low:high]
+
+    def total(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        category: Optional[Any] = None,
+    ) -> float:
+        """
+        期間内の支出合計
+
+        Args:
+            start_date: 開始日（ISO8601形式、この日を含む）
+            end_date: 終了日（ISO8601形式、この日を含む）
+            category: 指定した場合はそのカテゴリのみ
+        """
+        key = None if category is None else _category_key(category)
+        column = self._cumulative.get(key)
+        if column is None:
+            return 0.0
+        low, high = self._bounds(start_date, end_date)
+        return round(column[high] - column[low], _ROUND_DIGITS)
+
+    def category_totals(
+        self, start_date: Optional[str] = None, end_date: Optional[str] = None
+    ) -> Dict[str, float]:
+        """
+        期間内のカテゴリ別支出合計
+
+        Returns:
+            カテゴリ名 → 合計（期間外も含め記録のあるカテゴリのみ）
+        """
+        low, high = self._bounds(start_date, end_date)
+        return {
+            key: round(column[high] - column[low], _ROUND_DIGITS)
+            for key, column in self._cumulative.items()
+            if key is not None
+        }
@@ -2,15 +2,20 @@
 費用管理サービス
 
 食費の記録・集計・分析を行う。
+支出記録は起動時に一度だけ読み込んで日付順の台帳（expense_ledger）に索引し、
+期間の合計・カテゴリ別内訳は台帳の累積和から求める。
 """
 
 import json
+import threading
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 from pathlib import Path
 
+from backend.services.expense_ledger import ExpenseLedger
+
 
 class ExpenseCategory(str, Enum):
     """支出カテゴリ"""
@@ -95,7 +100,30 @@ class ExpenseService:
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.expenses_file = self.data_dir / "expenses.json"
         self.budgets_file = self.data_dir / "budgets.json"
+        self._lock = threading.Lock()
+        self._expenses: List[ExpenseRecord] = []
+        self.ledger = ExpenseLedger()
+        self._file_signature: Optional[Tuple[int, int]] = None
         self._ensure_data_files()
+        self._refresh()
+
+    def _stat_expenses_file(self) -> Optional[Tuple[int, int]]:
+        """支出記録ファイルの (更新時刻, サイズ)。ファイルがなければ None"""
+        try:
+            stat = self.expenses_file.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _refresh(self) -> None:
+        """支出記録ファイルが外部で変更されていれば読み込み直して台帳を作り直す"""
+        with self._lock:
+            signature = self._stat_expenses_file()
+            if signature == self._file_signature:
+                return
+            self._expenses = self._load_expenses()
+            self.ledger = ExpenseLedger(self._expenses)
+            self._file_signature = signature
 
     def _ensure_data_files(self) -> None:
         """データファイルの存在を確認"""
@@ -132,6 +160,7 @@ class ExpenseService:
                 json.dump(
                     [exp.to_dict() for exp in expenses], f, ensure_ascii=False, indent=2
                 )
+            self._file_signature = self._stat_expenses_file()
         except Exception as e:
             print(f"Error saving expenses: {e}")
             raise
@@ -181,7 +210,7 @@ class ExpenseService:
         Returns:
             作成された支出記録
         """
-        expenses = self._load_expenses()
+        self._refresh()
         expense_id = f"exp_{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
 
         expense = ExpenseRecord(
@@ -194,8 +223,10 @@ class ExpenseService:
             created_at=datetime.now().isoformat(),
         )
 
-        expenses.append(expense)
-        self._save_expenses(expenses)
+        with self._lock:
+            self._expenses.append(expense)
+            self.ledger.add(expense)
+            self._save_expenses(self._expenses)
 
         return expense
 
@@ -216,15 +247,10 @@ class ExpenseService:
         Returns:
             支出記録のリスト
         """
-        expenses = self._load_expenses()
-
-        # フィルタリング（日付部分のみで比較）
-        if start_date:
-            start_date_only = start_date.split("T")[0]
-            expenses = [e for e in expenses if e.date.split("T")[0] >= start_date_only]
-        if end_date:
-            end_date_only = end_date.split("T")[0]
-            expenses = [e for e in expenses if e.date.split("T")[0] <= end_date_only]
+        self._refresh()
+
+        # 台帳から期間内の記録を取得（日付部分のみで比較）
+        expenses = self.ledger.records(start_date, end_date)
         if category:
             expenses = [e for e in expenses if e.category == category]
 
@@ -315,22 +341,13 @@ class ExpenseService:
             end_date = next_month.replace(day=1) - timedelta(days=1)
             period_str = start_date.strftime("%Y-%m")
 
-        # 支出を取得
-        expenses = self.get_expenses(
-            start_date=start_date.isoformat(), end_date=end_date.isoformat()
+        # 合計金額・カテゴリ別内訳
+        self._refresh()
+        total_spent = self.ledger.total(start_date.isoformat(), end_date.isoformat())
+        category_breakdown = self._category_totals(
+            start_date.isoformat(), end_date.isoformat()
         )
 
-        # 合計金額
-        total_spent = sum(e.amount for e in expenses)
-
-        # カテゴリ別内訳
-        category_breakdown = {}
-        for category in ExpenseCategory:
-            category_expenses = [e for e in expenses if e.category == category]
-            category_breakdown[category.value] = sum(
-                e.amount for e in category_expenses
-            )
-
         # 予算残額（月次のみ）
         budget_remaining = None
         if period == "month":
@@ -369,16 +386,25 @@ class ExpenseService:
         next_month = start_date.replace(day=28) + timedelta(days=4)
         end_date = next_month.replace(day=1) - timedelta(days=1)
 
-        expenses = self.get_expenses(
-            start_date=start_date.isoformat(), end_date=end_date.isoformat()
-        )
+        self._refresh()
+        return self._category_totals(start_date.isoformat(), end_date.isoformat())
 
-        breakdown = {}
-        for category in ExpenseCategory:
-            category_expenses = [e for e in expenses if e.category == category]
-            breakdown[category.value] = sum(e.amount for e in category_expenses)
+    def _category_totals(self, start_date: str, end_date: str) -> Dict[str, float]:
+        """
+        期間内のカテゴリ別支出額（全カテゴリを含む）
 
-        return breakdown
+        Args:
+            start_date: 開始日（ISO8601形式）
+            end_date: 終了日（ISO8601形式）
+
+        Returns:
+            カテゴリ別支出額
+        """
+        totals = self.ledger.category_totals(start_date, end_date)
+        return {
+            category.value: totals.get(category.value, 0.0)
+            for category in ExpenseCategory
+        }
 
     def get_trends(self, months: int = 6) -> Dict[str, List[Dict]]:
         """
@@ -393,6 +419,7 @@ class ExpenseService:
         trends = {"monthly_totals": [], "category_trends": {}}
 
         today = datetime.now()
+        self._refresh()
 
         for i in range(months):
             # 対象月を計算
@@ -404,18 +431,16 @@ class ExpenseService:
             next_month = start_date.replace(day=28) + timedelta(days=4)
             end_date = next_month.replace(day=1) - timedelta(days=1)
 
-            # 支出を取得
-            expenses = self.get_expenses(
-                start_date=start_date.isoformat(), end_date=end_date.isoformat()
-            )
-
-            total = sum(e.amount for e in expenses)
+            # 支出を集計
+            total = self.ledger.total(start_date.isoformat(), end_date.isoformat())
             trends["monthly_totals"].insert(0, {"month": month_str, "total": total})
 
             # カテゴリ別
+            category_totals = self._category_totals(
+                start_date.isoformat(), end_date.isoformat()
+            )
             for category in ExpenseCategory:
-                category_expenses = [e for e in expenses if e.category == category]
-                category_total = sum(e.amount for e in category_expenses)
+                category_total = category_totals[category.value]
 
                 if category.value not in trends["category_trends"]:
                     trends["category_trends"][category.value] = []
@@ -448,16 +473,11 @@ class ExpenseService:
             prev_end = current_start - timedelta(days=1)
             prev_start = prev_end.replace(day=1)
 
-            # 直接支出を取得して集計（get_summaryを呼ばない）
-            current_expenses = self.get_expenses(
-                start_date=current_start.isoformat(), end_date=current_end.isoformat()
+            # 台帳から直接集計（get_summaryを呼ばない）
+            current_total = self.ledger.total(
+                current_start.isoformat(), current_end.isoformat()
             )
-            prev_expenses = self.get_expenses(
-                start_date=prev_start.isoformat(), end_date=prev_end.isoformat()
-            )
-
-            current_total = sum(e.amount for e in current_expenses)
-            prev_total = sum(e.amount for e in prev_expenses)
+            prev_total = self.ledger.total(prev_start.isoformat(), prev_end.isoformat())
 
             if prev_total == 0:
                 return "stable"
@@ -1,12 +1,17 @@
 """
 Follow Service - ユーザーフォロー関連の処理
+
+フォロー関係・ユーザー・レシピはディレクトリごとに共有される
+SocialGraph の索引から参照する。
 """
 
-import json
+import heapq
 from datetime import datetime
 from typing import Dict, List, Optional
 from pathlib import Path
 
+from backend.services.social_graph import get_social_graph
+
 
 class FollowService:
     """フォロー管理サービス"""
@@ -22,6 +27,8 @@ class FollowService:
         self.follow_file = self.data_dir / "follows.json"
         self.users_file = self.data_dir / "users.json"
         self.recipes_file = self.data_dir / "recipes.json"
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.graph = get_social_graph(self.data_dir)
         self._ensure_data_files()
 
     def _ensure_data_files(self) -> None:
@@ -39,38 +46,31 @@ class FollowService:
 
     def _load_follows(self) -> List[Dict]:
         """フォロー関係データを読み込む"""
-        with open(self.follow_file, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return self.graph.follows()
 
     def _save_follows(self, follows: List[Dict]) -> None:
         """フォロー関係データを保存"""
-        with open(self.follow_file, "w", encoding="utf-8") as f:
-            json.dump(follows, f, ensure_ascii=False, indent=2)
+        self.graph.replace_follows(follows)
 
     def _load_users(self) -> List[Dict]:
         """ユーザーデータを読み込む"""
-        with open(self.users_file, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return self.graph.users()
 
     def _save_users(self, users: List[Dict]) -> None:
         """ユーザーデータを保存"""
-        with open(self.users_file, "w", encoding="utf-8") as f:
-            json.dump(users, f, ensure_ascii=False, indent=2)
+        self.graph.replace_users(users)
 
     def _load_recipes(self) -> List[Dict]:
         """レシピデータを読み込む"""
-        with open(self.recipes_file, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return self.graph.recipes()
 
     def _save_recipes(self, recipes: List[Dict]) -> None:
         """レシピデータを保存"""
-        with open(self.recipes_file, "w", encoding="utf-8") as f:
-            json.dump(recipes, f, ensure_ascii=False, indent=2)
+        self.graph.replace_recipes(recipes)
 
     def _get_user_by_id(self, user_id: str) -> Optional[Dict]:
         """ユーザーIDでユーザーを取得"""
-        users = self._load_users()
-        return next((u for u in users if u.get("id") == user_id), None)
+        return self.graph.get_user(user_id)
 
     def follow_user(self, follower_id: str, following_id: str) -> Dict:
         """
@@ -98,23 +98,7 @@ class FollowService:
         if not following:
             raise ValueError(f"フォロー対象ユーザー {following_id} が存在しません")
 
-        follows = self._load_follows()
-
-        # 既にフォロー済みかチェック
-        existing = next(
-            (
-                f
-                for f in follows
-                if f.get("follower_id") == follower_id
-                and f.get("following_id") == following_id
-            ),
-            None,
-        )
-
-        if existing:
-            return existing
-
-        # 新規フォロー関係を作成
+        # 新規フォロー関係を作成（既にフォロー済みなら既存の関係を返す）
         follow_data = {
             "id": f"{follower_id}_{following_id}_{datetime.now().timestamp()}",
             "follower_id": follower_id,
@@ -122,10 +106,7 @@ class FollowService:
             "created_at": datetime.now().isoformat(),
         }
 
-        follows.append(follow_data)
-        self._save_follows(follows)
-
-        return follow_data
+        return self.graph.add_follow(follow_data)
 
     def unfollow_user(self, follower_id: str, following_id: str) -> bool:
         """
@@ -138,24 +119,7 @@ class FollowService:
         Returns:
             成功した場合True、フォロー関係が存在しない場合False
         """
-        follows = self._load_follows()
-
-        # フォロー関係を検索
-        original_len = len(follows)
-        follows = [
-            f
-            for f in follows
-            if not (
-                f.get("follower_id") == follower_id
-                and f.get("following_id") == following_id
-            )
-        ]
-
-        if len(follows) == original_len:
-            return False
-
-        self._save_follows(follows)
-        return True
+        return self.graph.remove_follow(follower_id, following_id)
 
     def get_followers(self, user_id: str, limit: int = 100, offset: int = 0) -> Dict:
         """
@@ -169,17 +133,8 @@ class FollowService:
         Returns:
             フォロワー情報とメタデータ
         """
-        follows = self._load_follows()
-        users = self._load_users()
-
-        # このユーザーをフォローしている関係を抽出
-        follower_relations = [f for f in follows if f.get("following_id") == user_id]
-
-        # フォロワーIDリストを取得
-        follower_ids = [f.get("follower_id") for f in follower_relations]
-
         # フォロワーユーザー情報を取得
-        followers = [u for u in users if u.get("id") in follower_ids]
+        followers = self.graph.users_in_order(self.graph.follower_ids(user_id))
 
         # 相互フォロー情報を追加
         for follower in followers:
@@ -209,17 +164,8 @@ class FollowService:
         Returns:
             フォロー中ユーザー情報とメタデータ
         """
-        follows = self._load_follows()
-        users = self._load_users()
-
-        # このユーザーがフォローしている関係を抽出
-        following_relations = [f for f in follows if f.get("follower_id") == user_id]
-
-        # フォロー中ユーザーIDリストを取得
-        following_ids = [f.get("following_id") for f in following_relations]
-
         # フォロー中ユーザー情報を取得
-        following_users = [u for u in users if u.get("id") in following_ids]
+        following_users = self.graph.users_in_order(self.graph.following_ids(user_id))
 
         # 相互フォロー情報を追加
         for user in following_users:
@@ -248,12 +194,7 @@ class FollowService:
         Returns:
             フォロー中の場合True
         """
-        follows = self._load_follows()
-        return any(
-            f.get("follower_id") == follower_id
-            and f.get("following_id") == following_id
-            for f in follows
-        )
+        return self.graph.is_following(follower_id, following_id)
 
     def is_mutual_follow(self, user_id_1: str, user_id_2: str) -> bool:
         """
@@ -281,22 +222,12 @@ class FollowService:
         Returns:
             フォロー状態情報
         """
-        follows = self._load_follows()
-
-        # フォロワー数・フォロー中数を計算
-        follower_count = sum(
-            1 for f in follows if f.get("following_id") == target_user_id
-        )
-        following_count = sum(
-            1 for f in follows if f.get("follower_id") == target_user_id
-        )
-
         return {
             "is_following": self.is_following(current_user_id, target_user_id),
             "is_follower": self.is_following(target_user_id, current_user_id),
             "is_mutual": self.is_mutual_follow(current_user_id, target_user_id),
-            "follower_count": follower_count,
-            "following_count": following_count,
+            "follower_count": self.graph.follower_count(target_user_id),
+            "following_count": self.graph.following_count(target_user_id),
         }
 
     def get_follow_feed(self, user_id: str, limit: int = 20) -> List[Dict]:
@@ -310,37 +241,41 @@ class FollowService:
         Returns:
             新着レシピリスト
         """
-        follows = self._load_follows()
-        recipes = self._load_recipes()
-        users = self._load_users()
-
         # フォロー中ユーザーIDリストを取得
-        following_ids = [
-            f.get("following_id") for f in follows if f.get("follower_id") == user_id
-        ]
+        following_ids = self.graph.following_ids(user_id)
 
         if not following_ids:
             return []
 
-        # フォロー中ユーザーのレシピを抽出
-        following_recipes = [r for r in recipes if r.get("user_id") in following_ids]
-
-        # 作成日時でソート（新しい順）
-        following_recipes.sort(key=lambda x: x.get("created_at", ""), reverse=True)
+        # タイムライン（フォロワーの多いユーザーの分はレシピ列）から新しい順に取得
+        following_recipes = self.graph.feed(user_id, limit)
 
         # ユーザー情報を追加
-        user_map = {u.get("id"): u for u in users}
-        for recipe in following_recipes[:limit]:
-            user_id_recipe = recipe.get("user_id")
-            if user_id_recipe in user_map:
+        for recipe in following_recipes:
+            author = self.graph.get_user(recipe.get("user_id"))
+            if author:
                 recipe["user"] = {
-                    "id": user_map[user_id_recipe].get("id"),
-                    "username": user_map[user_id_recipe].get("username"),
-                    "display_name": user_map[user_id_recipe].get("display_name"),
-                    "avatar_url": user_map[user_id_recipe].get("avatar_url"),
+                    "id": author.get("id"),
+                    "username": author.get("username"),
+                    "display_name": author.get("display_name"),
+                    "avatar_url": author.get("avatar_url"),
                 }
 
-        return following_recipes[:limit]
+        return following_recipes
+
+    def publish_recipe(self, recipe: Dict) -> Dict:
+        """
+        レシピを公開してフォロワーのフィードに配信
+
+        Args:
+            recipe: user_id, created_at を持つレシピ（created_at は省略時に現在時刻）
+
+        Returns:
+            保存したレシピ
+        """
+        recipe = dict(recipe)
+        recipe.setdefault("created_at", datetime.now().isoformat())
+        return self.graph.add_recipe(recipe)
 
     def get_suggested_users(self, user_id: str, limit: int = 10) -> List[Dict]:
         """
@@ -353,44 +288,20 @@ class FollowService:
         Returns:
             おすすめユーザーリスト
         """
-        follows = self._load_follows()
-        users = self._load_users()
-        recipes = self._load_recipes()
-
-        # フォロー中ユーザーIDリストを取得
-        following_ids = [
-            f.get("following_id") for f in follows if f.get("follower_id") == user_id
-        ]
-
         # 自分とフォロー中ユーザーを除外
-        excluded_ids = set(following_ids + [user_id])
-
-        # フォロー中ユーザーがフォローしているユーザー（友達の友達）
-        friend_of_friends = []
-        for following_id in following_ids:
-            friend_follows = [
-                f.get("following_id")
-                for f in follows
-                if f.get("follower_id") == following_id
-                and f.get("following_id") not in excluded_ids
-            ]
-            friend_of_friends.extend(friend_follows)
+        excluded_ids = set(self.graph.following_ids(user_id) + [user_id])
 
+        # フォロー中ユーザーがフォローしているユーザー（友達の友達）を
         # 出現回数でカウント（共通の友達が多い順）
-        from collections import Counter
-
-        suggested_ids = Counter(friend_of_friends).most_common()
+        suggested_ids = self.graph.friends_of_friends(user_id).most_common(limit)
 
         # ユーザー情報を取得
         suggested_users = []
-        for suggested_id, common_count in suggested_ids[:limit]:
+        for suggested_id, common_count in suggested_ids:
             user = self._get_user_by_id(suggested_id)
             if user:
                 # レシピ数を追加
-                recipe_count = sum(
-                    1 for r in recipes if r.get("user_id") == suggested_id
-                )
-                user["recipe_count"] = recipe_count
+                user["recipe_count"] = self.graph.recipe_count(suggested_id)
                 user["common_friends"] = common_count
                 suggested_users.append(user)
 
@@ -399,21 +310,22 @@ class FollowService:
             remaining = limit - len(suggested_users)
             suggested_user_ids = {u["id"] for u in suggested_users}
 
-            # レシピ数でユーザーをソート
+            # レシピ数の多い順に上位だけを取得
             all_users = [
                 u
-                for u in users
+                for u in self._load_users()
                 if u.get("id") not in excluded_ids
                 and u.get("id") not in suggested_user_ids
             ]
 
             for user in all_users:
-                user["recipe_count"] = sum(
-                    1 for r in recipes if r.get("user_id") == user.get("id")
-                )
+                user["recipe_count"] = self.graph.recipe_count(user.get("id"))
 
-            all_users.sort(key=lambda x: x.get("recipe_count", 0), reverse=True)
-            suggested_users.extend(all_users[:remaining])
+            suggested_users.extend(
+                heapq.nlargest(
+                    remaining, all_users, key=lambda x: x.get("recipe_count", 0)
+                )
+            )
 
         return suggested_users[:limit]
 
@@ -427,8 +339,7 @@ class FollowService:
         Returns:
             フォロワー数
         """
-        follows = self._load_follows()
-        return sum(1 for f in follows if f.get("following_id") == user_id)
+        return self.graph.follower_count(user_id)
 
     def get_following_count(self, user_id: str) -> int:
         """
@@ -440,5 +351,4 @@ class FollowService:
         Returns:
             フォロー中数
         """
-        follows = self._load_follows()
-        return sum(1 for f in follows if f.get("follower_id") == user_id)
+        return self.graph.following_count(user_id)
@@ -0,0 +1,84 @@
+"""
+フォローフィードのタイムライン（書き込み時配信）
+
+ユーザーごとに、フォロー中ユーザーの新着レシピの参照を件数上限付きで保持する。
+レシピの公開時にフォロワーのタイムラインへ参照を配り（fan-out on write）、
+フィードの取得はタイムラインを新しい順に読むだけで済む。
+フォロワーの多いユーザー（heavy publisher）の分は配らず、読み込み時に
+その投稿者のレシピ列から取り出して合流させる。
+
+タイムラインは一度フィードを読んだユーザーの分だけを作り、
+まだ作っていないユーザーへは配信しない（最初の読み込みで作る）。
+"""
+
+import bisect
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+# 1ユーザーのタイムラインに保持する件数
+DEFAULT_TIMELINE_CAPACITY = 200
+
+# タイムラインの要素: (created_at, -レシピの位置)。昇順に並べ、末尾が最新
+TimelineEntry = Tuple[str, int]
+
+
+class TimelineStore:
+    """件数上限付きのユーザー別タイムライン"""
+
+    def __init__(self, capacity: int = DEFAULT_TIMELINE_CAPACITY):
+        """
+        初期化
+
+        Args:
+            capacity: 1ユーザーのタイムラインに保持する件数
+        """
+        self.capacity = capacity
+        self._timelines: Dict[str, List[TimelineEntry]] = {}
+
+    def __len__(self) -> int:
+        return len(self._timelines)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._timelines
+
+    def create(self, user_id: str, entries: Iterable[TimelineEntry]) -> None:
+        """
+        タイムラインを作成（既存のものは置き換える）
+
+        Args:
+            user_id: ユーザーID
+            entries: 要素（順不同、上限を超えた古いものは捨てる）
+        """
+        self._timelines[user_id] = sorted(set(entries))[-self.capacity :]
+
+    def push(self, user_id: str, entry: TimelineEntry) -> None:
+        """タイムラインに1件追加（タイムラインがなければ何もしない）"""
+        timeline = self._timelines.get(user_id)
+        if timeline is None:
+            return
+        bisect.insort(timeline, entry)
+        if len(timeline) > self.capacity:
+            del timeline[0]
+
+    def merge(self, user_id: str, entries: Iterable[TimelineEntry]) -> None:
+        """複数件を重複なしで追加（タイムラインがなければ何もしない）"""
+        timeline = self._timelines.get(user_id)
+        if timeline is None:
+            return
+        self._timelines[user_id] = sorted(set(timeline).union(entries))[
+            -self.capacity :
+        ]
+
+    def discard(self, user_id: str, predicate: Callable[[TimelineEntry], bool]) -> None:
+        """条件に合う要素を取り除く"""
+        timeline = self._timelines.get(user_id)
+        if timeline is None:
+            return
+        self._timelines[user_id] = [e for e in timeline if not predicate(e)]
+
+    def latest(self, user_id: str) -> Iterator[TimelineEntry]:
+        """タイムラインを新しい順に返す"""
+        return reversed(self._timelines.get(user_id, []))
+
+    def clear(self) -> None:
+        """全タイムラインを破棄"""
+        self._timelines.clear()
@@ -6,19 +6,171 @@
 """
 
 import base64
-import hashlib
 import io
 import json
 import logging
-from datetime import datetime
+import sqlite3
+import threading
+import time
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from PIL import Image
 
 logger = logging.getLogger(__name__)
 
 
+class RecognitionCache:
+    """
+    認識結果キャッシュ（SQLite）
+
+    知覚ハッシュ（dHash 64bit）を16bitずつ4バンドに分けて索引化し、
+    ハミング距離が閾値以下の画像（再圧縮・リサイズ等のほぼ同一画像）も
+    キャッシュヒットとして扱う。
+    """
+
+    BANDS = 4
+    BAND_BITS = 16
+
+    def __init__(self, db_path: Path, ttl: int = 86400, max_distance: int = 3):
+        """
+        初期化
+
+        Args:
+          db_path: データベースファイルパス
+          ttl: 有効期限（秒）
+          max_distance: 同一画像とみなすハミング距離の上限（バンド数未満）
+        """
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_distance = min(max_distance, self.BANDS - 1)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS recognition_cache (
+                cache_key TEXT PRIMARY KEY,
+                color INTEGER NOT NULL,
+                band0 INTEGER NOT NULL,
+                band1 INTEGER NOT NULL,
+                band2 INTEGER NOT NULL,
+                band3 INTEGER NOT NULL,
+                results TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        for band in range(self.BANDS):
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_recognition_band{band} "
+                f"ON recognition_cache(band{band}, color)"
+            )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_recognition_created "
+            "ON recognition_cache(created_at)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def split_key(cache_key: str) -> Tuple[int, int]:
+        """キャッシュキーを (dhash, color) に分解"""
+        return int(cache_key[:16], 16), int(cache_key[16:], 16)
+
+    def _bands(self, dhash: int) -> List[int]:
+        """ハッシュをバンドに分割"""
+        mask = (1 << self.BAND_BITS) - 1
+        return [(dhash >> (self.BAND_BITS * i)) & mask for i in range(self.BANDS)]
+
+    def get(self, cache_key: str) -> Optional[List[Dict]]:
+        """
+        キャッシュ取得（完全一致、なければ近傍一致）
+
+        Args:
+          cache_key: キャッシュキー
+
+        Returns:
+          キャッシュされた結果（存在しない場合はNone）
+        """
+        dhash, color = self.split_key(cache_key)
+        cutoff = time.time() - self.ttl
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results FROM recognition_cache "
+                "WHERE cache_key = ? AND created_at >= ?",
+                (cache_key, cutoff),
+            ).fetchone()
+            if row:
+                return json.loads(row[0])
+
+            if self.max_distance <= 0:
+                return None
+
+            # いずれかのバンドが一致する候補のみ検査（鳩の巣原理）
+            bands = self._bands(dhash)
+            clauses = " OR ".join(
+                f"(band{i} = ? AND color = ?)" for i in range(self.BANDS)
+            )
+            params: List = []
+            for band in bands:
+                params.extend([band, color])
+            candidates = self._conn.execute(
+                f"SELECT cache_key, results FROM recognition_cache "
+                f"WHERE ({clauses}) AND created_at >= ?",
+                (*params, cutoff),
+            ).fetchall()
+
+        best = None
+        for key, results in candidates:
+            distance = bin(self.split_key(key)[0] ^ dhash).count("1")
+            if distance <= self.max_distance and (best is None or distance < best[0]):
+                best = (distance, results)
+        return json.loads(best[1]) if best else None
+
+    def put(self, cache_key: str, results: List[Dict]) -> None:
+        """
+        キャッシュ保存（期限切れエントリも削除）
+
+        Args:
+          cache_key: キャッシュキー
+          results: 認識結果
+        """
+        dhash, color = self.split_key(cache_key)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO recognition_cache "
+                "(cache_key, color, band0, band1, band2, band3, results, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    cache_key,
+                    color,
+                    *self._bands(dhash),
+                    json.dumps(results, ensure_ascii=False, separators=(",", ":")),
+                    now,
+                ),
+            )
+            self._conn.execute(
+                "DELETE FROM recognition_cache WHERE created_at < ?",
+                (now - self.ttl,),
+            )
+            self._conn.commit()
+
+    def count(self) -> int:
+        """有効なエントリ数"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM recognition_cache WHERE created_at >= ?",
+                (time.time() - self.ttl,),
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        """接続を閉じる"""
+        with self._lock:
+            self._conn.close()
+
+
 class ImageRecognitionService:
     """画像認識サービス - 食材識別"""
 
@@ -237,6 +389,7 @@ class ImageRecognitionService:
         self.mode = mode
         self.cache_dir = cache_dir or Path("data/cache/image_recognition")
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.cache = RecognitionCache(self.cache_dir / "recognition_cache.db")
         logger.info(f"ImageRecognitionService initialized in {mode} mode")
 
     def recognize_from_file(self, image_path: Path, max_results: int = 5) -> List[Dict]:
@@ -252,8 +405,7 @@ class ImageRecognitionService:
         """
         try:
             with Image.open(image_path) as img:
-                processed_img = self._preprocess_image(img)
-                return self._recognize_image(processed_img, max_results)
+                return self._recognize_image(img, max_results)
         except Exception as e:
             logger.error(f"Failed to recognize image from file: {e}")
             raise
@@ -275,8 +427,7 @@ class ImageRecognitionService:
             # Base64デコード
             image_data = base64.b64decode(base64_data)
             img = Image.open(io.BytesIO(image_data))
-            processed_img = self._preprocess_image(img)
-            return self._recognize_image(processed_img, max_results)
+            return self._recognize_image(img, max_results)
         except Exception as e:
             logger.error(f"Failed to recognize image from base64: {e}")
             raise
@@ -328,14 +479,16 @@ class ImageRecognitionService:
         """
         画像認識実行
 
+        キャッシュヒット時は前処理も認識処理も行わない。
+
         Args:
-          img: 前処理済み画像
+          img: 元画像
           max_results: 最大結果数
 
         Returns:
           認識結果リスト
         """
-        # キャッシュチェック
+        # キャッシュチェック（縮小画像の知覚ハッシュ）
         cache_key = self._get_image_hash(img)
         cached_result = self._get_cached_result(cache_key)
         if cached_result:
@@ -346,7 +499,7 @@ class ImageRecognitionService:
         if self.mode == "mock":
             results = self._generate_mock_results(max_results)
         else:
-            results = self._call_external_api(img, max_results)
+            results = self._call_external_api(self._preprocess_image(img), max_results)
 
         # キャッシュ保存
         self._save_to_cache(cache_key, results)
@@ -427,17 +580,34 @@ class ImageRecognitionService:
 
     def _get_image_hash(self, img: Image.Image) -> str:
         """
-        画像のハッシュ値取得（キャッシュキー用）
+        画像の知覚ハッシュ取得（キャッシュキー用）
+
+        9x8に縮小したグレースケール画像の隣接画素比較によるdHash（64bit）と、
+        平均色を各チャネル3bitに量子化した色シグネチャを連結する。
+        画像全体のエンコードは行わない。
 
         Args:
           img: 画像
 
         Returns:
-          SHA256ハッシュ値
+          19桁の16進文字列（dHash 16桁 + 色 3桁）
         """
-        img_bytes = io.BytesIO()
-        img.save(img_bytes, format="PNG")
-        return hashlib.sha256(img_bytes.getvalue()).hexdigest()
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+
+        small = img.resize((9, 8), Image.Resampling.BILINEAR, reducing_gap=2.0)
+        pixels = list(small.convert("L").getdata())
+
+        dhash = 0
+        for row in range(8):
+            offset = row * 9
+            for col in range(8):
+                dhash = (dhash << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+
+        rgb = small.convert("RGB").resize((1, 1), Image.Resampling.BOX).getpixel((0, 0))
+        color = ((rgb[0] >> 5) << 6) | ((rgb[1] >> 5) << 3) | (rgb[2] >> 5)
+
+        return f"{dhash:016x}{color:03x}"
 
     def _get_cached_result(self, cache_key: str) -> Optional[List[Dict]]:
         """
@@ -449,18 +619,8 @@ class ImageRecognitionService:
         Returns:
           キャッシュされた結果（存在しない場合はNone）
         """
-        cache_file = self.cache_dir / f"{cache_key}.json"
-        if not cache_file.exists():
-            return None
-
         try:
-            with open(cache_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                # 有効期限チェック（24時間）
-                cached_time = datetime.fromisoformat(data["timestamp"])
-                if (datetime.now() - cached_time).total_seconds() > 86400:
-                    return None
-                return data["results"]
+            return self.cache.get(cache_key)
         except Exception as e:
             logger.warning(f"Failed to load cache: {e}")
             return None
@@ -473,15 +633,8 @@ class ImageRecognitionService:
           cache_key: キャッシュキー
           results: 認識結果
         """
-        cache_file = self.cache_dir / f"{cache_key}.json"
         try:
-            with open(cache_file, "w", encoding="utf-8") as f:
-                json.dump(
-                    {"timestamp": datetime.now().isoformat(), "results": results},
-                    f,
-                    ensure_ascii=False,
-                    indent=2,
-                )
+            self.cache.put(cache_key, results)
         except Exception as e:
             logger.warning(f"Failed to save cache: {e}")
 
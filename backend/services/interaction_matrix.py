@@ -0,0 +1,209 @@
+"""
+ユーザー×レシピ 暗黙評価行列
+
+行動履歴から (ユーザー, レシピ) ごとの暗黙的評価を疎行列として保持し、
+行動の記録ごとに差分更新する。レシピ→ユーザーの転置索引により、
+類似ユーザー（Jaccard 類似度）は共通レシピを持つユーザーだけを走査して求め、
+結果はユーザーごとにキャッシュし、行動済みレシピ集合が変わったユーザーと
+そのユーザーとレシピを共有するユーザーの分だけ無効化する。
+"""
+
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# 行動タイプごとの暗黙的評価への寄与
+ACTIVITY_WEIGHTS: Dict[str, float] = {
+    "cooked": 1.0,
+    "favorited": 0.8,
+    "viewed": 0.1,
+    "not_interested": -0.5,
+}
+
+
+def activity_weight(activity: Dict) -> float:
+    """
+    1件の行動の評価寄与を計算
+
+    Args:
+      activity: activity_type と metadata を持つ行動
+
+    Returns:
+      評価への寄与（rated は 5段階評価を 0-1 に正規化）
+    """
+    activity_type = activity["activity_type"]
+    if activity_type == "rated":
+        rating = (activity.get("metadata") or {}).get("rating", 0)
+        return rating / 5.0
+    return ACTIVITY_WEIGHTS.get(activity_type, 0.0)
+
+
+class InteractionMatrix:
+    """ユーザー×レシピの疎な暗黙評価行列"""
+
+    def __init__(self, neighbors: int = 5):
+        """
+        初期化
+
+        Args:
+          neighbors: キャッシュする類似ユーザー数
+        """
+        self.neighbors = neighbors
+        self._lock = threading.RLock()
+        # 行（ユーザー→レシピ→評価の累積値）と列（レシピ→ユーザー集合）
+        self._rows: Dict[str, Dict[str, float]] = {}
+        self._columns: Dict[str, Set[str]] = defaultdict(set)
+        self._neighbor_cache: Dict[str, List[Tuple[str, float]]] = {}
+
+    def add(self, user_id: str, activity: Dict) -> None:
+        """
+        行動1件を行列に反映
+
+        Args:
+          user_id: ユーザーID
+          activity: recipe_id と activity_type を持つ行動
+        """
+        recipe_id = activity["recipe_id"]
+        with self._lock:
+            row = self._rows.setdefault(user_id, {})
+            if recipe_id not in row:
+                row[recipe_id] = 0.0
+                self._columns[recipe_id].add(user_id)
+                self._invalidate_neighbors(user_id, row)
+            row[recipe_id] += activity_weight(activity)
+
+    def _invalidate_neighbors(self, user_id: str, row: Dict[str, float]) -> None:
+        """
+        行動済みレシピ集合が変わったユーザーに関係するキャッシュを破棄
+
+        Jaccard 類似度は両者の集合サイズに依存するため、本人に加えて
+        レシピを1つでも共有するユーザーの類似ユーザーも変わりうる。
+        共有レシピのないユーザーの類似度は変わらないので残す。
+        """
+        if not self._neighbor_cache:
+            return
+        self._neighbor_cache.pop(user_id, None)
+        for recipe_id in row:
+            for other_id in self._columns.get(recipe_id, ()):
+                self._neighbor_cache.pop(other_id, None)
+
+    def add_many(self, activities: Dict[str, Iterable[Dict]]) -> None:
+        """
+        ユーザー別の行動履歴をまとめて反映
+
+        Args:
+          activities: ユーザーID→行動リスト
+        """
+        for user_id, history in activities.items():
+            for activity in history:
+                self.add(user_id, activity)
+
+    def rating(self, user_id: str, recipe_id: str) -> float:
+        """
+        暗黙的評価を取得
+
+        Args:
+          user_id: ユーザーID
+          recipe_id: レシピID
+
+        Returns:
+          0-1 にクリップした評価（未行動は 0.0）
+        """
+        value = self._rows.get(user_id, {}).get(recipe_id)
+        if value is None:
+            return 0.0
+        return max(0.0, min(1.0, value))
+
+    def recipes_of(self, user_id: str) -> Set[str]:
+        """ユーザーが行動したレシピID集合を取得"""
+        return set(self._rows.get(user_id, ()))
+
+    def similar_users(
+        self, user_id: str, top_n: Optional[int] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        類似ユーザーを取得（Jaccard 類似度の降順）
+
+        共通レシピを持つユーザーのみを転置索引から集計するため、
+        全ユーザーを走査しない。
+
+        Args:
+          user_id: ユーザーID
+          top_n: 取得件数（省略時はキャッシュ件数）
+
+        Returns:
+          (ユーザーID, 類似度) のリスト
+        """
+        top_n = self.neighbors if top_n is None else top_n
+        with self._lock:
+            if top_n > self.neighbors:
+                return self._compute_neighbors(user_id, top_n)
+
+            cached = self._neighbor_cache.get(user_id)
+            if cached is None:
+                cached = self._compute_neighbors(user_id, self.neighbors)
+                self._neighbor_cache[user_id] = cached
+            return cached[:top_n]
+
+    def _compute_neighbors(self, user_id: str, top_n: int) -> List[Tuple[str, float]]:
+        """転置索引を使って類似ユーザーを計算"""
+        row = self._rows.get(user_id)
+        if not row:
+            return []
+
+        intersections: Dict[str, int] = defaultdict(int)
+        for recipe_id in row:
+            for other_id in self._columns.get(recipe_id, ()):
+                if other_id != user_id:
+                    intersections[other_id] += 1
+
+        size = len(row)
+        similar = [
+            (other_id, count / (size + len(self._rows[other_id]) - count))
+            for other_id, count in intersections.items()
+        ]
+        similar.sort(key=lambda x: (-x[1], x[0]))
+        return similar[:top_n]
+
+    def collaborative_scores(
+        self, user_id: str, recipe_ids: Optional[Iterable[str]] = None
+    ) -> Dict[str, float]:
+        """
+        協調フィルタリングスコアをまとめて計算
+
+        類似ユーザーの評価行を類似度で重み付けして加算する。
+        計算量は類似ユーザーの行動数に比例し、候補レシピ数には依存しない。
+
+        Args:
+          user_id: ユーザーID
+          recipe_ids: 対象レシピID（省略時は類似ユーザーが行動した全レシピ）
+
+        Returns:
+          レシピID→スコア（評価のないレシピは含まない）
+        """
+        totals: Dict[str, float] = defaultdict(float)
+        weights: Dict[str, float] = defaultdict(float)
+
+        with self._lock:
+            for other_id, similarity in self.similar_users(user_id):
+                for recipe_id, value in self._rows[other_id].items():
+                    rating = max(0.0, min(1.0, value))
+                    if rating > 0:
+                        totals[recipe_id] += rating * similarity
+                        weights[recipe_id] += similarity
+
+        scores = {
+            recipe_id: totals[recipe_id] / weights[recipe_id] for recipe_id in totals
+        }
+        if recipe_ids is None:
+            return scores
+        return {rid: scores[rid] for rid in recipe_ids if rid in scores}
+
+    def get_stats(self) -> Dict[str, int]:
+        """行列の統計情報を取得"""
+        with self._lock:
+            return {
+                "users": len(self._rows),
+                "recipes": len(self._columns),
+                "nonzero": sum(len(row) for row in self._rows.values()),
+            }
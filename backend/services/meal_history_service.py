@@ -2,16 +2,21 @@
 食事履歴分析サービス
 
 食事記録の保存・取得、栄養摂取量の集計、傾向分析を提供します。
+記録は起動時に一度だけ読み込んで日別集計（meal_rollup）に索引し、
+期間の問い合わせは集計から答えます。
 """
 
 import json
 import statistics
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 from collections import defaultdict, Counter
 
+from backend.services.meal_rollup import MealRollup
+
 
 @dataclass
 class MealRecord:
@@ -88,6 +93,31 @@ class MealHistoryService:
             "vitamin_c": 100.0,
         }
 
+        self._lock = threading.Lock()
+        self._records: List[Dict] = []
+        self.rollup = MealRollup()
+        self._file_signature: Optional[Tuple[int, int]] = None
+        self._refresh()
+
+    def _stat_file(self) -> Optional[Tuple[int, int]]:
+        """記録ファイルの (更新時刻, サイズ)。ファイルがなければ None"""
+        try:
+            stat = self.meal_history_file.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _refresh(self) -> None:
+        """記録ファイルが外部で変更されていれば読み込み直して索引を作り直す"""
+        with self._lock:
+            signature = self._stat_file()
+            if signature == self._file_signature:
+                return
+            self._records = self._load_records()
+            self.rollup = MealRollup()
+            self.rollup.add_many(self._records)
+            self._file_signature = signature
+
     def _load_records(self) -> List[Dict]:
         """食事記録を読み込む"""
         if not self.meal_history_file.exists():
@@ -103,6 +133,7 @@ class MealHistoryService:
         """食事記録を保存する"""
         with open(self.meal_history_file, "w", encoding="utf-8") as f:
             json.dump(records, f, ensure_ascii=False, indent=2)
+        self._file_signature = self._stat_file()
 
     def record_meal(
         self,
@@ -147,9 +178,12 @@ class MealHistoryService:
             created_at=now,
         )
 
-        records = self._load_records()
-        records.append(asdict(record))
-        self._save_records(records)
+        self._refresh()
+        with self._lock:
+            data = asdict(record)
+            self._records.append(data)
+            self.rollup.add(data)
+            self._save_records(self._records)
 
         return record
 
@@ -164,20 +198,29 @@ class MealHistoryService:
         Returns:
             日別栄養摂取量
         """
-        records = self._load_records()
-
-        # 指定日の記録をフィルタ
-        daily_records = [
-            r
-            for r in records
-            if r["user_id"] == user_id and r["consumed_at"].startswith(date)
-        ]
-
-        # 栄養素を集計
-        total_nutrition = defaultdict(float)
-        for record in daily_records:
-            for nutrient, value in record["nutrition"].items():
-                total_nutrition[nutrient] += value
+        self._refresh()
+        return self._daily_from_rollup(user_id, date)
+
+    def _daily_from_rollup(self, user_id: str, date: str) -> DailyNutrition:
+        """日別集計から日別栄養摂取量を作る"""
+        bucket = self.rollup.day(user_id, date)
+        if bucket is not None:
+            daily_records = bucket.meals
+            total_nutrition = bucket.nutrition
+        else:
+            # YYYY-MM など日付の一部が渡された場合は前方一致する日の記録を合算
+            daily_records = [
+                r
+                for _, day in self.rollup.days_between(
+                    user_id, date[:10], date + "\uffff"
+                )
+                for r in day.meals
+                if r["consumed_at"].startswith(date)
+            ]
+            total_nutrition = defaultdict(float)
+            for record in daily_records:
+                for nutrient, value in record["nutrition"].items():
+                    total_nutrition[nutrient] += value
 
         meals = [
             {
@@ -216,10 +259,11 @@ class MealHistoryService:
             today = datetime.now()
             start = today - timedelta(days=today.weekday())
 
+        self._refresh()
         weekly_data = []
         for i in range(7):
             date = (start + timedelta(days=i)).strftime("%Y-%m-%d")
-            daily = self.get_daily_nutrition(user_id, date)
+            daily = self._daily_from_rollup(user_id, date)
             weekly_data.append(daily)
 
         return weekly_data
@@ -245,10 +289,11 @@ class MealHistoryService:
             next_month = datetime(year, month + 1, 1)
         last_day = (next_month - timedelta(days=1)).day
 
+        self._refresh()
         monthly_data = []
         for day in range(1, last_day + 1):
             date = f"{year:04d}-{month:02d}-{day:02d}"
-            daily = self.get_daily_nutrition(user_id, date)
+            daily = self._daily_from_rollup(user_id, date)
             monthly_data.append(daily)
 
         return monthly_data
@@ -267,18 +312,22 @@ class MealHistoryService:
         Returns:
             栄養素推移データ
         """
+        self._refresh()
+        return self._trend_from_rollup(user_id, nutrient_name, days)
+
+    def _trend_from_rollup(
+        self, user_id: str, nutrient_name: str, days: int
+    ) -> NutritionTrend:
+        """日別集計から栄養素の推移を作る"""
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days - 1)
 
-        dates = []
-        values = []
-
-        for i in range(days):
-            date = (start_date + timedelta(days=i)).strftime("%Y-%m-%d")
-            daily = self.get_daily_nutrition(user_id, date)
-
-            dates.append(date)
-            values.append(daily.total_nutrition.get(nutrient_name, 0.0))
+        dates = [
+            (start_date + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)
+        ]
+        values = self.rollup.daily_values(
+            user_id, nutrient_name, start_date.date(), days
+        )
 
         # 統計計算
         non_zero_values = [v for v in values if v > 0]
@@ -305,30 +354,26 @@ class MealHistoryService:
         Returns:
             傾向分析結果
         """
-        records = self._load_records()
+        self._refresh()
 
-        # 期間でフィルタ
+        # 期間内の日別集計を合算（境界日のみ記録単位で時刻を比較）
         cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
-        recent_records = [
-            r
-            for r in records
-            if r["user_id"] == user_id and r["consumed_at"] >= cutoff_date
-        ]
+        cutoff_day = cutoff_date[:10]
 
-        # 食材の集計
         ingredient_counter = Counter()
-        for record in recent_records:
-            ingredient_counter.update(record["ingredients"])
-
-        # レシピの集計
         recipe_counter = Counter()
-        for record in recent_records:
-            recipe_counter[record["recipe_name"]] += 1
-
-        # 食事タイプの集計
         meal_type_counter = Counter()
-        for record in recent_records:
-            meal_type_counter[record["meal_type"]] += 1
+        for day_key, day in self.rollup.days_between(user_id, cutoff_day):
+            if day_key > cutoff_day:
+                ingredient_counter.update(day.ingredients)
+                recipe_counter.update(day.recipes)
+                meal_type_counter.update(day.meal_types)
+                continue
+            for record in day.meals:
+                if record["consumed_at"] >= cutoff_date:
+                    ingredient_counter.update(record["ingredients"])
+                    recipe_counter[record["recipe_name"]] += 1
+                    meal_type_counter[record["meal_type"]] += 1
 
         # 栄養バランスの評価
         nutrition_balance = self._evaluate_nutrition_balance(user_id, days)
@@ -354,7 +399,7 @@ class MealHistoryService:
         balance = {}
 
         for nutrient, target in self.daily_targets.items():
-            trend = self.get_nutrition_trend(user_id, nutrient, days)
+            trend = self._trend_from_rollup(user_id, nutrient, days)
 
             if trend.average >= target * 1.2:
                 balance[nutrient] = "excessive"
@@ -379,21 +424,15 @@ class MealHistoryService:
         Returns:
             栄養摂取量サマリー
         """
-        records = self._load_records()
-
-        # 期間でフィルタ
-        period_records = [
-            r
-            for r in records
-            if r["user_id"] == user_id
-            and start_date <= r["consumed_at"][:10] <= end_date
-        ]
+        self._refresh()
 
-        # 栄養素を集計
+        # 期間内の日別集計を合算
         total_nutrition = defaultdict(float)
-        for record in period_records:
-            for nutrient, value in record["nutrition"].items():
+        meal_count = 0
+        for _, day in self.rollup.days_between(user_id, start_date, end_date):
+            for nutrient, value in day.nutrition.items():
                 total_nutrition[nutrient] += value
+            meal_count += len(day.meals)
 
         # 日数を計算
         start = datetime.fromisoformat(start_date)
@@ -407,6 +446,28 @@ class MealHistoryService:
             "period": {"start": start_date, "end": end_date, "days": days},
             "total": dict(total_nutrition),
             "average_per_day": avg_nutrition,
-            "meal_count": len(period_records),
+            "meal_count": meal_count,
             "targets": self.daily_targets,
         }
+
+    def get_period_totals(self, user_id: str, period: str = "week") -> List[Dict]:
+        """
+        週別・月別の栄養摂取量合計を取得
+
+        Args:
+            user_id: ユーザーID
+            period: 集計単位（week: 月曜日始まりの週 / month: 暦月）
+
+        Returns:
+            期間ごとの合計（古い順）
+        """
+        if period not in ("week", "month"):
+            raise ValueError(f"Unsupported period: {period}")
+
+        self._refresh()
+        totals = (
+            self.rollup.weeks(user_id)
+            if period == "week"
+            else self.rollup.months(user_id)
+        )
+        return [{"period": key, **value.to_dict()} for key, value in totals.items()]
@@ -0,0 +1,175 @@
+"""
+食事記録の時間別集計（ロールアップ）
+
+ユーザーごとに日別の集計（栄養素合計・食事回数・食材/レシピ/食事タイプの回数）を
+保持し、週別・月別の栄養素合計は日別集計に記録を足すときに同時に更新する。
+期間の問い合わせは対象日数分の辞書参照だけで答えられるため、
+食事記録ファイルを読み直す必要がない。
+"""
+
+import bisect
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class DayBucket:
+    """1ユーザー・1日分の集計"""
+
+    __slots__ = ("meals", "nutrition", "ingredients", "recipes", "meal_types")
+
+    def __init__(self):
+        self.meals: List[Dict] = []
+        self.nutrition: Dict[str, float] = defaultdict(float)
+        self.ingredients: Counter = Counter()
+        self.recipes: Counter = Counter()
+        self.meal_types: Counter = Counter()
+
+    def add(self, record: Dict) -> None:
+        """食事記録を1件加算"""
+        self.meals.append(record)
+        for nutrient, value in record["nutrition"].items():
+            self.nutrition[nutrient] += value
+        self.ingredients.update(record["ingredients"])
+        self.recipes[record["recipe_name"]] += 1
+        self.meal_types[record["meal_type"]] += 1
+
+
+class PeriodTotals:
+    """週・月単位の栄養素合計"""
+
+    __slots__ = ("nutrition", "meal_count")
+
+    def __init__(self):
+        self.nutrition: Dict[str, float] = defaultdict(float)
+        self.meal_count = 0
+
+    def to_dict(self) -> Dict:
+        return {"total_nutrition": dict(self.nutrition), "meal_count": self.meal_count}
+
+
+def week_key(day: str) -> str:
+    """日付（YYYY-MM-DD）が属する週の月曜日"""
+    parsed = date.fromisoformat(day)
+    return (parsed - timedelta(days=parsed.weekday())).isoformat()
+
+
+def month_key(day: str) -> str:
+    """日付（YYYY-MM-DD）が属する月（YYYY-MM）"""
+    return day[:7]
+
+
+class MealRollup:
+    """ユーザー別の日・週・月の食事集計"""
+
+    def __init__(self):
+        # user_id → 日付 → 日別集計
+        self._days: Dict[str, Dict[str, DayBucket]] = defaultdict(dict)
+        # user_id → 記録のある日付（昇順）
+        self._dates: Dict[str, List[str]] = defaultdict(list)
+        # user_id → 週の月曜日 / YYYY-MM → 合計
+        self._weeks: Dict[str, Dict[str, PeriodTotals]] = defaultdict(dict)
+        self._months: Dict[str, Dict[str, PeriodTotals]] = defaultdict(dict)
+        self.record_count = 0
+
+    def add(self, record: Dict) -> None:
+        """
+        食事記録を集計に加える
+
+        Args:
+            record: user_id, consumed_at, nutrition, ingredients などを持つ記録
+        """
+        user_id = record["user_id"]
+        day = record["consumed_at"][:10]
+
+        days = self._days[user_id]
+        bucket = days.get(day)
+        if bucket is None:
+            bucket = days[day] = DayBucket()
+            bisect.insort(self._dates[user_id], day)
+        bucket.add(record)
+
+        try:
+            keys = [
+                (self._weeks[user_id], week_key(day)),
+                (self._months[user_id], month_key(day)),
+            ]
+        except ValueError:
+            # 日付として解釈できない記録は日別集計のみ
+            keys = []
+        for periods, key in keys:
+            totals = periods.get(key)
+            if totals is None:
+                totals = periods[key] = PeriodTotals()
+            for nutrient, value in record["nutrition"].items():
+                totals.nutrition[nutrient] += value
+            totals.meal_count += 1
+
+        self.record_count += 1
+
+    def add_many(self, records: List[Dict]) -> None:
+        """複数の記録をまとめて加える"""
+        for record in records:
+            self.add(record)
+
+    def day(self, user_id: str, day: str) -> Optional[DayBucket]:
+        """日別集計を取得（記録がなければ None）"""
+        return self._days.get(user_id, {}).get(day)
+
+    def days_between(
+        self, user_id: str, start: str, end: Optional[str] = None
+    ) -> Iterator[Tuple[str, DayBucket]]:
+        """
+        記録のある日の (日付, 集計) を期間内で古い順に返す
+
+        Args:
+            user_id: ユーザーID
+            start: 開始日（YYYY-MM-DD、この日を含む）
+            end: 終了日（YYYY-MM-DD、この日を含む。省略時は最後まで）
+        """
+        dates = self._dates.get(user_id, [])
+        lo = bisect.bisect_left(dates, start)
+        hi = len(dates) if end is None else bisect.bisect_right(dates, end)
+        days = self._days[user_id]
+        for day in dates[lo:hi]:
+            yield day, days[day]
+
+    def daily_values(
+        self, user_id: str, nutrient: str, start: date, days: int
+    ) -> List[float]:
+        """
+        連続する日数分の栄養素の日別合計
+
+        Args:
+            user_id: ユーザーID
+            nutrient: 栄養素名
+            start: 開始日
+            days: 日数
+
+        Returns:
+            日ごとの合計（記録のない日は 0.0）
+        """
+        buckets = self._days.get(user_id, {})
+        values = []
+        for offset in range(days):
+            bucket = buckets.get((start + timedelta(days=offset)).isoformat())
+            values.append(bucket.nutrition.get(nutrient, 0.0) if bucket else 0.0)
+        return values
+
+    def week(self, user_id: str, week_start: str) -> PeriodTotals:
+        """週の合計（week_start はその週の任意の日付）"""
+        return self._weeks.get(user_id, {}).get(week_key(week_start), PeriodTotals())
+
+    def month(self, user_id: str, year: int, month: int) -> PeriodTotals:
+        """月の合計"""
+        return self._months.get(user_id, {}).get(
+            f"{year:04d}-{month:02d}", PeriodTotals()
+        )
+
+    def weeks(self, user_id: str) -> Dict[str, PeriodTotals]:
+        """週別の合計（キーは週の月曜日）"""
+        return dict(sorted(self._weeks.get(user_id, {}).items()))
+
+    def months(self, user_id: str) -> Dict[str, PeriodTotals]:
+        """月別の合計（キーは YYYY-MM）"""
+        return dict(sorted(self._months.get(user_id, {}).items()))
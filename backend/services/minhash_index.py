@@ -0,0 +1,186 @@
+"""
+MinHash / LSH 類似レシピ索引
+
+レシピの正規化済み材料・タグの集合から MinHash シグネチャを作り、
+バンド分割した LSH バケットに登録する。類似レシピ検索は同じバケットに
+入ったレシピのみを候補とするため、カタログ全件との比較を行わない。
+レシピの追加・更新・削除はその1件分のバケットだけを書き換える。
+"""
+
+import hashlib
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+# 2^31 - 1（ハッシュ値 × 係数が uint64 に収まる大きさ）
+_MERSENNE_PRIME = (1 << 31) - 1
+
+
+def token_hash(token: str) -> int:
+    """トークンを31bitの安定したハッシュ値に変換（プロセス間で同一）"""
+    digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") % _MERSENNE_PRIME
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """2つの集合の Jaccard 係数"""
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class MinHashLSHIndex:
+    """MinHash シグネチャ + LSH バンディングによる近似近傍索引"""
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        """
+        初期化
+
+        Args:
+          num_perm: MinHash の置換数（シグネチャ長）
+          bands: バンド数（num_perm を割り切れること）。
+            1バンドの行数 r = num_perm / bands のとき、Jaccard 係数 s の
+            2件が候補になる確率は 1 - (1 - s^r)^bands
+          seed: ハッシュ係数の乱数シード
+        """
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+        self._lock = threading.RLock()
+        self._tokens: Dict[str, frozenset] = {}
+        self._keys: Dict[str, List[Tuple[int, bytes]]] = {}
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._tokens
+
+    def signature(self, tokens: Iterable[str]) -> np.ndarray:
+        """
+        MinHash シグネチャを計算
+
+        Args:
+          tokens: トークン集合
+
+        Returns:
+          長さ num_perm のシグネチャ
+        """
+        hashes = np.fromiter((token_hash(t) for t in set(tokens)), dtype=np.uint64)
+        if hashes.size == 0:
+            return np.full(self.num_perm, _MERSENNE_PRIME, dtype=np.uint64)
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        """シグネチャをバンドごとのバケットキーに分割"""
+        return [
+            (band, signature[band * self.rows : (band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def add(self, item_id: str, tokens: Iterable[str]) -> None:
+        """
+        アイテムを登録（既存の場合は置き換え、集合が同じなら何もしない）
+
+        Args:
+          item_id: アイテムID
+          tokens: トークン集合
+        """
+        token_set = frozenset(tokens)
+        with self._lock:
+            if self._tokens.get(item_id) == token_set:
+                return
+            self.remove(item_id)
+            if not token_set:
+                return
+
+            keys = self._band_keys(self.signature(token_set))
+            self._tokens[item_id] = token_set
+            self._keys[item_id] = keys
+            for key in keys:
+                self._buckets.setdefault(key, set()).add(item_id)
+
+    def remove(self, item_id: str) -> None:
+        """
+        アイテムを削除
+
+        Args:
+          item_id: アイテムID
+        """
+        with self._lock:
+            self._tokens.pop(item_id, None)
+            for key in self._keys.pop(item_id, []):
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(item_id)
+                    if not bucket:
+                        del self._buckets[key]
+
+    def candidates(
+        self, tokens: Optional[Iterable[str]] = None, item_id: Optional[str] = None
+    ) -> Set[str]:
+        """
+        同じバケットに入るアイテムを取得
+
+        Args:
+          tokens: 検索するトークン集合
+          item_id: 登録済みアイテムID（tokens の代わりに指定）
+
+        Returns:
+          候補アイテムIDのセット（item_id 自身は含まない）
+        """
+        with self._lock:
+            if item_id is not None:
+                keys = self._keys.get(item_id)
+                if keys is None:
+                    return set()
+            else:
+                keys = self._band_keys(self.signature(tokens or ()))
+
+            found: Set[str] = set()
+            for key in keys:
+                found |= self._buckets.get(key, set())
+
+        found.discard(item_id)
+        return found
+
+    def query(
+        self,
+        tokens: Optional[Iterable[str]] = None,
+        item_id: Optional[str] = None,
+        top_k: int = 10,
+    ) -> List[Tuple[str, float]]:
+        """
+        候補を Jaccard 係数で並べ替えて返す
+
+        Args:
+          tokens: 検索するトークン集合
+          item_id: 登録済みアイテムID（tokens の代わりに指定）
+          top_k: 取得件数
+
+        Returns:
+          (アイテムID, Jaccard 係数) のリスト（降順）
+        """
+        if item_id is not None:
+            target = self._tokens.get(item_id, frozenset())
+        else:
+            target = frozenset(tokens or ())
+
+        scored = [
+            (other, jaccard(target, self._tokens[other]))
+            for other in self.candidates(tokens=target, item_id=item_id)
+            if other in self._tokens
+        ]
+        scored.sort(key=lambda x: (-x[1], x[0]))
+        return scored[:top_k]
@@ -4,12 +4,18 @@ Natural Language Search Service
 """
 
 import re
-import json
 from typing import Dict, List, Tuple
 from pathlib import Path
 from datetime import datetime
 from dataclasses import dataclass, asdict
 
+from backend.services.dictionary_matcher import DictionaryMatcher
+from backend.services.search_history import get_history_store
+from backend.services.suggestion_index import PopularityTrie, TermIndex
+
+# 単語照合で抽出する辞書の分類
+TERM_CATEGORIES = ("ingredients", "cooking_methods", "categories", "adjectives")
+
 
 @dataclass
 class ParsedQuery:
@@ -34,10 +40,19 @@ class NaturalSearchService:
 
         # 料理ドメイン辞書
         self.dictionary = self._load_dictionary()
+        self._build_matchers()
 
-        # 検索履歴
-        self.history_file = self.data_dir / "search_history.json"
-        self.history = self._load_history()
+        # 検索履歴（件数上限付き・バックグラウンドで追記）
+        self.history_store = get_history_store(self.data_dir)
+        self.history_file = self.history_store.log_path
+
+        # サジェスト用インデックス（辞書語の接尾辞配列・検索クエリの人気度トライ）
+        self.term_index = TermIndex(
+            word for category in TERM_CATEGORIES for word in self.dictionary[category]
+        )
+        self.popular_queries = PopularityTrie()
+        for query, count, timestamp in self.history_store.popularity():
+            self.popular_queries.record(query, self._to_epoch(timestamp), count)
 
     def _load_dictionary(self) -> Dict[str, List[str]]:
         """料理ドメイン辞書の読み込み"""
@@ -323,21 +338,34 @@ class NaturalSearchService:
             },
         }
 
-    def _load_history(self) -> List[Dict]:
-        """検索履歴の読み込み"""
-        if self.history_file.exists():
-            try:
-                with open(self.history_file, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except Exception:
-                return []
-        return []
+    def _build_matchers(self):
+        """辞書から照合用オートマトンと否定表現の正規表現を構築"""
+        self._term_matcher = DictionaryMatcher(
+            {category: self.dictionary[category] for category in TERM_CATEGORIES}
+        )
+
+        # 同義語 → 標準語（複数の標準語に属する場合は辞書で先に出たもの）
+        self._synonym_map: Dict[str, str] = {}
+        for standard, synonyms in self.dictionary["synonyms"].items():
+            for synonym in synonyms:
+                self._synonym_map.setdefault(synonym, standard)
+        self._synonym_matcher = DictionaryMatcher({"synonyms": list(self._synonym_map)})
+
+        # 「〇〇ない」「〇〇なし」など（長いパターンを優先）
+        patterns = sorted(self.dictionary["negation_patterns"], key=len, reverse=True)
+        self._negation_regex = re.compile(
+            r"(\S+?)(?:" + "|".join(re.escape(p) for p in patterns) + ")"
+        )
+
+    @property
+    def history(self) -> List[Dict]:
+        """保持している検索履歴（古い順）"""
+        return self.history_store.items()
 
     def _save_history(self):
-        """検索履歴の保存"""
+        """未書き込みの検索履歴を保存"""
         try:
-            with open(self.history_file, "w", encoding="utf-8") as f:
-                json.dump(self.history[-100:], f, ensure_ascii=False, indent=2)
+            self.history_store.flush()
         except Exception:
             pass
 
@@ -363,11 +391,12 @@ class NaturalSearchService:
         # 否定部分を除去したクエリ
         query_without_negations = self._remove_negations(query)
 
-        # 各要素の抽出
-        ingredients_include = self._extract_ingredients(query_without_negations)
-        cooking_methods = self._extract_cooking_methods(query_without_negations)
-        categories = self._extract_categories(query_without_negations)
-        adjectives = self._extract_adjectives(query_without_negations)
+        # 各要素の抽出（辞書照合は1回の走査で行う）
+        terms = self._extract_terms(query_without_negations)
+        ingredients_include = terms.get("ingredients", [])
+        cooking_methods = terms.get("cooking_methods", [])
+        categories = terms.get("categories", [])
+        adjectives = terms.get("adjectives", [])
 
         # キーワード抽出（辞書にない単語）
         keywords = self._extract_keywords(
@@ -397,11 +426,7 @@ class NaturalSearchService:
         query = query.replace("　", " ")
 
         # 同義語の統一
-        for standard, synonyms in self.dictionary["synonyms"].items():
-            for synonym in synonyms:
-                query = query.replace(synonym, standard)
-
-        return query
+        return self._synonym_matcher.replace(query, self._synonym_map)
 
     def _extract_negations(self, query: str) -> Tuple[List[str], List[str]]:
         """
@@ -414,68 +439,32 @@ class NaturalSearchService:
         negations = []
 
         # 否定パターンの検出
-        for pattern in self.dictionary["negation_patterns"]:
-            # 「〇〇ない」「〇〇なし」のパターン
-            regex = rf"(\S+?){re.escape(pattern)}"
-            matches = re.finditer(regex, query)
-
-            for match in matches:
-                base_word = match.group(1)
-                full_negation = match.group(0)
-                negations.append(full_negation)
-
-                # 食材・調理法・形容詞のチェック
-                for ingredient in self.dictionary["ingredients"]:
-                    if ingredient in base_word:
-                        exclude_ingredients.append(ingredient)
-                        break
-
-                for adjective in self.dictionary["adjectives"]:
-                    if adjective in base_word:
-                        # 形容詞の否定（例：辛くない → 辛いを除外）
-                        exclude_ingredients.append(adjective)
-                        break
+        for match in self._negation_regex.finditer(query):
+            base_word = match.group(1)
+            full_negation = match.group(0)
+            negations.append(full_negation)
+
+            # 食材・形容詞のチェック（最長一致）
+            terms = self._extract_terms(base_word)
+            # 形容詞の否定（例：辛くない → 辛いを除外）
+            for category in ("ingredients", "adjectives"):
+                if terms.get(category):
+                    exclude_ingredients.append(terms[category][0])
 
         return list(set(exclude_ingredients)), list(set(negations))
 
     def _remove_negations(self, query: str) -> str:
         """否定表現を除去"""
-        for pattern in self.dictionary["negation_patterns"]:
-            regex = rf"\S+?{re.escape(pattern)}"
-            query = re.sub(regex, "", query)
-        return query
-
-    def _extract_ingredients(self, query: str) -> List[str]:
-        """食材の抽出"""
-        found = []
-        for ingredient in self.dictionary["ingredients"]:
-            if ingredient in query:
-                found.append(ingredient)
-        return list(set(found))
-
-    def _extract_cooking_methods(self, query: str) -> List[str]:
-        """調理法の抽出"""
-        found = []
-        for method in self.dictionary["cooking_methods"]:
-            if method in query:
-                found.append(method)
-        return list(set(found))
-
-    def _extract_categories(self, query: str) -> List[str]:
-        """カテゴリの抽出"""
-        found = []
-        for category in self.dictionary["categories"]:
-            if category in query:
-                found.append(category)
-        return list(set(found))
-
-    def _extract_adjectives(self, query: str) -> List[str]:
-        """形容詞の抽出"""
-        found = []
-        for adjective in self.dictionary["adjectives"]:
-            if adjective in query:
-                found.append(adjective)
-        return list(set(found))
+        return self._negation_regex.sub("", query)
+
+    def _extract_terms(self, query: str) -> Dict[str, List[str]]:
+        """
+        辞書語の抽出
+
+        Returns:
+          分類（ingredients, cooking_methods, categories, adjectives）→ 単語リスト
+        """
+        return self._term_matcher.labelled(query)
 
     def _extract_keywords(self, query: str, extracted_words: List[str]) -> List[str]:
         """その他キーワードの抽出"""
@@ -496,12 +485,28 @@ class NaturalSearchService:
             "timestamp": datetime.now().isoformat(),
             "parsed": asdict(parsed),
         }
-        self.history.append(history_item)
-        self._save_history()
+        # ファイルへの書き込みはバックグラウンドでまとめて行う
+        self.history_store.append(history_item)
+        self.popular_queries.record(
+            parsed.original, self._to_epoch(history_item["timestamp"])
+        )
+
+    @staticmethod
+    def _to_epoch(timestamp: str):
+        """ISO形式の時刻をUNIX秒に変換（不正な値は None）"""
+        try:
+            return datetime.fromisoformat(timestamp).timestamp()
+        except (TypeError, ValueError):
+            return None
+
+    def clear_history(self):
+        """検索履歴と人気度をすべて削除"""
+        self.history_store.clear()
+        self.popular_queries.clear()
 
     def get_search_history(self, limit: int = 20) -> List[Dict]:
         """検索履歴の取得"""
-        return list(reversed(self.history[-limit:]))
+        return self.history_store.latest(limit)
 
     def get_suggestions(self, partial_query: str, limit: int = 10) -> List[str]:
         """
@@ -518,43 +523,19 @@ class NaturalSearchService:
             # 人気の検索クエリを返す
             return self._get_popular_queries(limit)
 
-        suggestions = set()
-        partial_lower = partial_query.lower()
-
-        # 辞書からマッチする単語を検索
-        for category_words in self.dictionary.values():
-            if isinstance(category_words, list):
-                for word in category_words:
-                    if (
-                        word.lower().startswith(partial_lower)
-                        or partial_lower in word.lower()
-                    ):
-                        suggestions.add(word)
-                        if len(suggestions) >= limit:
-                            break
-
-        # 履歴からマッチするクエリを検索
-        for item in reversed(self.history):
-            query = item.get("query", "")
-            if partial_lower in query.lower():
-                suggestions.add(query)
-                if len(suggestions) >= limit:
-                    break
-
-        return list(suggestions)[:limit]
+        # 人気の検索クエリ（前方一致）→ 辞書語（前方一致 → 部分一致）の順
+        suggestions = self.popular_queries.complete(partial_query, limit)
+        for word in self.term_index.search(partial_query, limit):
+            if len(suggestions) >= limit:
+                break
+            if word not in suggestions:
+                suggestions.append(word)
 
-    def _get_popular_queries(self, limit: int) -> List[str]:
-        """人気の検索クエリを取得"""
-        # クエリの出現頻度をカウント
-        query_counts: Dict[str, int] = {}
-        for item in self.history:
-            query = item.get("query", "")
-            query_counts[query] = query_counts.get(query, 0) + 1
-
-        # 出現頻度順にソート
-        sorted_queries = sorted(query_counts.items(), key=lambda x: x[1], reverse=True)
+        return suggestions
 
-        return [q[0] for q in sorted_queries[:limit]]
+    def _get_popular_queries(self, limit: int) -> List[str]:
+        """人気の検索クエリを取得（最近の検索ほど重みが大きい）"""
+        return self.popular_queries.complete("", limit)
 
     def build_search_filters(self, parsed: ParsedQuery) -> Dict:
         """
@@ -0,0 +1,324 @@
+"""
+レシピ特徴ベクトルストア
+
+レシピごとの特徴ベクトル（食材・カテゴリ・タグ・調理時間・難易度）を
+一度だけ計算し、L2正規化した行として NumPy 行列に保持する。
+行はレシピIDとバージョン（version / updated_at、なければ内容のハッシュ）で
+管理し、バージョンが変わったか無効化されたレシピのみ特徴を再抽出するため、
+候補全件のコサイン類似度は1回の行列×ベクトル積で求められる。
+"""
+
+import hashlib
+import json
+import threading
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from backend.services.minhash_index import MinHashLSHIndex
+
+# 類似レシピの近似検索（MinHash/LSH）に使う特徴の接頭辞
+SIMILARITY_PREFIXES = ("ingredient:", "tag:")
+
+# 特徴ベクトルの計算に使うレシピのフィールド
+FEATURE_FIELDS = ("ingredients", "category", "tags", "cooking_time", "difficulty")
+
+
+def recipe_version(recipe: Dict) -> Hashable:
+    """
+    特徴ベクトルの再計算要否を判定するためのレシピのバージョン
+
+    version または updated_at があればそれを使い、なければ
+    特徴の計算に使うフィールドの内容からハッシュを求める。
+
+    Args:
+      recipe: レシピデータ
+
+    Returns:
+      バージョン（値が同じなら特徴ベクトルも同じ）
+    """
+    for key in ("version", "updated_at"):
+        value = recipe.get(key)
+        if value is not None:
+            return (key, str(value))
+    payload = json.dumps(
+        [recipe.get(name) for name in FEATURE_FIELDS],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).digest()
+
+
+def extract_recipe_features(recipe: Dict) -> Dict[str, float]:
+    """
+    レシピから特徴ベクトル（特徴名→重み）を抽出
+
+    Args:
+      recipe: レシピデータ
+
+    Returns:
+      特徴名→重みの辞書
+    """
+    features = {}
+
+    # 食材（TF-IDF風の重み付け）
+    for ingredient in recipe.get("ingredients", []):
+        name = ingredient.get("name", "").lower()
+        if name:
+            # 主要食材として重み付け
+            features[f"ingredient:{name}"] = 1.0
+
+    # カテゴリ
+    category = recipe.get("category", "")
+    if category:
+        features[f"category:{category}"] = 2.0  # カテゴリは重要
+
+    # タグ
+    for tag in recipe.get("tags", []):
+        features[f"tag:{tag}"] = 1.5
+
+    # 調理時間（範囲でグループ化）
+    cook_time = recipe.get("cooking_time", 0)
+    if cook_time <= 15:
+        features["time:quick"] = 1.0
+    elif cook_time <= 30:
+        features["time:medium"] = 1.0
+    else:
+        features["time:long"] = 1.0
+
+    # 難易度
+    difficulty = recipe.get("difficulty", "")
+    if difficulty:
+        features[f"difficulty:{difficulty}"] = 1.0
+
+    return features
+
+
+class RecipeFeatureStore:
+    """レシピ特徴ベクトルのキャッシュ（行＝レシピ、列＝特徴）"""
+
+    def __init__(self, initial_rows: int = 64, initial_columns: int = 256):
+        """
+        初期化
+
+        Args:
+          initial_rows: 行列の初期行数（不足時は倍に拡張）
+          initial_columns: 行列の初期列数（不足時は倍に拡張）
+        """
+        self._lock = threading.RLock()
+        self._vocabulary: Dict[str, int] = {}
+        self._rows: Dict[str, int] = {}
+        self._versions: Dict[str, Hashable] = {}
+        self._matrix = np.zeros((initial_rows, initial_columns), dtype=np.float64)
+        self.lsh = MinHashLSHIndex()
+        # 類似レシピ検索の対象となる現在のカタログ（ID→レシピ）
+        self._catalog: Dict[str, Dict] = {}
+        # 最後に同期したカタログのリストと件数（同じなら再同期しない）
+        self._catalog_source: Optional[List[Dict]] = None
+        self._catalog_size = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _column(self, feature: str) -> int:
+        """特徴名の列番号を取得（未登録なら追加）"""
+        column = self._vocabulary.get(feature)
+        if column is None:
+            column = len(self._vocabulary)
+            self._vocabulary[feature] = column
+            if column >= self._matrix.shape[1]:
+                self._resize(columns=self._matrix.shape[1] * 2)
+        return column
+
+    def _resize(
+        self, rows: Optional[int] = None, columns: Optional[int] = None
+    ) -> None:
+        """行列を拡張（既存の値は保持）"""
+        old_rows, old_columns = self._matrix.shape
+        resized = np.zeros(
+            (rows or old_rows, columns or old_columns), dtype=self._matrix.dtype
+        )
+        resized[:old_rows, :old_columns] = self._matrix
+        self._matrix = resized
+
+    def update(self, recipe: Dict) -> int:
+        """
+        レシピの特徴ベクトルを登録・更新
+
+        バージョンが前回と同じ場合は特徴を抽出せずに行番号を返す。
+
+        Args:
+          recipe: レシピデータ（id 必須）
+
+        Returns:
+          レシピの行番号
+        """
+        recipe_id = recipe.get("id", "")
+        version = recipe_version(recipe)
+
+        with self._lock:
+            row = self._rows.get(recipe_id)
+            if row is not None and self._versions.get(recipe_id) == version:
+                return row
+
+            features = extract_recipe_features(recipe)
+
+            if row is None:
+                row = len(self._rows)
+                self._rows[recipe_id] = row
+                if row >= self._matrix.shape[0]:
+                    self._resize(rows=self._matrix.shape[0] * 2)
+
+            columns = [self._column(name) for name in features]
+            values = np.fromiter(
+                features.values(), dtype=np.float64, count=len(features)
+            )
+            norm = np.linalg.norm(values)
+
+            self._matrix[row] = 0.0
+            if norm > 0:
+                self._matrix[row, columns] = values / norm
+            self._versions[recipe_id] = version
+            self.lsh.add(
+                recipe_id,
+                [name for name in features if name.startswith(SIMILARITY_PREFIXES)],
+            )
+            return row
+
+    def invalidate(self, recipe_id: str) -> None:
+        """
+        レシピのキャッシュを無効化（次回の update/sync で再計算）
+
+        Args:
+          recipe_id: レシピID
+        """
+        with self._lock:
+            self._versions.pop(recipe_id, None)
+            self._catalog_source = None
+
+    def sync(self, recipes: Iterable[Dict]) -> List[int]:
+        """
+        レシピ一覧を登録し、各レシピの行番号を返す
+
+        Args:
+          recipes: レシピ一覧
+
+        Returns:
+          入力順の行番号リスト
+        """
+        with self._lock:
+            return [self.update(recipe) for recipe in recipes]
+
+    def sync_catalog(self, recipes: List[Dict]) -> None:
+        """
+        レシピ一覧をカタログとして同期
+
+        前回と同じリストオブジェクトで件数も変わらなければ何もしない
+        （リスト内のレシピを直接書き換えた場合は invalidate で通知する）。
+        一覧から消えたレシピは LSH 索引から外す。
+
+        Args:
+          recipes: 現在のレシピ一覧
+        """
+        with self._lock:
+            if recipes is self._catalog_source and len(recipes) == self._catalog_size:
+                return
+            self.sync(recipes)
+            catalog = {recipe.get("id", ""): recipe for recipe in recipes}
+            for recipe_id in self._catalog.keys() - catalog.keys():
+                self.lsh.remove(recipe_id)
+                self._versions.pop(recipe_id, None)
+            self._catalog = catalog
+            self._catalog_source = recipes
+            self._catalog_size = len(recipes)
+
+    def catalog_size(self) -> int:
+        """カタログのレシピ数"""
+        return len(self._catalog)
+
+    def catalog_recipe(self, recipe_id: str) -> Optional[Dict]:
+        """カタログのレシピを取得（存在しなければ None）"""
+        return self._catalog.get(recipe_id)
+
+    def catalog_rows(
+        self, recipe_ids: Optional[Iterable[str]] = None
+    ) -> List[Tuple[Dict, int]]:
+        """
+        カタログのレシピと行番号の組を取得
+
+        Args:
+          recipe_ids: 対象レシピID（省略時はカタログ全件をカタログ順で返す）
+
+        Returns:
+          (レシピ, 行番号) のリスト（recipe_ids 指定時は行番号順）
+        """
+        with self._lock:
+            if recipe_ids is None:
+                return [
+                    (recipe, self._rows[recipe_id])
+                    for recipe_id, recipe in self._catalog.items()
+                ]
+            pairs = [
+                (self._catalog[recipe_id], self._rows[recipe_id])
+                for recipe_id in recipe_ids
+                if recipe_id in self._catalog
+            ]
+        pairs.sort(key=lambda pair: pair[1])
+        return pairs
+
+    def row_of(self, recipe_id: str) -> Optional[int]:
+        """レシピの行番号を取得（未登録は None）"""
+        return self._rows.get(recipe_id)
+
+    def profile_vector(
+        self, recipe_ids: Iterable[str], catalog_rows: Optional[Iterable[int]] = None
+    ) -> Optional[np.ndarray]:
+        """
+        ユーザープロファイルベクトルを構築
+
+        好んだレシピの正規化ベクトルの平均。同じレシピが複数回含まれる
+        場合はその回数だけ重みが増える。
+
+        Args:
+          recipe_ids: 好んだレシピIDのリスト（重複可）
+          catalog_rows: 数える行番号（sync が返した現在のレシピ一覧の行）。
+            省略時は登録済みの全行（一覧から消えたレシピの行も含む）
+
+        Returns:
+          プロファイルベクトル（対象のレシピが1件もなければ None）
+        """
+        rows = [row for row in map(self.row_of, recipe_ids) if row is not None]
+        if catalog_rows is not None:
+            allowed = set(catalog_rows)
+            rows = [row for row in rows if row in allowed]
+        if not rows:
+            return None
+        with self._lock:
+            return self._matrix[rows].mean(axis=0)
+
+    def scores(self, vector: np.ndarray, rows: List[int]) -> np.ndarray:
+        """
+        指定行とベクトルの内積をまとめて計算
+
+        行は正規化済みのため、vector が正規化済みレシピ行ならコサイン類似度、
+        プロファイルベクトルなら好んだレシピとのコサイン類似度の平均になる。
+
+        Args:
+          vector: 比較するベクトル
+          rows: 行番号リスト
+
+        Returns:
+          各行のスコア
+        """
+        with self._lock:
+            width = self._matrix.shape[1]
+            if vector.shape[0] < width:
+                # 計算中に列が拡張された場合は新しい列を 0 で埋める
+                vector = np.pad(vector, (0, width - vector.shape[0]))
+            return self._matrix[rows] @ vector
+
+    def vector(self, row: int) -> np.ndarray:
+        """行ベクトルのコピーを取得"""
+        with self._lock:
+            return self._matrix[row].copy()
@@ -13,21 +13,39 @@ import math
 from collections import defaultdict
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+
+from backend.services.activity_log import get_activity_log
+from backend.services.interaction_matrix import InteractionMatrix
+from backend.services.recipe_features import RecipeFeatureStore, extract_recipe_features
 
 
 class RecommendationAIService:
     """レシピ推薦AIサービス"""
 
+    # この件数以上のカタログでは類似レシピを LSH の候補から選ぶ
+    LSH_MIN_RECIPES = 1000
+
     def __init__(self, data_dir: str = "data"):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
 
         self.user_activity_file = self.data_dir / "user_activity.json"
+        self.activity_log_file = self.data_dir / "user_activity.db"
         self.preferences_file = self.data_dir / "user_preferences.json"
         self.feedback_file = self.data_dir / "recommendation_feedback.json"
 
-        self.user_activities = self._load_json(self.user_activity_file, {})
+        self.activity_log = get_activity_log(self.activity_log_file)
+        if self.user_activity_file.exists() and self.activity_log.count() == 0:
+            self.activity_log.import_json(self.user_activity_file)
+
+        self.user_activities: Dict[str, List[Dict]] = {}
+        self.interactions = InteractionMatrix()
+        self.feature_store = RecipeFeatureStore()
+        # 行動が記録されるたびに呼ばれるコールバック（事前計算の更新通知など）
+        self._activity_listeners: List[Callable[[str, Dict], None]] = []
+        self.activity_version = 0
+        self._load_activities()
         self.user_preferences = self._load_json(self.preferences_file, {})
         self.feedback_data = self._load_json(self.feedback_file, {})
 
@@ -41,6 +59,12 @@ class RecommendationAIService:
                 return default
         return default
 
+    def _load_activities(self) -> None:
+        """行動ログを古い順に読み込み、ユーザー別の履歴を構築"""
+        for _, user_id, activity in self.activity_log.iter_since(0):
+            self.user_activities.setdefault(user_id, []).append(activity)
+            self.interactions.add(user_id, activity)
+
     def _save_json(self, file_path: Path, data: dict) -> None:
         """JSONファイル保存"""
         with open(file_path, "w", encoding="utf-8") as f:
@@ -68,8 +92,22 @@ class RecommendationAIService:
             "metadata": metadata or {},
         }
 
+        # 永続化を先に行い、metadata が JSON 化できなければ何も変更しない
+        self.activity_log.append(user_id, activity)
         self.user_activities[user_id].append(activity)
-        self._save_json(self.user_activity_file, self.user_activities)
+        self.interactions.add(user_id, activity)
+        self.activity_version += 1
+
+        for listener in list(self._activity_listeners):
+            listener(user_id, activity)
+
+    def add_activity_listener(self, listener: Callable[[str, Dict], None]) -> None:
+        """行動記録時に呼ばれるコールバックを登録"""
+        self._activity_listeners.append(listener)
+
+    def invalidate_recipe(self, recipe_id: str) -> None:
+        """レシピ更新時にキャッシュ済みの特徴ベクトルを無効化"""
+        self.feature_store.invalidate(recipe_id)
 
     def get_personalized_recommendations(
         self, user_id: str, recipes: List[Dict], limit: int = 10
@@ -92,9 +130,14 @@ class RecommendationAIService:
             # 新規ユーザーにはトレンド推薦
             return self.get_trending_recommendations(recipes, limit)
 
+        # 協調・コンテンツベースのスコアは全候補分をまとめて計算
+        collab_scores = self.interactions.collaborative_scores(user_id)
+        content_scores = self._calculate_content_scores(user_history, recipes)
+        trend_scores = self._trend_scores()
+
         # 各レシピのスコアを計算
         scored_recipes = []
-        for recipe in recipes:
+        for recipe, content_score in zip(recipes, content_scores):
             recipe_id = recipe.get("id", "")
 
             # 既に閲覧済み・却下済みは除外
@@ -102,13 +145,8 @@ class RecommendationAIService:
                 continue
 
             # スコア計算
-            collab_score = self._calculate_collaborative_score(
-                user_id, recipe_id, recipes
-            )
-            content_score = self._calculate_content_score(
-                user_id, recipe, user_history, recipes
-            )
-            trend_score = self._calculate_trend_score(recipe_id)
+            collab_score = collab_scores.get(recipe_id, 0.0)
+            trend_score = trend_scores.get(recipe_id, 0.0)
             diversity_penalty = self._calculate_diversity_penalty(recipe, user_history)
 
             # 重み付け合計
@@ -141,17 +179,36 @@ class RecommendationAIService:
     def get_similar_recipes(
         self, recipe_id: str, recipes: List[Dict], limit: int = 5
     ) -> List[Dict]:
-        """類似レシピを取得（コンテンツベース）"""
-        target_recipe = next((r for r in recipes if r.get("id") == recipe_id), None)
-        if not target_recipe:
+        """
+        類似レシピを取得（コンテンツベース）
+
+        カタログは同じリストが渡される間は再同期しない。
+        LSH_MIN_RECIPES 件以上のカタログでは LSH バケットの候補だけを比較する。
+        """
+        store = self.feature_store
+        store.sync_catalog(recipes)
+        if store.catalog_recipe(recipe_id) is None:
             return []
 
+        target = store.vector(store.row_of(recipe_id))
+
+        pairs = None
+        if store.catalog_size() >= self.LSH_MIN_RECIPES:
+            # 同じ LSH バケットに入ったレシピのみ比較する
+            pairs = store.catalog_rows(store.lsh.candidates(item_id=recipe_id))
+            if len(pairs) < limit:
+                pairs = None
+        if pairs is None:
+            pairs = store.catalog_rows()
+
+        recipes = [recipe for recipe, _ in pairs]
+        similarities = store.scores(target, [row for _, row in pairs])
+
         similar_recipes = []
-        for recipe in recipes:
+        for recipe, similarity in zip(recipes, similarities.tolist()):
             if recipe.get("id") == recipe_id:
                 continue
 
-            similarity = self._calculate_recipe_similarity(target_recipe, recipe)
             similar_recipes.append(
                 {
                     "recipe": recipe,
@@ -164,13 +221,14 @@ class RecommendationAIService:
         return similar_recipes[:limit]
 
     def get_trending_recommendations(
-        self, recipes: List[Dict], limit: int = 10
+        self, recipes: List[Dict], limit: int = 10, days: int = 30
     ) -> List[Dict]:
-        """トレンドレシピを取得"""
+        """トレンドレシピを取得（days: 集計期間の日数）"""
+        trend_scores = self._trend_scores(days)
         trending = []
         for recipe in recipes:
             recipe_id = recipe.get("id", "")
-            trend_score = self._calculate_trend_score(recipe_id)
+            trend_score = trend_scores.get(recipe_id, 0.0)
 
             trending.append(
                 {
@@ -349,112 +407,53 @@ class RecommendationAIService:
         self, user_id: str, recipe_id: str, recipes: List[Dict]
     ) -> float:
         """協調フィルタリングスコア計算"""
-        # 類似ユーザーを見つける
-        similar_users = self._find_similar_users(user_id)
-
-        if not similar_users:
-            return 0.0
-
-        # 類似ユーザーがこのレシピをどう評価したか
-        total_score = 0.0
-        total_weight = 0.0
-
-        for similar_user_id, similarity in similar_users:
-            user_rating = self._get_user_rating_for_recipe(similar_user_id, recipe_id)
-            if user_rating > 0:
-                total_score += user_rating * similarity
-                total_weight += similarity
-
-        if total_weight == 0:
-            return 0.0
-
-        return total_score / total_weight
+        return self.interactions.collaborative_scores(user_id, [recipe_id]).get(
+            recipe_id, 0.0
+        )
 
     def _find_similar_users(
         self, user_id: str, top_n: int = 5
     ) -> List[Tuple[str, float]]:
-        """類似ユーザーを見つける"""
-        user_history = self._get_user_history(user_id)
-        user_recipes = set(a["recipe_id"] for a in user_history)
-
-        if not user_recipes:
-            return []
-
-        similar_users = []
-        for other_user_id in self.user_activities:
-            if other_user_id == user_id:
-                continue
-
-            other_history = self._get_user_history(other_user_id)
-            other_recipes = set(a["recipe_id"] for a in other_history)
-
-            # Jaccard類似度
-            intersection = user_recipes & other_recipes
-            union = user_recipes | other_recipes
-
-            if union:
-                similarity = len(intersection) / len(union)
-                if similarity > 0:
-                    similar_users.append((other_user_id, similarity))
-
-        similar_users.sort(key=lambda x: x[1], reverse=True)
-        return similar_users[:top_n]
+        """類似ユーザーを見つける（Jaccard類似度、行列の近傍キャッシュを使用）"""
+        return self.interactions.similar_users(user_id, top_n)
 
     def _get_user_rating_for_recipe(self, user_id: str, recipe_id: str) -> float:
-        """ユーザーのレシピに対する暗黙的評価"""
-        user_history = self._get_user_history(user_id)
-
-        recipe_activities = [a for a in user_history if a["recipe_id"] == recipe_id]
-
-        if not recipe_activities:
-            return 0.0
-
-        # 行動タイプごとにスコア付与
-        score = 0.0
-        for activity in recipe_activities:
-            activity_type = activity["activity_type"]
-            if activity_type == "cooked":
-                score += 1.0
-            elif activity_type == "favorited":
-                score += 0.8
-            elif activity_type == "rated":
-                # メタデータに評価が含まれている場合
-                rating = activity.get("metadata", {}).get("rating", 0)
-                score += rating / 5.0  # 5段階評価を0-1に正規化
-            elif activity_type == "viewed":
-                score += 0.1
-            elif activity_type == "not_interested":
-                score -= 0.5
-
-        return max(0.0, min(1.0, score))  # 0-1の範囲にクリップ
+        """ユーザーのレシピに対する暗黙的評価（0-1）"""
+        return self.interactions.rating(user_id, recipe_id)
 
     def _calculate_content_score(
         self, user_id: str, recipe: Dict, user_history: List[Dict], recipes: List[Dict]
     ) -> float:
         """コンテンツベースフィルタリングスコア計算"""
-        if not user_history:
-            return 0.0
+        return self._calculate_content_scores(user_history, [recipe], recipes)[0]
 
-        # ユーザーが好んだレシピの特徴を抽出
-        liked_recipes = []
-        for activity in user_history:
-            if activity["activity_type"] in ["cooked", "favorited", "rated"]:
-                recipe_obj = next(
-                    (r for r in recipes if r.get("id") == activity["recipe_id"]), None
-                )
-                if recipe_obj:
-                    liked_recipes.append(recipe_obj)
-
-        if not liked_recipes:
-            return 0.0
+    def _calculate_content_scores(
+        self,
+        user_history: List[Dict],
+        recipes: List[Dict],
+        catalog: Optional[List[Dict]] = None,
+    ) -> List[float]:
+        """
+        候補レシピ全件のコンテンツベーススコアを計算
+
+        好んだレシピ（cooked, favorited, rated）の正規化特徴ベクトルの平均を
+        ユーザープロファイルとし、候補行列との積で
+        「好んだレシピとのコサイン類似度の平均」を一括で求める。
+        好んだレシピは catalog（省略時は recipes）に含まれるものだけを数える。
+        """
+        rows = self.feature_store.sync(recipes)
+        catalog_rows = rows if catalog is None else self.feature_store.sync(catalog)
 
-        # 各レシピとの類似度を計算し、平均を取る
-        similarities = [
-            self._calculate_recipe_similarity(recipe, liked_recipe)
-            for liked_recipe in liked_recipes
+        liked_ids = [
+            a["recipe_id"]
+            for a in user_history
+            if a["activity_type"] in ["cooked", "favorited", "rated"]
         ]
+        profile = self.feature_store.profile_vector(liked_ids, catalog_rows)
+        if profile is None:
+            return [0.0] * len(recipes)
 
-        return sum(similarities) / len(similarities) if similarities else 0.0
+        return self.feature_store.scores(profile, rows).tolist()
 
     def _calculate_recipe_similarity(self, recipe1: Dict, recipe2: Dict) -> float:
         """2つのレシピの類似度を計算（コサイン類似度風）"""
@@ -467,39 +466,7 @@ class RecommendationAIService:
 
     def _extract_recipe_features(self, recipe: Dict) -> Dict[str, float]:
         """レシピから特徴ベクトルを抽出"""
-        features = {}
-
-        # 食材（TF-IDF風の重み付け）
-        for ingredient in recipe.get("ingredients", []):
-            name = ingredient.get("name", "").lower()
-            if name:
-                # 主要食材として重み付け
-                features[f"ingredient:{name}"] = 1.0
-
-        # カテゴリ
-        category = recipe.get("category", "")
-        if category:
-            features[f"category:{category}"] = 2.0  # カテゴリは重要
-
-        # タグ
-        for tag in recipe.get("tags", []):
-            features[f"tag:{tag}"] = 1.5
-
-        # 調理時間（範囲でグループ化）
-        cook_time = recipe.get("cooking_time", 0)
-        if cook_time <= 15:
-            features["time:quick"] = 1.0
-        elif cook_time <= 30:
-            features["time:medium"] = 1.0
-        else:
-            features["time:long"] = 1.0
-
-        # 難易度
-        difficulty = recipe.get("difficulty", "")
-        if difficulty:
-            features[f"difficulty:{difficulty}"] = 1.0
-
-        return features
+        return extract_recipe_features(recipe)
 
     def _cosine_similarity(
         self, features1: Dict[str, float], features2: Dict[str, float]
@@ -523,29 +490,37 @@ class RecommendationAIService:
 
         return dot_product / (norm1 * norm2)
 
-    def _calculate_trend_score(self, recipe_id: str) -> float:
+    def _calculate_trend_score(self, recipe_id: str, days: int = 30) -> float:
         """トレンドスコア計算（直近の人気度）"""
-        # 全ユーザーの直近30日のアクティビティをカウント
-        recent_activities = 0
-        total_users = 0
-
-        for user_id, activities in self.user_activities.items():
-            total_users += 1
-            recent_recipe_activities = [
-                a
-                for a in activities
-                if a["recipe_id"] == recipe_id
-                and self._is_recent(a["timestamp"], days=30)
-            ]
-            recent_activities += len(recent_recipe_activities)
-
-        # 正規化（最大1.0）
-        if total_users == 0:
-            return 0.0
+        return self._trend_scores(days).get(recipe_id, 0.0)
+
+    def _trend_scores(self, days: int = 30) -> Dict[str, float]:
+        """
+        全レシピのトレンドスコアを行動ログの1回の走査で計算
 
-        # ユーザー数で正規化
-        normalized_score = recent_activities / max(total_users, 1)
-        return min(normalized_score, 1.0)
+        直近 days 日のアクティビティ数をユーザー数で正規化する（最大1.0）
+        """
+        # 記録中に辞書が伸びても走査できるようにコピーしておく
+        histories = list(self.user_activities.values())
+        if not histories:
+            return {}
+
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        counts: Dict[str, int] = defaultdict(int)
+        for activities in histories:
+            for activity in activities:
+                try:
+                    timestamp = datetime.fromisoformat(activity["timestamp"])
+                except Exception:
+                    continue
+                if timestamp >= cutoff:
+                    counts[activity["recipe_id"]] += 1
+
+        total_users = len(histories)
+        return {
+            recipe_id: min(count / total_users, 1.0)
+            for recipe_id, count in counts.items()
+        }
 
     def _calculate_diversity_penalty(
         self, recipe: Dict, user_history: List[Dict]
@@ -4,9 +4,12 @@
 材料ベースのレシピ推薦システムを提供する。
 """
 
-from typing import List, Dict, Any, Set
+import threading
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
 from dataclasses import dataclass
 
+from backend.services.minhash_index import MinHashLSHIndex
+
 
 @dataclass
 class RecommendationResult:
@@ -124,20 +127,330 @@ class IngredientNormalizer:
         )
 
 
+def extract_recipe_ingredients(recipe: Dict[str, Any]) -> List[str]:
+    """
+    レシピから材料リストを抽出
+
+    Args:
+      recipe: レシピデータ
+
+    Returns:
+      材料リスト
+    """
+    ingredients = []
+
+    # レシピ構造に応じて材料を抽出
+    if "ingredients" in recipe:
+        ingredient_data = recipe["ingredients"]
+
+        # リスト形式の場合
+        if isinstance(ingredient_data, list):
+            for item in ingredient_data:
+                if isinstance(item, str):
+                    ingredients.append(item)
+                elif isinstance(item, dict) and "name" in item:
+                    ingredients.append(item["name"])
+
+        # 辞書形式の場合
+        elif isinstance(ingredient_data, dict):
+            for key, value in ingredient_data.items():
+                if isinstance(value, str):
+                    ingredients.append(key)
+
+    return ingredients
+
+
+@dataclass
+class IndexedRecipe:
+    """索引済みレシピ（正規化済み材料と重みを保持）"""
+
+    recipe: Dict[str, Any]
+    position: int
+    # (元の材料名, 正規化済み材料名, 重み)
+    ingredients: List[Tuple[str, str, float]]
+    total_weight: float
+
+
+class IngredientIndex:
+    """
+    材料の転置索引
+
+    正規化済み材料名 → レシピキーのポスティングリストと、
+    レシピごとの正規化済み材料・重み合計を事前計算して保持する。
+    類似レシピの近似検索用に、材料・タグ集合の MinHash/LSH 索引も併せて
+    更新する。レシピ一覧の差分更新に対応し、リクエスト間で共有できる。
+    """
+
+    MAIN_INGREDIENT_WEIGHT = 1.0
+    SEASONING_WEIGHT = 0.3
+
+    def __init__(self, recipes: Optional[List[Dict[str, Any]]] = None):
+        """
+        Args:
+          recipes: 初期レシピリスト
+        """
+        self.normalizer = IngredientNormalizer()
+        self._lock = threading.RLock()
+        self._entries: Dict[str, IndexedRecipe] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        # 材料数 → レシピキー（不足材料数での絞り込み用）
+        self._by_size: Dict[int, Set[str]] = {}
+        self._normalized: Dict[str, Tuple[str, float]] = {}
+        self._ordered: Optional[List[Tuple[str, IndexedRecipe]]] = None
+        self.lsh = MinHashLSHIndex()
+        if recipes:
+            self.refresh(recipes)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def recipe_key(recipe: Dict[str, Any], position: int) -> str:
+        """レシピの索引キー（IDがなければ位置）"""
+        recipe_id = recipe.get("id")
+        return str(recipe_id) if recipe_id is not None else f"#{position}"
+
+    def _normalize(self, ingredient: str) -> Tuple[str, float]:
+        """材料名を正規化し、重みとともに返す（結果はキャッシュ）"""
+        cached = self._normalized.get(ingredient)
+        if cached is None:
+            normalized = self.normalizer.normalize(ingredient)
+            weight = (
+                self.SEASONING_WEIGHT
+                if self.normalizer.is_seasoning(normalized)
+                else self.MAIN_INGREDIENT_WEIGHT
+            )
+            cached = (normalized, weight)
+            self._normalized[ingredient] = cached
+        return cached
+
+    def _unlink(self, key: str, entry: IndexedRecipe) -> None:
+        """ポスティングリストからレシピを外す"""
+        for normalized in {n for _, n, _ in entry.ingredients}:
+            posting = self._postings.get(normalized)
+            if posting is not None:
+                posting.discard(key)
+                if not posting:
+                    del self._postings[normalized]
+        size = self._by_size.get(len(entry.ingredients))
+        if size is not None:
+            size.discard(key)
+
+    def upsert(self, recipe: Dict[str, Any], position: int) -> None:
+        """
+        レシピを追加・更新（材料が変わっていなければ再索引しない）
+
+        Args:
+          recipe: レシピデータ
+          position: レシピ一覧内の位置（同点時の順序に使用）
+        """
+        key = self.recipe_key(recipe, position)
+        names = extract_recipe_ingredients(recipe)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and [i for i, _, _ in entry.ingredients] == names:
+                if entry.position != position:
+                    self._ordered = None
+                entry.recipe = recipe
+                entry.position = position
+                self.lsh.add(key, self.similarity_tokens(entry))
+                return
+
+            self._ordered = None
+            if entry is not None:
+                self._unlink(key, entry)
+                del self._entries[key]
+
+            if not names:
+                self.lsh.remove(key)
+                return
+
+            ingredients = [(name, *self._normalize(name)) for name in names]
+            entry = IndexedRecipe(
+                recipe=recipe,
+                position=position,
+                ingredients=ingredients,
+                total_weight=sum(weight for _, _, weight in ingredients),
+            )
+            self._entries[key] = entry
+            for _, normalized, _ in ingredients:
+                self._postings.setdefault(normalized, set()).add(key)
+            self._by_size.setdefault(len(ingredients), set()).add(key)
+            self.lsh.add(key, self.similarity_tokens(entry))
+
+    def remove(self, key: str) -> None:
+        """
+        レシピを索引から削除
+
+        Args:
+          key: レシピキー
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._unlink(key, entry)
+                self.lsh.remove(key)
+                self._ordered = None
+
+    def refresh(self, recipes: List[Dict[str, Any]]) -> None:
+        """
+        レシピ一覧と索引を同期（変更分のみ再索引）
+
+        Args:
+          recipes: 最新のレシピリスト
+        """
+        with self._lock:
+            keys = set()
+            for position, recipe in enumerate(recipes):
+                keys.add(self.recipe_key(recipe, position))
+                self.upsert(recipe, position)
+            for key in [k for k in self._entries if k not in keys]:
+                self.remove(key)
+
+    @staticmethod
+    def similarity_tokens(entry: IndexedRecipe) -> Set[str]:
+        """MinHash 用のトークン集合（正規化済み材料とタグ）"""
+        tokens = {f"ingredient:{normalized}" for _, normalized, _ in entry.ingredients}
+        tags = entry.recipe.get("tags") or []
+        if isinstance(tags, list):
+            tokens.update(f"tag:{tag}" for tag in tags if isinstance(tag, str))
+        return tokens
+
+    def get(self, key: str) -> Optional[IndexedRecipe]:
+        """索引済みレシピを取得"""
+        return self._entries.get(key)
+
+    def normalize_all(self, ingredients: Iterable[str]) -> Set[str]:
+        """材料リストを正規化済みセットに変換"""
+        return {self._normalize(ing)[0] for ing in ingredients}
+
+    def candidates(self, normalized: Set[str]) -> Set[str]:
+        """
+        材料を1つ以上共有するレシピのキーを取得
+
+        Args:
+          normalized: 正規化済み材料セット
+
+        Returns:
+          レシピキーのセット
+        """
+        keys: Set[str] = set()
+        for ingredient in normalized:
+            keys |= self._postings.get(ingredient, set())
+        return keys
+
+    def keys_with_at_most(self, count: int) -> Set[str]:
+        """材料数が count 以下のレシピのキーを取得"""
+        keys: Set[str] = set()
+        for size, members in self._by_size.items():
+            if size <= count:
+                keys |= members
+        return keys
+
+    def entries(self) -> List[Tuple[str, IndexedRecipe]]:
+        """全ての索引済みレシピを位置順で取得"""
+        with self._lock:
+            if self._ordered is None:
+                self._ordered = sorted(
+                    self._entries.items(), key=lambda item: item[1].position
+                )
+            return self._ordered
+
+    def find(self, recipe_id: Any) -> Optional[Tuple[str, IndexedRecipe]]:
+        """
+        レシピIDから索引済みレシピを検索
+
+        Args:
+          recipe_id: レシピID
+
+        Returns:
+          (キー, 索引済みレシピ)。見つからなければ None
+        """
+        entry = self._entries.get(str(recipe_id))
+        if entry is not None and entry.recipe.get("id") == recipe_id:
+            return str(recipe_id), entry
+        return next(
+            (
+                (key, entry)
+                for key, entry in self.entries()
+                if entry.recipe.get("id") == recipe_id
+            ),
+            None,
+        )
+
+
 class RecommendationService:
     """レシピ推薦サービス"""
 
     # スコアリングの重み
-    MAIN_INGREDIENT_WEIGHT = 1.0
-    SEASONING_WEIGHT = 0.3
+    MAIN_INGREDIENT_WEIGHT = IngredientIndex.MAIN_INGREDIENT_WEIGHT
+    SEASONING_WEIGHT = IngredientIndex.SEASONING_WEIGHT
 
-    def __init__(self, recipes: List[Dict[str, Any]]):
+    # この件数以上のカタログでは類似レシピを LSH で近似検索する
+    LSH_MIN_RECIPES = 1000
+
+    def __init__(
+        self,
+        recipes: List[Dict[str, Any]],
+        index: Optional[IngredientIndex] = None,
+    ):
         """
         Args:
           recipes: レシピリスト
+          index: 共有する材料索引（省略時は recipes から構築）
         """
         self.recipes = recipes
         self.normalizer = IngredientNormalizer()
+        if index is None:
+            index = IngredientIndex(recipes)
+        self.index = index
+
+    def refresh(self, recipes: List[Dict[str, Any]]) -> None:
+        """
+        レシピ一覧を差し替え、索引を差分更新
+
+        Args:
+          recipes: 最新のレシピリスト
+        """
+        self.recipes = recipes
+        self.index.refresh(recipes)
+
+    def _match_indexed(
+        self, entry: IndexedRecipe, available_ingredients: Set[str]
+    ) -> RecommendationResult:
+        """索引済みレシピのマッチングスコアを計算"""
+        matched_ingredients: List[str] = []
+        missing_ingredients: List[str] = []
+        matched_weight = 0.0
+
+        for ingredient, normalized, weight in entry.ingredients:
+            if normalized in available_ingredients:
+                matched_ingredients.append(ingredient)
+                matched_weight += weight
+            else:
+                missing_ingredients.append(ingredient)
+
+        return self._build_result(
+            entry.recipe,
+            matched_ingredients,
+            missing_ingredients,
+            matched_weight,
+            entry.total_weight,
+        )
+
+    def _score_keys(
+        self, keys: Iterable[str], available_ingredients: Set[str]
+    ) -> List[Tuple[int, RecommendationResult]]:
+        """キーごとにマッチングし、(位置, 結果) のリストを返す"""
+        scored = []
+        for key in keys:
+            entry = self.index.get(key)
+            if entry is not None:
+                scored.append(
+                    (entry.position, self._match_indexed(entry, available_ingredients))
+                )
+        return scored
 
     def recommend_by_ingredients(
         self,
@@ -157,37 +470,30 @@ class RecommendationService:
           推薦結果リスト（スコア降順）
         """
         # 材料を正規化
-        normalized_available = {
-            self.normalizer.normalize(ing) for ing in available_ingredients
-        }
+        normalized_available = self.index.normalize_all(available_ingredients)
 
-        results: List[RecommendationResult] = []
+        # 材料を共有しないレシピはスコア0のため、min_score > 0 なら索引で絞り込む
+        if min_score > 0:
+            keys = self.index.candidates(normalized_available)
+        else:
+            keys = [key for key, _ in self.index.entries()]
 
-        for recipe in self.recipes:
-            # レシピの材料を取得
-            recipe_ingredients = self._extract_recipe_ingredients(recipe)
-
-            if not recipe_ingredients:
-                continue
-
-            # マッチング計算
-            result = self._calculate_match(
-                recipe=recipe,
-                recipe_ingredients=recipe_ingredients,
-                available_ingredients=normalized_available,
-            )
+        scored = [
+            item
+            for item in self._score_keys(keys, normalized_available)
+            if item[1].match_score >= min_score
+        ]
 
-            # スコアが基準以上なら追加
-            if result.match_score >= min_score:
-                results.append(result)
+        # スコア降順でソート（同点はレシピ一覧の順）
+        scored.sort(key=lambda x: (-x[1].match_score, x[0]))
 
-        # スコア降順でソート
-        results.sort(key=lambda x: x.match_score, reverse=True)
-
-        return results[:max_results]
+        return [result for _, result in scored[:max_results]]
 
     def recommend_similar(
-        self, target_recipe_id: str, max_results: int = 5
+        self,
+        target_recipe_id: str,
+        max_results: int = 5,
+        approximate: Optional[bool] = None,
     ) -> List[RecommendationResult]:
         """
         類似レシピを推薦
@@ -195,57 +501,62 @@ class RecommendationService:
         Args:
           target_recipe_id: 対象レシピID
           max_results: 最大結果数
+          approximate: LSH の候補のみを評価するか
+            （None の場合はカタログが LSH_MIN_RECIPES 件以上なら近似）
 
         Returns:
           推薦結果リスト（類似度降順）
         """
         # 対象レシピを検索
-        target_recipe = None
-        for recipe in self.recipes:
-            if recipe.get("id") == target_recipe_id:
-                target_recipe = recipe
-                break
+        found = self.index.find(target_recipe_id)
 
-        if not target_recipe:
+        if found is None:
             return []
 
-        # 対象レシピの材料を取得
-        target_ingredients = self._extract_recipe_ingredients(target_recipe)
-
-        if not target_ingredients:
-            return []
+        target_key, target = found
 
         # 正規化された材料セット
-        normalized_target = {
-            self.normalizer.normalize(ing) for ing in target_ingredients
-        }
-
-        results: List[RecommendationResult] = []
-
-        for recipe in self.recipes:
-            # 同じレシピはスキップ
-            if recipe.get("id") == target_recipe_id:
-                continue
-
-            # レシピの材料を取得
-            recipe_ingredients = self._extract_recipe_ingredients(recipe)
-
-            if not recipe_ingredients:
+        normalized_target = {normalized for _, normalized, _ in target.ingredients}
+
+        if approximate is None:
+            approximate = len(self.index) >= self.LSH_MIN_RECIPES
+
+        # 近似: LSH で同じバケットに入ったレシピのみ評価する
+        if approximate:
+            keys = self.index.lsh.candidates(item_id=target_key)
+            scored = [
+                item
+                for item in self._score_keys(keys, normalized_target)
+                if item[1].recipe.get("id") != target_recipe_id
+            ]
+            if len(scored) >= max_results:
+                scored.sort(key=lambda x: (-x[1].match_score, x[0]))
+                return [result for _, result in scored[:max_results]]
+
+        # 材料を共有するレシピのみスコアを計算
+        keys = self.index.candidates(normalized_target)
+        scored = [
+            item
+            for item in self._score_keys(keys, normalized_target)
+            if item[1].recipe.get("id") != target_recipe_id
+        ]
+
+        # 足りない分は材料を共有しない（スコア0の）レシピで一覧順に補う
+        fillers = max_results - len(scored)
+        for key, entry in self.index.entries():
+            if fillers <= 0:
+                break
+            if key in keys or entry.recipe.get("id") == target_recipe_id:
                 continue
-
-            # マッチング計算
-            result = self._calculate_match(
-                recipe=recipe,
-                recipe_ingredients=recipe_ingredients,
-                available_ingredients=normalized_target,
+            scored.append(
+                (entry.position, self._match_indexed(entry, normalized_target))
             )
+            fillers -= 1
 
-            results.append(result)
-
-        # スコア降順でソート
-        results.sort(key=lambda x: x.match_score, reverse=True)
+        # スコア降順でソート（同点はレシピ一覧の順）
+        scored.sort(key=lambda x: (-x[1].match_score, x[0]))
 
-        return results[:max_results]
+        return [result for _, result in scored[:max_results]]
 
     def what_can_i_make(
         self, available_ingredients: List[str], allow_missing: int = 2
@@ -261,34 +572,25 @@ class RecommendationService:
           推薦結果リスト（不足材料数昇順、スコア降順）
         """
         # 材料を正規化
-        normalized_available = {
-            self.normalizer.normalize(ing) for ing in available_ingredients
-        }
-
-        results: List[RecommendationResult] = []
+        normalized_available = self.index.normalize_all(available_ingredients)
 
-        for recipe in self.recipes:
-            # レシピの材料を取得
-            recipe_ingredients = self._extract_recipe_ingredients(recipe)
+        # 材料を共有するレシピに加え、材料数が許容数以下のレシピのみ対象
+        keys = self.index.candidates(normalized_available)
+        keys |= self.index.keys_with_at_most(allow_missing)
 
-            if not recipe_ingredients:
-                continue
-
-            # マッチング計算
-            result = self._calculate_match(
-                recipe=recipe,
-                recipe_ingredients=recipe_ingredients,
-                available_ingredients=normalized_available,
-            )
-
-            # 不足材料が許容範囲内なら追加
-            if len(result.missing_ingredients) <= allow_missing:
-                results.append(result)
+        # 不足材料が許容範囲内なら追加
+        scored = [
+            item
+            for item in self._score_keys(keys, normalized_available)
+            if len(item[1].missing_ingredients) <= allow_missing
+        ]
 
         # 不足材料数昇順、スコア降順でソート
-        results.sort(key=lambda x: (len(x.missing_ingredients), -x.match_score))
+        scored.sort(
+            key=lambda x: (len(x[1].missing_ingredients), -x[1].match_score, x[0])
+        )
 
-        return results
+        return [result for _, result in scored]
 
     def _extract_recipe_ingredients(self, recipe: Dict[str, Any]) -> List[str]:
         """
@@ -300,27 +602,7 @@ class RecommendationService:
         Returns:
           材料リスト
         """
-        ingredients = []
-
-        # レシピ構造に応じて材料を抽出
-        if "ingredients" in recipe:
-            ingredient_data = recipe["ingredients"]
-
-            # リスト形式の場合
-            if isinstance(ingredient_data, list):
-                for item in ingredient_data:
-                    if isinstance(item, str):
-                        ingredients.append(item)
-                    elif isinstance(item, dict) and "name" in item:
-                        ingredients.append(item["name"])
-
-            # 辞書形式の場合
-            elif isinstance(ingredient_data, dict):
-                for key, value in ingredient_data.items():
-                    if isinstance(value, str):
-                        ingredients.append(key)
-
-        return ingredients
+        return extract_recipe_ingredients(recipe)
 
     def _calculate_match(
         self,
@@ -363,14 +645,30 @@ class RecommendationService:
             else:
                 missing_ingredients.append(ingredient)
 
+        return self._build_result(
+            recipe,
+            matched_ingredients,
+            missing_ingredients,
+            matched_weight,
+            total_weight,
+        )
+
+    def _build_result(
+        self,
+        recipe: Dict[str, Any],
+        matched_ingredients: List[str],
+        missing_ingredients: List[str],
+        matched_weight: float,
+        total_weight: float,
+    ) -> RecommendationResult:
+        """マッチング結果から推薦結果を作成"""
         # スコア計算
         match_score = matched_weight / total_weight if total_weight > 0 else 0.0
 
         # パーセンテージ計算
+        total_count = len(matched_ingredients) + len(missing_ingredients)
         match_percentage = (
-            len(matched_ingredients) / len(recipe_ingredients) * 100
-            if recipe_ingredients
-            else 0.0
+            len(matched_ingredients) / total_count * 100 if total_count else 0.0
         )
 
         return RecommendationResult(
@@ -0,0 +1,377 @@
+"""
+推薦結果の事前計算（マテリアライズ）サービス
+
+パーソナライズ推薦・トレンド・類似レシピをバックグラウンドスレッドで
+事前に計算し、バージョン付きのスナップショットとして保持する。
+API リクエストはスナップショットを切り出して返すだけなので、
+応答時間はカタログ件数・ユーザー数に依存しない。
+
+- 行動が記録されると該当ユーザーを更新待ちにし、短い待ち時間の後に
+  そのユーザーとトレンドだけを再計算する（増分更新）
+- 一定間隔で直近に行動したユーザー全員・トレンドを再計算する
+- 類似レシピは最初に要求されたときにレシピごとに計算し、カタログが変わるまで保持する
+- 起動時の初回計算（ウォームアップ）はバックグラウンドスレッドで行う
+- バージョンは「カタログのハッシュ.行動ログの件数」で表す
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set
+
+from backend.services.recommendation_ai_service import RecommendationAIService
+
+logger = logging.getLogger(__name__)
+
+# トレンドの集計期間（ウィンドウ名 → 日数）
+TRENDING_WINDOWS: Dict[str, int] = {"24h": 1, "7d": 7, "30d": 30}
+DEFAULT_TRENDING_WINDOW = "30d"
+
+
+@dataclass
+class Snapshot:
+    """事前計算済みの推薦結果"""
+
+    version: str
+    generated_at: str
+    items: List[Dict] = field(default_factory=list)
+
+    def head(self, limit: int) -> List[Dict]:
+        """先頭 limit 件を取得"""
+        return self.items[:limit]
+
+
+class RecommendationMaterializer:
+    """推薦スナップショットの生成・保持"""
+
+    def __init__(
+        self,
+        service: RecommendationAIService,
+        recipe_source: Callable[[], List[Dict]],
+        top_n: int = 50,
+        similar_top_n: int = 20,
+        refresh_interval: float = 300.0,
+        trending_interval: float = 30.0,
+        debounce: float = 0.5,
+        active_days: int = 30,
+    ):
+        """
+        初期化
+
+        Args:
+          service: 推薦計算に使う RecommendationAIService
+          recipe_source: 現在のレシピ一覧を返す関数
+          top_n: ユーザー・トレンドごとに保持する件数
+          similar_top_n: レシピごとに保持する類似レシピ件数
+          refresh_interval: 全体を再計算する間隔（秒）
+          trending_interval: トレンドを再計算する最短間隔（秒）
+          debounce: 行動記録から増分更新までの待ち時間（秒）
+          active_days: 全体再計算の対象とするユーザーの最終行動からの日数
+        """
+        self.service = service
+        self.recipe_source = recipe_source
+        self.top_n = top_n
+        self.similar_top_n = similar_top_n
+        self.refresh_interval = refresh_interval
+        self.trending_interval = trending_interval
+        self.debounce = debounce
+        self.active_days = active_days
+
+        self._lock = threading.RLock()
+        # カタログの読み直しを1スレッドずつに制限する
+        self._catalog_lock = threading.Lock()
+        self._recipes: List[Dict] = []
+        self._recipe_ids: Set[str] = set()
+        self._catalog_version = ""
+        self._personalized: Dict[str, Snapshot] = {}
+        self._trending: Dict[str, Snapshot] = {}
+        self._similar: Dict[str, Snapshot] = {}
+
+        self._dirty_users: Set[str] = set()
+        self._trending_dirty = True
+        self._trending_refreshed_at = 0.0
+
+        self._wake = threading.Event()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        service.add_activity_listener(self._on_activity)
+
+    # === バージョン ===
+
+    @staticmethod
+    def catalog_hash(recipes: List[Dict]) -> str:
+        """レシピ一覧の内容から短いハッシュを計算"""
+        payload = json.dumps(recipes, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=6).hexdigest()
+
+    @property
+    def version(self) -> str:
+        """現在のバージョンタグ"""
+        return f"{self._catalog_version}.{self.service.activity_version}"
+
+    def _snapshot(self, items: List[Dict]) -> Snapshot:
+        return Snapshot(
+            version=self.version,
+            generated_at=datetime.utcnow().isoformat(),
+            items=items,
+        )
+
+    # === 更新 ===
+
+    def _on_activity(self, user_id: str, activity: Dict) -> None:
+        """行動記録の通知を受けて増分更新を予約"""
+        with self._lock:
+            self._trending_dirty = True
+        self.enqueue(user_id)
+
+    def enqueue(self, user_id: str) -> None:
+        """ユーザーを更新待ちに追加"""
+        with self._lock:
+            self._dirty_users.add(user_id)
+        self._wake.set()
+
+    def refresh_catalog(self) -> bool:
+        """
+        レシピ一覧を読み直し、内容が変わっていれば全スナップショットを更新対象にする
+
+        Returns:
+          カタログが変わったかどうか
+        """
+        with self._catalog_lock:
+            recipes = self.recipe_source()
+            catalog_version = self.catalog_hash(recipes)
+            if catalog_version == self._catalog_version:
+                return False
+
+            with self._lock:
+                self._recipes = recipes
+                self._recipe_ids = {recipe.get("id") for recipe in recipes}
+                self._catalog_version = catalog_version
+                self._dirty_users.update(self._personalized)
+                self._trending_dirty = True
+                # 類似レシピは次に要求されたときに新しいカタログで計算する
+                self._similar = {}
+            return True
+
+    def refresh_user(self, user_id: str) -> Snapshot:
+        """1ユーザー分のパーソナライズ推薦を再計算"""
+        items = self.service.get_personalized_recommendations(
+            user_id=user_id, recipes=self._recipes, limit=self.top_n
+        )
+        snapshot = self._snapshot(items)
+        with self._lock:
+            self._personalized[user_id] = snapshot
+        return snapshot
+
+    def refresh_trending(self) -> None:
+        """全ウィンドウのトレンドを再計算"""
+        with self._lock:
+            self._trending_dirty = False
+        snapshots = {
+            window: self._snapshot(
+                self.service.get_trending_recommendations(
+                    recipes=self._recipes, limit=self.top_n, days=days
+                )
+            )
+            for window, days in TRENDING_WINDOWS.items()
+        }
+        with self._lock:
+            self._trending.update(snapshots)
+            self._trending_refreshed_at = time.monotonic()
+
+    def refresh_similar(self, recipe_id: str) -> Snapshot:
+        """1レシピ分の類似レシピを計算（LSH バケットの候補のみ比較する）"""
+        with self._lock:
+            recipes = self._recipes
+            catalog_version = self._catalog_version
+        snapshot = self._snapshot(
+            self.service.get_similar_recipes(
+                recipe_id=recipe_id, recipes=recipes, limit=self.similar_top_n
+            )
+        )
+        with self._lock:
+            # 計算中にカタログが変わった場合は古い結果を保存しない
+            if catalog_version == self._catalog_version:
+                self._similar[recipe_id] = snapshot
+        return snapshot
+
+    def refresh_pending(self, force_trending: bool = False) -> int:
+        """
+        更新待ちのユーザーとトレンドを再計算
+
+        Args:
+          force_trending: 最短間隔に関係なくトレンドを再計算するか
+
+        Returns:
+          再計算したユーザー数
+        """
+        if not self._catalog_version:
+            self.refresh_catalog()
+
+        with self._lock:
+            users = list(self._dirty_users)
+            self._dirty_users.clear()
+            trending_due = force_trending or (
+                self._trending_dirty
+                and (
+                    not self._trending
+                    or time.monotonic() - self._trending_refreshed_at
+                    >= self.trending_interval
+                )
+            )
+
+        for user_id in users:
+            self.refresh_user(user_id)
+        if trending_due:
+            self.refresh_trending()
+        return len(users)
+
+    def active_users(self) -> List[str]:
+        """直近 active_days 日以内に行動したユーザー"""
+        cutoff = (datetime.utcnow() - timedelta(days=self.active_days)).isoformat()
+        return [
+            user_id
+            for user_id, activities in list(self.service.user_activities.items())
+            if activities and activities[-1].get("timestamp", "") >= cutoff
+        ]
+
+    def refresh_all(self) -> None:
+        """カタログ・アクティブユーザー・トレンドをすべて再計算"""
+        self.refresh_catalog()
+        with self._lock:
+            self._dirty_users.update(self.active_users())
+        self.refresh_pending(force_trending=True)
+
+    # === 取得 ===
+
+    def get_personalized(self, user_id: str, limit: int = 10) -> Snapshot:
+        """
+        パーソナライズ推薦を取得
+
+        スナップショットが未作成のユーザーは更新を予約し、
+        作成されるまではトレンドを返す
+        """
+        with self._lock:
+            snapshot = self._personalized.get(user_id)
+        if snapshot is None:
+            if user_id in self.service.user_activities:
+                self.enqueue(user_id)
+            snapshot = self.get_trending(DEFAULT_TRENDING_WINDOW, limit)
+        return Snapshot(snapshot.version, snapshot.generated_at, snapshot.head(limit))
+
+    def get_trending(
+        self, window: str = DEFAULT_TRENDING_WINDOW, limit: int = 10
+    ) -> Snapshot:
+        """
+        トレンドを取得
+
+        Raises:
+          KeyError: 未対応のウィンドウ
+        """
+        if window not in TRENDING_WINDOWS:
+            raise KeyError(window)
+        with self._lock:
+            snapshot = self._trending.get(window)
+        if snapshot is None:
+            # 起動直後のみ同期的に作成する
+            self.refresh_catalog()
+            self.refresh_trending()
+            snapshot = self._trending[window]
+        return Snapshot(snapshot.version, snapshot.generated_at, snapshot.head(limit))
+
+    def get_similar(self, recipe_id: str, limit: int = 5) -> Optional[Snapshot]:
+        """
+        類似レシピを取得
+
+        未計算のレシピはその場で計算し、カタログが変わるまで保持する。
+
+        Returns:
+          スナップショット（レシピが存在しない場合は None）
+        """
+        if not self._catalog_version:
+            self.refresh_catalog()
+        with self._lock:
+            if recipe_id not in self._recipe_ids:
+                return None
+            snapshot = self._similar.get(recipe_id)
+        if snapshot is None:
+            snapshot = self.refresh_similar(recipe_id)
+        return Snapshot(snapshot.version, snapshot.generated_at, snapshot.head(limit))
+
+    # === バックグラウンド実行 ===
+
+    def _run_loop(self, warm_up: bool = False) -> None:
+        """更新スレッドのメインループ"""
+        logger.info("Recommendation materializer started")
+
+        if warm_up:
+            try:
+                self.refresh_all()
+            except Exception as e:
+                logger.error(f"Materializer warm-up error: {e}")
+
+        while self._running:
+            woken = self._wake.wait(timeout=self.refresh_interval)
+            if not self._running:
+                break
+            try:
+                if woken:
+                    # 連続した行動記録をまとめて反映する
+                    time.sleep(self.debounce)
+                    self._wake.clear()
+                    self.refresh_pending()
+                else:
+                    self.refresh_all()
+            except Exception as e:
+                logger.error(f"Materializer error: {e}")
+
+        logger.info("Recommendation materializer stopped")
+
+    def start(self, warm_up: bool = True) -> None:
+        """
+        バックグラウンド更新を開始
+
+        すぐに戻り、ウォームアップは更新スレッドで行う。
+        ウォームアップ完了前の取得は必要な分だけその場で計算する。
+
+        Args:
+          warm_up: 最初にアクティブユーザー・トレンドを計算しておくか
+        """
+        if self._running:
+            return
+
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run_loop, args=(warm_up,), daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """バックグラウンド更新を停止"""
+        self._running = False
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def get_stats(self) -> Dict:
+        """スナップショットの状態を取得"""
+        with self._lock:
+            return {
+                "version": self.version,
+                "running": self._running,
+                "recipes": len(self._recipes),
+                "personalized": len(self._personalized),
+                "trending_windows": sorted(self._trending),
+                "similar": len(self._similar),
+                "pending_users": len(self._dirty_users),
+            }
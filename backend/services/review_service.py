@@ -3,14 +3,14 @@ Review service for Personal Recipe Intelligence.
 レビュー・評価機能のビジネスロジック
 """
 
-import json
 import html
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 from uuid import uuid4
 
 from backend.models.review import Review, RecipeRatingSummary
+from backend.services.review_store import ReviewStore
 
 
 class ReviewService:
@@ -25,32 +25,29 @@ class ReviewService:
         """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
-        self.reviews_file = self.data_dir / "reviews.json"
-        self._ensure_data_file()
-
-    def _ensure_data_file(self) -> None:
-        """データファイルが存在しない場合は作成"""
-        if not self.reviews_file.exists():
-            self._save_reviews([])
-
-    def _load_reviews(self) -> list[Review]:
-        """レビューをファイルから読み込み"""
-        try:
-            with open(self.reviews_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return [Review.from_dict(item) for item in data]
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
-
-    def _save_reviews(self, reviews: list[Review]) -> None:
-        """レビューをファイルに保存"""
-        with open(self.reviews_file, "w", encoding="utf-8") as f:
-            json.dump(
-                [review.to_dict() for review in reviews],
-                f,
-                ensure_ascii=False,
-                indent=2,
-            )
+        self.store = ReviewStore(self.data_dir / "reviews.db")
+
+        # 旧形式の JSON ファイルがあれば一度だけ取り込む
+        legacy_file = self.data_dir / "reviews.json"
+        if legacy_file.exists() and self.store.count() == 0:
+            self.store.import_json(legacy_file)
+
+    def _get_owned_review(self, review_id: str, user_id: str) -> Review:
+        """
+        本人のレビューを取得
+
+        Raises:
+            ValueError: レビューが見つからない、または権限がない場合
+        """
+        review = self.store.get(review_id)
+
+        if not review:
+            raise ValueError("Review not found")
+
+        if review.user_id != user_id:
+            raise ValueError("Permission denied")
+
+        return review
 
     def _sanitize_comment(self, comment: str) -> str:
         """
@@ -93,16 +90,6 @@ class ReviewService:
         if not (1 <= rating <= 5):
             raise ValueError("Rating must be between 1 and 5")
 
-        reviews = self._load_reviews()
-
-        # 既にレビュー済みかチェック
-        existing = next(
-            (r for r in reviews if r.recipe_id == recipe_id and r.user_id == user_id),
-            None,
-        )
-        if existing:
-            raise ValueError("User has already reviewed this recipe")
-
         # サニタイズ
         sanitized_comment = self._sanitize_comment(comment)
 
@@ -119,8 +106,8 @@ class ReviewService:
             updated_at=None,
         )
 
-        reviews.append(review)
-        self._save_reviews(reviews)
+        # 既にレビュー済みの場合は一意制約により ValueError
+        self.store.insert(review)
 
         return review
 
@@ -138,24 +125,8 @@ class ReviewService:
         Returns:
             レビューリスト
         """
-        reviews = self._load_reviews()
-        recipe_reviews = [r for r in reviews if r.recipe_id == recipe_id]
-
-        # ソート
-        if sort_by == "rating":
-            recipe_reviews.sort(key=lambda x: (-x.rating, -x.created_at.timestamp()))
-        elif sort_by == "helpful":
-            recipe_reviews.sort(
-                key=lambda x: (-x.helpful_count, -x.created_at.timestamp())
-            )
-        else:  # recent
-            recipe_reviews.sort(key=lambda x: -x.created_at.timestamp())
-
-        # 制限
-        if limit:
-            recipe_reviews = recipe_reviews[:limit]
-
-        return recipe_reviews
+        # ソート・件数制限は索引を使って SQL で行う
+        return self.store.list_by_recipe(recipe_id, sort_by, limit)
 
     def get_user_reviews(self, user_id: str) -> list[Review]:
         """
@@ -167,10 +138,7 @@ class ReviewService:
         Returns:
             レビューリスト
         """
-        reviews = self._load_reviews()
-        user_reviews = [r for r in reviews if r.user_id == user_id]
-        user_reviews.sort(key=lambda x: -x.created_at.timestamp())
-        return user_reviews
+        return self.store.list_by_user(user_id)
 
     def update_review(
         self,
@@ -194,14 +162,7 @@ class ReviewService:
         Raises:
             ValueError: レビューが見つからない、または権限がない場合
         """
-        reviews = self._load_reviews()
-        review = next((r for r in reviews if r.id == review_id), None)
-
-        if not review:
-            raise ValueError("Review not found")
-
-        if review.user_id != user_id:
-            raise ValueError("Permission denied")
+        review = self._get_owned_review(review_id, user_id)
 
         # 更新
         if rating is not None:
@@ -214,7 +175,7 @@ class ReviewService:
 
         review.updated_at = datetime.now()
 
-        self._save_reviews(reviews)
+        self.store.update(review)
         return review
 
     def delete_review(self, review_id: str, user_id: str) -> bool:
@@ -231,18 +192,8 @@ class ReviewService:
         Raises:
             ValueError: レビューが見つからない、または権限がない場合
         """
-        reviews = self._load_reviews()
-        review = next((r for r in reviews if r.id == review_id), None)
-
-        if not review:
-            raise ValueError("Review not found")
-
-        if review.user_id != user_id:
-            raise ValueError("Permission denied")
-
-        reviews = [r for r in reviews if r.id != review_id]
-        self._save_reviews(reviews)
-        return True
+        self._get_owned_review(review_id, user_id)
+        return self.store.delete(review_id)
 
     def mark_helpful(self, review_id: str, user_id: str) -> Review:
         """
@@ -258,8 +209,7 @@ class ReviewService:
         Raises:
             ValueError: レビューが見つからない、または既にマーク済みの場合
         """
-        reviews = self._load_reviews()
-        review = next((r for r in reviews if r.id == review_id), None)
+        review = self.store.get(review_id)
 
         if not review:
             raise ValueError("Review not found")
@@ -270,7 +220,7 @@ class ReviewService:
         review.helpful_users.append(user_id)
         review.helpful_count = len(review.helpful_users)
 
-        self._save_reviews(reviews)
+        self.store.update(review)
         return review
 
     def unmark_helpful(self, review_id: str, user_id: str) -> Review:
@@ -287,8 +237,7 @@ class ReviewService:
         Raises:
             ValueError: レビューが見つからない、またはマークされていない場合
         """
-        reviews = self._load_reviews()
-        review = next((r for r in reviews if r.id == review_id), None)
+        review = self.store.get(review_id)
 
         if not review:
             raise ValueError("Review not found")
@@ -299,7 +248,7 @@ class ReviewService:
         review.helpful_users.remove(user_id)
         review.helpful_count = len(review.helpful_users)
 
-        self._save_reviews(reviews)
+        self.store.update(review)
         return review
 
     def get_recipe_rating_summary(self, recipe_id: str) -> RecipeRatingSummary:
@@ -312,31 +261,21 @@ class ReviewService:
         Returns:
             評価サマリー
         """
-        reviews = self.get_recipe_reviews(recipe_id)
-
-        if not reviews:
-            return RecipeRatingSummary(
-                recipe_id=recipe_id,
-                average_rating=0.0,
-                total_reviews=0,
-                rating_distribution={1: 0, 2: 0, 3: 0, 4: 0, 5: 0},
-            )
-
-        # 平均評価計算
-        total_rating = sum(r.rating for r in reviews)
-        average_rating = total_rating / len(reviews)
-
-        # 評価分布
-        rating_distribution = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-        for review in reviews:
-            rating_distribution[review.rating] += 1
-
-        return RecipeRatingSummary(
-            recipe_id=recipe_id,
-            average_rating=round(average_rating, 1),
-            total_reviews=len(reviews),
-            rating_distribution=rating_distribution,
-        )
+        return self.store.summaries([recipe_id])[recipe_id]
+
+    def get_rating_summaries(
+        self, recipe_ids: Iterable[str]
+    ) -> dict[str, RecipeRatingSummary]:
+        """
+        複数レシピの評価サマリーをまとめて取得（一覧ページの評価バッジ用）
+
+        Args:
+            recipe_ids: レシピIDのリスト
+
+        Returns:
+            レシピID → 評価サマリー
+        """
+        return self.store.summaries(recipe_ids)
 
     def get_popular_reviews(self, recipe_id: str, limit: int = 3) -> list[Review]:
         """
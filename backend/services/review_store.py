@@ -0,0 +1,323 @@
+"""
+Review storage for Personal Recipe Intelligence.
+レビューの SQLite ストアと評価集計
+
+レビューは models/review.py の Review として読み書きし、recipe_id・user_id の
+索引で絞り込む。評価の集計（件数・合計・星ごとの件数）はレシピごとの行として
+保持し、レビューの追加・評価変更・削除と同じトランザクションで増分更新する。
+一覧ページの評価バッジは集計行を1回のクエリで読むだけで表示できる。
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+
+from backend.models.review import RecipeRatingSummary, Review
+
+logger = logging.getLogger(__name__)
+
+# 1クエリの IN 句に渡す ID の最大数（SQLite の変数上限より小さくする）
+_MAX_IN_PARAMS = 500
+
+_REVIEW_COLUMNS = (
+    "id, recipe_id, user_id, rating, comment, helpful_count, helpful_users, "
+    "created_at, updated_at"
+)
+
+_ORDER_BY = {
+    "rating": "rating DESC, created_at DESC, seq",
+    "helpful": "helpful_count DESC, created_at DESC, seq",
+    "recent": "created_at DESC, seq",
+}
+
+
+class ReviewStore:
+    """SQLite によるレビュー保存と評価集計"""
+
+    def __init__(self, db_path: Path):
+        """
+        初期化
+
+        Args:
+            db_path: データベースファイルパス
+        """
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS reviews (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    id TEXT NOT NULL UNIQUE,
+                    recipe_id TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    rating INTEGER NOT NULL,
+                    comment TEXT NOT NULL,
+                    helpful_count INTEGER NOT NULL DEFAULT 0,
+                    helpful_users TEXT NOT NULL DEFAULT '[]',
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT,
+                    UNIQUE (recipe_id, user_id)
+                );
+                CREATE INDEX IF NOT EXISTS idx_reviews_recipe
+                    ON reviews(recipe_id, created_at);
+                CREATE INDEX IF NOT EXISTS idx_reviews_user
+                    ON reviews(user_id, created_at);
+                CREATE TABLE IF NOT EXISTS recipe_rating_aggregates (
+                    recipe_id TEXT PRIMARY KEY,
+                    review_count INTEGER NOT NULL DEFAULT 0,
+                    rating_sum INTEGER NOT NULL DEFAULT 0,
+                    rating_1 INTEGER NOT NULL DEFAULT 0,
+                    rating_2 INTEGER NOT NULL DEFAULT 0,
+                    rating_3 INTEGER NOT NULL DEFAULT 0,
+                    rating_4 INTEGER NOT NULL DEFAULT 0,
+                    rating_5 INTEGER NOT NULL DEFAULT 0
+                );
+                """
+            )
+
+    # === 変換 ===
+
+    @staticmethod
+    def _to_row(review: Review) -> tuple:
+        return (
+            review.id,
+            review.recipe_id,
+            review.user_id,
+            review.rating,
+            review.comment,
+            review.helpful_count,
+            json.dumps(review.helpful_users, ensure_ascii=False),
+            review.created_at.isoformat(),
+            review.updated_at.isoformat() if review.updated_at else None,
+        )
+
+    @staticmethod
+    def _from_row(row: tuple) -> Review:
+        (
+            review_id,
+            recipe_id,
+            user_id,
+            rating,
+            comment,
+            helpful_count,
+            helpful_users,
+            created_at,
+            updated_at,
+        ) = row
+        return Review(
+            id=review_id,
+            recipe_id=recipe_id,
+            user_id=user_id,
+            rating=rating,
+            comment=comment,
+            helpful_count=helpful_count,
+            helpful_users=json.loads(helpful_users),
+            created_at=datetime.fromisoformat(created_at),
+            updated_at=datetime.fromisoformat(updated_at) if updated_at else None,
+        )
+
+    def _adjust_aggregate(self, recipe_id: str, rating: int, delta: int) -> None:
+        """集計行に1件分の評価を加算（delta=1）または減算（delta=-1）"""
+        column = f"rating_{int(rating)}"
+        self._conn.execute(
+            "INSERT INTO recipe_rating_aggregates (recipe_id) VALUES (?) "
+            "ON CONFLICT(recipe_id) DO NOTHING",
+            (recipe_id,),
+        )
+        self._conn.execute(
+            f"UPDATE recipe_rating_aggregates SET review_count = review_count + ?, "
+            f"rating_sum = rating_sum + ?, {column} = {column} + ? "
+            f"WHERE recipe_id = ?",
+            (delta, delta * rating, delta, recipe_id),
+        )
+
+    # === 書き込み ===
+
+    def insert(self, review: Review) -> None:
+        """
+        レビューを追加
+
+        Raises:
+            ValueError: 同じユーザーが同じレシピを既にレビューしている場合
+        """
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute(
+                        f"INSERT INTO reviews ({_REVIEW_COLUMNS}) "
+                        f"VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        self._to_row(review),
+                    )
+                    self._adjust_aggregate(review.recipe_id, review.rating, 1)
+            except sqlite3.IntegrityError:
+                raise ValueError("User has already reviewed this recipe")
+
+    def update(self, review: Review) -> None:
+        """レビューを上書き（評価が変わった場合は集計も更新）"""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT rating FROM reviews WHERE id = ?", (review.id,)
+            ).fetchone()
+            if row is None:
+                raise ValueError("Review not found")
+
+            self._conn.execute(
+                "UPDATE reviews SET rating = ?, comment = ?, helpful_count = ?, "
+                "helpful_users = ?, updated_at = ? WHERE id = ?",
+                (
+                    review.rating,
+                    review.comment,
+                    review.helpful_count,
+                    json.dumps(review.helpful_users, ensure_ascii=False),
+                    review.updated_at.isoformat() if review.updated_at else None,
+                    review.id,
+                ),
+            )
+            if row[0] != review.rating:
+                self._adjust_aggregate(review.recipe_id, row[0], -1)
+                self._adjust_aggregate(review.recipe_id, review.rating, 1)
+
+    def delete(self, review_id: str) -> bool:
+        """
+        レビューを削除
+
+        Returns:
+            削除したかどうか
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT recipe_id, rating FROM reviews WHERE id = ?", (review_id,)
+            ).fetchone()
+            if row is None:
+                return False
+            self._conn.execute("DELETE FROM reviews WHERE id = ?", (review_id,))
+            self._adjust_aggregate(row[0], row[1], -1)
+        return True
+
+    # === 読み込み ===
+
+    def get(self, review_id: str) -> Optional[Review]:
+        """IDでレビューを取得"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_REVIEW_COLUMNS} FROM reviews WHERE id = ?", (review_id,)
+            ).fetchone()
+        return self._from_row(row) if row else None
+
+    def list_by_recipe(
+        self, recipe_id: str, sort_by: str = "recent", limit: Optional[int] = None
+    ) -> list[Review]:
+        """
+        レシピのレビューを取得
+
+        Args:
+            recipe_id: レシピID
+            sort_by: ソート方法（recent/rating/helpful）
+            limit: 取得件数制限
+        """
+        order_by = _ORDER_BY.get(sort_by, _ORDER_BY["recent"])
+        sql = (
+            f"SELECT {_REVIEW_COLUMNS} FROM reviews WHERE recipe_id = ? "
+            f"ORDER BY {order_by}"
+        )
+        params: tuple = (recipe_id,)
+        if limit:
+            sql += " LIMIT ?"
+            params += (limit,)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def list_by_user(self, user_id: str) -> list[Review]:
+        """ユーザーのレビューを新しい順に取得"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_REVIEW_COLUMNS} FROM reviews WHERE user_id = ? "
+                f"ORDER BY created_at DESC, seq",
+                (user_id,),
+            ).fetchall()
+        return [self._from_row(row) for row in rows]
+
+    def count(self) -> int:
+        """レビュー総数"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM reviews").fetchone()[0]
+
+    def summaries(self, recipe_ids: Iterable[str]) -> dict[str, RecipeRatingSummary]:
+        """
+        複数レシピの評価サマリーを集計行から取得
+
+        Args:
+            recipe_ids: レシピIDのリスト
+
+        Returns:
+            レシピID → 評価サマリー（レビューのないレシピは0件のサマリー）
+        """
+        ids = list(dict.fromkeys(recipe_ids))
+        rows = []
+        with self._lock:
+            for start in range(0, len(ids), _MAX_IN_PARAMS):
+                chunk = ids[start : start + _MAX_IN_PARAMS]
+                placeholders = ", ".join("?" * len(chunk))
+                rows += self._conn.execute(
+                    "SELECT recipe_id, review_count, rating_sum, "
+                    "rating_1, rating_2, rating_3, rating_4, rating_5 "
+                    f"FROM recipe_rating_aggregates WHERE recipe_id IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+
+        found = {row[0]: row for row in rows}
+        result = {}
+        for recipe_id in ids:
+            row = found.get(recipe_id)
+            count, total = (row[1], row[2]) if row else (0, 0)
+            histogram = row[3:] if row else (0, 0, 0, 0, 0)
+            result[recipe_id] = RecipeRatingSummary(
+                recipe_id=recipe_id,
+                average_rating=round(total / count, 1) if count else 0.0,
+                total_reviews=count,
+                rating_distribution={star: histogram[star - 1] for star in range(1, 6)},
+            )
+        return result
+
+    # === 移行 ===
+
+    def import_json(self, json_path: Path) -> int:
+        """
+        旧形式（レビューリストの JSON）を取り込む
+
+        取り込み後、元のファイルは ``.migrated`` を付けた名前に変更する。
+
+        Returns:
+            取り込んだ件数
+        """
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                reviews = [Review.from_dict(item) for item in json.load(f)]
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Failed to read legacy review file {json_path}: {e}")
+            return 0
+
+        imported = 0
+        for review in reviews:
+            try:
+                self.insert(review)
+                imported += 1
+            except ValueError:
+                logger.warning(f"Skipped duplicate review {review.id}")
+        json_path.rename(json_path.with_name(json_path.name + ".migrated"))
+        logger.info(f"Imported {imported} reviews from {json_path}")
+        return imported
+
+    def close(self) -> None:
+        """接続を閉じる"""
+        with self._lock:
+            self._conn.close()
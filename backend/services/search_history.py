@@ -0,0 +1,337 @@
+"""
+検索履歴ストア（リングバッファ + 追記専用ファイル）
+
+検索履歴は件数上限付きのリングバッファに保持し、ファイルへは
+バックグラウンドスレッドがまとめて JSON Lines 形式で追記する。
+追記ファイルが上限の2倍を超えたらリングバッファの内容だけに書き直す。
+人気度の集計として、正規化したクエリごとの検索回数を日別に保持し、
+集計期間を過ぎた日の分は捨てる（ファイルは日別集計のみを書き直す）。
+検索1回あたりの処理は履歴の件数・ファイルサイズに依存しない。
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+from collections import deque
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, Tuple
+
+from backend.services.suggestion_index import normalize_query
+from backend.services.write_behind import WriteBehindBuffer
+
+logger = logging.getLogger(__name__)
+
+
+class SearchHistoryStore:
+    """件数上限付きの検索履歴（非同期バッチ書き込み）"""
+
+    def __init__(
+        self,
+        data_dir: Path,
+        retention: int = 100,
+        window_days: int = 30,
+        flush_interval: float = 1.0,
+        batch_size: int = 64,
+    ):
+        """
+        初期化
+
+        Args:
+          data_dir: データディレクトリ
+          retention: 保持する履歴の件数
+          window_days: 人気度を集計する日数
+          flush_interval: バックグラウンド書き込みの間隔（秒）
+          batch_size: この件数に達したら間隔を待たずに書き込む
+        """
+        self.data_dir = Path(data_dir)
+        self.log_path = self.data_dir / "search_history.jsonl"
+        self.popularity_path = self.data_dir / "search_popularity.json"
+        self.legacy_path = self.data_dir / "search_history.json"
+        self.retention = retention
+        self.window_days = window_days
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._lock = threading.Lock()
+        self._items: Deque[Dict] = deque(maxlen=retention)
+        # 日付 → 正規化クエリ → [表示用クエリ, 回数, 最終検索時刻]
+        self._daily: Dict[str, Dict[str, list]] = {}
+        self._popularity_dirty = False
+        self._log_lines = 0
+
+        self._buffer = WriteBehindBuffer(
+            self._write_lines,
+            name="search-history-flush",
+            flush_interval=flush_interval,
+            batch_size=batch_size,
+        )
+
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    # === 読み込み ===
+
+    def _load(self) -> None:
+        """追記ファイルと日別集計を読み込む（旧形式の JSON は取り込む）"""
+        if self.log_path.exists():
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    self._log_lines += 1
+                    try:
+                        self._items.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # 書き込み途中で終了した行は読み飛ばす
+                        continue
+
+        if self.popularity_path.exists():
+            try:
+                with open(self.popularity_path, "r", encoding="utf-8") as f:
+                    self._daily = json.load(f)
+            except Exception as e:
+                logger.warning(f"Failed to read {self.popularity_path}: {e}")
+        self._expire_days()
+
+        if self.legacy_path.exists() and not self.log_path.exists():
+            self.import_json(self.legacy_path)
+
+    def import_json(self, json_path: Path) -> int:
+        """
+        旧形式（履歴リストの JSON）を取り込む
+
+        取り込み後、元のファイルは ``.migrated`` を付けた名前に変更する。
+
+        Returns:
+          取り込んだ件数
+        """
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                items = json.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to read legacy history file {json_path}: {e}")
+            return 0
+
+        for item in items:
+            self.append(item)
+        self.flush()
+        json_path.rename(json_path.with_name(json_path.name + ".migrated"))
+        return len(items)
+
+    # === 追記 ===
+
+    def append(self, item: Dict) -> None:
+        """
+        履歴を追加（書き込みはバックグラウンドで行う）
+
+        JSON への変換は呼び出し元のスレッドで行う。
+
+        Args:
+          item: query, timestamp, parsed を持つ辞書
+
+        Raises:
+          TypeError: item が JSON に変換できない場合
+        """
+        line = self._line(item)
+        with self._lock:
+            self._items.append(item)
+            self._count(item)
+            # 履歴とバッファへの追加をまとめて行い、書き直し時の重複を防ぐ
+            self._buffer.append(line)
+
+    @property
+    def closed(self) -> bool:
+        return self._buffer.closed
+
+    def _count(self, item: Dict) -> None:
+        """日別集計に1回分を加算"""
+        query = item.get("query", "")
+        key = normalize_query(query)
+        if not key:
+            return
+        timestamp = item.get("timestamp", "")
+        day = timestamp[:10] or date.today().isoformat()
+
+        counts = self._daily.get(day)
+        if counts is None:
+            counts = self._daily[day] = {}
+            self._expire_days()
+        entry = counts.setdefault(key, [query, 0, timestamp])
+        entry[0] = query
+        entry[1] += 1
+        entry[2] = max(entry[2], timestamp)
+        self._popularity_dirty = True
+
+    def _expire_days(self) -> None:
+        """集計期間を過ぎた日の集計を削除"""
+        cutoff = (date.today() - timedelta(days=self.window_days)).isoformat()
+        for day in [d for d in self._daily if d < cutoff]:
+            del self._daily[day]
+            self._popularity_dirty = True
+
+    def _write_lines(self, lines: List[str]) -> None:
+        """履歴の行を追記し、必要に応じて追記ファイルを書き直す"""
+        with self._lock:
+            compact = self._log_lines + len(lines) > self.retention * 2
+            if compact:
+                # まだバッファにある分は次回の追記で書くので除く
+                items = list(self._items)
+                retained = items[: max(len(items) - len(self._buffer), 0)]
+
+        if compact:
+            self._write_atomic(self.log_path, "".join(map(self._line, retained)))
+            self._log_lines = len(retained)
+        else:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+            self._log_lines += len(lines)
+
+        # 集計の書き込みに失敗しても追記済みのバッチは再送しない
+        try:
+            self._write_popularity()
+        except OSError as e:
+            logger.error(f"Search popularity write failed: {e}")
+
+    def _write_popularity(self) -> None:
+        """日別集計が変わっていれば書き直す（io_lock を保持した状態で呼ぶ）"""
+        with self._lock:
+            if not self._popularity_dirty:
+                return
+            popularity = json.dumps(self._daily, ensure_ascii=False)
+            self._popularity_dirty = False
+        try:
+            self._write_atomic(self.popularity_path, popularity)
+        except OSError:
+            with self._lock:
+                self._popularity_dirty = True
+            raise
+
+    def flush(self) -> int:
+        """
+        未書き込みの履歴を追記し、必要に応じて追記ファイルを書き直す
+
+        書き込みに失敗した場合はバッファを残し、次回の flush で再試行する。
+
+        Returns:
+          書き込んだ件数
+        """
+        written = self._buffer.flush()
+        with self._buffer.io_lock:
+            self._write_popularity()
+        return written
+
+    @staticmethod
+    def _line(item: Dict) -> str:
+        return json.dumps(item, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+    @staticmethod
+    def _write_atomic(path: Path, content: str) -> None:
+        """一時ファイルに書いてから置き換える"""
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    # === 取得 ===
+
+    def latest(self, limit: int = 20) -> List[Dict]:
+        """
+        最新の履歴を新しい順に取得
+
+        Args:
+          limit: 最大件数
+        """
+        with self._lock:
+            items = list(self._items)
+        return list(reversed(items[-limit:]))
+
+    def items(self) -> List[Dict]:
+        """保持している全履歴（古い順）"""
+        with self._lock:
+            return list(self._items)
+
+    def popularity(self) -> Iterator[Tuple[str, int, str]]:
+        """
+        集計期間内の日別検索回数
+
+        Yields:
+          (表示用クエリ, 回数, 最終検索時刻) のタプル（古い日から）
+        """
+        with self._lock:
+            self._expire_days()
+            rows = [
+                tuple(entry)
+                for day in sorted(self._daily)
+                for entry in self._daily[day].values()
+            ]
+        yield from rows
+
+    def query_counts(self) -> Dict[str, int]:
+        """集計期間内の正規化クエリごとの検索回数"""
+        totals: Dict[str, int] = {}
+        for query, count, _ in self.popularity():
+            key = normalize_query(query)
+            totals[key] = totals.get(key, 0) + count
+        return totals
+
+    def clear(self) -> None:
+        """全履歴と集計を削除"""
+        with self._buffer.io_lock:
+            with self._lock:
+                self._items.clear()
+                self._buffer.discard()
+                self._daily.clear()
+                self._popularity_dirty = False
+            self._write_atomic(self.log_path, "")
+            self._write_atomic(self.popularity_path, "{}")
+            self._log_lines = 0
+
+    def close(self) -> None:
+        """残りを書き込んでバックグラウンドスレッドを止める"""
+        if self._buffer.closed:
+            return
+        self._buffer.close()
+        try:
+            with self._buffer.io_lock:
+                self._write_popularity()
+        except OSError as e:
+            logger.error(f"Search popularity write failed: {e}")
+
+
+_stores: Dict[Path, SearchHistoryStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_history_store(data_dir: Path) -> SearchHistoryStore:
+    """
+    ディレクトリごとに共有される SearchHistoryStore を取得
+
+    同じディレクトリを使う複数のサービスインスタンスが
+    未書き込みの履歴を共有するため、別インスタンスからも直前の検索が見える。
+
+    Args:
+      data_dir: データディレクトリ
+
+    Returns:
+      SearchHistoryStore インスタンス
+    """
+    key = Path(data_dir).resolve()
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None or store.closed:
+            store = SearchHistoryStore(key)
+            _stores[key] = store
+        return store
+
+
+@atexit.register
+def close_history_stores() -> None:
+    """全ての SearchHistoryStore を書き込んで閉じる"""
+    with _stores_lock:
+        stores = list(_stores.values())
+        _stores.clear()
+    for store in stores:
+        store.close()
@@ -0,0 +1,519 @@
+"""
+ソーシャルグラフの索引
+
+フォロー関係・ユーザー・レシピの各ファイルを一度だけ読み込み、次の索引を保持する。
+
+- フォロー中 / フォロワーの隣接集合（フォロー判定は O(1)）
+- ユーザーごとのレシピ数
+- ユーザーごとの作成日時順のレシピ列（プル型の取得は k-way マージで上位だけを取り出す）
+- フォロワーごとのタイムライン（follow_timeline。公開時に配信するプッシュ型）
+
+フォローの追加・解除は follows.log に1行ずつ追記し、一定件数たまったら
+follows.json に書き出して追記ファイルを空にする。users.json・recipes.json は
+他のサービスも書き込むため、更新時刻とサイズが変わったときだけ読み込み直す。
+"""
+
+import bisect
+import heapq
+import json
+import threading
+from collections import Counter
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from backend.services.follow_timeline import (
+    DEFAULT_TIMELINE_CAPACITY,
+    TimelineEntry,
+    TimelineStore,
+)
+
+# 追記ファイルをスナップショットに書き出す件数
+DEFAULT_COMPACT_THRESHOLD = 1000
+# この人数以上のフォロワーを持つユーザーの投稿はタイムラインに配らない
+DEFAULT_HEAVY_PUBLISHER_THRESHOLD = 1000
+
+
+class SocialGraph:
+    """フォロー関係の隣接集合とユーザー別レシピ列"""
+
+    def __init__(
+        self,
+        data_dir: Path,
+        compact_threshold: int = DEFAULT_COMPACT_THRESHOLD,
+        timeline_capacity: int = DEFAULT_TIMELINE_CAPACITY,
+        heavy_publisher_threshold: int = DEFAULT_HEAVY_PUBLISHER_THRESHOLD,
+    ):
+        """
+        初期化
+
+        Args:
+            data_dir: データディレクトリパス
+            compact_threshold: 追記ファイルをスナップショットに書き出す件数
+            timeline_capacity: フォロワーごとのタイムラインの件数
+            heavy_publisher_threshold: 投稿を配らずプル型で読むフォロワー数
+        """
+        self.data_dir = Path(data_dir)
+        self.follow_file = self.data_dir / "follows.json"
+        self.follow_log = self.data_dir / "follows.log"
+        self.users_file = self.data_dir / "users.json"
+        self.recipes_file = self.data_dir / "recipes.json"
+        self.compact_threshold = compact_threshold
+        self.heavy_publisher_threshold = heavy_publisher_threshold
+        self.timelines = TimelineStore(timeline_capacity)
+
+        self._lock = threading.RLock()
+        self._signatures: Dict[str, tuple] = {}
+
+        # (follower_id, following_id) → フォロー関係（挿入順 = フォロー順）
+        self._relations: Dict[Tuple[str, str], Dict] = {}
+        # user_id → フォロー中 / フォロワーの ID（値は使わない順序付き集合）
+        self._following: Dict[str, Dict[str, None]] = {}
+        self._followers: Dict[str, Dict[str, None]] = {}
+        self._log_entries = 0
+
+        self._users: List[Dict] = []
+        self._users_by_id: Dict[str, Dict] = {}
+        self._user_position: Dict[str, int] = {}
+
+        self._recipes: List[Dict] = []
+        self._recipe_counts: Counter = Counter()
+        # user_id → (created_at, -recipes 内の位置) の昇順リスト
+        # （後ろから読むと新しい順、同時刻はファイル順）
+        self._authored: Dict[str, List[Tuple[str, int]]] = {}
+
+        self.refresh()
+
+    # === 読み込み ===
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def _read_json(path: Path) -> List[Dict]:
+        if not path.exists():
+            return []
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write_json(path: Path, data: List[Dict]) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def _follow_signature(self) -> tuple:
+        return (self._stat(self.follow_file), self._stat(self.follow_log))
+
+    def refresh(self) -> None:
+        """いずれかのファイルが外部で変更されていれば、その部分の索引を作り直す"""
+        with self._lock:
+            signature = self._follow_signature()
+            if self._signatures.get("follows") != signature:
+                self._index_follows(self._read_json(self.follow_file))
+                self._replay_log()
+                self._signatures["follows"] = signature
+
+            signature = self._stat(self.users_file)
+            if self._signatures.get("users", False) != signature:
+                self._index_users(self._read_json(self.users_file))
+                self._signatures["users"] = signature
+
+            signature = self._stat(self.recipes_file)
+            if self._signatures.get("recipes", False) != signature:
+                self._index_recipes(self._read_json(self.recipes_file))
+                self._signatures["recipes"] = signature
+
+    def _index_follows(self, follows: List[Dict]) -> None:
+        self.timelines.clear()
+        self._relations = {}
+        self._following = {}
+        self._followers = {}
+        self._log_entries = 0
+        for follow in follows:
+            self._link(follow)
+
+    def _replay_log(self) -> None:
+        """追記ファイルのフォロー・アンフォローを順に反映"""
+        if not self.follow_log.exists():
+            return
+        with open(self.follow_log, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 書き込み途中で終了した行は読み飛ばす
+                    continue
+                if entry.get("op") == "unfollow":
+                    self._unlink(entry["follower_id"], entry["following_id"])
+                else:
+                    self._link(entry["follow"])
+                self._log_entries += 1
+
+    def _link(self, follow: Dict) -> None:
+        follower_id = follow.get("follower_id")
+        following_id = follow.get("following_id")
+        key = (follower_id, following_id)
+        if key in self._relations:
+            return
+        self._relations[key] = follow
+        self._following.setdefault(follower_id, {})[following_id] = None
+        self._followers.setdefault(following_id, {})[follower_id] = None
+
+    def _unlink(self, follower_id: str, following_id: str) -> bool:
+        if self._relations.pop((follower_id, following_id), None) is None:
+            return False
+        self._following.get(follower_id, {}).pop(following_id, None)
+        self._followers.get(following_id, {}).pop(follower_id, None)
+        return True
+
+    def _index_users(self, users: List[Dict]) -> None:
+        self._users = users
+        self._users_by_id = {}
+        self._user_position = {}
+        for position, user in enumerate(users):
+            user_id = user.get("id")
+            if user_id not in self._users_by_id:
+                self._users_by_id[user_id] = user
+                self._user_position[user_id] = position
+
+    def _index_recipes(self, recipes: List[Dict]) -> None:
+        self.timelines.clear()
+        self._recipes = []
+        self._recipe_counts = Counter()
+        self._authored = {}
+        for recipe in recipes:
+            self._add_recipe(recipe)
+
+    def _add_recipe(self, recipe: Dict) -> TimelineEntry:
+        position = len(self._recipes)
+        self._recipes.append(recipe)
+        user_id = recipe.get("user_id")
+        self._recipe_counts[user_id] += 1
+        entry = (recipe.get("created_at", ""), -position)
+        bisect.insort(self._authored.setdefault(user_id, []), entry)
+        return entry
+
+    def _author_of(self, entry: TimelineEntry) -> str:
+        return self._recipes[-entry[1]].get("user_id")
+
+    def _recent(self, user_id: str) -> List[TimelineEntry]:
+        """ユーザーの新しいレシピ（タイムラインの件数分）"""
+        return self._authored.get(user_id, [])[-self.timelines.capacity :]
+
+    def _pushed_entries(self, user_id: str) -> Iterator[TimelineEntry]:
+        """タイムラインに配信される分（フォロワーの少ないフォロー先の新しいレシピ）"""
+        for author_id in self._following.get(user_id, {}):
+            if not self.is_heavy_publisher(author_id):
+                yield from self._recent(author_id)
+
+    def is_heavy_publisher(self, user_id: str) -> bool:
+        """投稿をタイムラインに配らないユーザーかどうか"""
+        return len(self._followers.get(user_id, ())) >= self.heavy_publisher_threshold
+
+    # === 書き込み ===
+
+    def replace_follows(self, follows: List[Dict]) -> None:
+        """フォロー関係を丸ごと置き換える（追記ファイルは空にする）"""
+        with self._lock:
+            self._write_json(self.follow_file, follows)
+            self.follow_log.write_text("", encoding="utf-8")
+            self._index_follows([dict(follow) for follow in follows])
+            self._signatures["follows"] = self._follow_signature()
+
+    def replace_users(self, users: List[Dict]) -> None:
+        """ユーザーを丸ごと置き換える"""
+        with self._lock:
+            self._write_json(self.users_file, users)
+            self._index_users([dict(user) for user in users])
+            self._signatures["users"] = self._stat(self.users_file)
+
+    def replace_recipes(self, recipes: List[Dict]) -> None:
+        """レシピを丸ごと置き換える"""
+        with self._lock:
+            self._write_json(self.recipes_file, recipes)
+            self._index_recipes([dict(recipe) for recipe in recipes])
+            self._signatures["recipes"] = self._stat(self.recipes_file)
+
+    def add_recipe(self, recipe: Dict) -> Dict:
+        """
+        レシピを公開
+
+        recipes.json に保存し、投稿者がフォロワーの多いユーザーでなければ
+        タイムラインを持つフォロワーに配信する。
+
+        Args:
+            recipe: user_id, created_at を持つレシピ
+
+        Returns:
+            保存したレシピ
+        """
+        self.refresh()
+        with self._lock:
+            recipe = dict(recipe)
+            entry = self._add_recipe(recipe)
+            self._write_json(self.recipes_file, self._recipes)
+            self._signatures["recipes"] = self._stat(self.recipes_file)
+
+            author_id = recipe.get("user_id")
+            if not self.is_heavy_publisher(author_id):
+                for follower_id in self._followers.get(author_id, ()):
+                    self.timelines.push(follower_id, entry)
+            return dict(recipe)
+
+    def add_follow(self, follow: Dict) -> Dict:
+        """
+        フォロー関係を追加
+
+        Args:
+            follow: follower_id, following_id を持つフォロー関係
+
+        Returns:
+            追加したフォロー関係（既に存在する場合は既存のもの）
+        """
+        self.refresh()
+        with self._lock:
+            key = (follow["follower_id"], follow["following_id"])
+            existing = self._relations.get(key)
+            if existing is not None:
+                return dict(existing)
+            self._link(dict(follow))
+            self._append_log({"op": "follow", "follow": follow})
+
+            # フォローした相手の新しいレシピをタイムラインに取り込む
+            if not self.is_heavy_publisher(key[1]):
+                self.timelines.merge(key[0], self._recent(key[1]))
+            return dict(follow)
+
+    def remove_follow(self, follower_id: str, following_id: str) -> bool:
+        """
+        フォロー関係を削除
+
+        Returns:
+            削除した場合True、存在しない場合False
+        """
+        self.refresh()
+        with self._lock:
+            if not self._unlink(follower_id, following_id):
+                return False
+
+            # 取り除いた分の空きは、件数上限で押し出された残りのフォロー先の
+            # レシピで埋める必要があるため、タイムラインを作り直す
+            if follower_id in self.timelines:
+                self.timelines.create(follower_id, self._pushed_entries(follower_id))
+            # フォロワーが減って配信対象に戻ったら、残りのフォロワーに取り込む
+            remaining = self._followers.get(following_id, ())
+            if len(remaining) == self.heavy_publisher_threshold - 1:
+                recent = self._recent(following_id)
+                for other_id in remaining:
+                    self.timelines.merge(other_id, recent)
+            self._append_log(
+                {
+                    "op": "unfollow",
+                    "follower_id": follower_id,
+                    "following_id": following_id,
+                }
+            )
+            return True
+
+    def _append_log(self, entry: Dict) -> None:
+        """追記ファイルに1行追加し、件数が閾値を超えたら書き出す"""
+        with open(self.follow_log, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._log_entries += 1
+        if self._log_entries >= self.compact_threshold:
+            self._write_json(self.follow_file, list(self._relations.values()))
+            self.follow_log.write_text("", encoding="utf-8")
+            self._log_entries = 0
+        self._signatures["follows"] = self._follow_signature()
+
+    # === 取得 ===
+
+    def follows(self) -> List[Dict]:
+        """全フォロー関係（フォロー順）"""
+        self.refresh()
+        with self._lock:
+            return [dict(follow) for follow in self._relations.values()]
+
+    def users(self) -> List[Dict]:
+        """全ユーザー（ファイル順、各要素は複製）"""
+        self.refresh()
+        with self._lock:
+            return [dict(user) for user in self._users]
+
+    def recipes(self) -> List[Dict]:
+        """全レシピ（ファイル順、各要素は複製）"""
+        self.refresh()
+        with self._lock:
+            return [dict(recipe) for recipe in self._recipes]
+
+    def get_user(self, user_id: str) -> Optional[Dict]:
+        """ユーザーを取得（複製）"""
+        self.refresh()
+        with self._lock:
+            user = self._users_by_id.get(user_id)
+            return dict(user) if user is not None else None
+
+    def users_in_order(self, user_ids: Iterable[str]) -> List[Dict]:
+        """
+        存在するユーザーをファイル順に取得（複製）
+
+        Args:
+            user_ids: ユーザーIDのリスト
+        """
+        self.refresh()
+        with self._lock:
+            positions = sorted(
+                self._user_position[user_id]
+                for user_id in set(user_ids)
+                if user_id in self._user_position
+            )
+            return [dict(self._users[position]) for position in positions]
+
+    def is_following(self, follower_id: str, following_id: str) -> bool:
+        """フォロー関係の有無"""
+        self.refresh()
+        return (follower_id, following_id) in self._relations
+
+    def following_ids(self, user_id: str) -> List[str]:
+        """フォロー中のユーザーID（フォロー順）"""
+        self.refresh()
+        with self._lock:
+            return list(self._following.get(user_id, ()))
+
+    def follower_ids(self, user_id: str) -> List[str]:
+        """フォロワーのユーザーID（フォロー順）"""
+        self.refresh()
+        with self._lock:
+            return list(self._followers.get(user_id, ()))
+
+    def following_count(self, user_id: str) -> int:
+        """フォロー中数"""
+        self.refresh()
+        return len(self._following.get(user_id, ()))
+
+    def follower_count(self, user_id: str) -> int:
+        """フォロワー数"""
+        self.refresh()
+        return len(self._followers.get(user_id, ()))
+
+    def recipe_count(self, user_id: str) -> int:
+        """ユーザーのレシピ数"""
+        self.refresh()
+        return self._recipe_counts.get(user_id, 0)
+
+    def friends_of_friends(self, user_id: str) -> Counter:
+        """
+        フォロー中ユーザーがフォローしているユーザーと共通の友達の数
+
+        自分とフォロー中のユーザーは含まない。
+        """
+        self.refresh()
+        with self._lock:
+            following = self._following.get(user_id, {})
+            counts: Counter = Counter()
+            for friend_id in following:
+                for candidate in self._following.get(friend_id, ()):
+                    if candidate != user_id and candidate not in following:
+                        counts[candidate] += 1
+            return counts
+
+    def latest_recipes(self, user_ids: Iterable[str], limit: int) -> List[Dict]:
+        """
+        複数ユーザーのレシピを新しい順に取得
+
+        ユーザーごとの作成日時順の列を後ろから k-way マージし、
+        上位 limit 件だけを取り出す。
+
+        Args:
+            user_ids: ユーザーIDのリスト
+            limit: 取得件数
+
+        Returns:
+            レシピのリスト（各要素は複製）
+        """
+        self.refresh()
+        with self._lock:
+            timelines = [
+                reversed(self._authored[user_id])
+                for user_id in dict.fromkeys(user_ids)
+                if user_id in self._authored
+            ]
+            merged = heapq.merge(*timelines, reverse=True)
+            return [
+                dict(self._recipes[-position]) for _, position in islice(merged, limit)
+            ]
+
+    def feed(self, user_id: str, limit: int) -> List[Dict]:
+        """
+        フォロー中ユーザーのレシピを新しい順に取得
+
+        タイムライン（初回の読み込み時に作成）と、フォロワーの多い
+        フォロー中ユーザーのレシピ列を合流させる。タイムラインの件数を
+        超える取得はプル型（latest_recipes）で読む。
+
+        Args:
+            user_id: ユーザーID
+            limit: 取得件数
+
+        Returns:
+            レシピのリスト（各要素は複製）
+        """
+        self.refresh()
+        with self._lock:
+            following = self._following.get(user_id, {})
+            if not following:
+                return []
+            if limit > self.timelines.capacity:
+                return self.latest_recipes(following, limit)
+
+            if user_id not in self.timelines:
+                self.timelines.create(user_id, self._pushed_entries(user_id))
+
+            pulled: List[Iterator[TimelineEntry]] = [
+                reversed(self._authored[author_id])
+                for author_id in following
+                if author_id in self._authored and self.is_heavy_publisher(author_id)
+            ]
+            merged = heapq.merge(self.timelines.latest(user_id), *pulled, reverse=True)
+
+            recipes = []
+            seen = set()
+            for entry in merged:
+                if entry in seen:
+                    # 配信後にフォロワーが増えた投稿者の分は両方に含まれる
+                    continue
+                seen.add(entry)
+                recipes.append(dict(self._recipes[-entry[1]]))
+                if len(recipes) >= limit:
+                    break
+            return recipes
+
+
+_graphs: Dict[Path, SocialGraph] = {}
+_graphs_lock = threading.Lock()
+
+
+def get_social_graph(data_dir: Path) -> SocialGraph:
+    """
+    ディレクトリごとに共有される SocialGraph を取得
+
+    リクエストごとに作られる FollowService が同じ索引を使うため、
+    ファイルの読み込みと索引の構築はディレクトリごとに一度で済む。
+
+    Args:
+        data_dir: データディレクトリパス
+
+    Returns:
+        SocialGraph インスタンス
+    """
+    key = Path(data_dir).resolve()
+    with _graphs_lock:
+        graph = _graphs.get(key)
+        if graph is None:
+            graph = _graphs[key] = SocialGraph(key)
+        return graph
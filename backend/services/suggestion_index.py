@@ -0,0 +1,218 @@
+"""
+検索サジェスト用インデックス
+
+- TermIndex: 辞書語の全接尾辞をソートした配列。二分探索で
+  前方一致・部分一致する辞書語を取得する
+- PopularityTrie: 検索クエリのトライ。各ノードに配下のクエリの
+  人気上位を保持し、入力途中の文字列から上位候補を即座に返す
+
+人気度は前方減衰（forward decay）で管理する。検索のたびに
+2^((t - 基準時刻) / 半減期) を加算するため、他のクエリのスコアを
+書き換えずに「最近よく検索されたもの」を上位にできる。
+"""
+
+import bisect
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 半減期の既定値（7日）
+DEFAULT_HALF_LIFE = 7 * 24 * 3600.0
+# 減衰の指数がこの値を超えたら全スコアを縮小する
+_RESCALE_EXPONENT = 64.0
+
+
+def normalize_query(query: str) -> str:
+    """クエリを照合用に正規化（小文字化・空白の統一）"""
+    return " ".join(query.replace("　", " ").lower().split())
+
+
+class TermIndex:
+    """接尾辞配列による辞書語の前方一致・部分一致検索"""
+
+    def __init__(self, terms: Iterable[str] = ()):
+        self._suffixes: List[Tuple[str, int, str]] = []
+        self._terms: Dict[str, str] = {}
+        self.add_many(terms)
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def add_many(self, terms: Iterable[str]) -> None:
+        """
+        辞書語を登録
+
+        Args:
+          terms: 辞書語
+        """
+        added = False
+        for term in terms:
+            key = term.lower()
+            if not key or key in self._terms:
+                continue
+            self._terms[key] = term
+            for offset in range(len(key)):
+                self._suffixes.append((key[offset:], offset, term))
+            added = True
+        if added:
+            self._suffixes.sort()
+
+    def search(self, partial: str, limit: int = 10) -> List[str]:
+        """
+        部分文字列を含む辞書語を取得
+
+        前方一致を優先し、同順位は短い語から返す
+
+        Args:
+          partial: 入力途中の文字列
+          limit: 最大返却数
+
+        Returns:
+          辞書語のリスト
+        """
+        key = partial.lower()
+        if not key:
+            return []
+
+        start = bisect.bisect_left(self._suffixes, (key,))
+        # key で始まる接尾辞の範囲（key + 最大文字 未満）
+        end = bisect.bisect_left(self._suffixes, (key + "\U0010ffff",), start)
+
+        best: Dict[str, Tuple[int, int, str]] = {}
+        for _, offset, term in self._suffixes[start:end]:
+            rank = (0 if offset == 0 else 1, len(term), term)
+            if term not in best or rank < best[term]:
+                best[term] = rank
+
+        ranked = sorted(best.values())
+        return [term for _, _, term in ranked[:limit]]
+
+
+class _TrieNode:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # 配下のクエリの人気上位（正規化済みクエリのリスト、スコア降順）
+        self.top: List[str] = []
+
+
+class PopularityTrie:
+    """減衰付き人気度で上位候補を保持するクエリのトライ"""
+
+    def __init__(self, half_life: float = DEFAULT_HALF_LIFE, top_k: int = 50):
+        """
+        初期化
+
+        Args:
+          half_life: 人気度の半減期（秒）
+          top_k: 各ノードに保持する上位件数（返却できる最大件数）
+        """
+        self.half_life = half_life
+        self.top_k = top_k
+        self._root = _TrieNode()
+        self._scores: Dict[str, float] = {}
+        self._display: Dict[str, str] = {}
+        self._landmark: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def __contains__(self, query: str) -> bool:
+        return normalize_query(query) in self._scores
+
+    def _weight(self, timestamp: float) -> float:
+        """基準時刻からの経過に応じた加算値"""
+        if self._landmark is None:
+            self._landmark = timestamp
+        exponent = (timestamp - self._landmark) / self.half_life
+        if exponent > _RESCALE_EXPONENT:
+            self._rescale(timestamp)
+            exponent = 0.0
+        return 2.0**exponent
+
+    def _rescale(self, timestamp: float) -> None:
+        """基準時刻を進めて全スコアを縮小（順位は変わらない）"""
+        factor = 2.0 ** ((timestamp - self._landmark) / self.half_life)
+        for key in self._scores:
+            self._scores[key] /= factor
+        self._landmark = timestamp
+
+    def record(
+        self, query: str, timestamp: Optional[float] = None, count: int = 1
+    ) -> None:
+        """
+        検索クエリを記録
+
+        Args:
+          query: 検索クエリ
+          timestamp: 検索時刻（UNIX秒、省略時は現在時刻）
+          count: 同時刻の検索回数
+        """
+        key = normalize_query(query)
+        if not key:
+            return
+
+        weight = self._weight(time.time() if timestamp is None else timestamp)
+        self._scores[key] = self._scores.get(key, 0.0) + weight * count
+        self._display[key] = query.strip()
+
+        # スコアが変わるのはこのクエリだけなので、経路上のノードのみ更新する
+        node = self._root
+        self._promote(node, key)
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+            self._promote(node, key)
+
+    def _promote(self, node: _TrieNode, key: str) -> None:
+        """ノードの上位リストにクエリを反映"""
+        top = node.top
+        if key in top:
+            top.remove(key)
+        score = self._scores[key]
+        if len(top) >= self.top_k and self._scores[top[-1]] >= score:
+            return
+
+        position = len(top)
+        while position > 0 and self._scores[top[position - 1]] < score:
+            position -= 1
+        top.insert(position, key)
+        del top[self.top_k :]
+
+    def score(self, query: str, now: Optional[float] = None) -> float:
+        """
+        現在時刻での減衰後の人気度
+
+        Args:
+          query: 検索クエリ
+          now: 基準とする時刻（省略時は現在時刻）
+        """
+        key = normalize_query(query)
+        if key not in self._scores or self._landmark is None:
+            return 0.0
+        now = time.time() if now is None else now
+        return self._scores[key] / 2.0 ** ((now - self._landmark) / self.half_life)
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """
+        前方一致するクエリを人気順に取得
+
+        Args:
+          prefix: 入力途中の文字列（空文字の場合は全体の人気順）
+          limit: 最大返却数
+
+        Returns:
+          クエリのリスト
+        """
+        node = self._root
+        for char in normalize_query(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return [self._display[key] for key in node.top[:limit]]
+
+    def clear(self) -> None:
+        """全クエリを削除"""
+        self._root = _TrieNode()
+        self._scores.clear()
+        self._display.clear()
+        self._landmark = None
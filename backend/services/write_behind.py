@@ -0,0 +1,124 @@
+"""
+非同期バッチ書き込み（ライトビハインド）バッファ
+
+記録はメモリ上のバッファに積むだけで即座に返り、バックグラウンドスレッドが
+一定間隔またはバッファが溜まった時点でまとめて書き込み関数に渡す。
+書き込みに失敗したバッチはバッファの先頭に戻し、次回の書き込みで再試行する。
+行動ログ・検索履歴・APIキー使用量の記録で共通に使う。
+"""
+
+import logging
+import threading
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """バックグラウンドスレッドでまとめて書き込むバッファ"""
+
+    def __init__(
+        self,
+        write_batch: Callable[[List[Any]], None],
+        name: str,
+        flush_interval: float = 1.0,
+        batch_size: int = 256,
+    ):
+        """
+        初期化
+
+        Args:
+          write_batch: バッチ（追加順のリスト）を書き込む関数。例外を送出した
+            場合、そのバッチは次回の書き込みで再試行する
+          name: バックグラウンドスレッド名（ログにも使う）
+          flush_interval: バックグラウンド書き込みの間隔（秒）
+          batch_size: この件数に達したら間隔を待たずに書き込む
+        """
+        self.name = name
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        # 書き込み同士、および呼び出し側の書き直し処理と排他にするためのロック
+        self.io_lock = threading.Lock()
+
+        self._write_batch = write_batch
+        self._lock = threading.Lock()
+        self._pending: List[Any] = []
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def append(self, item: Any) -> None:
+        """
+        バッファに追加（初回呼び出し時にバックグラウンドスレッドを開始）
+
+        Args:
+          item: write_batch に渡す値
+        """
+        with self._lock:
+            self._pending.append(item)
+            pending = len(self._pending)
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(
+                    target=self._run, name=self.name, daemon=True
+                )
+                self._thread.start()
+
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def _run(self) -> None:
+        """バックグラウンド書き込みループ"""
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"{self.name} failed: {e}")
+
+    def flush(self) -> int:
+        """
+        バッファ内の値をまとめて書き込む
+
+        失敗した場合はバッチをバッファの先頭に戻してから例外を送出する。
+
+        Returns:
+          書き込んだ件数
+        """
+        with self.io_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch, self._pending = self._pending, []
+            try:
+                self._write_batch(batch)
+            except Exception:
+                with self._lock:
+                    self._pending[:0] = batch
+                raise
+        return len(batch)
+
+    def discard(self) -> None:
+        """未書き込みの値を捨てる（io_lock を保持した状態で呼ぶ）"""
+        with self._lock:
+            self._pending = []
+
+    def close(self) -> None:
+        """残りを書き込んでバックグラウンドスレッドを止める"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 1)
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"{self.name} failed: {e}")
@@ -93,3 +93,18 @@ def clear_env():
     """環境変数をクリアするフィクスチャ"""
     with patch.dict(os.environ, {}, clear=True):
         yield
+
+
+@pytest.fixture
+def make_follow():
+    """フォロー関係の辞書を作るファクトリ"""
+
+    def _make(follower_id, following_id, created_at="2025-12-10T10:00:00"):
+        return {
+            "id": f"{follower_id}_{following_id}",
+            "follower_id": follower_id,
+            "following_id": following_id,
+            "created_at": created_at,
+        }
+
+    return _make
@@ -0,0 +1,155 @@
+"""
+行動ログ（ActivityLog）のテスト
+"""
+
+import json
+import sqlite3
+import time
+from datetime import datetime
+
+import pytest
+
+from backend.services.activity_log import ActivityLog, get_activity_log
+from backend.services.recommendation_ai_service import RecommendationAIService
+
+
+def make_activity(recipe_id: str, activity_type: str = "viewed") -> dict:
+    """テスト用の行動イベント"""
+    return {
+        "recipe_id": recipe_id,
+        "activity_type": activity_type,
+        "timestamp": "2025-01-01T00:00:00",
+        "metadata": {"source": "test"},
+    }
+
+
+@pytest.fixture
+def log(tmp_path):
+    """バックグラウンド書き込みを実質無効にした ActivityLog"""
+    activity_log = ActivityLog(tmp_path / "activity.db", flush_interval=3600)
+    yield activity_log
+    activity_log.close()
+
+
+class TestActivityLog:
+    """ActivityLogのテスト"""
+
+    def test_append_is_buffered_until_flush(self, log):
+        """追記はバッファに積まれ、flushでまとめて書き込まれる"""
+        for i in range(3):
+            log.append("user_001", make_activity(f"recipe_{i}"))
+
+        assert log.count() == 0
+        assert log.flush() == 3
+        assert log.count() == 3
+
+    def test_batch_size_triggers_background_flush(self, tmp_path):
+        """バッチサイズに達するとバックグラウンドで書き込まれる"""
+        activity_log = ActivityLog(
+            tmp_path / "activity.db", flush_interval=3600, batch_size=2
+        )
+        try:
+            activity_log.append("user_001", make_activity("recipe_1"))
+            activity_log.append("user_001", make_activity("recipe_2"))
+            for _ in range(100):
+                if activity_log.count() == 2:
+                    break
+                time.sleep(0.01)
+            assert activity_log.count() == 2
+        finally:
+            activity_log.close()
+
+    def test_failed_flush_keeps_batch(self, log):
+        """書き込みに失敗したバッチは破棄されず次回の flush で書き込まれる"""
+        log.append("user_001", make_activity("recipe_1"))
+        log._conn.execute("ALTER TABLE activities RENAME TO activities_moved")
+
+        with pytest.raises(sqlite3.OperationalError):
+            log.flush()
+
+        log._conn.execute("ALTER TABLE activities_moved RENAME TO activities")
+        assert log.flush() == 1
+        assert log.count() == 1
+
+    def test_unserializable_metadata_rejected_on_append(self, log):
+        """JSON化できない metadata は追記時に例外となりバッファを汚さない"""
+        bad = make_activity("recipe_1")
+        bad["metadata"] = {"at": datetime(2025, 1, 1)}
+
+        with pytest.raises(TypeError):
+            log.append("user_001", bad)
+
+        log.append("user_001", make_activity("recipe_2"))
+        assert log.flush() == 1
+        assert [a["recipe_id"] for a in log.load_user("user_001")] == ["recipe_2"]
+
+    def test_iter_since_is_incremental(self, log):
+        """前回のシーケンス以降のイベントのみ返す"""
+        log.append("user_001", make_activity("recipe_1"))
+        log.append("user_002", make_activity("recipe_2"))
+        events = list(log.iter_since(0, chunk_size=1))
+        assert [(user, a["recipe_id"]) for _, user, a in events] == [
+            ("user_001", "recipe_1"),
+            ("user_002", "recipe_2"),
+        ]
+        assert events[0][2]["metadata"] == {"source": "test"}
+
+        log.append("user_001", make_activity("recipe_3"))
+        newer = list(log.iter_since(events[-1][0]))
+        assert [a["recipe_id"] for _, _, a in newer] == ["recipe_3"]
+
+    def test_load_user(self, log):
+        """ユーザー単位で履歴を取得できる"""
+        log.append("user_001", make_activity("recipe_1"))
+        log.append("user_002", make_activity("recipe_2"))
+        log.append("user_001", make_activity("recipe_3", "cooked"))
+
+        history = log.load_user("user_001")
+        assert [a["recipe_id"] for a in history] == ["recipe_1", "recipe_3"]
+        assert history[1]["activity_type"] == "cooked"
+
+    def test_close_flushes_pending(self, tmp_path):
+        """close時に未書き込みのイベントを書き込む"""
+        path = tmp_path / "activity.db"
+        activity_log = ActivityLog(path, flush_interval=3600)
+        activity_log.append("user_001", make_activity("recipe_1"))
+        activity_log.close()
+
+        reopened = ActivityLog(path)
+        try:
+            assert reopened.count() == 1
+        finally:
+            reopened.close()
+
+    def test_get_activity_log_shared_per_path(self, tmp_path):
+        """同じパスには同じインスタンスを返す"""
+        path = tmp_path / "activity.db"
+        assert get_activity_log(path) is get_activity_log(
+            tmp_path / "." / "activity.db"
+        )
+
+
+class TestServiceMigration:
+    """旧JSON形式からの移行テスト"""
+
+    def test_legacy_json_imported_once(self, tmp_path):
+        """user_activity.json は初回起動時に取り込まれる"""
+        legacy = {
+            "user_001": [make_activity("recipe_1"), make_activity("recipe_2")],
+            "user_002": [make_activity("recipe_1", "cooked")],
+        }
+        (tmp_path / "user_activity.json").write_text(
+            json.dumps(legacy), encoding="utf-8"
+        )
+
+        service = RecommendationAIService(data_dir=str(tmp_path))
+        assert len(service._get_user_history("user_001")) == 2
+        assert not (tmp_path / "user_activity.json").exists()
+        assert (tmp_path / "user_activity.json.migrated").exists()
+
+        service.record_activity("user_002", "recipe_3", "viewed")
+        reloaded = RecommendationAIService(data_dir=str(tmp_path))
+        assert [a["recipe_id"] for a in reloaded._get_user_history("user_002")] == [
+            "recipe_1",
+            "recipe_3",
+        ]
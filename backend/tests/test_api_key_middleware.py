@@ -25,7 +25,10 @@ def temp_dir():
 @pytest.fixture
 def api_key_service(temp_dir):
     """APIキーサービスのインスタンスを作成"""
-    return APIKeyService(data_dir=temp_dir)
+    service = APIKeyService(data_dir=temp_dir)
+    yield service
+    # 一時ディレクトリの削除前に使用量の記録を書き込んで閉じる
+    service.usage_log.close()
 
 
 @pytest.fixture
@@ -28,7 +28,10 @@ def temp_dir():
 @pytest.fixture
 def service(temp_dir):
     """APIキーサービスのインスタンスを作成"""
-    return APIKeyService(data_dir=temp_dir)
+    service = APIKeyService(data_dir=temp_dir)
+    yield service
+    # 一時ディレクトリの削除前に使用量の記録を書き込んで閉じる
+    service.usage_log.close()
 
 
 class TestAPIKeyGeneration:
@@ -453,6 +456,133 @@ class TestArgon2idHashing:
         assert api_key.key_hash.startswith("$argon2")
 
 
+class TestKeyLookup:
+    """キーIDによる検証対象の絞り込みと検証済みキャッシュのテスト"""
+
+    @staticmethod
+    def _count_hash_checks(service, monkeypatch):
+        calls = []
+        original = service._verify_key_hash
+
+        def counting(raw_key, key_hash):
+            calls.append(key_hash)
+            return original(raw_key, key_hash)
+
+        monkeypatch.setattr(service, "_verify_key_hash", counting)
+        return calls
+
+    def test_generated_key_embeds_key_id(self, service):
+        """発行したキーはキーIDで始まる"""
+        raw_key, api_key = service.generate_api_key(name="Test Key")
+
+        assert raw_key.startswith(api_key.key_id + ".")
+        assert api_key.prefixed is True
+
+    def test_verify_checks_single_hash(self, service, monkeypatch):
+        """キーIDを含むキーは1件分のハッシュだけを照合"""
+        keys = [service.generate_api_key(name=f"Key {i}") for i in range(5)]
+        calls = self._count_hash_checks(service, monkeypatch)
+
+        raw_key, api_key = keys[3]
+        assert service.verify_api_key(raw_key).key_id == api_key.key_id
+        assert len(calls) == 1
+
+        # 未知のキーIDは照合せずに失敗
+        assert service.verify_api_key("unknown.secret") is None
+        assert len(calls) == 1
+
+    def test_verified_key_cache(self, service, monkeypatch):
+        """検証済みキーは再照合しない"""
+        raw_key, api_key = service.generate_api_key(name="Test Key")
+        calls = self._count_hash_checks(service, monkeypatch)
+
+        assert service.verify_api_key(raw_key) is not None
+        assert service.verify_api_key(raw_key) is not None
+        assert len(calls) == 1
+
+        # 改ざんしたキーはキャッシュに当たらない
+        assert service.verify_api_key(raw_key + "x") is None
+
+    def test_revoked_key_not_served_from_cache(self, service):
+        """無効化・削除したキーはキャッシュがあっても失敗"""
+        raw_key1, key1 = service.generate_api_key(name="Key 1")
+        raw_key2, key2 = service.generate_api_key(name="Key 2")
+        service.verify_api_key(raw_key1)
+        service.verify_api_key(raw_key2)
+
+        service.revoke_api_key(key1.key_id)
+        service.delete_api_key(key2.key_id)
+
+        assert service.verify_api_key(raw_key1) is None
+        assert service.verify_api_key(raw_key2) is None
+
+    def test_legacy_key_without_key_id(self, service):
+        """キーIDを含まない旧形式のキーも検証できる"""
+        import hashlib
+
+        service.generate_api_key(name="New Key")
+        raw_key, api_key = service.generate_api_key(name="Legacy Key")
+        legacy_raw_key = "legacyKeyWithoutPrefix"
+        api_key.key_hash = hashlib.sha256(legacy_raw_key.encode()).hexdigest()
+        api_key.prefixed = False
+
+        verified = service.verify_api_key(legacy_raw_key)
+
+        assert verified is not None
+        assert verified.key_id == api_key.key_id
+        assert service.verify_api_key(raw_key) is None
+
+
+class TestBufferedUsage:
+    """使用量の非同期記録のテスト"""
+
+    def test_record_usage_does_not_rewrite_files(self, service):
+        """record_usage は keys.json / usage.json を書き直さない"""
+        raw_key, api_key = service.generate_api_key(name="Test Key")
+        keys_mtime = service.keys_file.stat().st_mtime_ns
+        usage_mtime = service.usage_file.stat().st_mtime_ns
+
+        for i in range(10):
+            service.record_usage(api_key.key_id, "/test", 200)
+
+        assert service.keys_file.stat().st_mtime_ns == keys_mtime
+        assert service.usage_file.stat().st_mtime_ns == usage_mtime
+
+    def test_usage_replayed_on_load(self, temp_dir):
+        """追記された使用量を読み込み時に反映する"""
+        service1 = APIKeyService(data_dir=temp_dir)
+        raw_key, api_key = service1.generate_api_key(
+            name="Test Key", rate_limit=RateLimit(requests_per_minute=3)
+        )
+        for i in range(3):
+            service1.record_usage(api_key.key_id, "/test", 200)
+        service1.usage_log.flush()
+
+        service2 = APIKeyService(data_dir=temp_dir)
+
+        assert service2.keys[api_key.key_id].usage_count == 3
+        assert service2.keys[api_key.key_id].last_used_at is not None
+        stats = service2.get_usage_stats(api_key.key_id)
+        assert stats["current_usage"]["last_minute"] == 3
+        is_allowed, error = service2.check_rate_limit(api_key.key_id)
+        assert is_allowed is False
+
+    def test_snapshot_truncates_log(self, temp_dir):
+        """スナップショット後は追記ファイルを二重に数えない"""
+        service1 = APIKeyService(data_dir=temp_dir)
+        raw_key, api_key = service1.generate_api_key(name="Key 1")
+        service1.record_usage(api_key.key_id, "/test", 200)
+        service1.record_usage(api_key.key_id, "/test", 200)
+
+        # キー発行でスナップショットを書き出す
+        service1.generate_api_key(name="Key 2")
+
+        service2 = APIKeyService(data_dir=temp_dir)
+
+        assert service2.keys[api_key.key_id].usage_count == 2
+        assert len(service2.usage[api_key.key_id]) == 2
+
+
 class TestPersistence:
     """永続化のテスト"""
 
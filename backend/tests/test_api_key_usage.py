@@ -0,0 +1,138 @@
+"""
+Tests for API key usage counters and usage log
+
+APIキー使用量のカウンタと追記ファイルのテスト
+"""
+
+import json
+
+import pytest
+
+from backend.services.api_key_usage import (
+    SlidingWindowCounter,
+    UsageCounters,
+    UsageLog,
+    get_usage_log,
+)
+
+
+class TestSlidingWindowCounter:
+    """リングバッファによる件数のテスト"""
+
+    def test_counts_within_window(self):
+        """期間内の件数だけを数える"""
+        counter = SlidingWindowCounter(60, 1.0)
+        counter.add(1000.0)
+        counter.add(1000.5)
+        counter.add(1030.0)
+
+        assert counter.total(1030.0) == 3
+        assert counter.total(1059.9) == 3
+        # 1000秒台のバケットは期間外になる
+        assert counter.total(1060.0) == 1
+        assert counter.total(1090.0) == 0
+
+    def test_bucket_reused_after_wraparound(self):
+        """一周したバケットは古い件数を捨てて再利用する"""
+        counter = SlidingWindowCounter(60, 1.0)
+        for _ in range(5):
+            counter.add(1000.0)
+        counter.add(1060.0)
+
+        assert counter.total(1060.0) == 1
+
+    def test_ignores_records_older_than_bucket(self):
+        """新しい期間に使われているバケットへの古い記録は数えない"""
+        counter = SlidingWindowCounter(60, 1.0)
+        counter.add(1060.0)
+        counter.add(1000.0)
+
+        assert counter.total(1060.0) == 1
+
+    def test_usage_counters(self):
+        """分・時間・日の件数"""
+        counters = UsageCounters()
+        now = 1_700_000_000.0
+        counters.add(now - 7200)
+        counters.add(now - 600)
+        counters.add(now - 10)
+        counters.add(now)
+
+        assert counters.counts(now) == (2, 3, 4)
+        assert counters.counts(now + 86400 * 2) == (0, 0, 0)
+
+
+class TestUsageLog:
+    """追記ファイルのテスト"""
+
+    def test_append_is_buffered(self, tmp_path):
+        """追記はバッファに積むだけで flush まで書き込まない"""
+        log = UsageLog(tmp_path / "usage.log", flush_interval=60)
+        try:
+            log.append({"key_id": "a", "timestamp": 1.0})
+            log.append({"key_id": "b", "timestamp": 2.0})
+
+            assert not (tmp_path / "usage.log").exists()
+            assert log.entry_count == 2
+
+            assert log.flush() == 2
+            lines = (tmp_path / "usage.log").read_text(encoding="utf-8").splitlines()
+            assert [json.loads(line)["key_id"] for line in lines] == ["a", "b"]
+        finally:
+            log.close()
+
+    def test_read_includes_pending(self, tmp_path):
+        """read は未書き込みの記録も含めて古い順に返す"""
+        log = UsageLog(tmp_path / "usage.log", flush_interval=60)
+        try:
+            log.append({"n": 1})
+            log.flush()
+            log.append({"n": 2})
+
+            assert [entry["n"] for entry in log.read()] == [1, 2]
+        finally:
+            log.close()
+
+    def test_read_skips_partial_line(self, tmp_path):
+        """書き込み途中の行は読み飛ばす"""
+        path = tmp_path / "usage.log"
+        path.write_text('{"n": 1}\n{"n": 2\n', encoding="utf-8")
+        log = UsageLog(path)
+        try:
+            assert [entry["n"] for entry in log.read()] == [1]
+            assert log.entry_count == 2
+        finally:
+            log.close()
+
+    def test_truncate(self, tmp_path):
+        """truncate は未書き込みの記録とファイルを空にする"""
+        log = UsageLog(tmp_path / "usage.log", flush_interval=60)
+        try:
+            log.append({"n": 1})
+            log.flush()
+            log.append({"n": 2})
+            log.truncate()
+
+            assert list(log.read()) == []
+            assert log.entry_count == 0
+        finally:
+            log.close()
+
+    def test_close_flushes(self, tmp_path):
+        """close で残りを書き込む"""
+        log = UsageLog(tmp_path / "usage.log", flush_interval=60)
+        log.append({"n": 1})
+        log.close()
+
+        assert (tmp_path / "usage.log").read_text(encoding="utf-8").strip() == '{"n":1}'
+
+    def test_shared_per_path(self, tmp_path):
+        """同じパスには同じ UsageLog を返す"""
+        log = get_usage_log(tmp_path / "usage.log")
+
+        assert get_usage_log(tmp_path / "usage.log") is log
+        assert get_usage_log(tmp_path / "other.log") is not log
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
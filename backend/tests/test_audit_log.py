@@ -0,0 +1,274 @@
+"""
+Test Suite for Audit Log Writer
+
+監査ログの非同期書き込み・ローテーション・検索のテスト
+"""
+
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend.services.audit_log import AuditLog, get_audit_log
+from backend.services.audit_service import (
+  AuditAction,
+  AuditResourceType,
+  AuditService,
+)
+
+BASE_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def make_entry(minutes: int, action: str = "recipe_read", user_id: str = "user_001"):
+  """BASE_TIME から minutes 分後の監査エントリ"""
+  return {
+    "timestamp": (BASE_TIME + timedelta(minutes=minutes)).isoformat(),
+    "action": action,
+    "resource_type": "recipe",
+    "status": "success",
+    "user_id": user_id,
+    "resource_id": None,
+    "ip_address": None,
+    "details": {},
+  }
+
+
+@pytest.fixture
+def audit_log(tmp_path):
+  """テスト用 AuditLog（時間によるローテーションは無効）"""
+  log = AuditLog(tmp_path, max_age=float("inf"), fsync=False)
+  yield log
+  log.close()
+
+
+class TestWriter:
+  """非同期書き込みのテスト"""
+
+  def test_write_is_buffered_until_flush(self, audit_log, tmp_path):
+    """write はキューに積み、flush 後にファイルへ書かれる"""
+    for i in range(3):
+      assert audit_log.write(make_entry(i))
+    audit_log.flush()
+
+    lines = (tmp_path / "audit.json").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["timestamp"] for line in lines] == [
+      make_entry(i)["timestamp"] for i in range(3)
+    ]
+
+  def test_full_queue_is_reported(self, tmp_path):
+    """キューが満杯のまま空かなければ False を返す"""
+    log = AuditLog(tmp_path, queue_size=1, put_timeout=0.01, fsync=False)
+    # 書き込みスレッドを起動させずにキューを埋める
+    log._thread = object()
+    try:
+      assert log.write(make_entry(0))
+      assert not log.write(make_entry(1))
+    finally:
+      log._thread = None
+      log.close()
+
+  def test_close_flushes(self, tmp_path):
+    """close で残りを書き込み、その後の記録も失わない"""
+    log = AuditLog(tmp_path, max_age=float("inf"), fsync=False)
+    log.write(make_entry(0))
+    log.close()
+    log.write(make_entry(1))
+
+    lines = (tmp_path / "audit.json").read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2
+
+  def test_non_json_details_are_stringified(self, audit_log, tmp_path):
+    """JSON にできない値は文字列にして、同じバッチの記録も失わない"""
+    entry = make_entry(1)
+    entry["details"] = {"at": BASE_TIME}
+    audit_log.write(make_entry(0))
+    audit_log.write(entry)
+    audit_log.write(make_entry(2))
+    audit_log.flush()
+
+    lines = (tmp_path / "audit.json").read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 3
+    assert json.loads(lines[1])["details"] == {"at": str(BASE_TIME)}
+
+  def test_unserializable_entry_goes_to_emergency(self, audit_log, tmp_path):
+    """変換できない記録だけを緊急ログに残し、他の記録は書き込む"""
+    entry = make_entry(1)
+    entry["details"] = {(1, 2): "tuple key"}
+    audit_log.write(make_entry(0))
+    assert audit_log.write(entry)
+    audit_log.write(make_entry(2))
+    audit_log.flush()
+
+    lines = (tmp_path / "audit.json").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["timestamp"] for line in lines] == [
+      make_entry(0)["timestamp"],
+      make_entry(2)["timestamp"],
+    ]
+    emergency = (tmp_path / "audit_emergency.json").read_text(encoding="utf-8")
+    assert len(emergency.splitlines()) == 1
+    assert "tuple key" in emergency
+
+  def test_shared_per_directory(self, tmp_path):
+    """同じディレクトリには同じ AuditLog を返す"""
+    log = get_audit_log(tmp_path)
+
+    assert get_audit_log(tmp_path) is log
+    assert get_audit_log(tmp_path / "other") is not log
+
+
+class TestRotation:
+  """ローテーションとインデックスのテスト"""
+
+  def test_rotate_by_size(self, tmp_path):
+    """サイズ上限でセグメントを gzip 圧縮して切り替える"""
+    log = AuditLog(tmp_path, max_bytes=1000, max_age=float("inf"), fsync=False)
+    try:
+      for i in range(20):
+        log.write(make_entry(i))
+      log.flush()
+
+      segments = sorted(tmp_path.glob("audit-*.json.gz"))
+      assert segments
+      archived = []
+      for path in segments:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+          archived.extend(json.loads(line) for line in f)
+      active = tmp_path / "audit.json"
+      remaining = active.read_text(encoding="utf-8") if active.exists() else ""
+      assert len(archived) + len(remaining.splitlines()) == 20
+
+      index = json.loads((tmp_path / "audit_index.json").read_text(encoding="utf-8"))
+      assert set(index["segments"]) == {path.name for path in segments}
+    finally:
+      log.close()
+
+  def test_rotate_by_age(self, tmp_path):
+    """最初の記録から max_age 秒経ったセグメントを切り替える"""
+    log = AuditLog(tmp_path, max_age=3600, fsync=False)
+    try:
+      log.write(make_entry(0))
+      log.write(make_entry(30))
+      log.flush()
+      # BASE_TIME は過去なので次の書き込みで期限切れと判定される
+      assert not (tmp_path / "audit.json").exists()
+
+      segment = next(tmp_path.glob("audit-*.json.gz"))
+      assert segment.name.startswith("audit-20260101T000000-")
+    finally:
+      log.close()
+
+  def test_index_skips_segments(self, tmp_path, audit_log):
+    """期間・アクション・ユーザーに合わないセグメントは候補から外す"""
+    audit_log.write(make_entry(0, action="recipe_create", user_id="alice"))
+    audit_log.write(make_entry(10, action="recipe_read", user_id="alice"))
+    audit_log.flush()
+    first = audit_log.rotate()
+    audit_log.write(make_entry(120, action="auth_failure", user_id="bob"))
+    audit_log.flush()
+    second = audit_log.rotate()
+    audit_log.write(make_entry(240, action="recipe_read", user_id="carol"))
+    audit_log.flush()
+
+    def names(**kwargs):
+      return [path.name for path in audit_log.candidate_segments(**kwargs)]
+
+    assert names(action="auth_failure") == [second]
+    assert names(user_id="alice") == [first]
+    assert names(action="recipe_read") == [first, "audit.json"]
+    start = (BASE_TIME + timedelta(minutes=60)).timestamp()
+    assert names(start=start) == [second, "audit.json"]
+
+  def test_rotation_by_another_writer(self, tmp_path):
+    """別の AuditLog がローテーションした後は新しい audit.json に追記する"""
+    first = AuditLog(tmp_path, max_age=float("inf"), fsync=False)
+    second = AuditLog(tmp_path, max_age=float("inf"), fsync=False)
+    try:
+      first.write(make_entry(0))
+      first.flush()
+      second.write(make_entry(1))
+      second.flush()
+      segment = second.rotate()
+
+      first.write(make_entry(2))
+      first.flush()
+      # second のローテーションで空になった要約を first も読み直している
+      assert first.rotate() is not None
+      assert second.rotate() is None
+
+      results = first.query(limit=None)
+      assert [entry["timestamp"] for entry in results] == [
+        make_entry(i)["timestamp"] for i in (2, 1, 0)
+      ]
+      assert segment in {path.name for path in first.candidate_segments()}
+    finally:
+      first.close()
+      second.close()
+
+  def test_reload_recovers_interrupted_rotation(self, tmp_path):
+    """圧縮前に中断したセグメントと壊れた行を起動時に修復する"""
+    pending = tmp_path / "audit-20260101T000000-000001.json"
+    pending.write_text(json.dumps(make_entry(0)) + "\n", encoding="utf-8")
+    (tmp_path / "audit.json").write_text(
+      json.dumps(make_entry(5)) + '\n{"timestamp": "2026', encoding="utf-8"
+    )
+
+    log = AuditLog(tmp_path, max_age=float("inf"), fsync=False)
+    try:
+      assert not pending.exists()
+      assert (tmp_path / (pending.name + ".gz")).exists()
+
+      log.write(make_entry(10))
+      results = log.query(limit=None)
+      assert [entry["timestamp"] for entry in results] == [
+        make_entry(10)["timestamp"],
+        make_entry(5)["timestamp"],
+        make_entry(0)["timestamp"],
+      ]
+    finally:
+      log.close()
+
+
+class TestQuery:
+  """検索のテスト"""
+
+  def test_query_filters_newest_first(self, audit_log):
+    """条件で絞り込み、新しい順に返す"""
+    for i in range(5):
+      audit_log.write(make_entry(i, user_id="alice" if i % 2 else "bob"))
+      if i == 2:
+        audit_log.flush()
+        audit_log.rotate()
+    audit_log.write(make_entry(5, action="auth_failure", user_id="alice"))
+
+    results = audit_log.query(user_id="alice", action="recipe_read")
+    assert [entry["timestamp"] for entry in results] == [
+      make_entry(3)["timestamp"],
+      make_entry(1)["timestamp"],
+    ]
+    assert len(audit_log.query(limit=2)) == 2
+
+    start = (BASE_TIME + timedelta(minutes=2)).timestamp()
+    end = (BASE_TIME + timedelta(minutes=4)).timestamp()
+    assert len(audit_log.query(start=start, end=end)) == 3
+
+  def test_service_query(self, tmp_path):
+    """AuditService から Enum と datetime で検索する"""
+    service = AuditService(log_dir=str(tmp_path))
+    service.log_auth_failure(user_id="user_001", ip_address="192.168.1.100")
+    service.log(
+      action=AuditAction.RECIPE_CREATE,
+      resource_type=AuditResourceType.RECIPE,
+      user_id="user_002",
+    )
+
+    results = service.query(
+      action=AuditAction.AUTH_FAILURE,
+      start=datetime.now(timezone.utc) - timedelta(minutes=1),
+    )
+    assert [entry["user_id"] for entry in results] == ["user_001"]
+    assert service.query(end=BASE_TIME) == []
+
+
+if __name__ == "__main__":
+  pytest.main([__file__, "-v"])
@@ -51,6 +51,7 @@ class TestAuditService:
       details={"recipe_title": "Test Recipe"},
     )
 
+    audit_service.flush()
     # ログファイルが作成されたことを確認
     log_file = Path(temp_log_dir) / "audit.json"
     assert log_file.exists()
@@ -109,6 +110,7 @@ class TestAuditService:
       recipe_title="Test Recipe",
     )
 
+    audit_service.flush()
     log_file = Path(temp_log_dir) / "audit.json"
     with open(log_file, "r", encoding="utf-8") as f:
       log_entry = json.loads(f.readline())
@@ -128,6 +130,7 @@ class TestAuditService:
       changes=changes,
     )
 
+    audit_service.flush()
     log_file = Path(temp_log_dir) / "audit.json"
     with open(log_file, "r", encoding="utf-8") as f:
       log_entry = json.loads(f.readline())
@@ -144,6 +147,7 @@ class TestAuditService:
       recipe_title="Test Recipe",
     )
 
+    audit_service.flush()
     log_file = Path(temp_log_dir) / "audit.json"
     with open(log_file, "r", encoding="utf-8") as f:
       log_entry = json.loads(f.readline())
@@ -159,6 +163,7 @@ class TestAuditService:
       recipe_ids=recipe_ids, user_id="user_001", ip_address="192.168.1.100"
     )
 
+    audit_service.flush()
     log_file = Path(temp_log_dir) / "audit.json"
     with open(log_file, "r", encoding="utf-8") as f:
       log_entry = json.loads(f.readline())
@@ -173,6 +178,7 @@ class TestAuditService:
       user_id="user_001", ip_address="192.168.1.100", method="api_key"
     )
 
+    audit_service.flush()
     log_file = Path(temp_log_dir) / "audit.json"
     with open(log_file, "r", encoding="utf-8") as f:
       log_entry = json.loads(f.readline())
@@ -191,6 +197,7 @@ class TestAuditService:
       method="api_key",
     )
 
+    audit_service.flush()
     log_file = Path(temp_log_dir) / "audit.json"
     with open(log_file, "r", encoding="utf-8") as f:
       log_entry = json.loads(f.readline())
@@ -208,6 +215,7 @@ class TestAuditService:
       key_name="Production Key",
     )
 
+    audit_service.flush()
     log_file = Path(temp_log_dir) / "audit.json"
     with open(log_file, "r", encoding="utf-8") as f:
       log_entry = json.loads(f.readline())
@@ -225,6 +233,7 @@ class TestAuditService:
       ip_address="192.168.1.100",
     )
 
+    audit_service.flush()
     log_file = Path(temp_log_dir) / "audit.json"
     with open(log_file, "r", encoding="utf-8") as f:
       log_entry = json.loads(f.readline())
@@ -242,6 +251,7 @@ class TestAuditService:
       details={"endpoint": "/api/v1/recipes", "payload": "' OR 1=1 --"},
     )
 
+    audit_service.flush()
     log_file = Path(temp_log_dir) / "audit.json"
     with open(log_file, "r", encoding="utf-8") as f:
       log_entry = json.loads(f.readline())
@@ -258,6 +268,7 @@ class TestAuditService:
       endpoint="/api/v1/recipes",
     )
 
+    audit_service.flush()
     log_file = Path(temp_log_dir) / "audit.json"
     with open(log_file, "r", encoding="utf-8") as f:
       log_entry = json.loads(f.readline())
@@ -271,6 +282,7 @@ class TestAuditService:
       ip_address="192.168.1.100", user_id="user_001", token_prefix="pri_abc1"
     )
 
+    audit_service.flush()
     log_file = Path(temp_log_dir) / "audit.json"
     with open(log_file, "r", encoding="utf-8") as f:
       log_entry = json.loads(f.readline())
@@ -290,6 +302,7 @@ class TestAuditService:
       source="csv_file",
     )
 
+    audit_service.flush()
     log_file = Path(temp_log_dir) / "audit.json"
     with open(log_file, "r", encoding="utf-8") as f:
       log_entry = json.loads(f.readline())
@@ -307,6 +320,7 @@ class TestAuditService:
       format="json",
     )
 
+    audit_service.flush()
     log_file = Path(temp_log_dir) / "audit.json"
     with open(log_file, "r", encoding="utf-8") as f:
       log_entry = json.loads(f.readline())
@@ -328,6 +342,7 @@ class TestAuditService:
       recipe_id="recipe_001", user_id="user_001", ip_address="192.168.1.100"
     )
 
+    audit_service.flush()
     # ログファイルを読み込み
     log_file = Path(temp_log_dir) / "audit.json"
     with open(log_file, "r", encoding="utf-8") as f:
@@ -346,6 +361,7 @@ class TestAuditService:
       user_id="user_001",
     )
 
+    audit_service.flush()
     log_file = Path(temp_log_dir) / "audit.json"
     with open(log_file, "r", encoding="utf-8") as f:
       log_entry = json.loads(f.readline())
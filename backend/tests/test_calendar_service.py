@@ -365,5 +365,124 @@ class TestCalendarServiceEdgeCases:
         assert len(plans) == 3
 
 
+class TestCalendarStore:
+    """日付索引・採番・iCal キャッシュのテスト"""
+
+    def _create(self, calendar_service, day, name, meal_type="夕食"):
+        return calendar_service.create_plan(
+            MealPlanModel(date=day, meal_type=meal_type, recipe_name=name)
+        )
+
+    def test_ids_not_reused_after_delete(self, calendar_service, temp_data_dir):
+        """削除した最大IDは再利用されない（再起動後も）"""
+        first = self._create(calendar_service, date(2025, 12, 15), "A")
+        second = self._create(calendar_service, date(2025, 12, 16), "B")
+        calendar_service.delete_plan(second.id)
+
+        third = self._create(calendar_service, date(2025, 12, 17), "C")
+        assert (first.id, second.id, third.id) == (1, 2, 3)
+
+        calendar_service.delete_plan(third.id)
+        restarted = CalendarService(data_dir=temp_data_dir)
+        fourth = self._create(restarted, date(2025, 12, 18), "D")
+        assert fourth.id == 4
+
+    def test_get_plans_in_date_order(self, calendar_service):
+        """作成順によらず日付順に返し、日付の変更も反映される"""
+        late = self._create(calendar_service, date(2025, 12, 20), "後")
+        self._create(calendar_service, date(2025, 12, 10), "前")
+        self._create(calendar_service, date(2025, 12, 15), "中")
+
+        names = [p.recipe_name for p in calendar_service.get_plans()]
+        assert names == ["前", "中", "後"]
+
+        calendar_service.update_plan(late.id, {"date": date(2025, 12, 1)})
+        names = [
+            p.recipe_name
+            for p in calendar_service.get_plans(end_date=date(2025, 12, 12))
+        ]
+        assert names == ["後", "前"]
+
+    def test_ical_export_cached_until_change(self, calendar_service):
+        """iCal エクスポートは変更があるまで再利用される"""
+        plan = self._create(calendar_service, date(2025, 12, 15), "カレー")
+
+        content, etag = calendar_service.get_ical_export()
+        assert calendar_service.get_ical_export() == (content, etag)
+
+        calendar_service.update_plan(plan.id, {"recipe_name": "シチュー"})
+        updated, new_etag = calendar_service.get_ical_export()
+        assert new_etag != etag
+        assert "シチュー" in updated
+        assert "カレー" not in updated
+
+    def test_ical_cache_per_range(self, calendar_service):
+        """期間ごとに別々にキャッシュされる"""
+        self._create(calendar_service, date(2025, 12, 15), "カレー")
+        self._create(calendar_service, date(2025, 12, 25), "ケーキ")
+
+        december = calendar_service.export_to_ical(
+            start_date=date(2025, 12, 1), end_date=date(2025, 12, 20)
+        )
+        everything = calendar_service.export_to_ical()
+
+        assert "ケーキ" not in december
+        assert "ケーキ" in everything
+
+    def test_reloads_external_changes(self, calendar_service, temp_data_dir):
+        """別インスタンスの変更が反映される"""
+        other = CalendarService(data_dir=temp_data_dir)
+        self._create(other, date(2025, 12, 15), "カレー")
+
+        plans = calendar_service.get_plans()
+        assert [p.recipe_name for p in plans] == ["カレー"]
+
+
+class TestICalExportRouter:
+    """iCal エクスポート API の ETag / 304 のテスト"""
+
+    @pytest.fixture
+    def client(self, calendar_service, monkeypatch):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+
+        from backend.api.routers.calendar import router
+
+        monkeypatch.setattr(
+            "backend.api.routers.calendar.calendar_service", calendar_service
+        )
+        app = FastAPI()
+        app.include_router(router)
+        return TestClient(app)
+
+    def test_if_none_match_returns_304(self, client, calendar_service):
+        """ETag が一致すれば本文なしの 304、変更後は新しい本文を返す"""
+        plan = calendar_service.create_plan(
+            MealPlanModel(
+                date=date(2025, 12, 15), meal_type="夕食", recipe_name="カレー"
+            )
+        )
+
+        first = client.get("/api/v1/calendar/export/ical")
+        assert first.status_code == 200
+        assert "カレー" in first.text
+        etag = first.headers["ETag"]
+
+        cached = client.get(
+            "/api/v1/calendar/export/ical", headers={"If-None-Match": etag}
+        )
+        assert cached.status_code == 304
+        assert cached.headers["ETag"] == etag
+        assert cached.content == b""
+
+        calendar_service.update_plan(plan.id, {"recipe_name": "シチュー"})
+        changed = client.get(
+            "/api/v1/calendar/export/ical", headers={"If-None-Match": etag}
+        )
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
+        assert "シチュー" in changed.text
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -2,8 +2,10 @@
 Tests for collection service.
 """
 
+import json
 import tempfile
 import uuid
+from pathlib import Path
 
 import pytest
 
@@ -413,3 +415,87 @@ class TestCollectionService:
         assert loaded is not None
         assert loaded.id == created.id
         assert loaded.name == "Persisted"
+
+    def test_get_collections_with_recipe(self, service, user_id, other_user_id):
+        """Test reverse lookup of a user's collections containing a recipe."""
+        recipe_id = str(uuid.uuid4())
+        first = service.create_collection(name="First", owner_id=user_id)
+        service.create_collection(name="Empty", owner_id=user_id)
+        second = service.create_collection(name="Second", owner_id=user_id)
+        others = service.create_collection(name="Others", owner_id=other_user_id)
+
+        service.add_recipe(first.id, recipe_id, user_id)
+        service.add_recipe(second.id, recipe_id, user_id)
+        service.add_recipe(others.id, recipe_id, other_user_id)
+
+        found = service.get_collections_with_recipe(recipe_id, user_id)
+        assert [c.id for c in found] == [first.id, second.id]
+
+        service.remove_recipe(first.id, recipe_id, user_id)
+        service.delete_collection(second.id, user_id)
+        assert service.get_collections_with_recipe(recipe_id, user_id) == []
+        assert [
+            c.id for c in service.get_collections_with_recipe(recipe_id, other_user_id)
+        ] == [others.id]
+
+    def test_recipe_changes_persisted(self, temp_data_dir, user_id):
+        """Test recipe items and positions survive a new service instance."""
+        service1 = CollectionService(data_dir=temp_data_dir)
+        collection = service1.create_collection(
+            name="Persisted", owner_id=user_id, visibility=CollectionVisibility.PUBLIC
+        )
+        recipes = [str(uuid.uuid4()) for _ in range(3)]
+        for recipe_id in recipes:
+            service1.add_recipe(collection.id, recipe_id, user_id, note=recipe_id[:4])
+        service1.remove_recipe(collection.id, recipes[0], user_id)
+
+        service2 = CollectionService(data_dir=temp_data_dir)
+        loaded = service2.get_collection(collection.id)
+
+        assert [item.recipe_id for item in loaded.recipes] == recipes[1:]
+        assert [item.position for item in loaded.recipes] == [0, 1]
+        assert loaded.recipes[0].note == recipes[1][:4]
+        assert service2.get_public_collections()[0].id == collection.id
+        assert service2.get_stats().total_recipes == 2
+
+    def test_legacy_json_import(self, temp_data_dir, user_id):
+        """Test legacy collections.json is imported once and renamed."""
+        legacy_dir = Path(temp_data_dir) / "collections"
+        legacy_dir.mkdir(parents=True)
+        legacy_file = legacy_dir / "collections.json"
+        legacy_file.write_text(
+            json.dumps(
+                [
+                    {
+                        "id": "legacy-1",
+                        "name": "Legacy",
+                        "description": None,
+                        "owner_id": user_id,
+                        "visibility": "public",
+                        "created_at": "2024-01-01T00:00:00",
+                        "updated_at": "2024-01-02T00:00:00",
+                        "recipes": [
+                            {"recipe_id": "r1", "added_at": "2024-01-01T00:00:00"},
+                            {
+                                "recipe_id": "r2",
+                                "added_at": "2024-01-01T00:00:00",
+                                "position": 1,
+                            },
+                        ],
+                        "tags": ["old"],
+                    }
+                ]
+            ),
+            encoding="utf-8",
+        )
+
+        service = CollectionService(data_dir=temp_data_dir)
+
+        assert not legacy_file.exists()
+        assert (legacy_dir / "collections.json.migrated").exists()
+        loaded = service.get_collection("legacy-1")
+        assert loaded.tags == ["old"]
+        assert [item.recipe_id for item in loaded.recipes] == ["r1", "r2"]
+        assert [c.id for c in service.get_collections_with_recipe("r2", user_id)] == [
+            "legacy-1"
+        ]
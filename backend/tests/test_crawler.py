@@ -0,0 +1,221 @@
+"""
+BatchCrawler のテスト
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from backend.scraper.crawler import (
+    BatchCrawler,
+    close_batch_crawler,
+    get_batch_crawler,
+)
+from backend.scraper.html_cache import HTMLCache
+
+RECIPE_HTML = """
+<html><head>
+<script type="application/ld+json">
+{"@type": "Recipe", "name": "テストカレー",
+ "recipeIngredient": ["たまねぎ 1個"], "recipeInstructions": ["煮込む"]}
+</script>
+</head><body></body></html>
+"""
+
+
+def make_crawler(handler, **kwargs) -> BatchCrawler:
+    """MockTransport を使うクローラーを作成"""
+    kwargs.setdefault("per_host_interval", 0)
+    crawler = BatchCrawler(**kwargs)
+    crawler.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return crawler
+
+
+class TestBatchCrawler:
+    """BatchCrawlerのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_crawl_yields_result_per_unique_url(self):
+        """重複URLは1回だけ取得される"""
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/robots.txt":
+                return httpx.Response(404)
+            calls.append(str(request.url))
+            return httpx.Response(200, text=RECIPE_HTML)
+
+        urls = [
+            "https://a.example.com/r/1",
+            "https://b.example.com/r/2",
+            "https://a.example.com/r/1",
+        ]
+        async with make_crawler(handler) as crawler:
+            results = [r async for r in crawler.crawl(urls)]
+
+        assert len(results) == 2
+        assert all(r.status == "ok" for r in results)
+        assert results[0].recipe["title"] == "テストカレー"
+        assert sorted(calls) == sorted(set(urls))
+
+    @pytest.mark.asyncio
+    async def test_robots_disallow_blocks_url_and_is_cached(self):
+        """robots.txtで禁止されたURLはブロックされ、robots.txtはキャッシュされる"""
+        robots_fetches = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/robots.txt":
+                robots_fetches.append(1)
+                return httpx.Response(200, text="User-agent: *\nDisallow: /private/\n")
+            return httpx.Response(200, text=RECIPE_HTML)
+
+        urls = ["https://example.com/private/1", "https://example.com/r/2"]
+        async with make_crawler(handler) as crawler:
+            results = {r.url: r async for r in crawler.crawl(urls)}
+
+        assert results[urls[0]].status == "blocked"
+        assert results[urls[1]].status == "ok"
+        assert len(robots_fetches) == 1
+
+    @pytest.mark.asyncio
+    async def test_conditional_revalidation_uses_cached_body(self):
+        """ETagによる条件付きリクエストで304なら前回の本文を使う"""
+        seen_headers = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen_headers.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, text=RECIPE_HTML, headers={"ETag": '"v1"'})
+
+        url = "https://example.com/r/1"
+        async with make_crawler(handler, respect_robots=False) as crawler:
+            first = await crawler.scrape(url)
+            second = await crawler.scrape(url)
+
+        assert first.status == "ok" and not first.revalidated
+        assert second.status == "ok" and second.revalidated
+        assert second.recipe["title"] == "テストカレー"
+        assert seen_headers == [None, '"v1"']
+
+    @pytest.mark.asyncio
+    async def test_http_error_reported_without_raising(self):
+        """HTTPエラーは例外ではなくエラー結果として返す"""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(404)
+
+        async with make_crawler(handler, respect_robots=False) as crawler:
+            result = await crawler.scrape("https://example.com/missing")
+
+        assert result.status == "error"
+        assert "404" in result.error
+
+    @pytest.mark.asyncio
+    async def test_per_host_concurrency_cap(self):
+        """同一ホストへの同時リクエスト数が上限を超えない"""
+        in_flight = {"now": 0, "max": 0}
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(0.01)
+            in_flight["now"] -= 1
+            return httpx.Response(200, text=RECIPE_HTML)
+
+        urls = [f"https://example.com/r/{i}" for i in range(6)]
+        async with make_crawler(
+            handler, respect_robots=False, per_host_concurrency=2
+        ) as crawler:
+            results = [r async for r in crawler.crawl(urls)]
+
+        assert len(results) == 6
+        assert in_flight["max"] <= 2
+
+    @pytest.mark.asyncio
+    async def test_robots_fetch_waits_for_host_slot(self):
+        """robots.txt の取得もホストごとの間隔に従う"""
+        slots = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/robots.txt":
+                return httpx.Response(404)
+            return httpx.Response(200, text=RECIPE_HTML)
+
+        async with make_crawler(handler) as crawler:
+            original = crawler._wait_for_slot
+
+            async def wait_for_slot(state):
+                slots.append(state)
+                await original(state)
+
+            crawler._wait_for_slot = wait_for_slot
+            result = await crawler.scrape("https://example.com/r/1")
+
+        assert result.status == "ok"
+        assert len(slots) == 2
+
+    @pytest.mark.asyncio
+    async def test_validators_persist_in_html_cache(self, tmp_path):
+        """HTMLキャッシュに保存した ETag で別のクローラーからも条件付き取得する"""
+        seen_headers = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen_headers.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, text=RECIPE_HTML, headers={"ETag": '"v1"'})
+
+        # TTL 0: キャッシュの本文は直接使わず、必ず再検証する
+        html_cache = HTMLCache(cache_dir=str(tmp_path), ttl=0)
+        url = "https://example.com/r/1"
+        try:
+            async with make_crawler(
+                handler, respect_robots=False, html_cache=html_cache
+            ) as crawler:
+                first = await crawler.scrape(url)
+            async with make_crawler(
+                handler, respect_robots=False, html_cache=html_cache
+            ) as crawler:
+                second = await crawler.scrape(url)
+        finally:
+            html_cache.close()
+
+        assert first.status == "ok" and not first.revalidated
+        assert second.status == "ok" and second.revalidated
+        assert seen_headers == [None, '"v1"']
+
+    @pytest.mark.asyncio
+    async def test_crawl_per_call_concurrency(self):
+        """crawl ごとの上限はクローラー全体の上限より小さくできる"""
+        in_flight = {"now": 0, "max": 0}
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(0.01)
+            in_flight["now"] -= 1
+            return httpx.Response(200, text=RECIPE_HTML)
+
+        urls = [f"https://example.com/r/{i}" for i in range(4)]
+        async with make_crawler(
+            handler, respect_robots=False, per_host_concurrency=4
+        ) as crawler:
+            results = [r async for r in crawler.crawl(urls, per_host_concurrency=1)]
+
+        assert len(results) == 4
+        assert in_flight["max"] == 1
+
+    @pytest.mark.asyncio
+    async def test_shared_crawler_reused_within_loop(self, tmp_path, monkeypatch):
+        """API用のクローラーは同じイベントループ内で使い回される"""
+        html_cache = HTMLCache(cache_dir=str(tmp_path))
+        monkeypatch.setattr("backend.scraper.html_cache._html_cache", html_cache)
+        crawler = get_batch_crawler()
+        try:
+            assert get_batch_crawler() is crawler
+            assert crawler.html_cache is html_cache
+        finally:
+            await close_batch_crawler()
+            html_cache.close()
@@ -0,0 +1,78 @@
+"""
+辞書照合（Aho–Corasick）のテスト
+"""
+
+import random
+
+from backend.services.dictionary_matcher import DictionaryMatcher
+
+
+def brute_force(words, text):
+    """全単語・全位置の走査による参照実装"""
+    found = set()
+    for word in words:
+        start = text.find(word)
+        while start != -1:
+            found.add((word, start, start + len(word)))
+            start = text.find(word, start + 1)
+    return found
+
+
+class TestDictionaryMatcher:
+    """DictionaryMatcherのテスト"""
+
+    def test_find_all_matches_brute_force(self):
+        """重なりを含む全出現が総当たりの結果と一致する"""
+        rng = random.Random(5)
+        alphabet = "abcd"
+        words = {
+            "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4)))
+            for _ in range(40)
+        }
+        matcher = DictionaryMatcher({"words": words})
+
+        for _ in range(50):
+            text = "".join(rng.choice(alphabet) for _ in range(30))
+            actual = {(m.word, m.start, m.end) for m in matcher.find_all(text)}
+            assert actual == brute_force(words, text)
+
+    def test_longest_match_wins(self):
+        """重なり合う出現は左端優先・最長一致"""
+        matcher = DictionaryMatcher({"ingredients": ["ねぎ", "長ねぎ", "玉ねぎ"]})
+
+        matches = matcher.find("長ねぎと玉ねぎとねぎ")
+
+        assert [(m.word, m.start, m.end) for m in matches] == [
+            ("長ねぎ", 0, 3),
+            ("玉ねぎ", 4, 7),
+            ("ねぎ", 8, 10),
+        ]
+
+    def test_labels(self):
+        """同じ単語を複数ラベルで登録できる"""
+        matcher = DictionaryMatcher(
+            {"ingredients": ["パスタ", "トマト"], "categories": ["パスタ"]}
+        )
+
+        assert matcher.labelled("トマトパスタとパスタ") == {
+            "ingredients": ["トマト", "パスタ"],
+            "categories": ["パスタ"],
+        }
+        assert len(matcher) == 2
+
+    def test_replace(self):
+        """置換結果は再照合しない"""
+        matcher = DictionaryMatcher({"synonyms": ["たまねぎ", "玉子"]})
+
+        replaced = matcher.replace(
+            "たまねぎと玉子", {"たまねぎ": "玉ねぎ", "玉子": "卵"}
+        )
+
+        assert replaced == "玉ねぎと卵"
+
+    def test_add_after_build(self):
+        """構築後に追加した単語も照合される"""
+        matcher = DictionaryMatcher({"words": ["abc"]})
+        matcher.add("bc", "words")
+
+        assert [m.word for m in matcher.find_all("abc")] == ["abc", "bc"]
@@ -0,0 +1,78 @@
+"""
+支出台帳のテスト
+"""
+
+from backend.services.expense_ledger import ExpenseLedger
+from backend.services.expense_service import ExpenseCategory, ExpenseRecord
+
+
+def _expense(expense_id, date, amount, category=ExpenseCategory.INGREDIENTS):
+    return ExpenseRecord(
+        id=expense_id,
+        date=date,
+        amount=amount,
+        category=category,
+        description=expense_id,
+    )
+
+
+class TestExpenseLedger:
+    """ExpenseLedgerのテスト"""
+
+    def test_records_sorted_by_date(self):
+        """読み込み順によらず日付順に並ぶ"""
+        ledger = ExpenseLedger(
+            [
+                _expense("c", "2025-12-03T10:00:00", 300.0),
+                _expense("a", "2025-12-01", 100.0),
+                _expense("b", "2025-12-02T09:00:00", 200.0),
+            ]
+        )
+
+        assert [e.id for e in ledger.records()] == ["a", "b", "c"]
+        assert len(ledger) == 3
+
+    def test_range_is_inclusive_by_day(self):
+        """期間の両端は日付部分で比較し、両端を含む"""
+        ledger = ExpenseLedger()
+        ledger.add(_expense("a", "2025-12-01T23:59:00", 100.0))
+        ledger.add(_expense("b", "2025-12-02T00:00:00", 200.0))
+        ledger.add(_expense("c", "2025-12-03T12:00:00", 400.0))
+
+        ids = [e.id for e in ledger.records("2025-12-02T15:00:00", "2025-12-03")]
+        assert ids == ["b", "c"]
+        assert ledger.total("2025-12-01", "2025-12-02") == 300.0
+        assert ledger.total(start_date="2025-12-02") == 600.0
+        assert ledger.total(end_date="2025-12-01") == 100.0
+        assert ledger.total("2025-12-04", "2025-12-31") == 0.0
+        assert ledger.total("2025-12-03", "2025-12-01") == 0.0
+
+    def test_out_of_order_add_updates_sums(self):
+        """過去の日付を追加しても累積和が正しく更新される"""
+        ledger = ExpenseLedger()
+        ledger.add(_expense("b", "2025-12-05", 500.0))
+        ledger.add(_expense("c", "2025-12-09", 900.0, ExpenseCategory.DINING_OUT))
+        ledger.add(_expense("a", "2025-12-01", 100.0, ExpenseCategory.BEVERAGES))
+
+        assert [e.id for e in ledger.records()] == ["a", "b", "c"]
+        assert ledger.total() == 1500.0
+        assert ledger.total("2025-12-02", "2025-12-09") == 1400.0
+        assert ledger.category_totals("2025-12-01", "2025-12-05") == {
+            "食材": 500.0,
+            "外食": 0.0,
+            "飲料": 100.0,
+        }
+
+    def test_category_total(self):
+        """カテゴリを指定した合計"""
+        ledger = ExpenseLedger(
+            [
+                _expense("a", "2025-12-01", 0.1),
+                _expense("b", "2025-12-02", 0.2),
+                _expense("c", "2025-12-02", 5.0, ExpenseCategory.OTHER),
+            ]
+        )
+
+        assert ledger.total(category=ExpenseCategory.INGREDIENTS) == 0.3
+        assert ledger.total(category="その他") == 5.0
+        assert ledger.total(category=ExpenseCategory.SEASONINGS) == 0.0
@@ -491,3 +491,39 @@ class TestExpenseService:
         budget = new_service.get_budget("2025-12")
         assert budget is not None
         assert budget.total_budget == 50000.0
+
+    def test_summary_with_out_of_order_dates(self, expense_service):
+        """日付順でない追加でも期間の集計が正しい"""
+        for date, amount in [
+            ("2025-12-20", 3000.0),
+            ("2025-11-30", 9000.0),
+            ("2025-12-01", 1000.0),
+            ("2026-01-01", 7000.0),
+        ]:
+            expense_service.add_expense(
+                date=date,
+                amount=amount,
+                category=ExpenseCategory.INGREDIENTS,
+                description="食材",
+            )
+
+        summary = expense_service.get_summary(period="month", date="2025-12-15")
+
+        assert summary.total_spent == 4000.0
+        assert summary.category_breakdown["食材"] == 4000.0
+        assert summary.trend == "decreasing"
+        expenses = expense_service.get_expenses("2025-12-01", "2025-12-31")
+        assert [e.date for e in expenses] == ["2025-12-20", "2025-12-01"]
+
+    def test_reloads_when_file_changes(self, expense_service):
+        """別インスタンスの追加が反映される"""
+        other = ExpenseService(data_dir=expense_service.data_dir)
+        other.add_expense(
+            date="2025-12-10",
+            amount=1200.0,
+            category=ExpenseCategory.DINING_OUT,
+            description="外食",
+        )
+
+        breakdown = expense_service.get_category_breakdown("2025-12")
+        assert breakdown["外食"] == 1200.0
@@ -0,0 +1,153 @@
+"""
+フォローフィードのタイムラインのテスト
+"""
+
+from backend.services.follow_timeline import TimelineStore
+from backend.services.social_graph import SocialGraph
+
+
+def _recipe(recipe_id, user_id, day):
+    return {
+        "id": recipe_id,
+        "user_id": user_id,
+        "created_at": f"2025-12-{day:02d}T10:00:00",
+    }
+
+
+class TestTimelineStore:
+    """TimelineStore のテスト"""
+
+    def test_capacity_keeps_newest(self):
+        """上限を超えたら古い要素から捨てる"""
+        store = TimelineStore(capacity=3)
+        store.create("u", [("2025-12-01", 0)])
+        for day in ["2025-12-04", "2025-12-02", "2025-12-05"]:
+            store.push("u", (day, 0))
+
+        assert [day for day, _ in store.latest("u")] == [
+            "2025-12-05",
+            "2025-12-04",
+            "2025-12-02",
+        ]
+
+    def test_push_ignored_without_timeline(self):
+        """タイムラインを作っていないユーザーには配信しない"""
+        store = TimelineStore()
+        store.push("u", ("2025-12-01", 0))
+        store.merge("u", [("2025-12-02", -1)])
+
+        assert "u" not in store
+        assert list(store.latest("u")) == []
+
+    def test_merge_and_discard(self):
+        """重複なしの追加と条件による削除"""
+        store = TimelineStore()
+        store.create("u", [("2025-12-01", 0), ("2025-12-02", -1)])
+        store.merge("u", [("2025-12-02", -1), ("2025-12-03", -2)])
+        assert len(list(store.latest("u"))) == 3
+
+        store.discard("u", lambda entry: entry[1] == -1)
+        assert list(store.latest("u")) == [("2025-12-03", -2), ("2025-12-01", 0)]
+
+
+class TestSocialGraphFeed:
+    """SocialGraph.feed のテスト"""
+
+    def _graph(self, tmp_path, make_follow, **kwargs):
+        graph = SocialGraph(tmp_path, **kwargs)
+        graph.replace_recipes(
+            [
+                _recipe("r1", "b", 1),
+                _recipe("r2", "c", 2),
+                _recipe("r3", "d", 3),
+            ]
+        )
+        graph.add_follow(make_follow("a", "b"))
+        graph.add_follow(make_follow("a", "c"))
+        return graph
+
+    def test_feed_matches_pull(self, tmp_path, make_follow):
+        """タイムラインの結果がプル型の結果と一致する"""
+        graph = self._graph(tmp_path, make_follow)
+
+        assert [r["id"] for r in graph.feed("a", 10)] == ["r2", "r1"]
+        graph.add_recipe(_recipe("r4", "b", 4))
+        graph.add_recipe(_recipe("r5", "d", 5))
+
+        feed = [r["id"] for r in graph.feed("a", 10)]
+        assert feed == ["r4", "r2", "r1"]
+        assert feed == [r["id"] for r in graph.latest_recipes(["b", "c"], 10)]
+
+    def test_publish_fans_out_to_followers(self, tmp_path, make_follow):
+        """公開したレシピがフォロワーのタイムラインに入る"""
+        graph = self._graph(tmp_path, make_follow)
+        graph.feed("a", 10)
+
+        graph.add_recipe(_recipe("r4", "c", 4))
+
+        assert [day for day, _ in graph.timelines.latest("a")][0] == (
+            "2025-12-04T10:00:00"
+        )
+        assert graph.recipe_count("c") == 2
+
+    def test_follow_and_unfollow_update_timeline(self, tmp_path, make_follow):
+        """フォローで取り込み、アンフォローで取り除く"""
+        graph = self._graph(tmp_path, make_follow)
+        graph.feed("a", 10)
+
+        graph.add_follow(make_follow("a", "d"))
+        assert [r["id"] for r in graph.feed("a", 10)] == ["r3", "r2", "r1"]
+
+        graph.remove_follow("a", "c")
+        assert [r["id"] for r in graph.feed("a", 10)] == ["r3", "r1"]
+
+    def test_unfollow_refills_evicted_entries(self, tmp_path, make_follow):
+        """アンフォロー後も、上限で押し出された残りのフォロー先の投稿を返す"""
+        graph = SocialGraph(tmp_path, timeline_capacity=5)
+        graph.add_follow(make_follow("r", "a"))
+        graph.add_follow(make_follow("r", "b"))
+        for day in range(1, 6):
+            graph.add_recipe(_recipe(f"a{day}", "a", day))
+        graph.feed("r", 5)
+        for day in range(6, 11):
+            graph.add_recipe(_recipe(f"b{day}", "b", day))
+
+        graph.remove_follow("r", "b")
+
+        feed = [r["id"] for r in graph.feed("r", 5)]
+        assert feed == ["a5", "a4", "a3", "a2", "a1"]
+        assert feed == [r["id"] for r in graph.latest_recipes(["a"], 5)]
+
+    def test_heavy_publisher_is_pulled(self, tmp_path, make_follow):
+        """フォロワーの多いユーザーの投稿は配らず読み込み時に合流する"""
+        graph = self._graph(tmp_path, make_follow, heavy_publisher_threshold=2)
+        graph.add_follow(make_follow("x", "b"))
+        graph.feed("a", 10)
+
+        graph.add_recipe(_recipe("r4", "b", 4))
+
+        assert all(
+            graph._author_of(entry) != "b" or entry[0] < "2025-12-04"
+            for entry in graph.timelines.latest("a")
+        )
+        assert [r["id"] for r in graph.feed("a", 10)] == ["r4", "r2", "r1"]
+
+        # フォロワーが減ったら配信対象に戻る
+        graph.remove_follow("x", "b")
+        graph.add_recipe(_recipe("r5", "b", 5))
+        assert [r["id"] for r in graph.feed("a", 2)] == ["r5", "r4"]
+
+    def test_limit_beyond_capacity_uses_pull(self, tmp_path, make_follow):
+        """タイムラインの件数を超える取得はプル型で読む"""
+        graph = self._graph(tmp_path, make_follow, timeline_capacity=1)
+
+        assert [r["id"] for r in graph.feed("a", 1)] == ["r2"]
+        assert [r["id"] for r in graph.feed("a", 5)] == ["r2", "r1"]
+
+    def test_published_recipe_persisted(self, tmp_path, make_follow):
+        """公開したレシピが recipes.json に保存される"""
+        graph = self._graph(tmp_path, make_follow)
+        graph.add_recipe(_recipe("r4", "b", 4))
+
+        reloaded = SocialGraph(tmp_path)
+        assert [r["id"] for r in reloaded.feed("a", 10)] == ["r4", "r2", "r1"]
@@ -0,0 +1,141 @@
+"""
+HTMLCache のテスト
+"""
+
+import os
+import time
+
+import pytest
+
+from backend.scraper.html_cache import HTMLCache, normalize_url, reparse_cached
+from backend.scraper.sites import GenericScraper
+
+RECIPE_HTML = """
+<html><head>
+<script type="application/ld+json">
+{"@type": "Recipe", "name": "肉じゃが",
+ "recipeIngredient": ["じゃがいも 2個"], "recipeInstructions": ["煮る"]}
+</script>
+</head><body></body></html>
+"""
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """テスト用キャッシュ（一時ディレクトリを使用）"""
+    html_cache = HTMLCache(cache_dir=str(tmp_path / "html_cache"))
+    yield html_cache
+    html_cache.close()
+
+
+class TestNormalizeUrl:
+    """normalize_urlのテスト"""
+
+    def test_equivalent_urls_normalize_identically(self):
+        """大文字ホスト・既定ポート・フラグメント・末尾スラッシュを正規化"""
+        assert normalize_url("HTTPS://Example.COM:443/recipe/1/#steps") == (
+            "https://example.com/recipe/1"
+        )
+
+    def test_tracking_params_removed_and_sorted(self):
+        """トラッキングパラメータを除去し、クエリをソート"""
+        assert (
+            normalize_url("https://example.com/r?b=2&utm_source=x&a=1&fbclid=abc")
+            == "https://example.com/r?a=1&b=2"
+        )
+
+
+class TestHTMLCache:
+    """HTMLCacheのテスト"""
+
+    def test_put_and_get_roundtrip(self, cache):
+        """保存したHTMLを正規化URLで取得できる"""
+        cache.put("https://example.com/r/1", RECIPE_HTML)
+        assert cache.get("https://EXAMPLE.com/r/1/") == RECIPE_HTML
+        assert cache.get("https://example.com/r/2") is None
+
+    def test_expired_entry_not_served(self, cache):
+        """TTLを過ぎたページは返さない"""
+        cache.put("https://example.com/r/1", RECIPE_HTML)
+        assert cache.get("https://example.com/r/1", max_age=-1) is None
+        assert cache.get("https://example.com/r/1") == RECIPE_HTML
+        cache.ttl = -1
+        assert cache.get("https://example.com/r/1") is None
+        assert cache.purge_expired() == 1
+
+    def test_size_limit_evicts_least_recently_used(self, tmp_path):
+        """サイズ上限を超えると最も古くアクセスされたページから削除"""
+        html_cache = HTMLCache(cache_dir=str(tmp_path / "small"), max_bytes=2100)
+        try:
+            for i in range(3):
+                html_cache.put(f"https://example.com/{i}", os.urandom(600).hex())
+                time.sleep(0.01)
+            html_cache.get("https://example.com/0")
+            html_cache.put("https://example.com/3", os.urandom(600).hex())
+
+            assert html_cache.get_stats()["bytes"] <= 2100
+            assert html_cache.get("https://example.com/0") is not None
+            assert html_cache.get("https://example.com/1") is None
+        finally:
+            html_cache.close()
+
+    def test_running_total_tracks_writes(self, tmp_path):
+        """置き換え・削除・再起動後も保持サイズの合計が実際の合計と一致する"""
+        html_cache = HTMLCache(cache_dir=str(tmp_path / "total"))
+        try:
+            html_cache.put("https://example.com/a", os.urandom(300).hex())
+            html_cache.put("https://example.com/b", os.urandom(300).hex())
+            html_cache.put("https://example.com/a", os.urandom(100).hex())
+            html_cache.delete("https://example.com/b")
+            html_cache.delete("https://example.com/missing")
+
+            actual = html_cache.get_stats()["bytes"]
+            assert html_cache._total_bytes == actual
+        finally:
+            html_cache.close()
+
+        reopened = HTMLCache(cache_dir=str(tmp_path / "total"))
+        try:
+            assert reopened._total_bytes == actual
+        finally:
+            reopened.close()
+
+    def test_pages_are_compressed(self, cache):
+        """保存サイズは元のHTMLより小さい"""
+        html = RECIPE_HTML * 50
+        cache.put("https://example.com/r/1", html)
+        assert cache.get_stats()["bytes"] < len(html.encode("utf-8"))
+
+    @pytest.mark.asyncio
+    async def test_scraper_uses_cache_before_network(self, cache):
+        """キャッシュ済みURLはネットワークから取得しない"""
+        cache.put("https://example.com/r/1", RECIPE_HTML)
+
+        async def fail_fetch(url: str) -> str:
+            raise AssertionError("network should not be used")
+
+        scraper = GenericScraper(fetcher=fail_fetch, html_cache=cache)
+        recipe = await scraper.scrape("https://example.com/r/1")
+        assert recipe["title"] == "肉じゃが"
+
+    @pytest.mark.asyncio
+    async def test_reparse_cached_runs_parsers_offline(self, cache):
+        """再解析はキャッシュ済み全ページに現在のパーサーを適用する"""
+        cache.put("https://example.com/r/1", RECIPE_HTML)
+        cache.put("https://example.com/r/2", "<html><body></body></html>")
+
+        results = [r async for r in reparse_cached(cache)]
+
+        by_url = {r["url"]: r for r in results}
+        assert by_url["https://example.com/r/1"]["status"] == "ok"
+        assert by_url["https://example.com/r/1"]["recipe"]["title"] == "肉じゃが"
+        assert by_url["https://example.com/r/2"]["status"] == "error"
+
+    @pytest.mark.asyncio
+    async def test_reparse_limit(self, cache):
+        """limit件数で打ち切る"""
+        for i in range(5):
+            cache.put(f"https://example.com/r/{i}", RECIPE_HTML)
+
+        results = [r async for r in reparse_cached(cache, limit=2)]
+        assert len(results) == 2
@@ -4,7 +4,6 @@
 
 import base64
 import io
-import json
 from pathlib import Path
 
 import pytest
@@ -114,7 +113,50 @@ class TestImageRecognitionService:
 
         # 同じ画像は同じハッシュ
         assert hash1 == hash2
-        assert len(hash1) == 64  # SHA256
+        assert len(hash1) == 19  # dHash 16桁 + 色 3桁
+
+    def test_image_hash_near_duplicate(self, tmp_path):
+        """リサイズ・再圧縮したほぼ同一画像は近いハッシュになる"""
+        from PIL import ImageDraw
+
+        service = ImageRecognitionService(mode="mock", cache_dir=tmp_path)
+
+        img = Image.new("RGB", (800, 600), color=(200, 100, 50))
+        draw = ImageDraw.Draw(img)
+        draw.ellipse((100, 100, 500, 400), fill=(20, 200, 20))
+        draw.rectangle((550, 50, 750, 550), fill=(0, 0, 200))
+
+        buffer = io.BytesIO()
+        img.resize((640, 480)).save(buffer, format="JPEG", quality=60)
+        recompressed = Image.open(buffer)
+
+        key1 = service._get_image_hash(img)
+        key2 = service._get_image_hash(recompressed)
+        dhash1, color1 = service.cache.split_key(key1)
+        dhash2, color2 = service.cache.split_key(key2)
+
+        assert color1 == color2
+        assert bin(dhash1 ^ dhash2).count("1") <= service.cache.max_distance
+
+        # ほぼ同一画像はキャッシュヒット
+        results = service._recognize_image(img, max_results=5)
+        assert service._recognize_image(recompressed, max_results=5) == results
+
+    def test_cache_skips_recognition_on_hit(self, sample_image, tmp_path):
+        """キャッシュヒット時は認識処理を呼ばない"""
+        from unittest.mock import patch
+
+        service = ImageRecognitionService(mode="mock", cache_dir=tmp_path)
+
+        service._save_to_cache(
+            service._get_image_hash(sample_image),
+            [{"ingredient_id": "tomato", "confidence": 0.9}],
+        )
+        with patch.object(service, "_generate_mock_results") as mock_generate:
+            results = service._recognize_image(sample_image, max_results=5)
+
+        mock_generate.assert_not_called()
+        assert results[0]["ingredient_id"] == "tomato"
 
     def test_cache_functionality(self, service, sample_image_path):
         """キャッシュ機能テスト"""
@@ -127,9 +169,9 @@ class TestImageRecognitionService:
         # 結果が一致するか
         assert results1 == results2
 
-        # キャッシュファイルが作成されているか
-        cache_files = list(service.cache_dir.glob("*.json"))
-        assert len(cache_files) > 0
+        # キャッシュに保存されているか
+        assert (service.cache_dir / "recognition_cache.db").exists()
+        assert service.cache.count() > 0
 
     def test_get_ingredient_info(self, service):
         """食材情報取得テスト"""
@@ -274,12 +316,15 @@ class TestImageRecognitionService:
         # キャッシュ保存
         cache_key = service._get_image_hash(sample_image)
         results = [{"ingredient_id": "test", "confidence": 0.9}]
+        service._save_to_cache(cache_key, results)
 
-        cache_file = service.cache_dir / f"{cache_key}.json"
-        with open(cache_file, "w") as f:
-            # 古いタイムスタンプで保存
-            old_time = datetime.now() - timedelta(days=2)
-            json.dump({"timestamp": old_time.isoformat(), "results": results}, f)
+        # 古いタイムスタンプに書き換え
+        old_time = datetime.now() - timedelta(days=2)
+        service.cache._conn.execute(
+            "UPDATE recognition_cache SET created_at = ? WHERE cache_key = ?",
+            (old_time.timestamp(), cache_key),
+        )
+        service.cache._conn.commit()
 
         # 期限切れキャッシュは取得できない
         cached_result = service._get_cached_result(cache_key)
@@ -0,0 +1,157 @@
+"""
+ユーザー×レシピ 暗黙評価行列のテスト
+"""
+
+import random
+
+import pytest
+
+from backend.services.interaction_matrix import InteractionMatrix, activity_weight
+
+ACTIVITY_TYPES = ["viewed", "cooked", "favorited", "rated", "not_interested"]
+
+
+def make_activity(recipe_id: str, activity_type: str, rating: int = 0) -> dict:
+    """テスト用の行動イベント"""
+    return {
+        "recipe_id": recipe_id,
+        "activity_type": activity_type,
+        "metadata": {"rating": rating} if activity_type == "rated" else {},
+    }
+
+
+def brute_force_scores(histories: dict, user_id: str, top_n: int = 5) -> dict:
+    """全ユーザー走査による参照実装"""
+
+    def rating(uid, rid):
+        score = sum(activity_weight(a) for a in histories[uid] if a["recipe_id"] == rid)
+        return max(0.0, min(1.0, score))
+
+    mine = {a["recipe_id"] for a in histories[user_id]}
+    similar = []
+    for other, history in histories.items():
+        if other == user_id:
+            continue
+        theirs = {a["recipe_id"] for a in history}
+        sim = len(mine & theirs) / len(mine | theirs)
+        if sim > 0:
+            similar.append((other, sim))
+    similar.sort(key=lambda x: (-x[1], x[0]))
+    similar = similar[:top_n]
+
+    recipes = {a["recipe_id"] for h in histories.values() for a in h}
+    scores = {}
+    for rid in recipes:
+        total = weight = 0.0
+        for other, sim in similar:
+            r = rating(other, rid)
+            if r > 0:
+                total += r * sim
+                weight += sim
+        if weight:
+            scores[rid] = total / weight
+    return scores
+
+
+@pytest.fixture
+def histories():
+    """ランダムな行動履歴"""
+    rng = random.Random(42)
+    data = {}
+    for u in range(60):
+        data[f"user_{u:03d}"] = [
+            make_activity(
+                f"recipe_{rng.randrange(40):03d}",
+                rng.choice(ACTIVITY_TYPES),
+                rng.randint(1, 5),
+            )
+            for _ in range(rng.randint(1, 15))
+        ]
+    return data
+
+
+class TestInteractionMatrix:
+    """InteractionMatrixのテスト"""
+
+    def test_rating_is_clipped_sum(self):
+        """評価は行動の寄与の合計を 0-1 にクリップした値"""
+        matrix = InteractionMatrix()
+        matrix.add("u1", make_activity("r1", "viewed"))
+        assert matrix.rating("u1", "r1") == pytest.approx(0.1)
+        matrix.add("u1", make_activity("r1", "cooked"))
+        assert matrix.rating("u1", "r1") == 1.0
+        matrix.add("u1", make_activity("r2", "not_interested"))
+        assert matrix.rating("u1", "r2") == 0.0
+        assert matrix.rating("u1", "missing") == 0.0
+
+    def test_scores_match_brute_force(self, histories):
+        """転置索引による計算が全走査の結果と一致する"""
+        matrix = InteractionMatrix()
+        matrix.add_many(histories)
+
+        for user_id in list(histories)[:10]:
+            expected = brute_force_scores(histories, user_id)
+            actual = matrix.collaborative_scores(user_id)
+            assert actual.keys() == expected.keys()
+            for rid, score in expected.items():
+                assert actual[rid] == pytest.approx(score)
+
+    def test_neighbor_cache_invalidated_on_new_pair(self):
+        """新しい (ユーザー, レシピ) の組が増えると類似ユーザーを再計算する"""
+        matrix = InteractionMatrix()
+        matrix.add("u1", make_activity("r1", "cooked"))
+        matrix.add("u2", make_activity("r2", "cooked"))
+        assert matrix.similar_users("u1") == []
+
+        matrix.add("u2", make_activity("r1", "cooked"))
+        assert matrix.similar_users("u1") == [("u2", pytest.approx(0.5))]
+
+        # u2 の集合サイズが変わると共有レシピを持つ u1 の類似度も変わる
+        matrix.add("u2", make_activity("r3", "cooked"))
+        assert matrix.similar_users("u1") == [("u2", pytest.approx(1 / 3))]
+
+    def test_unrelated_users_keep_neighbor_cache(self):
+        """レシピを共有しないユーザーの行動ではキャッシュを破棄しない"""
+        matrix = InteractionMatrix()
+        matrix.add("u1", make_activity("r1", "cooked"))
+        matrix.add("u2", make_activity("r1", "cooked"))
+        matrix.add("u3", make_activity("r9", "cooked"))
+        matrix.similar_users("u1")
+        matrix.similar_users("u3")
+
+        matrix.add("u4", make_activity("r9", "cooked"))
+        assert "u1" in matrix._neighbor_cache
+        assert "u3" not in matrix._neighbor_cache
+
+    def test_cache_matches_brute_force_after_updates(self, histories):
+        """キャッシュを保ったまま行動を追加しても全走査の結果と一致する"""
+        matrix = InteractionMatrix()
+        users = list(histories)
+        for user_id in users:
+            for activity in histories[user_id]:
+                matrix.add(user_id, activity)
+                matrix.collaborative_scores(user_id)
+        for user_id in users:
+            matrix.collaborative_scores(user_id)
+
+        extra = make_activity("recipe_000", "cooked")
+        for user_id in users[::7]:
+            histories[user_id].append(extra)
+            matrix.add(user_id, extra)
+
+        for user_id in users:
+            expected = brute_force_scores(histories, user_id)
+            actual = matrix.collaborative_scores(user_id)
+            assert actual.keys() == expected.keys()
+            for rid, score in expected.items():
+                assert actual[rid] == pytest.approx(score)
+
+    def test_candidate_filter(self):
+        """候補レシピを指定するとその分だけ返す"""
+        matrix = InteractionMatrix()
+        for rid in ["r1", "r2", "r3"]:
+            matrix.add("u2", make_activity(rid, "cooked"))
+        matrix.add("u1", make_activity("r1", "cooked"))
+
+        assert set(matrix.collaborative_scores("u1", ["r2", "r9"])) == {"r2"}
+        assert matrix.get_stats() == {"users": 2, "recipes": 3, "nonzero": 4}
@@ -401,3 +401,82 @@ class TestMealHistoryService:
         assert len(analysis.top_ingredients) == 0
         assert len(analysis.favorite_recipes) == 0
         assert len(analysis.meal_time_pattern) == 0
+
+    def test_analyze_trends_uses_cutoff_time(
+        self, service, sample_nutrition, sample_ingredients
+    ):
+        """期間の境界日は記録の時刻で判定されることを確認"""
+        now = datetime.now()
+        inside = now - timedelta(days=6, hours=1)
+        outside = now - timedelta(days=8)
+        for name, consumed_at in [("内", inside), ("外", outside), ("今日", now)]:
+            service.record_meal(
+                user_id="user123",
+                recipe_id=name,
+                recipe_name=name,
+                meal_type="dinner",
+                servings=1.0,
+                nutrition=sample_nutrition,
+                ingredients=sample_ingredients,
+                consumed_at=consumed_at.isoformat(),
+            )
+
+        analysis = service.analyze_trends("user123", days=7)
+
+        assert dict(analysis.favorite_recipes) == {"内": 1, "今日": 1}
+        assert analysis.meal_time_pattern == {"dinner": 2}
+
+    def test_get_period_totals(self, service, sample_nutrition, sample_ingredients):
+        """週別・月別の合計を取得できることを確認"""
+        for consumed_at in [
+            "2025-11-30T12:00:00",
+            "2025-12-01T12:00:00",
+            "2025-12-02T12:00:00",
+        ]:
+            service.record_meal(
+                user_id="user123",
+                recipe_id="recipe1",
+                recipe_name="カレー",
+                meal_type="lunch",
+                servings=1.0,
+                nutrition=sample_nutrition,
+                ingredients=sample_ingredients,
+                consumed_at=consumed_at,
+            )
+
+        weekly = service.get_period_totals("user123", "week")
+        assert [w["period"] for w in weekly] == ["2025-11-24", "2025-12-01"]
+        assert weekly[1]["meal_count"] == 2
+        assert weekly[1]["total_nutrition"]["calories"] == 1000.0
+
+        monthly = service.get_period_totals("user123", "month")
+        assert [(m["period"], m["meal_count"]) for m in monthly] == [
+            ("2025-11", 1),
+            ("2025-12", 2),
+        ]
+
+        with pytest.raises(ValueError):
+            service.get_period_totals("user123", "year")
+
+    def test_records_shared_through_file(
+        self, temp_dir, sample_nutrition, sample_ingredients
+    ):
+        """別インスタンスが書き込んだ記録も読み込み直されることを確認"""
+        reader = MealHistoryService(data_dir=temp_dir)
+        writer = MealHistoryService(data_dir=temp_dir)
+        assert reader.get_daily_nutrition("user123", "2025-12-10").meal_count == 0
+
+        writer.record_meal(
+            user_id="user123",
+            recipe_id="recipe1",
+            recipe_name="カレー",
+            meal_type="dinner",
+            servings=1.0,
+            nutrition=sample_nutrition,
+            ingredients=sample_ingredients,
+            consumed_at="2025-12-10T19:00:00",
+        )
+
+        daily = reader.get_daily_nutrition("user123", "2025-12-10")
+        assert daily.meal_count == 1
+        assert daily.total_nutrition["calories"] == 500.0
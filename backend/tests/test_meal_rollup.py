@@ -0,0 +1,79 @@
+"""
+食事記録ロールアップのテスト
+"""
+
+from datetime import date
+
+from backend.services.meal_rollup import MealRollup, week_key
+
+
+def _record(user_id, consumed_at, calories, recipe_name="カレー", meal_type="dinner"):
+    return {
+        "user_id": user_id,
+        "recipe_name": recipe_name,
+        "meal_type": meal_type,
+        "consumed_at": consumed_at,
+        "nutrition": {"calories": calories},
+        "ingredients": ["鶏肉", "玉ねぎ"],
+    }
+
+
+class TestMealRollup:
+    """MealRollup のテスト"""
+
+    def test_week_key_is_monday(self):
+        """週のキーはその週の月曜日"""
+        assert week_key("2025-12-10") == "2025-12-08"
+        assert week_key("2025-12-08") == "2025-12-08"
+        assert week_key("2025-12-14") == "2025-12-08"
+
+    def test_day_bucket_totals(self):
+        """日別集計に栄養素・食材・レシピ・食事タイプが加算される"""
+        rollup = MealRollup()
+        rollup.add(_record("u1", "2025-12-10T08:00:00", 300.0, "トースト", "breakfast"))
+        rollup.add(_record("u1", "2025-12-10T19:00:00", 700.0))
+
+        day = rollup.day("u1", "2025-12-10")
+        assert day.nutrition["calories"] == 1000.0
+        assert len(day.meals) == 2
+        assert day.ingredients["鶏肉"] == 2
+        assert day.recipes == {"トースト": 1, "カレー": 1}
+        assert day.meal_types == {"breakfast": 1, "dinner": 1}
+        assert rollup.day("u1", "2025-12-11") is None
+        assert rollup.day("u2", "2025-12-10") is None
+
+    def test_week_and_month_totals(self):
+        """週・月の合計が日別の記録から更新される"""
+        rollup = MealRollup()
+        rollup.add(_record("u1", "2025-11-30T12:00:00", 100.0))
+        rollup.add(_record("u1", "2025-12-01T12:00:00", 200.0))
+        rollup.add(_record("u1", "2025-12-07T12:00:00", 300.0))
+        rollup.add(_record("u1", "2025-12-08T12:00:00", 400.0))
+
+        assert rollup.week("u1", "2025-12-03").nutrition["calories"] == 500.0
+        assert rollup.week("u1", "2025-12-03").meal_count == 2
+        assert list(rollup.weeks("u1")) == ["2025-11-24", "2025-12-01", "2025-12-08"]
+        assert rollup.month("u1", 2025, 12).nutrition["calories"] == 900.0
+        assert rollup.month("u1", 2025, 11).meal_count == 1
+        assert rollup.month("u1", 2025, 10).meal_count == 0
+
+    def test_days_between_in_date_order(self):
+        """記録の追加順によらず日付順に範囲を返す"""
+        rollup = MealRollup()
+        for day in ["2025-12-05", "2025-12-01", "2025-12-03", "2025-12-09"]:
+            rollup.add(_record("u1", f"{day}T12:00:00", 100.0))
+
+        keys = [key for key, _ in rollup.days_between("u1", "2025-12-02", "2025-12-05")]
+        assert keys == ["2025-12-03", "2025-12-05"]
+        keys = [key for key, _ in rollup.days_between("u1", "2025-12-04")]
+        assert keys == ["2025-12-05", "2025-12-09"]
+        assert list(rollup.days_between("u2", "2025-12-01")) == []
+
+    def test_daily_values_fill_missing_days(self):
+        """記録のない日は 0.0 で埋める"""
+        rollup = MealRollup()
+        rollup.add(_record("u1", "2025-12-02T12:00:00", 500.0))
+
+        values = rollup.daily_values("u1", "calories", date(2025, 12, 1), 3)
+        assert values == [0.0, 500.0, 0.0]
+        assert rollup.daily_values("u1", "protein", date(2025, 12, 1), 2) == [0.0, 0.0]
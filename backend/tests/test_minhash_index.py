@@ -0,0 +1,109 @@
+"""
+MinHash / LSH 類似レシピ索引のテスト
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from backend.services.minhash_index import MinHashLSHIndex, jaccard
+from backend.services.recommendation_service import RecommendationService
+
+
+def make_catalogue(size: int, seed: int = 3):
+    """ベースとなる料理のバリエーションからなるレシピ一覧"""
+    rng = random.Random(seed)
+    vocabulary = [f"食材{i:03d}" for i in range(500)]
+    bases = [rng.sample(vocabulary, rng.randint(5, 10)) for _ in range(size // 10)]
+    recipes = []
+    for i in range(size):
+        ingredients = list(rng.choice(bases))
+        if len(ingredients) > 3 and rng.random() < 0.5:
+            ingredients.pop(rng.randrange(len(ingredients)))
+        ingredients += rng.sample(vocabulary, rng.randint(0, 2))
+        recipes.append({"id": f"r{i:04d}", "ingredients": ingredients})
+    return recipes
+
+
+class TestMinHashLSHIndex:
+    """MinHashLSHIndexのテスト"""
+
+    def test_signature_estimates_jaccard(self):
+        """シグネチャの一致率は Jaccard 係数の推定値になる"""
+        index = MinHashLSHIndex(num_perm=256, bands=64)
+        a = {f"t{i}" for i in range(40)}
+        b = {f"t{i}" for i in range(20, 60)}
+
+        estimate = np.mean(index.signature(a) == index.signature(b))
+
+        assert estimate == pytest.approx(jaccard(a, b), abs=0.1)
+
+    def test_signature_is_stable(self):
+        """同じシード・トークンなら同じシグネチャ"""
+        tokens = ["ingredient:たまねぎ", "tag:和食"]
+        first = MinHashLSHIndex().signature(tokens)
+        assert np.array_equal(first, MinHashLSHIndex().signature(reversed(tokens)))
+
+    def test_near_duplicate_is_candidate(self):
+        """ほぼ同一の集合は候補に入り、無関係な集合は入らない"""
+        index = MinHashLSHIndex()
+        base = {f"t{i}" for i in range(10)}
+        index.add("a", base)
+        index.add("b", base - {"t0"})
+        index.add("c", {f"x{i}" for i in range(10)})
+
+        assert index.candidates(item_id="a") == {"b"}
+        assert index.query(tokens=base, top_k=1) == [("a", 1.0)]
+
+    def test_update_and_remove(self):
+        """更新・削除でバケットが書き換わる"""
+        index = MinHashLSHIndex()
+        index.add("a", {"t1", "t2", "t3"})
+        index.add("b", {"t1", "t2", "t3"})
+        assert "b" in index.candidates(item_id="a")
+
+        index.add("b", {"x1", "x2", "x3"})
+        assert "b" not in index.candidates(item_id="a")
+
+        index.remove("a")
+        assert "a" not in index
+        assert index.candidates(tokens={"t1", "t2", "t3"}) == set()
+
+    def test_bands_must_divide_num_perm(self):
+        """バンド数がシグネチャ長を割り切れない場合はエラー"""
+        with pytest.raises(ValueError):
+            MinHashLSHIndex(num_perm=64, bands=10)
+
+
+class TestApproximateSimilar:
+    """RecommendationService の近似類似検索のテスト"""
+
+    def test_recall_against_exact(self):
+        """近似検索は厳密検索の上位をおおむね再現する"""
+        recipes = make_catalogue(1000)
+        service = RecommendationService(recipes)
+        rng = random.Random(11)
+
+        recalls = []
+        for target in rng.sample(recipes, 50):
+            exact = service.recommend_similar(target["id"], 5, approximate=False)
+            approx = service.recommend_similar(target["id"], 5, approximate=True)
+            relevant = {r.recipe["id"] for r in exact if r.match_score >= 0.5}
+            if relevant:
+                found = {r.recipe["id"] for r in approx}
+                recalls.append(len(relevant & found) / len(relevant))
+
+        assert recalls
+        assert sum(recalls) / len(recalls) >= 0.9
+
+    def test_index_updated_on_refresh(self):
+        """refresh で追加したレシピも近似検索の対象になる"""
+        recipes = [{"id": "r1", "ingredients": ["a", "b", "c", "d"]}]
+        service = RecommendationService(recipes)
+
+        service.refresh(recipes + [{"id": "r2", "ingredients": ["a", "b", "c", "d"]}])
+
+        results = service.recommend_similar("r1", 1, approximate=True)
+        assert [r.recipe["id"] for r in results] == ["r2"]
+        assert service.index.lsh.candidates(item_id="r1") == {"r2"}
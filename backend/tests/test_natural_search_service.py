@@ -21,7 +21,10 @@ def temp_data_dir():
 @pytest.fixture
 def service(temp_data_dir):
     """NaturalSearchService インスタンス"""
-    return NaturalSearchService(data_dir=temp_data_dir)
+    service = NaturalSearchService(data_dir=temp_data_dir)
+    yield service
+    # ディレクトリ削除前に未書き込みの履歴を書き込んでおく
+    service.history_store.close()
 
 
 @pytest.fixture
@@ -149,6 +152,28 @@ class TestParseQuery:
         # 「たまねぎ」→「玉ねぎ」に正規化される
         assert "玉ねぎ" in parsed.ingredients_include
 
+    def test_longest_match(self, service):
+        """重なり合う辞書語は最長一致の1語のみ抽出"""
+        parsed = service.parse_query("長ねぎと野菜たっぷりスープ")
+
+        assert parsed.ingredients_include == ["長ねぎ"]
+        assert parsed.adjectives == ["野菜たっぷり"]
+        assert parsed.categories == ["スープ"]
+
+    def test_word_in_multiple_categories(self, service):
+        """複数の分類に属する単語はそれぞれに抽出"""
+        parsed = service.parse_query("トマトのパスタ")
+
+        assert parsed.ingredients_include == ["トマト", "パスタ"]
+        assert parsed.categories == ["パスタ"]
+
+    def test_negated_longest_ingredient(self, service):
+        """否定された食材も最長一致で除外"""
+        parsed = service.parse_query("長ねぎ抜き")
+
+        assert parsed.ingredients_exclude == ["長ねぎ"]
+        assert parsed.ingredients_include == []
+
     def test_empty_query(self, service):
         """空のクエリ"""
         parsed = service.parse_query("")
@@ -0,0 +1,122 @@
+"""
+Unit Tests for OCR Line Grammar
+
+Tests for LineClassifier and the precompiled quantity patterns.
+"""
+
+from backend.ocr import LineClassifier, LineLabel, RecipeParser
+from backend.ocr.grammar import extract_quantities, parse_amount
+
+RECIPE_TEXT = """
+チキンカレー
+
+材料
+鶏肉 500g
+玉ねぎ 2個
+カレールー 1箱
+
+作り方
+1. 鶏肉を切る
+よく洗ってから
+2. 玉ねぎを炒める
+3. カレーを煮込む
+"""
+
+
+class TestLineClassifier:
+    """Test cases for LineClassifier."""
+
+    def test_custom_section_keywords(self):
+        """Sections are found with the keywords the classifier was built with."""
+        text = RECIPE_TEXT.replace("材料", "Zutaten").replace("作り方", "Zubereitung")
+        classifier = LineClassifier(["zutaten"], ["zubereitung"])
+        result = classifier.parse(text)
+
+        assert result["ingredients"] == ["鶏肉 500g", "玉ねぎ 2個", "カレールー 1箱"]
+        assert len(result["steps"]) == 3
+
+    def test_parser_keyword_overrides(self):
+        """RecipeParser subclasses can override the section keywords."""
+
+        class GermanParser(RecipeParser):
+            INGREDIENT_KEYWORDS = ["zutaten"]
+            STEPS_KEYWORDS = ["zubereitung"]
+
+        parser = GermanParser()
+        text = RECIPE_TEXT.replace("材料", "Zutaten").replace("作り方", "Zubereitung")
+        lines = parser.classifier.split_lines(text)
+
+        assert parser.parse(text)["ingredients"][0] == "鶏肉 500g"
+        assert parser._find_section(lines, parser.INGREDIENT_KEYWORDS) == (2, 5)
+        assert parser._find_section(lines, ["zubereitung"]) == (6, 10)
+        assert parser._find_section(lines, ["missing"]) == (None, None)
+
+    def test_labels_each_line(self):
+        """Every line gets the expected label."""
+        lines = LineClassifier().classify(RECIPE_TEXT)
+        labels = [(line.text, line.label) for line in lines]
+
+        assert labels == [
+            ("チキンカレー", LineLabel.TITLE),
+            ("材料", LineLabel.INGREDIENT_HEADER),
+            ("鶏肉 500g", LineLabel.INGREDIENT),
+            ("玉ねぎ 2個", LineLabel.INGREDIENT),
+            ("カレールー 1箱", LineLabel.INGREDIENT),
+            ("作り方", LineLabel.STEPS_HEADER),
+            ("1. 鶏肉を切る", LineLabel.STEP),
+            ("よく洗ってから", LineLabel.STEP),
+            ("2. 玉ねぎを炒める", LineLabel.STEP),
+            ("3. カレーを煮込む", LineLabel.STEP),
+        ]
+
+    def test_ingredient_lines_carry_quantities(self):
+        """Ingredient lines include structured quantities."""
+        lines = LineClassifier().classify(RECIPE_TEXT)
+        chicken = next(line for line in lines if line.text == "鶏肉 500g")
+
+        assert chicken.quantities == [{"value": 500.0, "unit": "g"}]
+
+    def test_continuation_lines_join_step(self):
+        """Unnumbered lines continue the previous step."""
+        result = LineClassifier().parse(RECIPE_TEXT)
+
+        assert result["steps"][0] == "鶏肉を切る よく洗ってから"
+        assert len(result["steps"]) == 3
+
+    def test_empty_text(self):
+        """Empty text yields no lines."""
+        result = LineClassifier().parse("")
+
+        assert result["title"] == ""
+        assert result["lines"] == []
+
+
+class TestQuantityGrammar:
+    """Test cases for the compiled quantity patterns."""
+
+    def test_extract_quantities_units(self):
+        """Known units are captured, unknown ones are not."""
+        assert extract_quantities("牛肉 500g と 水 2カップ と 卵 3") == [
+            {"value": 500.0, "unit": "g"},
+            {"value": 2.0, "unit": "カップ"},
+            {"value": 3.0, "unit": None},
+        ]
+
+    def test_parse_amount_splits_name(self):
+        """Quantity and unit are removed from the name."""
+        assert parse_amount("牛肉 500g") == {
+            "name": "牛肉",
+            "quantity": 500.0,
+            "unit": "g",
+            "original": "牛肉 500g",
+        }
+
+    def test_recipe_parser_returns_parsed_ingredients(self):
+        """RecipeParser exposes structured ingredients directly."""
+        result = RecipeParser().parse(RECIPE_TEXT)
+
+        assert [i["quantity"] for i in result["parsed_ingredients"]] == [
+            500.0,
+            2.0,
+            1.0,
+        ]
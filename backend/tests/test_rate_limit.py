@@ -0,0 +1,265 @@
+"""
+Tests for the shared rate limiting engine (GCRA) and its call sites.
+"""
+
+import threading
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from backend.core.rate_limit import (
+    MemoryStorage,
+    Rate,
+    RateLimitEngine,
+    SQLiteStorage,
+    retry_after_seconds,
+)
+from backend.middleware.rate_limiter import (
+    Limiter,
+    RateLimitExceeded,
+    rate_limit_exceeded_handler,
+)
+from backend.scraper.base import RateLimiter as ScraperRateLimiter
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestRate:
+    def test_parse(self):
+        assert Rate.parse("5/minute") == Rate(5, 60)
+        assert Rate.parse("100 per 1 hour") == Rate(100, 3600)
+        assert Rate.parse("10/2 seconds") == Rate(10, 2)
+        with pytest.raises(ValueError):
+            Rate.parse("fast")
+
+    def test_str(self):
+        assert str(Rate(5, 60)) == "5 per 1 minute"
+        assert str(Rate(10, 7200)) == "10 per 2 hour"
+
+
+class TestRateLimitEngine:
+    def test_burst_then_sustained_rate(self, clock):
+        engine = RateLimitEngine(clock=clock)
+        rate = Rate(3, 60)
+
+        results = [engine.hit("client", rate) for _ in range(3)]
+        assert all(r.allowed for r in results)
+        assert [r.remaining for r in results] == [2, 1, 0]
+
+        denied = engine.hit("client", rate)
+        assert not denied.allowed
+        assert denied.retry_after == pytest.approx(20.0)
+        assert retry_after_seconds(denied) == 20
+
+        # One request is freed every period / limit seconds
+        clock.now += 20
+        assert engine.hit("client", rate).allowed
+        assert not engine.hit("client", rate).allowed
+
+        # A full period later the whole burst is available again
+        clock.now += 60
+        assert [engine.hit("client", rate).allowed for _ in range(4)] == [
+            True,
+            True,
+            True,
+            False,
+        ]
+
+    @pytest.mark.parametrize(
+        "rate",
+        [Rate(50, 60), Rate(9, 60), Rate(5, 1), Rate(7, 60), Rate(10000, 86400)],
+        ids=str,
+    )
+    def test_full_burst_at_epoch_scale(self, rate):
+        # Float sums of intervals onto a wall-clock timestamp used to reject
+        # the last request of the burst
+        clock = FakeClock(1_760_000_000.123456)
+        engine = RateLimitEngine(clock=clock)
+
+        allowed = [engine.hit("client", rate).allowed for _ in range(rate.limit + 1)]
+        assert allowed.count(True) == rate.limit
+        assert allowed[-1] is False
+
+        clock.now += rate.interval
+        assert engine.hit("client", rate).allowed
+        assert not engine.hit("client", rate).allowed
+
+    def test_keys_are_independent(self, clock):
+        engine = RateLimitEngine(clock=clock)
+        rate = Rate(1, 60)
+
+        assert engine.hit("a", rate).allowed
+        assert not engine.hit("a", rate).allowed
+        assert engine.hit("b", rate).allowed
+
+        engine.reset("a")
+        assert engine.hit("a", rate).allowed
+
+    def test_reserve_spaces_requests(self, clock):
+        engine = RateLimitEngine(clock=clock)
+        rate = Rate(2, 10)
+
+        delays = [engine.reserve("scraper", rate) for _ in range(4)]
+
+        assert delays == pytest.approx([0.0, 0.0, 5.0, 10.0])
+
+    def test_memory_storage_drops_expired_keys(self, clock):
+        storage = MemoryStorage()
+        engine = RateLimitEngine(storage, clock=clock)
+        rate = Rate(10, 10)
+
+        for i in range(100):
+            engine.hit(f"client-{i}", rate)
+        assert len(storage) == 100
+
+        clock.now += 10
+        engine.hit("client-new", rate)
+        assert len(storage) == 1
+
+    def test_memory_storage_sweep_not_blocked_by_slow_key(self, clock):
+        storage = MemoryStorage()
+        engine = RateLimitEngine(storage, clock=clock)
+
+        engine.hit("slow-client", Rate.parse("1/day"))
+        for i in range(100):
+            engine.hit(f"client-{i}", Rate(10, 10))
+            engine.hit(f"client-{i}", Rate(10, 10))
+        assert len(storage) == 101
+
+        clock.now += 10
+        engine.hit("client-new", Rate(10, 10))
+        assert len(storage) == 2
+        assert len(storage._expiry) <= 2 * len(storage)
+
+    @pytest.mark.asyncio
+    async def test_async_calls_offload_blocking_storage(self, tmp_path, clock):
+        loop_thread = threading.get_ident()
+        threads = []
+
+        class RecordingStorage(SQLiteStorage):
+            def update(self, key, now, updater):
+                threads.append(threading.get_ident())
+                return super().update(key, now, updater)
+
+        engine = RateLimitEngine(RecordingStorage(tmp_path / "limits.db"), clock=clock)
+        try:
+            assert (await engine.hit_async("client", Rate(1, 60))).allowed
+            assert await engine.reserve_async("scraper", Rate(1, 60)) == 0.0
+        finally:
+            engine.storage.close()
+        assert threads and loop_thread not in threads
+
+        memory = RateLimitEngine(clock=clock)
+        assert (await memory.hit_async("client", Rate(1, 60))).allowed
+
+    def test_sqlite_storage_shared_between_processes(self, tmp_path, clock):
+        # Two connections to the same file behave like two uvicorn workers
+        worker1 = RateLimitEngine(SQLiteStorage(tmp_path / "limits.db"), clock=clock)
+        worker2 = RateLimitEngine(SQLiteStorage(tmp_path / "limits.db"), clock=clock)
+        rate = Rate(3, 60)
+        try:
+            assert worker1.hit("client", rate).allowed
+            assert worker2.hit("client", rate).allowed
+            assert worker1.hit("client", rate).allowed
+            assert not worker2.hit("client", rate).allowed
+
+            clock.now += 20
+            assert worker2.hit("client", rate).allowed
+        finally:
+            worker1.storage.close()
+            worker2.storage.close()
+
+
+class TestEndpointLimiter:
+    @pytest.fixture
+    def client(self, clock):
+        limiter = Limiter(
+            key_func=lambda request: request.client.host,
+            engine=RateLimitEngine(clock=clock),
+        )
+        app = FastAPI()
+        app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
+
+        @app.get("/limited")
+        @limiter.limit("2/minute")
+        async def limited(request: Request):
+            return {"status": "ok"}
+
+        @app.get("/other")
+        @limiter.limit("2/minute")
+        async def other(request: Request):
+            return {"status": "ok"}
+
+        return TestClient(app)
+
+    def test_limit_per_endpoint(self, client):
+        assert client.get("/limited").status_code == 200
+        assert client.get("/limited").status_code == 200
+
+        response = client.get("/limited")
+        assert response.status_code == 429
+        assert response.json()["error"]["code"] == "RATE_LIMIT_EXCEEDED"
+        assert response.headers["Retry-After"] == "30"
+        assert response.headers["X-RateLimit-Limit"] == "2"
+
+        assert client.get("/other").status_code == 200
+
+
+class TestScraperRateLimiter:
+    @pytest.mark.asyncio
+    async def test_acquire_waits_when_over_limit(self, clock, monkeypatch):
+        sleeps = []
+
+        async def fake_sleep(seconds):
+            sleeps.append(seconds)
+
+        monkeypatch.setattr("backend.scraper.base.asyncio.sleep", fake_sleep)
+        limiter = ScraperRateLimiter(
+            max_requests=2, time_window=10, engine=RateLimitEngine(clock=clock)
+        )
+
+        for _ in range(3):
+            await limiter.acquire()
+
+        assert sleeps == [pytest.approx(5.0)]
+
+    @pytest.mark.asyncio
+    async def test_budget_shared_per_host(self, clock, monkeypatch):
+        sleeps = []
+
+        async def fake_sleep(seconds):
+            sleeps.append(seconds)
+
+        monkeypatch.setattr("backend.scraper.base.asyncio.sleep", fake_sleep)
+        engine = RateLimitEngine(clock=clock)
+        monkeypatch.setattr(
+            "backend.scraper.base.get_rate_limit_engine", lambda: engine
+        )
+
+        # A new scraper is built per URL, so separate limiters must share budgets
+        for _ in range(2):
+            limiter = ScraperRateLimiter(max_requests=2, time_window=10)
+            await limiter.acquire("https://cookpad.com/recipe/1")
+        await ScraperRateLimiter(max_requests=2, time_window=10).acquire(
+            "https://example.com/recipe"
+        )
+        assert sleeps == []
+
+        await ScraperRateLimiter(max_requests=2, time_window=10).acquire(
+            "https://COOKPAD.com/recipe/2"
+        )
+        assert sleeps == [pytest.approx(5.0)]
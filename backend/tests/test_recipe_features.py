@@ -0,0 +1,209 @@
+"""
+レシピ特徴ベクトルストアのテスト
+"""
+
+import random
+
+import pytest
+
+from backend.services.recipe_features import RecipeFeatureStore, extract_recipe_features
+from backend.services.recommendation_ai_service import RecommendationAIService
+
+
+def make_recipe(recipe_id: str, ingredients, category="主菜", tags=(), cooking_time=20):
+    """テスト用レシピ"""
+    return {
+        "id": recipe_id,
+        "category": category,
+        "tags": list(tags),
+        "ingredients": [{"name": name} for name in ingredients],
+        "cooking_time": cooking_time,
+        "difficulty": "easy",
+    }
+
+
+@pytest.fixture
+def recipes():
+    """ランダムなレシピ一覧"""
+    rng = random.Random(7)
+    pool = [f"食材{i}" for i in range(30)]
+    return [
+        make_recipe(
+            f"recipe_{i:03d}",
+            rng.sample(pool, rng.randint(1, 6)),
+            category=rng.choice(["主菜", "副菜", "主食"]),
+            tags=rng.sample(["簡単", "時短", "和食", "中華"], rng.randint(0, 2)),
+            cooking_time=rng.choice([10, 25, 45]),
+        )
+        for i in range(100)
+    ]
+
+
+class TestRecipeFeatureStore:
+    """RecipeFeatureStoreのテスト"""
+
+    def test_scores_match_pairwise_cosine(self, recipes, tmp_path):
+        """行列積の結果が辞書ベースのコサイン類似度と一致する"""
+        service = RecommendationAIService(data_dir=str(tmp_path))
+        store = RecipeFeatureStore(initial_rows=4, initial_columns=4)
+        rows = store.sync(recipes)
+
+        target = store.vector(rows[0])
+        for recipe, score in zip(recipes, store.scores(target, rows)):
+            expected = service._cosine_similarity(
+                extract_recipe_features(recipes[0]), extract_recipe_features(recipe)
+            )
+            assert score == pytest.approx(expected)
+
+    def test_profile_is_mean_of_liked(self, recipes, tmp_path):
+        """プロファイルスコアは好んだレシピとの類似度の平均"""
+        service = RecommendationAIService(data_dir=str(tmp_path))
+        store = RecipeFeatureStore()
+        rows = store.sync(recipes)
+        liked = [recipes[1]["id"], recipes[2]["id"], recipes[1]["id"]]
+
+        scores = store.scores(store.profile_vector(liked), rows)
+        by_id = {r["id"]: r for r in recipes}
+        for recipe, score in zip(recipes[:10], scores):
+            expected = sum(
+                service._calculate_recipe_similarity(recipe, by_id[rid])
+                for rid in liked
+            ) / len(liked)
+            assert score == pytest.approx(expected)
+
+    def test_unchanged_recipe_not_recomputed(self, recipes):
+        """内容が同じレシピは同じ行のまま再計算しない"""
+        store = RecipeFeatureStore()
+        rows = store.sync(recipes)
+        assert store.sync(recipes) == rows
+        assert len(store) == len(recipes)
+
+    def test_updated_recipe_recomputed(self):
+        """内容が変わったレシピは行を更新する"""
+        store = RecipeFeatureStore()
+        recipe = make_recipe("r1", ["じゃがいも"])
+        other = make_recipe("r2", ["鶏肉"])
+        row, other_row = store.sync([recipe, other])
+        before = store.scores(store.vector(other_row), [row])[0]
+
+        recipe["ingredients"] = [{"name": "鶏肉"}]
+        assert store.update(recipe) == row
+        after = store.scores(store.vector(other_row), [row])[0]
+        assert after > before
+
+    def test_versioned_recipe_skips_extraction(self, monkeypatch):
+        """バージョンが同じレシピは特徴を再抽出せず、無効化すると再計算する"""
+        store = RecipeFeatureStore()
+        recipe = make_recipe("r1", ["じゃがいも"])
+        recipe["updated_at"] = "2025-01-01T00:00:00"
+        store.update(recipe)
+
+        calls = []
+        monkeypatch.setattr(
+            "backend.services.recipe_features.extract_recipe_features",
+            lambda r: calls.append(r["id"]) or extract_recipe_features(r),
+        )
+        store.sync([recipe])
+        assert calls == []
+
+        store.invalidate("r1")
+        store.sync([recipe])
+        assert calls == ["r1"]
+
+        recipe["updated_at"] = "2025-01-02T00:00:00"
+        store.sync([recipe])
+        assert calls == ["r1", "r1"]
+
+    def test_profile_of_unknown_recipes(self):
+        """未登録レシピのみの場合はプロファイルなし"""
+        assert RecipeFeatureStore().profile_vector(["missing"]) is None
+
+    def test_profile_ignores_removed_recipes(self, tmp_path):
+        """一覧から消えたレシピはプロファイルに数えない"""
+        service = RecommendationAIService(data_dir=str(tmp_path))
+        a = make_recipe("a", ["じゃがいも"])
+        b = make_recipe("b", ["じゃがいも", "にんじん"])
+        c = make_recipe("c", ["鶏肉"])
+        history = [{"recipe_id": "a", "activity_type": "cooked"}]
+
+        assert service._calculate_content_scores(history, [a, b, c])[1] > 0.0
+        assert service._calculate_content_scores(history, [b, c]) == [0.0, 0.0]
+        assert service._calculate_content_score("u", b, history, [b, c]) == 0.0
+
+    def test_lsh_tracks_ingredient_and_tag_features(self):
+        """LSH 索引は材料・タグの特徴で更新される"""
+        store = RecipeFeatureStore()
+        recipe = make_recipe("r1", ["じゃがいも", "にんじん"], tags=["和食"])
+        store.update(recipe)
+        store.update(make_recipe("r2", ["じゃがいも", "にんじん"], tags=["和食"]))
+        assert store.lsh.candidates(item_id="r1") == {"r2"}
+
+        recipe["ingredients"] = [{"name": "鶏肉"}]
+        recipe["tags"] = ["中華"]
+        store.update(recipe)
+        assert store.lsh.candidates(item_id="r1") == set()
+
+    def test_sync_catalog_skips_same_list(self, recipes, monkeypatch):
+        """同じリストは再同期せず、無効化すると再同期する"""
+        store = RecipeFeatureStore()
+        store.sync_catalog(recipes)
+
+        calls = []
+        monkeypatch.setattr(
+            "backend.services.recipe_features.recipe_version",
+            lambda r: calls.append(r["id"]) or "v",
+        )
+        store.sync_catalog(recipes)
+        assert calls == []
+
+        store.invalidate(recipes[0]["id"])
+        store.sync_catalog(recipes)
+        assert len(calls) == len(recipes)
+
+    def test_sync_catalog_drops_removed_recipes(self):
+        """一覧から消えたレシピはカタログと LSH 索引から外れる"""
+        store = RecipeFeatureStore()
+        r1 = make_recipe("r1", ["じゃがいも", "にんじん"], tags=["和食"])
+        r2 = make_recipe("r2", ["じゃがいも", "にんじん"], tags=["和食"])
+        store.sync_catalog([r1, r2])
+        assert store.lsh.candidates(item_id="r1") == {"r2"}
+
+        store.sync_catalog([r1])
+        assert store.catalog_recipe("r2") is None
+        assert store.lsh.candidates(item_id="r1") == set()
+        assert [recipe["id"] for recipe, _ in store.catalog_rows()] == ["r1"]
+
+
+class TestSimilarRecipes:
+    """RecommendationAIService の類似レシピ検索のテスト"""
+
+    def test_large_catalog_scores_only_bucket_candidates(self, recipes, tmp_path):
+        """LSH を使うカタログでは同じバケットの候補だけを比較する"""
+        service = RecommendationAIService(data_dir=str(tmp_path))
+        service.LSH_MIN_RECIPES = 10
+        catalog = recipes + [
+            make_recipe("dup_a", ["豚肉", "キャベツ", "もやし"], tags=["中華"]),
+            make_recipe("dup_b", ["豚肉", "キャベツ", "もやし"], tags=["中華"]),
+        ]
+
+        scored = []
+        scores = service.feature_store.scores
+        service.feature_store.scores = lambda vector, rows: (
+            scored.append(len(rows)) or scores(vector, rows)
+        )
+
+        similar = service.get_similar_recipes("dup_a", catalog, limit=1)
+        assert [item["recipe"]["id"] for item in similar] == ["dup_b"]
+        assert scored == [len(service.feature_store.lsh.candidates(item_id="dup_a"))]
+        assert scored[0] < len(catalog)
+
+    def test_catalog_change_is_reflected(self, recipes, tmp_path):
+        """カタログから消えたレシピは結果に含まれない"""
+        service = RecommendationAIService(data_dir=str(tmp_path))
+        target = recipes[0]["id"]
+        assert service.get_similar_recipes(target, recipes, limit=len(recipes))
+
+        remaining = [recipe for recipe in recipes if recipe["id"] != recipes[1]["id"]]
+        similar = service.get_similar_recipes(target, remaining, limit=len(recipes))
+        assert recipes[1]["id"] not in {item["recipe"]["id"] for item in similar}
+        assert service.get_similar_recipes(recipes[1]["id"], remaining) == []
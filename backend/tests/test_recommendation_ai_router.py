@@ -82,6 +82,24 @@ class TestRecommendationAIRouter:
         assert "data" in data
         assert "trending_recipes" in data["data"]
 
+    def test_get_trending_recipes_by_window(self, client):
+        """集計期間指定のトレンド取得テスト"""
+        response = client.get("/api/v1/ai/recommend/trending?window=7d&limit=3")
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+
+        assert data["window"] == "7d"
+        assert len(data["trending_recipes"]) <= 3
+        assert "version" in data
+        assert "generated_at" in data
+
+    def test_get_trending_recipes_invalid_window(self, client):
+        """無効な集計期間"""
+        response = client.get("/api/v1/ai/recommend/trending?window=1y")
+
+        assert response.status_code == 400
+
     def test_submit_feedback(self, client):
         """フィードバック送信テスト"""
         payload = {
@@ -5,6 +5,7 @@
 import pytest
 from backend.services.recommendation_service import (
     RecommendationService,
+    IngredientIndex,
     IngredientNormalizer,
 )
 
@@ -244,3 +245,73 @@ class TestRecommendationService:
         # 調味料を含むレシピの方がスコアが高くなるはず
         recipe2_result = next(r for r in results if r.recipe["id"] == "weight_test_2")
         assert recipe2_result.match_score > 0.5
+
+
+class TestIngredientIndex:
+    """IngredientIndex のテスト"""
+
+    def test_candidates_share_ingredient(self):
+        """正規化済み材料を共有するレシピのみ候補になる"""
+        index = IngredientIndex(TEST_RECIPES)
+
+        keys = index.candidates(index.normalize_all(["玉ねぎ"]))
+
+        expected = {
+            r["id"]
+            for r in TEST_RECIPES
+            if any(i["name"] == "たまねぎ" for i in r["ingredients"])
+        }
+        assert keys == expected
+
+    def test_weight_totals_precomputed(self):
+        """レシピごとの重み合計を保持する"""
+        index = IngredientIndex(
+            [{"id": "r1", "ingredients": ["たまねぎ", "塩", "醤油"]}]
+        )
+        assert index.get("r1").total_weight == pytest.approx(1.6)
+
+    def test_refresh_updates_and_removes(self):
+        """refresh で変更・削除されたレシピのみ索引を更新する"""
+        recipes = [
+            {"id": "r1", "ingredients": ["たまねぎ"]},
+            {"id": "r2", "ingredients": ["にんじん"]},
+        ]
+        service = RecommendationService(recipes)
+        kept = service.index.get("r2")
+
+        service.refresh(
+            [
+                {"id": "r1", "ingredients": ["キャベツ"]},
+                {"id": "r3", "ingredients": ["たまねぎ"]},
+            ]
+        )
+
+        assert service.index.get("r2") is None
+        assert kept.recipe["id"] == "r2"
+        assert service.index.candidates({"たまねぎ"}) == {"r3"}
+        assert service.index.candidates({"キャベツ"}) == {"r1"}
+        results = service.recommend_by_ingredients(["たまねぎ"], min_score=0.1)
+        assert [r.recipe["id"] for r in results] == ["r3"]
+
+    def test_what_can_i_make_includes_small_recipes(self):
+        """材料を共有しなくても不足数が許容内のレシピは対象になる"""
+        service = RecommendationService(
+            [
+                {"id": "r1", "ingredients": ["卵"]},
+                {"id": "r2", "ingredients": ["卵", "牛乳", "砂糖", "小麦粉"]},
+            ]
+        )
+
+        results = service.what_can_i_make(["たまねぎ"], allow_missing=1)
+
+        assert [r.recipe["id"] for r in results] == ["r1"]
+
+    def test_similar_fills_with_unrelated_recipes(self):
+        """類似レシピが足りない場合は材料を共有しないレシピで補う"""
+        service = RecommendationService(TEST_RECIPES)
+
+        results = service.recommend_similar("test_001", max_results=len(TEST_RECIPES))
+
+        assert len(results) == len(TEST_RECIPES) - 1
+        scores = [r.match_score for r in results]
+        assert scores == sorted(scores, reverse=True)
@@ -0,0 +1,207 @@
+"""
+推薦スナップショット（事前計算）サービスのテスト
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.services.recommendation_ai_service import RecommendationAIService
+from backend.services.recommendation_snapshot import (
+    TRENDING_WINDOWS,
+    RecommendationMaterializer,
+)
+
+
+def make_recipes():
+    """テスト用レシピ一覧"""
+    names = [
+        ("recipe_001", "主菜", ["じゃがいも", "にんじん", "玉ねぎ"]),
+        ("recipe_002", "主菜", ["じゃがいも", "にんじん", "牛肉"]),
+        ("recipe_003", "副菜", ["鶏むね肉", "塩"]),
+        ("recipe_004", "主食", ["パスタ", "にんにく"]),
+        ("recipe_005", "主菜", ["豆腐", "豚ひき肉"]),
+    ]
+    return [
+        {
+            "id": recipe_id,
+            "category": category,
+            "tags": [],
+            "ingredients": [{"name": name} for name in ingredients],
+            "cooking_time": 20,
+            "difficulty": "easy",
+        }
+        for recipe_id, category, ingredients in names
+    ]
+
+
+@pytest.fixture
+def service(tmp_path):
+    """推薦サービス"""
+    return RecommendationAIService(data_dir=str(tmp_path))
+
+
+@pytest.fixture
+def catalogue():
+    """差し替え可能なレシピ一覧"""
+    return {"recipes": make_recipes()}
+
+
+@pytest.fixture
+def materializer(service, catalogue):
+    """事前計算サービス"""
+    materializer = RecommendationMaterializer(
+        service,
+        recipe_source=lambda: catalogue["recipes"],
+        refresh_interval=60.0,
+        trending_interval=0.0,
+        debounce=0.0,
+    )
+    yield materializer
+    materializer.stop()
+
+
+class TestRecommendationMaterializer:
+    """RecommendationMaterializerのテスト"""
+
+    def test_snapshot_matches_direct_computation(
+        self, service, materializer, catalogue
+    ):
+        """スナップショットは直接計算した結果と同じ"""
+        service.record_activity("user_001", "recipe_001", "cooked")
+        service.record_activity("user_002", "recipe_001", "cooked")
+        service.record_activity("user_002", "recipe_002", "favorited")
+        materializer.refresh_all()
+
+        snapshot = materializer.get_personalized("user_001", limit=3)
+        assert snapshot.items == service.get_personalized_recommendations(
+            "user_001", catalogue["recipes"], limit=3
+        )
+        trending = materializer.get_trending("7d", limit=2)
+        assert trending.items == service.get_trending_recommendations(
+            catalogue["recipes"], limit=2, days=7
+        )
+
+    def test_activity_marks_user_dirty(self, service, materializer):
+        """行動記録でそのユーザーのみ更新待ちになり、増分更新で反映される"""
+        service.record_activity("user_001", "recipe_001", "cooked")
+        materializer.refresh_all()
+        before = materializer.get_personalized("user_001")
+
+        service.record_activity("user_001", "recipe_002", "not_interested")
+        assert materializer.get_stats()["pending_users"] == 1
+        assert materializer.refresh_pending() == 1
+
+        after = materializer.get_personalized("user_001")
+        assert after.version != before.version
+        assert "recipe_002" not in [r["recipe"]["id"] for r in after.items]
+
+    def test_unknown_user_gets_trending(self, service, materializer):
+        """スナップショットのないユーザーにはトレンドを返す"""
+        service.record_activity("user_001", "recipe_003", "cooked")
+        materializer.refresh_all()
+
+        snapshot = materializer.get_personalized("new_user", limit=1)
+        assert [r["recipe"]["id"] for r in snapshot.items] == ["recipe_003"]
+        assert materializer.get_stats()["pending_users"] == 0
+
+    def test_trending_windows(self, service, materializer):
+        """トレンドはウィンドウごとに集計期間が異なる"""
+        service.record_activity("user_001", "recipe_004", "viewed")
+        old = (datetime.utcnow() - timedelta(days=3)).isoformat()
+        service.user_activities["user_001"][0]["timestamp"] = old
+        service.record_activity("user_002", "recipe_005", "viewed")
+        materializer.refresh_all()
+
+        assert (
+            materializer.get_trending("24h", 1).items[0]["recipe"]["id"] == "recipe_005"
+        )
+        scores = {
+            r["recipe"]["id"]: r["score"] for r in materializer.get_trending("7d").items
+        }
+        assert scores["recipe_004"] == scores["recipe_005"] > 0
+        with pytest.raises(KeyError):
+            materializer.get_trending("1y")
+        assert materializer.get_stats()["trending_windows"] == sorted(TRENDING_WINDOWS)
+
+    def test_similar_precomputed_per_catalog_version(self, materializer, catalogue):
+        """類似レシピはカタログが変わったときだけ作り直す"""
+        first = materializer.get_similar("recipe_001", limit=1)
+        assert first.items[0]["recipe"]["id"] == "recipe_002"
+        assert materializer.get_similar("missing") is None
+
+        assert materializer.refresh_catalog() is False
+        catalogue["recipes"] = catalogue["recipes"] + [
+            {
+                "id": "recipe_006",
+                "category": "副菜",
+                "tags": [],
+                "ingredients": [{"name": "鶏むね肉"}, {"name": "塩"}],
+                "cooking_time": 20,
+                "difficulty": "easy",
+            }
+        ]
+        assert materializer.refresh_catalog() is True
+
+        updated = materializer.get_similar("recipe_006", limit=1)
+        assert updated.items[0]["recipe"]["id"] == "recipe_003"
+        assert updated.version.split(".")[0] != first.version.split(".")[0]
+
+    def test_similar_computed_on_demand(self, service, materializer, monkeypatch):
+        """類似レシピは要求されたレシピの分だけ計算してキャッシュする"""
+        calls = []
+        compute = service.get_similar_recipes
+        monkeypatch.setattr(
+            service,
+            "get_similar_recipes",
+            lambda **kwargs: calls.append(kwargs["recipe_id"]) or compute(**kwargs),
+        )
+
+        materializer.refresh_all()
+        assert calls == []
+        materializer.get_similar("recipe_001")
+        materializer.get_similar("recipe_001", limit=1)
+        assert calls == ["recipe_001"]
+        assert materializer.get_stats()["similar"] == 1
+
+    def test_start_does_not_block_on_warm_up(self, service, catalogue):
+        """ウォームアップは更新スレッドで行い、start はすぐに戻る"""
+        started = []
+
+        def slow_source():
+            started.append(time.monotonic())
+            time.sleep(0.3)
+            return catalogue["recipes"]
+
+        materializer = RecommendationMaterializer(
+            service, recipe_source=slow_source, refresh_interval=60.0
+        )
+        try:
+            begin = time.monotonic()
+            materializer.start()
+            assert time.monotonic() - begin < 0.2
+
+            snapshot = materializer.get_trending(limit=1)
+            assert snapshot.version
+            assert started
+        finally:
+            materializer.stop()
+
+    def test_background_thread_applies_activity(self, service, materializer):
+        """バックグラウンドスレッドが行動記録を反映する"""
+        materializer.start()
+        assert materializer.running
+
+        service.record_activity("user_010", "recipe_001", "cooked")
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if materializer.get_stats()["personalized"] == 1:
+                break
+            time.sleep(0.01)
+
+        snapshot = materializer.get_personalized("user_010")
+        assert snapshot.version.endswith(f".{service.activity_version}")
+
+        materializer.stop()
+        assert not materializer.running
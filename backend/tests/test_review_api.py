@@ -349,6 +349,33 @@ class TestReviewAPI:
         assert summary["rating_distribution"]["5"] == 1
         assert summary["rating_distribution"]["4"] == 1
 
+    def test_get_rating_summaries(self, client):
+        """複数レシピの評価サマリー一括取得テスト"""
+        client.post(
+            "/api/v1/review/recipe/recipe1",
+            json={"rating": 5, "comment": "Great!"},
+            headers={"Authorization": "Bearer user1"},
+        )
+        client.post(
+            "/api/v1/review/recipe/recipe2",
+            json={"rating": 3, "comment": "OK"},
+            headers={"Authorization": "Bearer user1"},
+        )
+
+        response = client.get("/api/v1/review/summaries?recipe_ids=recipe1,recipe2,recipe3")
+
+        assert response.status_code == 200
+        summaries = response.json()["data"]["summaries"]
+        assert summaries["recipe1"]["average_rating"] == 5.0
+        assert summaries["recipe2"]["rating_distribution"]["3"] == 1
+        assert summaries["recipe3"]["total_reviews"] == 0
+
+    def test_get_rating_summaries_requires_ids(self, client):
+        """レシピID未指定の一括取得テスト"""
+        response = client.get("/api/v1/review/summaries?recipe_ids=,")
+
+        assert response.status_code == 400
+
     def test_get_popular_reviews(self, client):
         """人気レビュー取得テスト"""
         # レビュー作成
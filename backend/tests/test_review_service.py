@@ -217,6 +217,60 @@ class TestReviewService:
         assert summary.average_rating == 0.0
         assert all(count == 0 for count in summary.rating_distribution.values())
 
+    def test_get_rating_summaries(self, review_service):
+        """複数レシピの評価サマリー一括取得のテスト"""
+        review_service.create_review("recipe1", "user1", 5, "Great!")
+        review_service.create_review("recipe1", "user2", 4, "Good")
+        review_service.create_review("recipe2", "user1", 2, "Meh")
+
+        summaries = review_service.get_rating_summaries(
+            ["recipe1", "recipe2", "recipe3"]
+        )
+
+        assert list(summaries) == ["recipe1", "recipe2", "recipe3"]
+        assert summaries["recipe1"].average_rating == 4.5
+        assert summaries["recipe2"].rating_distribution[2] == 1
+        assert summaries["recipe3"].total_reviews == 0
+
+    def test_rating_aggregates_follow_updates(self, review_service):
+        """評価の変更・削除で集計が更新されることのテスト"""
+        first = review_service.create_review("recipe1", "user1", 5, "Great!")
+        second = review_service.create_review("recipe1", "user2", 1, "Bad")
+
+        review_service.update_review(first.id, "user1", rating=3)
+        review_service.mark_helpful(second.id, "user1")
+        review_service.delete_review(second.id, "user2")
+
+        summary = review_service.get_recipe_rating_summary("recipe1")
+        assert summary.total_reviews == 1
+        assert summary.average_rating == 3.0
+        assert summary.rating_distribution == {1: 0, 2: 0, 3: 1, 4: 0, 5: 0}
+
+    def test_import_legacy_json(self, temp_data_dir):
+        """旧形式の JSON ファイルを取り込むテスト"""
+        import json
+        from pathlib import Path
+
+        from backend.models.review import Review
+
+        legacy = Path(temp_data_dir) / "reviews.json"
+        reviews = [
+            Review(recipe_id="recipe1", user_id="user1", rating=4, comment="Good"),
+            Review(recipe_id="recipe1", user_id="user2", rating=2, comment="Meh"),
+        ]
+        legacy.write_text(
+            json.dumps([r.to_dict() for r in reviews], ensure_ascii=False),
+            encoding="utf-8",
+        )
+
+        service = ReviewService(data_dir=temp_data_dir)
+
+        assert {r.id for r in service.get_recipe_reviews("recipe1")} == {
+            r.id for r in reviews
+        }
+        assert service.get_recipe_rating_summary("recipe1").average_rating == 3.0
+        assert not legacy.exists()
+
     def test_get_popular_reviews(self, review_service):
         """人気レビュー取得のテスト"""
         review_service.create_review("recipe1", "user1", 5, "Great!")
@@ -0,0 +1,129 @@
+"""
+検索履歴ストアのテスト
+"""
+
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.services.search_history import SearchHistoryStore
+
+
+def make_item(query: str, when: datetime = None) -> dict:
+    """テスト用の履歴項目"""
+    return {
+        "query": query,
+        "timestamp": (when or datetime.now()).isoformat(),
+        "parsed": {"original": query},
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    """検索履歴ストア"""
+    store = SearchHistoryStore(tmp_path, retention=10, flush_interval=60.0)
+    yield store
+    store.close()
+
+
+class TestSearchHistoryStore:
+    """SearchHistoryStoreのテスト"""
+
+    def test_ring_buffer_retention(self, store):
+        """保持件数を超えた古い履歴は捨てる"""
+        for i in range(15):
+            store.append(make_item(f"q{i}"))
+
+        assert len(store) == 10
+        assert [item["query"] for item in store.latest(3)] == ["q14", "q13", "q12"]
+        assert store.items()[0]["query"] == "q5"
+
+    def test_append_only_until_compaction(self, store):
+        """ファイルへは追記し、上限の2倍を超えたら書き直す"""
+        for i in range(20):
+            store.append(make_item(f"q{i}"))
+        assert store.flush() == 20
+        lines = store.log_path.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 20
+
+        store.append(make_item("q20"))
+        store.flush()
+        lines = store.log_path.read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["query"] for line in lines] == [
+            f"q{i}" for i in range(11, 21)
+        ]
+
+    def test_reload(self, store, tmp_path):
+        """書き込んだ履歴と集計を読み直せる"""
+        for query in ["鶏肉", "鶏肉", "豚肉"]:
+            store.append(make_item(query))
+        store.close()
+
+        reloaded = SearchHistoryStore(tmp_path, retention=10)
+        assert [item["query"] for item in reloaded.latest(5)] == [
+            "豚肉",
+            "鶏肉",
+            "鶏肉",
+        ]
+        assert reloaded.query_counts() == {"鶏肉": 2, "豚肉": 1}
+        reloaded.close()
+
+    def test_counts_outlive_retention(self, store):
+        """人気度の集計はリングバッファから外れた検索も数える"""
+        for _ in range(12):
+            store.append(make_item("Easy Pasta"))
+        store.append(make_item("easy  pasta"))
+
+        assert len(store) == 10
+        assert store.query_counts() == {"easy pasta": 13}
+        query, count, _ = next(store.popularity())
+        assert (query, count) == ("easy  pasta", 13)
+
+    def test_counts_expire_after_window(self, store):
+        """集計期間を過ぎた日の集計は捨てる"""
+        store.append(make_item("古い", datetime.now() - timedelta(days=40)))
+        store.append(make_item("新しい"))
+
+        assert store.query_counts() == {"新しい": 1}
+
+    def test_legacy_json_imported(self, tmp_path):
+        """旧形式の JSON 履歴を取り込む"""
+        legacy = tmp_path / "search_history.json"
+        legacy.write_text(
+            json.dumps([make_item("鶏肉"), make_item("豚肉")], ensure_ascii=False),
+            encoding="utf-8",
+        )
+
+        store = SearchHistoryStore(tmp_path)
+
+        assert [item["query"] for item in store.latest()] == ["豚肉", "鶏肉"]
+        assert not legacy.exists()
+        assert (tmp_path / "search_history.json.migrated").exists()
+        store.close()
+
+    def test_background_flush(self, tmp_path):
+        """バッチ件数に達するとバックグラウンドで書き込む"""
+        store = SearchHistoryStore(tmp_path, flush_interval=60.0, batch_size=2)
+        store.append(make_item("a"))
+        store.append(make_item("b"))
+
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if store.log_path.exists() and store.log_path.read_text(encoding="utf-8"):
+                break
+            time.sleep(0.01)
+
+        assert len(store.log_path.read_text(encoding="utf-8").splitlines()) == 2
+        store.close()
+
+    def test_clear(self, store):
+        """全履歴と集計を削除"""
+        store.append(make_item("鶏肉"))
+        store.flush()
+        store.clear()
+
+        assert store.latest() == []
+        assert store.query_counts() == {}
+        assert store.log_path.read_text(encoding="utf-8") == ""
@@ -0,0 +1,100 @@
+"""
+ソーシャルグラフ索引のテスト
+"""
+
+import json
+
+from backend.services.social_graph import SocialGraph, get_social_graph
+
+
+class TestSocialGraph:
+    """SocialGraph のテスト"""
+
+    def test_adjacency_sets(self, tmp_path, make_follow):
+        """フォロー・アンフォローが隣接集合に反映される"""
+        graph = SocialGraph(tmp_path)
+        graph.add_follow(make_follow("a", "b"))
+        graph.add_follow(make_follow("a", "c"))
+        graph.add_follow(make_follow("c", "b"))
+        graph.remove_follow("a", "c")
+
+        assert graph.is_following("a", "b")
+        assert not graph.is_following("a", "c")
+        assert graph.following_ids("a") == ["b"]
+        assert graph.follower_ids("b") == ["a", "c"]
+        assert graph.follower_count("b") == 2
+        assert graph.following_count("c") == 1
+
+    def test_log_replayed_on_load(self, tmp_path, make_follow):
+        """追記ファイルの内容が新しいインスタンスに復元される"""
+        graph = SocialGraph(tmp_path)
+        graph.add_follow(make_follow("a", "b"))
+        graph.add_follow(make_follow("b", "a"))
+        graph.remove_follow("b", "a")
+
+        assert not (tmp_path / "follows.json").exists()
+        lines = (tmp_path / "follows.log").read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 3
+
+        reloaded = SocialGraph(tmp_path)
+        assert [f["id"] for f in reloaded.follows()] == ["a_b"]
+
+    def test_log_compacted_to_snapshot(self, tmp_path, make_follow):
+        """閾値に達したら follows.json に書き出して追記ファイルを空にする"""
+        graph = SocialGraph(tmp_path, compact_threshold=3)
+        for target in ["b", "c", "d"]:
+            graph.add_follow(make_follow("a", target))
+
+        snapshot = json.loads((tmp_path / "follows.json").read_text("utf-8"))
+        assert [f["following_id"] for f in snapshot] == ["b", "c", "d"]
+        assert (tmp_path / "follows.log").read_text(encoding="utf-8") == ""
+        assert SocialGraph(tmp_path).following_ids("a") == ["b", "c", "d"]
+
+    def test_latest_recipes_merges_timelines(self, tmp_path):
+        """複数ユーザーのレシピを新しい順にマージし、上位だけを返す"""
+        graph = SocialGraph(tmp_path)
+        graph.replace_recipes(
+            [
+                {"id": "r1", "user_id": "b", "created_at": "2025-12-01T10:00:00"},
+                {"id": "r2", "user_id": "c", "created_at": "2025-12-03T10:00:00"},
+                {"id": "r3", "user_id": "b", "created_at": "2025-12-05T10:00:00"},
+                {"id": "r4", "user_id": "d", "created_at": "2025-12-09T10:00:00"},
+                {"id": "r5", "user_id": "c", "created_at": "2025-12-02T10:00:00"},
+            ]
+        )
+
+        latest = graph.latest_recipes(["b", "c"], limit=3)
+        assert [r["id"] for r in latest] == ["r3", "r2", "r5"]
+        assert graph.recipe_count("c") == 2
+        assert graph.latest_recipes(["x"], limit=3) == []
+
+    def test_friends_of_friends(self, tmp_path, make_follow):
+        """友達の友達を共通の友達の数で数える（自分とフォロー中は除く）"""
+        graph = SocialGraph(tmp_path)
+        for follower, following in [
+            ("a", "b"),
+            ("a", "c"),
+            ("b", "c"),
+            ("b", "d"),
+            ("c", "d"),
+            ("c", "a"),
+            ("c", "e"),
+        ]:
+            graph.add_follow(make_follow(follower, following))
+
+        assert graph.friends_of_friends("a") == {"d": 2, "e": 1}
+
+    def test_reloads_external_changes(self, tmp_path):
+        """他のサービスが書き込んだユーザーファイルを読み込み直す"""
+        graph = SocialGraph(tmp_path)
+        assert graph.get_user("u1") is None
+
+        (tmp_path / "users.json").write_text(
+            json.dumps([{"id": "u1", "username": "alice"}]), encoding="utf-8"
+        )
+
+        assert graph.get_user("u1")["username"] == "alice"
+
+    def test_shared_per_directory(self, tmp_path):
+        """同じディレクトリには同じインスタンスを返す"""
+        assert get_social_graph(tmp_path) is get_social_graph(tmp_path)
@@ -0,0 +1,112 @@
+"""
+検索サジェスト用インデックスのテスト
+"""
+
+import random
+
+import pytest
+
+from backend.services.suggestion_index import (
+    PopularityTrie,
+    TermIndex,
+    normalize_query,
+)
+
+DAY = 24 * 3600.0
+
+
+class TestTermIndex:
+    """TermIndexのテスト"""
+
+    def test_prefix_before_substring(self):
+        """前方一致を部分一致より優先し、同順位は短い語から"""
+        index = TermIndex(["鶏もも肉", "鶏肉", "豚肉", "牛肉", "鶏ささみ"])
+
+        assert index.search("鶏") == ["鶏肉", "鶏ささみ", "鶏もも肉"]
+        assert index.search("肉") == ["牛肉", "豚肉", "鶏肉", "鶏もも肉"]
+        assert index.search("肉", limit=2) == ["牛肉", "豚肉"]
+
+    def test_matches_linear_scan(self):
+        """総当たりの部分一致と同じ語集合を返す"""
+        rng = random.Random(1)
+        terms = {
+            "".join(rng.choice("abcde") for _ in range(rng.randint(1, 6)))
+            for _ in range(200)
+        }
+        index = TermIndex(terms)
+
+        for partial in ["a", "bc", "cad", "e", "zz"]:
+            expected = {t for t in terms if partial in t}
+            assert set(index.search(partial, limit=len(terms))) == expected
+
+    def test_case_insensitive(self):
+        """大文字小文字を区別しない"""
+        index = TermIndex(["Easy", "tomato"])
+        assert index.search("eA") == ["Easy"]
+        assert index.search("") == []
+
+
+class TestPopularityTrie:
+    """PopularityTrieのテスト"""
+
+    def test_complete_by_count(self):
+        """同時刻の検索は回数順"""
+        trie = PopularityTrie()
+        for query, count in [("鶏肉", 3), ("鶏もも肉", 1), ("豚肉", 2)]:
+            for _ in range(count):
+                trie.record(query, timestamp=0.0)
+
+        assert trie.complete("") == ["鶏肉", "豚肉", "鶏もも肉"]
+        assert trie.complete("鶏") == ["鶏肉", "鶏もも肉"]
+        assert trie.complete("牛") == []
+
+    def test_recent_queries_outrank_old(self):
+        """古い検索ほど重みが小さい"""
+        trie = PopularityTrie(half_life=DAY)
+        for _ in range(3):
+            trie.record("カレー", timestamp=0.0)
+        trie.record("カレーうどん", timestamp=2 * DAY)
+
+        assert trie.complete("カレー") == ["カレーうどん", "カレー"]
+        assert trie.score("カレー", now=2 * DAY) == pytest.approx(0.75)
+
+    def test_matches_brute_force_top_k(self):
+        """各ノードの上位リストが全件ソートの結果と一致する"""
+        rng = random.Random(3)
+        trie = PopularityTrie(half_life=10.0, top_k=5)
+        queries = [
+            "".join(rng.choice("abc") for _ in range(rng.randint(1, 4)))
+            for _ in range(30)
+        ]
+        for t in range(500):
+            trie.record(rng.choice(queries), timestamp=float(t))
+
+        for prefix in ["", "a", "ab", "c", "bca"]:
+            candidates = {q for q in queries if q.startswith(prefix)}
+            expected = sorted(candidates, key=lambda q: (-trie.score(q, now=500.0), q))
+            assert trie.complete(prefix, limit=5) == expected[:5]
+
+    def test_rescale_keeps_order(self):
+        """基準時刻の更新後も順位と減衰後の値は変わらない"""
+        trie = PopularityTrie(half_life=1.0)
+        trie.record("a", timestamp=0.0)
+        trie.record("a", timestamp=0.0)
+        trie.record("b", timestamp=0.0)
+        trie.record("c", timestamp=100.0)
+
+        assert trie.complete("") == ["c", "a", "b"]
+        assert trie.score("a", now=100.0) == pytest.approx(2 * 2.0**-100)
+
+    def test_normalized_key(self):
+        """大文字小文字・空白の違いは同じクエリとして数える"""
+        trie = PopularityTrie()
+        trie.record("Easy  Pasta", timestamp=0.0)
+        trie.record("easy pasta", timestamp=0.0)
+
+        assert len(trie) == 1
+        assert "EASY PASTA" in trie
+        assert trie.complete("EASY") == ["easy pasta"]
+        assert normalize_query("　a  B ") == "a b"
+
+        trie.clear()
+        assert trie.complete("") == []
@@ -0,0 +1,176 @@
+"""
+ストリーミングアップロード取り込みのテスト
+"""
+
+import io
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI, Request, UploadFile
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from backend.core.uploads import (
+    remove_spooled,
+    spool_multipart_images,
+    spool_upload_file,
+)
+
+
+def png_bytes(size=(32, 32)) -> bytes:
+    """テスト用PNG画像のバイト列"""
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color=(255, 0, 0)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def spool_dir(tmp_path):
+    """書き出し先ディレクトリ"""
+    return tmp_path / "spool"
+
+
+@pytest.fixture
+def client(spool_dir):
+    """spool_multipart_images を呼ぶだけのテスト用アプリ"""
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        uploads, fields = await spool_multipart_images(
+            request, dest_dir=spool_dir, max_file_size=4096, max_files=3
+        )
+        body = {
+            "files": [
+                {
+                    "name": u.original_filename,
+                    "mime": u.mime_type,
+                    "size": u.size,
+                    "exists": u.path.exists(),
+                    "same": u.path.read_bytes() == png_bytes(),
+                }
+                for u in uploads
+            ],
+            "fields": fields,
+        }
+        remove_spooled(uploads)
+        return body
+
+    return TestClient(app)
+
+
+class TestSpoolMultipartImages:
+    """spool_multipart_imagesのテスト"""
+
+    def test_spools_multiple_images_to_disk(self, client, spool_dir):
+        """複数画像をディスクに書き出し、内容とMIMEを保持する"""
+        data = png_bytes()
+        response = client.post(
+            "/upload",
+            files=[
+                ("files", ("a.png", data, "image/png")),
+                ("files", ("b.png", data, "image/png")),
+            ],
+            data={"note": "hello"},
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [f["name"] for f in body["files"]] == ["a.png", "b.png"]
+        assert all(f["mime"] == "image/png" for f in body["files"])
+        assert all(f["exists"] and f["same"] for f in body["files"])
+        assert body["fields"] == {"note": "hello"}
+        assert list(spool_dir.iterdir()) == []
+
+    def test_rejects_oversize_while_streaming(self, client, spool_dir):
+        """上限超過はストリーミング中に413で拒否し、一時ファイルを残さない"""
+        big = png_bytes() + b"\0" * 8192
+        response = client.post(
+            "/upload",
+            files=[
+                ("files", ("ok.png", png_bytes(), "image/png")),
+                ("files", ("big.png", big, "image/png")),
+            ],
+        )
+
+        assert response.status_code == 413
+        assert list(spool_dir.iterdir()) == []
+
+    def test_rejects_non_image_by_magic_bytes(self, client, spool_dir):
+        """Content-Typeではなく先頭バイトで形式を判定する"""
+        response = client.post(
+            "/upload",
+            files=[("files", ("fake.png", b"#!/bin/sh\necho hacked\n", "image/png"))],
+        )
+
+        assert response.status_code == 400
+        assert list(spool_dir.iterdir()) == []
+
+    def test_rejects_too_many_files(self, client):
+        """ファイル数の上限を超えると拒否する"""
+        data = png_bytes()
+        response = client.post(
+            "/upload",
+            files=[("files", (f"{i}.png", data, "image/png")) for i in range(4)],
+        )
+
+        assert response.status_code == 400
+
+    def test_rejects_non_multipart(self, client):
+        """multipart以外のリクエストは拒否する"""
+        response = client.post("/upload", json={"a": 1})
+        assert response.status_code == 400
+
+
+class TestSpoolUploadFile:
+    """spool_upload_fileのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_spool_upload_file(self, spool_dir):
+        """UploadFileをチャンク単位で書き出す"""
+        data = png_bytes()
+        upload = await spool_upload_file(
+            UploadFile(file=io.BytesIO(data), filename="photo.png"), dest_dir=spool_dir
+        )
+
+        assert upload.path.read_bytes() == data
+        assert upload.mime_type == "image/png"
+        remove_spooled([upload])
+        assert not upload.path.exists()
+
+
+class TestOCRBulkEndpoint:
+    """一括OCRエンドポイントのテスト"""
+
+    def test_extract_bulk_passes_paths_to_workers(self):
+        """OCRワーカーにはバイト列ではなくファイルパスが渡される"""
+        from backend.api.routers.ocr import router
+
+        app = FastAPI()
+        app.include_router(router)
+        seen = []
+
+        def fake_process_image(
+            self, image_path, preprocess=True, include_confidence=False
+        ):
+            seen.append(image_path)
+            assert image_path.exists()
+            return {"status": "ok", "data": {"title": "テスト"}, "error": None}
+
+        with patch("backend.ocr.service.OCRService.__init__", return_value=None), patch(
+            "backend.ocr.service.OCRService.process_image", fake_process_image
+        ):
+            response = TestClient(app).post(
+                "/api/v1/ocr/extract-bulk",
+                files=[
+                    ("files", ("1.png", png_bytes(), "image/png")),
+                    ("files", ("2.png", png_bytes(), "image/png")),
+                ],
+            )
+
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["summary"] == {"total": 2, "success": 2, "error": 0}
+        assert [r["source"] for r in data["results"]] == ["1.png", "2.png"]
+        assert len(seen) == 2
+        assert not any(path.exists() for path in seen)
@@ -0,0 +1,117 @@
+"""
+非同期バッチ書き込みバッファ（WriteBehindBuffer）のテスト
+"""
+
+import time
+
+import pytest
+
+from backend.services.write_behind import WriteBehindBuffer
+
+
+class FlakyWriter:
+    """指定回数だけ失敗する書き込み関数"""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.batches = []
+
+    def __call__(self, batch):
+        if self.failures > 0:
+            self.failures -= 1
+            raise OSError("disk full")
+        self.batches.append(list(batch))
+
+
+@pytest.fixture
+def writer():
+    return FlakyWriter()
+
+
+@pytest.fixture
+def buffer(writer):
+    """バックグラウンド書き込みを実質無効にしたバッファ"""
+    buffer = WriteBehindBuffer(writer, name="test-flush", flush_interval=3600)
+    yield buffer
+    buffer.close()
+
+
+class TestWriteBehindBuffer:
+    """WriteBehindBufferのテスト"""
+
+    def test_flush_writes_in_order(self, buffer, writer):
+        """追加順にまとめて書き込む"""
+        for i in range(3):
+            buffer.append(i)
+
+        assert len(buffer) == 3
+        assert buffer.flush() == 3
+        assert writer.batches == [[0, 1, 2]]
+        assert buffer.flush() == 0
+
+    def test_failed_batch_is_requeued(self, buffer, writer):
+        """失敗したバッチは後から追加した分より前に戻して再試行する"""
+        writer.failures = 1
+        buffer.append("a")
+        buffer.append("b")
+
+        with pytest.raises(OSError):
+            buffer.flush()
+        buffer.append("c")
+
+        assert buffer.flush() == 3
+        assert writer.batches == [["a", "b", "c"]]
+
+    def test_background_thread_survives_errors(self):
+        """書き込み関数の例外でバックグラウンドスレッドが止まらない"""
+        writer = FlakyWriter(failures=1)
+        buffer = WriteBehindBuffer(writer, name="test-flush", flush_interval=0.01)
+        try:
+            buffer.append("a")
+            for _ in range(200):
+                if writer.batches:
+                    break
+                time.sleep(0.01)
+            assert writer.batches == [["a"]]
+        finally:
+            buffer.close()
+
+    def test_batch_size_wakes_writer(self, writer):
+        """バッチサイズに達すると間隔を待たずに書き込む"""
+        buffer = WriteBehindBuffer(
+            writer, name="test-flush", flush_interval=3600, batch_size=2
+        )
+        try:
+            buffer.append(1)
+            buffer.append(2)
+            for _ in range(100):
+                if writer.batches:
+                    break
+                time.sleep(0.01)
+            assert writer.batches == [[1, 2]]
+        finally:
+            buffer.close()
+
+    def test_discard(self, buffer, writer):
+        """discard で未書き込みの値を捨てる"""
+        buffer.append(1)
+        with buffer.io_lock:
+            buffer.discard()
+
+        assert buffer.flush() == 0
+        assert writer.batches == []
+
+    def test_close_flushes_and_logs_errors(self, writer, caplog):
+        """close で残りを書き込み、失敗はログに残して例外にしない"""
+        buffer = WriteBehindBuffer(writer, name="test-flush", flush_interval=3600)
+        buffer.append(1)
+        buffer.close()
+        assert buffer.closed
+        assert writer.batches == [[1]]
+
+        failing = WriteBehindBuffer(
+            FlakyWriter(failures=1), name="test-flush", flush_interval=3600
+        )
+        failing.append(1)
+        failing.close()
+        assert "test-flush failed" in caplog.text
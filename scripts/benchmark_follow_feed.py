@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Follow feed benchmark: pull (scan / k-way merge) vs push (fan-out timelines)
+
+Builds a synthetic social graph with a skewed follower distribution (a few
+heavy publishers, many small accounts) and compares three ways to read the
+follow feed:
+
+- scan : the original pull model (filter every recipe, sort, slice)
+- merge: pull via SocialGraph.latest_recipes (k-way merge of author lists)
+- push : SocialGraph.feed (bounded per-follower timelines, heavy publishers
+         merged in at read time)
+
+Also reports the cost of publishing a recipe (fan-out + recipes.json write)
+and checks that push and pull return the same feed.
+
+Run: python scripts/benchmark_follow_feed.py --users 10000 --recipes 50000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.services.social_graph import SocialGraph  # noqa: E402
+
+
+def generate_graph(users: int, following: int, recipes: int, seed: int = 42):
+    """Generate users, follows (Zipf-like popularity) and time-ordered recipes."""
+    rng = random.Random(seed)
+    user_ids = [f"user_{i:05d}" for i in range(users)]
+    # Popularity weight ~ 1 / rank so a handful of accounts collect most follows
+    weights = [1.0 / (rank + 1) for rank in range(users)]
+
+    follows: List[Dict] = []
+    for follower_id in user_ids:
+        targets = set(rng.choices(user_ids, weights=weights, k=following))
+        targets.discard(follower_id)
+        follows.extend(
+            {
+                "id": f"{follower_id}_{target}",
+                "follower_id": follower_id,
+                "following_id": target,
+            }
+            for target in targets
+        )
+
+    authors = rng.choices(user_ids, weights=weights, k=recipes)
+    recipe_list = [
+        {
+            "id": f"recipe_{i:06d}",
+            "user_id": author,
+            "title": f"レシピ{i}",
+            "created_at": f"2025-{1 + i * 12 // recipes:02d}-01T00:00:{i:09d}",
+        }
+        for i, author in enumerate(authors)
+    ]
+    return [{"id": user_id} for user_id in user_ids], follows, recipe_list
+
+
+def scan_feed(follows: List[Dict], recipes: List[Dict], user_id: str, limit: int):
+    """The pre-index pull model: filter all follows and recipes, then sort."""
+    following_ids = [f["following_id"] for f in follows if f["follower_id"] == user_id]
+    selected = [r for r in recipes if r["user_id"] in following_ids]
+    selected.sort(key=lambda r: r.get("created_at", ""), reverse=True)
+    return selected[:limit]
+
+
+def percentiles(samples: List[float]) -> str:
+    return (
+        f"{statistics.median(samples):8.3f} / "
+        f"{statistics.quantiles(samples, n=20)[-1]:8.3f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--following", type=int, default=50)
+    parser.add_argument("--recipes", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--scan-queries", type=int, default=20)
+    parser.add_argument("--publishes", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--heavy-threshold", type=int, default=1000)
+    args = parser.parse_args()
+
+    users, follows, recipes = generate_graph(args.users, args.following, args.recipes)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        graph = SocialGraph(
+            Path(data_dir), heavy_publisher_threshold=args.heavy_threshold
+        )
+        started = time.perf_counter()
+        graph.replace_users(users)
+        graph.replace_follows(follows)
+        graph.replace_recipes(recipes)
+        load_seconds = time.perf_counter() - started
+
+        heavy = sum(1 for u in users if graph.is_heavy_publisher(u["id"]))
+        rng = random.Random(7)
+        readers = [rng.choice(users)["id"] for _ in range(args.queries)]
+
+        scan_ms = []
+        for user_id in readers[: args.scan_queries]:
+            t0 = time.perf_counter()
+            scan_feed(follows, recipes, user_id, args.limit)
+            scan_ms.append((time.perf_counter() - t0) * 1000)
+
+        merge_ms, cold_ms, push_ms, mismatches = [], [], [], 0
+        for user_id in readers:
+            following = graph.following_ids(user_id)
+
+            t0 = time.perf_counter()
+            pulled = graph.latest_recipes(following, args.limit)
+            t1 = time.perf_counter()
+            first = user_id not in graph.timelines
+            pushed = graph.feed(user_id, args.limit)
+            t2 = time.perf_counter()
+            graph.feed(user_id, args.limit)
+            t3 = time.perf_counter()
+
+            merge_ms.append((t1 - t0) * 1000)
+            if first:
+                cold_ms.append((t2 - t1) * 1000)
+            push_ms.append((t3 - t2) * 1000)
+            if [r["id"] for r in pulled] != [r["id"] for r in pushed]:
+                mismatches += 1
+
+        publish_ms, fan_out = [], []
+        for i in range(args.publishes):
+            author = rng.choice(users)["id"]
+            t0 = time.perf_counter()
+            graph.add_recipe(
+                {
+                    "id": f"published_{i}",
+                    "user_id": author,
+                    "created_at": f"2026-01-01T00:00:{i:09d}",
+                }
+            )
+            publish_ms.append((time.perf_counter() - t0) * 1000)
+            if not graph.is_heavy_publisher(author):
+                fan_out.append(
+                    sum(1 for f in graph.follower_ids(author) if f in graph.timelines)
+                )
+
+    print("=" * 64)
+    print(
+        f"Follow feed: {args.users} users, ~{args.following} follows each, "
+        f"{args.recipes} recipes, limit={args.limit}"
+    )
+    print("=" * 64)
+    print(f"follows / heavy users    : {len(follows):8d} / {heavy}")
+    print(f"index load               : {load_seconds:8.2f} s")
+    print(f"scan  median / p95       : {percentiles(scan_ms)}")
+    print(f"merge median / p95       : {percentiles(merge_ms)}")
+    print(f"push  cold build med     : {statistics.median(cold_ms):8.3f} ms")
+    print(f"push  median / p95       : {percentiles(push_ms)}")
+    print(f"publish median / p95     : {percentiles(publish_ms)}  (incl. file write)")
+    print(
+        f"fan-out per publish      : {statistics.mean(fan_out or [0]):8.1f} timelines"
+    )
+    print(f"push != pull feeds       : {mismatches:8d} of {len(readers)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Rate limiter microbenchmark: per-request overhead and memory per client
+
+Compares the shared GCRA engine (backend/core/rate_limit.py) with a
+timestamp-list sliding log, which is how the previous per-IP limiter and
+the scraper limiter counted requests:
+
+- sliding-log : per-client list of timestamps, filtered on every request
+- gcra-memory : RateLimitEngine + MemoryStorage (one float per client)
+- gcra-sqlite : RateLimitEngine + SQLiteStorage (shared between processes)
+
+Requests are spread over --clients keys with a skewed (Zipf-like) pattern so
+a few hot clients sit at their limit while most stay under it.
+
+Run: python scripts/benchmark_rate_limiter.py --clients 1000 --requests 200000
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.core.rate_limit import (  # noqa: E402
+    MemoryStorage,
+    Rate,
+    RateLimitEngine,
+    SQLiteStorage,
+)
+
+
+class SlidingLog:
+    """Reference: per-client timestamp list filtered on every request."""
+
+    def __init__(self):
+        self._requests: Dict[str, List[float]] = {}
+
+    def hit(self, key: str, rate: Rate, now: float) -> bool:
+        cutoff = now - rate.period
+        valid = [ts for ts in self._requests.get(key, []) if ts > cutoff]
+        if len(valid) >= rate.limit:
+            self._requests[key] = valid
+            return False
+        valid.append(now)
+        self._requests[key] = valid
+        return True
+
+
+def generate_keys(clients: int, requests: int, seed: int = 42) -> List[str]:
+    """Client key per request, most traffic from a few clients."""
+    rng = random.Random(seed)
+    names = [f"api|general|10.0.{i // 256}.{i % 256}" for i in range(clients)]
+    weights = [1.0 / (rank + 1) for rank in range(clients)]
+    return rng.choices(names, weights=weights, k=requests)
+
+
+def measure(
+    name: str,
+    check: Callable[[str, float], bool],
+    reset: Callable[[], None],
+    keys: List[str],
+    step: float,
+) -> Dict:
+    """Run every request through ``check`` on a simulated clock."""
+
+    def run() -> int:
+        now = 1_000_000.0
+        allowed = 0
+        for key in keys:
+            now += step
+            allowed += check(key, now)
+        return allowed
+
+    # Timed pass, then a second pass under tracemalloc for the retained state
+    start = time.perf_counter()
+    allowed = run()
+    elapsed = time.perf_counter() - start
+    reset()
+    tracemalloc.start()
+    run()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "name": name,
+        "us_per_request": elapsed / len(keys) * 1e6,
+        "allowed": allowed,
+        "state_kib": retained / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=200000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--window", type=float, default=60.0)
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=600.0,
+        help="simulated seconds the requests are spread over",
+    )
+    parser.add_argument("--skip-sqlite", action="store_true")
+    args = parser.parse_args()
+
+    rate = Rate(args.limit, args.window)
+    keys = generate_keys(args.clients, args.requests)
+    step = args.duration / args.requests
+
+    sliding = SlidingLog()
+    runs = [
+        measure(
+            "sliding-log",
+            lambda k, t: sliding.hit(k, rate, t),
+            sliding._requests.clear,
+            keys,
+            step,
+        )
+    ]
+
+    for label, storage_factory in [
+        ("gcra-memory", lambda tmp: MemoryStorage()),
+        ("gcra-sqlite", lambda tmp: SQLiteStorage(Path(tmp) / "limits.db")),
+    ]:
+        if label == "gcra-sqlite" and args.skip_sqlite:
+            continue
+        with tempfile.TemporaryDirectory() as tmp:
+            clock = {"now": 0.0}
+            engine = RateLimitEngine(storage_factory(tmp), clock=lambda: clock["now"])
+
+            def check(key: str, now: float) -> bool:
+                clock["now"] = now
+                return engine.hit(key, rate).allowed
+
+            runs.append(measure(label, check, engine.reset, keys, step))
+            if isinstance(engine.storage, SQLiteStorage):
+                engine.storage.close()
+
+    print(
+        f"clients={args.clients} requests={args.requests} "
+        f"limit={args.limit}/{args.window:g}s duration={args.duration:g}s"
+    )
+    print(f"{'limiter':<14}{'us/request':>12}{'allowed':>10}{'state KiB':>12}")
+    for run in runs:
+        print(
+            f"{run['name']:<14}{run['us_per_request']:>12.2f}"
+            f"{run['allowed']:>10}{run['state_kib']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Similar-recipe benchmark: exact pairwise scan vs MinHash/LSH candidates
+
+Builds a synthetic catalogue in which recipes are variations of a set of
+base dishes, then compares RecommendationService.recommend_similar with
+approximate=False (score every recipe that shares an ingredient) and
+approximate=True (score only LSH bucket candidates).
+
+The same catalogue is then passed to RecommendationAIService.get_similar_recipes,
+once with the LSH path disabled (score the whole feature matrix) and once with
+it enabled (score only the bucket candidates of the incrementally maintained
+index). The first call, which syncs the feature store, is reported separately.
+
+Reports per-query latency, the fraction of the catalogue scored and
+recall@k of the approximate results against the exact top-k.
+
+Run: python scripts/benchmark_similar_recipes.py --recipes 20000 --queries 200
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.services.recommendation_ai_service import (  # noqa: E402
+    RecommendationAIService,
+)
+from backend.services.recommendation_service import RecommendationService  # noqa: E402
+
+TAGS = ["和食", "洋食", "中華", "簡単", "時短", "定番", "ヘルシー", "作り置き"]
+
+
+def generate_catalogue(size: int, seed: int = 42) -> List[Dict]:
+    """Generate recipes as noisy variations of base dishes."""
+    rng = random.Random(seed)
+    vocabulary = [f"食材{i:04d}" for i in range(3000)]
+    bases = [
+        rng.sample(vocabulary, rng.randint(5, 12)) for _ in range(max(size // 20, 1))
+    ]
+
+    recipes = []
+    for i in range(size):
+        ingredients = list(rng.choice(bases))
+        # Drop and add a few ingredients to create near-duplicates
+        for _ in range(rng.randint(0, 2)):
+            if len(ingredients) > 2:
+                ingredients.pop(rng.randrange(len(ingredients)))
+        ingredients += rng.sample(vocabulary, rng.randint(0, 3))
+        recipes.append(
+            {
+                "id": f"recipe_{i:06d}",
+                "ingredients": [{"name": name} for name in ingredients],
+                "tags": rng.sample(TAGS, rng.randint(1, 3)),
+            }
+        )
+    return recipes
+
+
+def recall_at_k(exact, approx) -> float:
+    """Share of the exact top-k (with positive score) found by the approximation."""
+    relevant = {r.recipe["id"] for r in exact if r.match_score > 0}
+    if not relevant:
+        return 1.0
+    found = {r.recipe["id"] for r in approx}
+    return len(relevant & found) / len(relevant)
+
+
+def ai_recall_at_k(exact: List[Dict], approx: List[Dict]) -> float:
+    """recall_at_k for RecommendationAIService results."""
+    relevant = {r["recipe"]["id"] for r in exact if r["similarity"] > 0}
+    if not relevant:
+        return 1.0
+    found = {r["recipe"]["id"] for r in approx}
+    return len(relevant & found) / len(relevant)
+
+
+def benchmark_ai_service(recipes: List[Dict], targets: List[str], k: int) -> None:
+    """Time RecommendationAIService.get_similar_recipes with and without LSH."""
+    with tempfile.TemporaryDirectory() as data_dir:
+        service = RecommendationAIService(data_dir=data_dir)
+
+        started = time.perf_counter()
+        service.get_similar_recipes(targets[0], recipes, limit=k)
+        sync_seconds = time.perf_counter() - started
+
+        exact_ms, approx_ms, recalls, fractions = [], [], [], []
+        for target in targets:
+            service.LSH_MIN_RECIPES = len(recipes) + 1
+            t0 = time.perf_counter()
+            exact = service.get_similar_recipes(target, recipes, limit=k)
+            t1 = time.perf_counter()
+            service.LSH_MIN_RECIPES = 0
+            approx = service.get_similar_recipes(target, recipes, limit=k)
+            t2 = time.perf_counter()
+
+            exact_ms.append((t1 - t0) * 1000)
+            approx_ms.append((t2 - t1) * 1000)
+            recalls.append(ai_recall_at_k(exact, approx))
+            fractions.append(
+                len(service.feature_store.lsh.candidates(item_id=target)) / len(recipes)
+            )
+
+    print("-" * 60)
+    print("RecommendationAIService.get_similar_recipes")
+    print("-" * 60)
+    print(f"first call (sync)     : {sync_seconds:8.2f} s")
+    print(
+        f"matrix  median / p95  : {statistics.median(exact_ms):8.2f} / "
+        f"{statistics.quantiles(exact_ms, n=20)[-1]:8.2f} ms"
+    )
+    print(
+        f"lsh     median / p95  : {statistics.median(approx_ms):8.2f} / "
+        f"{statistics.quantiles(approx_ms, n=20)[-1]:8.2f} ms"
+    )
+    print(
+        f"candidates scored     : {statistics.mean(fractions) * 100:8.2f} % of catalogue"
+    )
+    print(f"recall@{k:<3}            : {statistics.mean(recalls):8.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--recipes", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    recipes = generate_catalogue(args.recipes)
+
+    started = time.perf_counter()
+    service = RecommendationService(recipes)
+    build_seconds = time.perf_counter() - started
+
+    rng = random.Random(7)
+    targets = [rng.choice(recipes)["id"] for _ in range(args.queries)]
+
+    exact_ms, approx_ms, recalls, fractions = [], [], [], []
+    for target in targets:
+        t0 = time.perf_counter()
+        exact = service.recommend_similar(target, args.k, approximate=False)
+        t1 = time.perf_counter()
+        approx = service.recommend_similar(target, args.k, approximate=True)
+        t2 = time.perf_counter()
+
+        exact_ms.append((t1 - t0) * 1000)
+        approx_ms.append((t2 - t1) * 1000)
+        recalls.append(recall_at_k(exact, approx))
+        fractions.append(
+            len(service.index.lsh.candidates(item_id=target)) / len(recipes)
+        )
+
+    print("=" * 60)
+    print(
+        f"Similar recipes: {args.recipes} recipes, {args.queries} queries, k={args.k}"
+    )
+    print("=" * 60)
+    print(f"index build           : {build_seconds:8.2f} s")
+    print(
+        f"exact   median / p95  : {statistics.median(exact_ms):8.2f} / "
+        f"{statistics.quantiles(exact_ms, n=20)[-1]:8.2f} ms"
+    )
+    print(
+        f"lsh     median / p95  : {statistics.median(approx_ms):8.2f} / "
+        f"{statistics.quantiles(approx_ms, n=20)[-1]:8.2f} ms"
+    )
+    print(
+        f"candidates scored     : {statistics.mean(fractions) * 100:8.2f} % of catalogue"
+    )
+    print(f"recall@{args.k:<3}            : {statistics.mean(recalls):8.3f}")
+
+    benchmark_ai_service(recipes, targets, args.k)
+
+
+if __name__ == "__main__":
+    main()